@@ -0,0 +1,126 @@
+"""
+Micro-benchmark: wall-clock context compaction, sequential vs map-reduce.
+
+Compacts a synthetic tool-loop history with a mocked summarizer that
+sleeps for a fixed latency per call (standing in for the provider round
+trip). Sequential staged summarization makes one call per chunk back to
+back; map-reduce runs the chunk calls on a bounded pool, then merges once.
+
+Before timing, the history splitter is checked: split_messages_by_token_share
+must return the requested number of roughly equal chunks, and
+prune_history_for_context must actually drop the oldest history; --check
+runs only that.
+
+    python -m benchmarks.bench_compaction --messages 400 --latency 0.2 --workers 1 2 4 8
+    python -m benchmarks.bench_compaction --check
+"""
+
+import argparse
+import random
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.infra.compaction import (  # noqa: E402
+    STRATEGY_MAP_REDUCE,
+    STRATEGY_SEQUENTIAL,
+    compact_messages,
+    estimate_messages_tokens,
+    prune_history_for_context,
+    split_messages_by_token_share,
+)
+
+WORDS = ("deploy build cron circuit agent memory browser schedule token "
+         "search screenshot note vision tool error fix config skill").split()
+
+
+def _history(count: int) -> list:
+    rng = random.Random(0)
+    messages = [{"role": "system", "content": "You are a helpful agent."}]
+    for i in range(count):
+        role = ("user", "assistant", "tool")[i % 3]
+        words = rng.randint(150, 600)
+        messages.append({"role": role, "content": " ".join(rng.choice(WORDS) for _ in range(words))})
+    return messages
+
+
+class _MockSummarizer:
+    """Thread-safe summarizer stub: sleeps `latency` seconds per call."""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, text, instructions, previous_summary):
+        with self._lock:
+            self.calls += 1
+        time.sleep(self.latency)
+        return f"summary of {len(text)} chars"
+
+
+def check_split() -> None:
+    """Assert the token-share splitter splits and that pruning drops the oldest chunk."""
+    messages = _history(40)
+    total = estimate_messages_tokens(messages)
+    for parts in (2, 3, 4):
+        chunks = split_messages_by_token_share(messages, parts)
+        assert len(chunks) == parts, (parts, len(chunks))
+        assert [m for chunk in chunks for m in chunk] == messages
+        sizes = [estimate_messages_tokens(chunk) for chunk in chunks]
+        assert max(sizes) <= 2 * total / parts, (parts, sizes)
+
+    result = prune_history_for_context(messages, max_context_tokens=total, max_history_share=0.5)
+    assert result.dropped_count > 0 and result.kept_tokens <= result.budget_tokens, result
+    assert result.messages == messages[result.dropped_count:]
+    print(f"split check: {total} tokens split into 2-4 parts; prune kept {len(result.messages)}/{len(messages)}")
+
+
+def _run_once(messages, strategy, workers, latency, context_window):
+    summarizer = _MockSummarizer(latency)
+    start = time.perf_counter()
+    _, stats = compact_messages(
+        messages,
+        max_tokens=8000,
+        summarizer=summarizer,
+        context_window=context_window,
+        strategy=strategy,
+        max_workers=workers,
+    )
+    return time.perf_counter() - start, summarizer.calls, stats
+
+
+def run(count: int, latency: float, worker_counts, context_window: int) -> None:
+    messages = _history(count)
+    print(f"{count} messages, ~{estimate_messages_tokens(messages)} tokens, "
+          f"{latency * 1000:.0f} ms/summary call, context window {context_window}")
+    print(f"{'strategy':>12} {'workers':>8} {'calls':>6} {'wall s':>8} {'speedup':>8}")
+
+    baseline, calls, _ = _run_once(messages, STRATEGY_SEQUENTIAL, 1, latency, context_window)
+    print(f"{'sequential':>12} {1:>8} {calls:>6} {baseline:>8.2f} {1.0:>7.1f}x")
+    for workers in worker_counts:
+        if workers <= 1:
+            continue
+        elapsed, calls, _ = _run_once(messages, STRATEGY_MAP_REDUCE, workers, latency, context_window)
+        print(f"{'map_reduce':>12} {workers:>8} {calls:>6} {elapsed:>8.2f} {baseline / elapsed:>7.1f}x")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--messages", type=int, default=400)
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--workers", type=int, nargs="+", default=[2, 4, 8])
+    parser.add_argument("--context-window", type=int, default=32000)
+    parser.add_argument("--check", action="store_true", help="only run the splitter check")
+    args = parser.parse_args()
+    check_split()
+    if args.check:
+        return
+    run(args.messages, args.latency, args.workers, args.context_window)
+
+
+if __name__ == "__main__":
+    main()
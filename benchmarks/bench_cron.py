@@ -0,0 +1,159 @@
+"""
+Micro-benchmark + conformance check: in-process cron engine vs croner.
+
+Conformance: every expression in CASES is resolved from a fixed base time
+(UTC) and compared with the expected next fire time. When Node and the
+croner package are available, each case is also run through croner with
+the same base time and the two results must agree.
+
+Throughput: next-run computations per second for the compiled (cached)
+engine, for compile + search on every call, and for the old one Node
+subprocess per call path (skipped when Node/croner are missing).
+
+    python -m benchmarks.bench_cron --calls 20000 --node-calls 20
+"""
+
+import argparse
+import json
+import shutil
+import subprocess
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.gateway.cron_engine import CronSchedule, compile_cron  # noqa: E402
+
+ROOT = Path(__file__).resolve().parent.parent
+BASE = datetime(2025, 3, 1, 12, 0, tzinfo=timezone.utc)   # a Saturday
+
+# (expression, expected next fire after BASE in UTC)
+CASES = [
+    ("0 8 * * *", "2025-03-02T08:00:00"),
+    ("*/30 * * * *", "2025-03-01T12:30:00"),
+    ("0 9 * * 1-5", "2025-03-03T09:00:00"),
+    ("15 14 1 * *", "2025-03-01T14:15:00"),
+    ("23 0-20/2 * * *", "2025-03-01T12:23:00"),
+    ("5 4 * * sun", "2025-03-02T04:05:00"),
+    ("0 0,12 1 */2 *", "2025-05-01T00:00:00"),
+    ("*/15 9-17 * * MON-FRI", "2025-03-03T09:00:00"),
+    ("0 0 13 * 5", "2025-03-07T00:00:00"),
+    ("0 0 29 2 *", "2028-02-29T00:00:00"),
+    ("0 0 1 1 *", "2026-01-01T00:00:00"),
+    ("0 0 * * 7", "2025-03-02T00:00:00"),
+    ("0 0 * * 5-7", "2025-03-02T00:00:00"),
+    ("0 0 ? JAN,JUL MON", "2025-07-07T00:00:00"),
+    ("*/10 * * * * *", "2025-03-01T12:00:10"),
+    ("0 5/20 * * * *", "2025-03-01T12:05:00"),
+    ("@hourly", "2025-03-01T13:00:00"),
+    ("@weekly", "2025-03-02T00:00:00"),
+    ("0 0 L * *", "2025-03-31T00:00:00"),
+    ("0 12 15W * *", "2025-03-14T12:00:00"),
+    ("0 0 1W * *", "2025-03-03T00:00:00"),
+    ("0 12 LW * *", "2025-03-31T12:00:00"),
+    ("0 18 * * 5L", "2025-03-28T18:00:00"),
+    ("0 10 * * 1#2", "2025-03-10T10:00:00"),
+]
+INVALID = ["", "* * * *", "60 * * * *", "* * 32 * *", "* * * 13 *", "*/0 * * * *",
+           "5-1 * * * *", "* * * * 8", "0 0 30 2 *"]
+
+_CRONER_JS = """
+const { Cron } = require("croner");
+const [base, ...exprs] = process.argv.slice(1);
+for (const expr of exprs) {
+  try {
+    const next = new Cron(expr, { timezone: "UTC" }).nextRun(new Date(base));
+    console.log(next ? next.toISOString() : "NONE");
+  } catch (e) { console.log("INVALID"); }
+}
+"""
+
+
+def _has_croner() -> bool:
+    if not shutil.which("node"):
+        return False
+    probe = subprocess.run(["node", "-e", "require('croner')"], cwd=ROOT, capture_output=True)
+    return probe.returncode == 0
+
+
+def _croner(exprs, base: datetime):
+    result = subprocess.run(
+        ["node", "-e", _CRONER_JS, base.isoformat(), *exprs],
+        cwd=ROOT, capture_output=True, text=True, timeout=30,
+    )
+    out = []
+    for line in result.stdout.split("\n")[:len(exprs)]:
+        line = line.strip()
+        out.append(line if line in ("NONE", "INVALID")
+                   else datetime.fromisoformat(line.replace("Z", "+00:00")).strftime("%Y-%m-%dT%H:%M:%S"))
+    return out
+
+
+def _native(expr: str, base: datetime) -> str:
+    try:
+        schedule = CronSchedule(expr)
+    except ValueError:
+        return "INVALID"
+    found = schedule.next_after(base)
+    return found.strftime("%Y-%m-%dT%H:%M:%S") if found else "NONE"
+
+
+def conformance(use_node: bool) -> int:
+    exprs = [e for e, _ in CASES] + INVALID
+    expected = [x for _, x in CASES] + ["INVALID"] * (len(INVALID) - 1) + ["NONE"]
+    node = _croner(exprs, BASE) if use_node else [None] * len(exprs)
+    failures = 0
+    print(f"{'expression':>24} {'native':>20} {'expected':>20} {'croner':>20}")
+    for expr, want, from_node in zip(exprs, expected, node):
+        got = _native(expr, BASE)
+        ok = got == want and (from_node is None or from_node == got)
+        failures += not ok
+        print(f"{expr!r:>24} {got:>20} {want:>20} {from_node or '-':>20}{'' if ok else '  MISMATCH'}")
+    print(f"{len(exprs) - failures}/{len(exprs)} conformant"
+          + ("" if use_node else " (croner cross-check skipped: node/croner not available)"))
+    return failures
+
+
+def throughput(calls: int, node_calls: int, use_node: bool) -> None:
+    exprs = [e for e, _ in CASES]
+    bases = [BASE + timedelta(minutes=17 * i) for i in range(calls)]
+
+    start = time.perf_counter()
+    for i, base in enumerate(bases):
+        compile_cron(exprs[i % len(exprs)]).next_after(base)
+    cached = calls / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    for i, base in enumerate(bases):
+        CronSchedule(exprs[i % len(exprs)]).next_after(base)
+    uncached = calls / (time.perf_counter() - start)
+
+    print(f"\n{'path':>22} {'next-runs/s':>12}")
+    print(f"{'native (cached)':>22} {cached:>12,.0f}")
+    print(f"{'native (compile each)':>22} {uncached:>12,.0f}")
+    if use_node:
+        helper = ROOT / "src" / "gateway" / "cron_next.js"
+        start = time.perf_counter()
+        for i in range(node_calls):
+            subprocess.run(["node", str(helper), exprs[i % len(exprs)]], capture_output=True, timeout=5)
+        per_sec = node_calls / (time.perf_counter() - start)
+        print(f"{'node subprocess':>22} {per_sec:>12,.1f}   ({cached / per_sec:,.0f}x slower than cached)")
+    print(f"compile cache: {json.dumps(compile_cron.cache_info()._asdict())}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--calls", type=int, default=20000)
+    parser.add_argument("--node-calls", type=int, default=20)
+    parser.add_argument("--no-node", action="store_true", help="skip the croner cross-check and timing")
+    args = parser.parse_args()
+    use_node = not args.no_node and _has_croner()
+    failures = conformance(use_node)
+    throughput(args.calls, args.node_calls, use_node)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+"""
+Micro-benchmark: grep_tool search over a synthetic source tree.
+
+Builds a throwaway tree of N small source files (default 50k, ~100 files
+per directory) with a handful of rare tokens sprinkled in, then times:
+
+- legacy:  os.walk + stat per file, readlines() + per-line regex, single
+           thread, re-walked per query (the previous grep implementation)
+- cold:    first grep on a root (walk + snapshot, parallel buffer scan)
+- warm:    repeated greps (cached file list revalidated by dir mtimes)
+- find:    find_files by name pattern on the cached tree
+
+Queries are rare, so every file is scanned (no early stop at the result cap).
+
+Before timing, a small tree of non-ASCII files is searched with Unicode-
+and newline-sensitive queries (word/space classes, dot, negated classes,
+case folding, newlines, string anchors) and every result is checked
+against the legacy implementation; --check runs only that.
+
+    python -m benchmarks.bench_grep --files 50000 --repeat 3
+    python -m benchmarks.bench_grep --check
+"""
+
+import argparse
+import os
+import random
+import re
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.tools import grep_tool  # noqa: E402
+
+WORDS = ("def class return import self value result config agent tool cron "
+         "memory schedule token buffer state event handler request response").split()
+QUERIES = [
+    ("literal", {"query": "needle_token_7", "fixed_strings": True}),
+    ("regex", {"query": r"def\s+rare_\w+\(", "includes": ["*.py"]}),
+    ("context", {"query": "FIXME-bench", "context_lines": 2}),
+]
+
+
+UNICODE_LINES = [
+    "café au lait",
+    "naïve résumé\u00a0",
+    "trailing nbsp\u00a0",
+    "em space\u2003",
+    "日本語のテキスト",
+    "中文",
+    "Ωmega and \u212Aelvin",
+    "ſtraße STRASSE",
+    "İstanbul ıslak",
+    "plain ascii line",
+    "",
+]
+UNICODE_QUERIES = [
+    (r"caf\w", {}),
+    (r"\s+$", {}),
+    (r"\w+", {}),
+    (r"^.{3}$", {}),
+    (r"^.{2}$", {}),
+    (r"[^a-z ]", {}),
+    (r"\bStra", {}),
+    (r"\d", {}),
+    ("kelvin", {}),
+    ("kelvin", {"case_sensitive": True}),
+    ("strasse", {"fixed_strings": True}),
+    ("st", {}),
+    ("istanbul", {}),
+    (r"[k-s]aße", {}),
+    ("plain", {}),
+    (r"asc+ii", {"case_sensitive": True}),
+    ("ïve", {}),
+    (r"\w$", {}),
+    (r"[^x]{3}$", {}),
+    (r"^$", {}),
+    (r"e\n", {}),
+    (r"(?s)lait.", {}),
+    (r"\Atr", {}),
+    (r"n\Z", {}),
+]
+
+
+def check_unicode_parity() -> None:
+    """Assert grep finds the same lines as the legacy per-line str regex on non-ASCII text."""
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        (root / "unicode.txt").write_text("\n".join(UNICODE_LINES) + "\n", encoding="utf-8")
+        (root / "crlf.md").write_bytes("\r\n".join(UNICODE_LINES).encode("utf-8"))
+        grep_tool.invalidate_file_cache()
+        for query, args in UNICODE_QUERIES:
+            expected = _legacy_grep(query, str(root), **args)
+            result = grep_tool.grep(query, path=str(root), max_results=100, **args)
+            assert result["status"] == "success", result
+            assert result["total_matches"] == expected, (query, args, result["total_matches"], expected)
+    print(f"unicode parity: {len(UNICODE_QUERIES)} queries match legacy")
+
+
+def _build_tree(root: Path, count: int, per_dir: int = 100) -> None:
+    rng = random.Random(0)
+    for i in range(count):
+        d = root / f"pkg{i // (per_dir * 20):03d}" / f"mod{(i // per_dir) % 20:02d}"
+        if i % per_dir == 0:
+            d.mkdir(parents=True, exist_ok=True)
+        lines = [" ".join(rng.choice(WORDS) for _ in range(rng.randint(4, 12))) for _ in range(rng.randint(20, 80))]
+        if i % 997 == 0:
+            lines.insert(len(lines) // 2, "needle_token_7 = True")
+        if i % 1499 == 0:
+            lines.insert(3, f"def rare_{i}(x):")
+        if i % 2503 == 0:
+            lines.append("# FIXME-bench tidy this")
+        ext = (".py", ".js", ".md", ".txt")[i % 4]
+        (d / f"file{i:06d}{ext}").write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+
+def _legacy_grep(query, path, includes=None, fixed_strings=False, context_lines=0, max_results=100,
+                 case_sensitive=False):
+    """The previous implementation's hot path (walk + readlines + per-line regex)."""
+    pattern = re.compile(re.escape(query) if fixed_strings else query, 0 if case_sensitive else re.IGNORECASE)
+    import fnmatch
+    files = []
+    for root, dirs, names in os.walk(path):
+        dirs[:] = [d for d in dirs if d not in grep_tool.SKIP_DIRS and not d.startswith('.')]
+        for name in names:
+            fp = os.path.join(root, name)
+            if os.path.splitext(name)[1].lower() in grep_tool.BINARY_EXTENSIONS:
+                continue
+            if os.path.getsize(fp) > grep_tool.MAX_FILE_SIZE:
+                continue
+            if includes and not any(fnmatch.fnmatch(name, p) for p in includes):
+                continue
+            files.append(fp)
+    matches = 0
+    for fp in files:
+        with open(fp, 'r', encoding='utf-8', errors='replace') as f:
+            lines = f.readlines()
+        for i, line in enumerate(lines):
+            if pattern.search(line):
+                matches += 1
+                if context_lines:
+                    _ = lines[max(0, i - context_lines):i + context_lines + 1]
+        if matches >= max_results:
+            break
+    return matches
+
+
+def _timed(fn, repeat: int):
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def run(count: int, repeat: int, workers: int) -> None:
+    grep_tool.SEARCH_WORKERS = workers
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        start = time.perf_counter()
+        _build_tree(root, count)
+        print(f"built {count} files in {time.perf_counter() - start:.1f}s; {workers} scan workers")
+        print(f"{'query':>8} {'matches':>8} {'legacy s':>9} {'cold s':>8} {'warm s':>8} {'speedup':>8}")
+        for name, args in QUERIES:
+            legacy, legacy_matches = _timed(lambda: _legacy_grep(path=str(root), **args), 1)
+            grep_tool.invalidate_file_cache()
+            cold, _ = _timed(lambda: grep_tool.grep(path=str(root), max_results=100, **args), 1)
+            warm, result = _timed(lambda: grep_tool.grep(path=str(root), max_results=100, **args), repeat)
+            assert result["total_matches"] == legacy_matches, (result["total_matches"], legacy_matches)
+            print(f"{name:>8} {result['total_matches']:>8} {legacy:>9.2f} {cold:>8.2f} {warm:>8.2f} {legacy / warm:>7.1f}x")
+
+        def legacy_find():
+            import fnmatch
+            return sum(1 for _, _, names in os.walk(root) for n in names if fnmatch.fnmatch(n, "file0042*"))
+        legacy, _ = _timed(legacy_find, 1)
+        warm, found = _timed(lambda: grep_tool.find_files("file0042*", path=str(root), max_depth=10, max_results=100), repeat)
+        print(f"{'find':>8} {found['total']:>8} {legacy:>9.2f} {'-':>8} {warm:>8.2f} {legacy / warm:>7.1f}x")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--files", type=int, default=50000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--workers", type=int, default=grep_tool.SEARCH_WORKERS)
+    parser.add_argument("--check", action="store_true", help="only run the unicode parity check")
+    args = parser.parse_args()
+    check_unicode_parity()
+    if not args.check:
+        run(args.files, args.repeat, args.workers)
+
+
+if __name__ == "__main__":
+    main()
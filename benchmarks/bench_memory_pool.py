@@ -0,0 +1,96 @@
+"""
+Micro-benchmark: unified memory throughput under concurrent load.
+
+Simulates subagents and circuits hitting the memory store at once: most
+threads read (recent context, FTS search, type listing) while a few write
+new memories. Reports queries/sec per thread count against a throwaway DB.
+
+    python -m benchmarks.bench_memory_pool --rows 5000 --threads 1 4 8 16
+"""
+
+import argparse
+import random
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.memory.unified_memory import MemoryType, UnifiedMemoryManager  # noqa: E402
+
+WORDS = ("deploy build cron circuit agent memory browser schedule token "
+         "search screenshot note vision tool error fix config skill").split()
+
+
+def _sentence(rng: random.Random, n: int = 12) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(n))
+
+
+def _seed(mgr: UnifiedMemoryManager, rows: int) -> None:
+    rng = random.Random(0)
+    types = [MemoryType.CHAT, MemoryType.NOTE, MemoryType.SEARCH, MemoryType.COMMAND]
+    for i in range(rows):
+        mgr.add_memory(f"{_sentence(rng)} #{i}", _sentence(rng, 40), memory_type=rng.choice(types))
+
+
+def _worker(mgr, stop, counts, idx, write_ratio):
+    rng = random.Random(idx)
+    done = 0
+    while not stop.is_set():
+        r = rng.random()
+        if r < write_ratio:
+            mgr.add_memory(f"{_sentence(rng)} w{idx}-{done}", _sentence(rng, 40))
+        elif r < 0.5:
+            mgr.get_recent_context(limit=10)
+        elif r < 0.8:
+            mgr._search_fts(" ".join(rng.sample(WORDS, 2)), 20)
+        else:
+            mgr.search_by_type(MemoryType.NOTE, limit=20)
+        done += 1
+    counts[idx] = done
+
+
+def run(rows: int, thread_counts, seconds: float, write_ratio: float) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        mgr = UnifiedMemoryManager(Path(tmp) / "bench.db")
+        # Embeddings aren't under test — skip the model load
+        mgr._embedder.submit = lambda *a, **k: True
+        t0 = time.perf_counter()
+        _seed(mgr, rows)
+        print(f"seeded {rows} rows in {time.perf_counter() - t0:.2f}s")
+        print(f"{'threads':>8} {'queries':>9} {'qps':>10}")
+
+        for n in thread_counts:
+            stop = threading.Event()
+            counts = [0] * n
+            threads = [threading.Thread(target=_worker, args=(mgr, stop, counts, i, write_ratio))
+                       for i in range(n)]
+            start = time.perf_counter()
+            for t in threads:
+                t.start()
+            time.sleep(seconds)
+            stop.set()
+            for t in threads:
+                t.join()
+            elapsed = time.perf_counter() - start
+            total = sum(counts)
+            print(f"{n:>8} {total:>9} {total / elapsed:>10.0f}")
+
+        print(f"pool: {mgr._pool.get_stats()}")
+        mgr._pool.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 4, 8, 16])
+    parser.add_argument("--seconds", type=float, default=3.0)
+    parser.add_argument("--write-ratio", type=float, default=0.05)
+    args = parser.parse_args()
+    run(args.rows, args.threads, args.seconds, args.write_ratio)
+
+
+if __name__ == "__main__":
+    main()
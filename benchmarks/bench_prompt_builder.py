@@ -0,0 +1,94 @@
+"""
+Micro-benchmark: system prompt assembly time vs number of skills.
+
+Builds the prompt the way ChatAgent.chat_with_tools does at the start of
+every request, against a throwaway userData dir holding N skill files.
+Reports per-call time for:
+
+- cold:    section cache invalidated before every call (the old behaviour)
+- warm:    unchanged workspace, per-file fingerprint check
+- watched: unchanged workspace, skills dir covered by SkillWatcher
+
+    python -m benchmarks.bench_prompt_builder --skills 0 50 500
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+SKILL_TEMPLATE = """---
+name: skill-{i}
+description: Walk through workflow number {i} step by step, checking each result
+triggers: workflow {i}, task {i}
+---
+
+# Skill {i}
+
+{body}
+"""
+
+
+def _write_skills(skills_dir: Path, count: int) -> None:
+    skills_dir.mkdir(parents=True, exist_ok=True)
+    body = "Do the thing carefully. " * 80
+    for i in range(count):
+        (skills_dir / f"skill_{i:04d}.md").write_text(SKILL_TEMPLATE.format(i=i, body=body), encoding="utf-8")
+
+
+def _time_calls(build, calls: int, before=None) -> float:
+    total = 0.0
+    for _ in range(calls):
+        if before:
+            before()
+        start = time.perf_counter()
+        build()
+        total += time.perf_counter() - start
+    return total / calls * 1e6  # µs per call
+
+
+def run(skill_counts, calls: int) -> None:
+    print(f"{'skills':>7} {'cold µs':>10} {'warm µs':>10} {'watched µs':>11} {'speedup':>8}")
+    for count in skill_counts:
+        with tempfile.TemporaryDirectory() as tmp:
+            os.environ["SUBSTRATE_USER_DATA"] = tmp
+            skills_dir = Path(tmp) / "skills"
+            _write_skills(skills_dir, count)
+
+            from src.infra import prompt_builder as pb
+            from src.infra import skill_watcher as sw
+
+            def build():
+                return pb.build_system_prompt(config={"model": "bench"}, chat_mode="code")
+
+            pb.invalidate_prompt_cache()
+            build()  # first-use template copies into userData
+
+            cold = _time_calls(build, calls, before=pb.invalidate_prompt_cache)
+            build()
+            warm = _time_calls(build, calls)
+
+            watcher = sw.start_skill_watcher(skills_dir)
+            build()
+            watched = _time_calls(build, calls)
+            sw.stop_skill_watcher()
+            del watcher
+
+            print(f"{count:>7} {cold:>10.0f} {warm:>10.0f} {watched:>11.0f} {cold / watched:>7.0f}x")
+    os.environ.pop("SUBSTRATE_USER_DATA", None)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--skills", type=int, nargs="+", default=[0, 50, 500])
+    parser.add_argument("--calls", type=int, default=50)
+    args = parser.parse_args()
+    run(args.skills, args.calls)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+"""
+Micro-benchmark: frontend messages and CPU per streamed response, per-chunk vs coalesced.
+
+Replays a recorded provider stream (arrival time, stream, text per chunk)
+through StreamCoalescer into a sink that does the per-message work of the
+frontend path: the MessageBuffer stdout line and duplicate check, the feed
+append, and a FanoutHub publish to SSE streams and WS clients. The clock
+is virtual, so the replay runs as fast as the CPU allows while flush
+decisions follow the recorded timing. Interval 0 is the old behaviour
+(one message per chunk).
+
+Without --recording, a deterministic 2,000-chunk stream is synthesized
+(thinking then text, 1-12 char chunks, ~15 ms apart with packet bursts
+and pauses). --save writes it out as JSONL ({"t", "stream", "text"}).
+
+    python -m benchmarks.bench_stream_coalescer --chunks 2000 --intervals 0 0.03 0.05
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.infra.fanout_hub import FanoutHub  # noqa: E402
+from src.infra.stream_coalescer import StreamCoalescer  # noqa: E402
+
+WORDS = ("the agent opened the browser and searched for recent cron schedule "
+         "changes then summarized each result with a short note about the "
+         "tool output and what to check next").split()
+
+
+def _synthesize(count: int) -> list:
+    rng = random.Random(0)
+    text = " ".join(rng.choice(WORDS) for _ in range(count * 2))
+    chunks, t, pos = [], 0.0, 0
+    thinking = count // 10
+    for i in range(count):
+        size = rng.randint(1, 12)
+        piece, pos = text[pos:pos + size] or "x", pos + size
+        r = rng.random()
+        if r < 0.3:
+            gap = 0.0                          # same network packet
+        elif r < 0.98:
+            gap = rng.uniform(0.005, 0.035)
+        else:
+            gap = rng.uniform(0.2, 0.8)        # model pause
+        t += gap
+        chunks.append({"t": round(t, 4), "stream": "thinking" if i < thinking else "text", "text": piece})
+    return chunks
+
+
+def _load(path: str) -> list:
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class _FrontendSink:
+    """Per-message work of send_message_to_frontend after the coalescer."""
+
+    def __init__(self, sse_streams: int, ws_clients: int):
+        self.hub = FanoutHub()
+        self.subs = [self.hub.subscribe() for _ in range(sse_streams)]
+        self.ws_out = []
+        self.hub.add_sink(lambda frame: self.ws_out.extend([frame.event("substrate_raw")] * ws_clients))
+        self.feed = []
+        self.last = None
+        self.stdout = []
+        self.count = 0
+
+    def __call__(self, message):
+        self.count += 1
+        if message == self.last:                       # MessageBuffer duplicate check
+            return
+        self.last = message.copy()
+        self.stdout.append(json.dumps(message))        # MessageBuffer stdout line
+        self.feed.append({"idx": self.count, "ts": time.time(), "message": message})
+        if len(self.feed) > 500:
+            del self.feed[:len(self.feed) - 500]
+        self.hub.publish(message)
+        for sub in self.subs:                          # SSE generators drain
+            frame = sub.get(0)
+            if frame is not None:
+                frame.sse
+        self.ws_out.clear()                            # WS writers drain
+        self.stdout.clear()
+
+
+def _replay(chunks: list, interval: float, sse_streams: int, ws_clients: int, repeat: int):
+    best_cpu, sink = None, None
+    for _ in range(repeat):
+        clock = _Clock()
+        sink = _FrontendSink(sse_streams, ws_clients)
+        out = StreamCoalescer(sink, flush_interval=interval, clock=clock)
+        thinking = False
+        start = time.process_time()
+        for chunk in chunks:
+            clock.now = chunk["t"]
+            if chunk["stream"] == "thinking":
+                if not thinking:
+                    thinking = True
+                    out.send({"type": "thinking_start"})
+                out.push(chunk["text"], stream="thinking")
+                continue
+            if thinking:
+                thinking = False
+                out.send({"type": "thinking_end"})
+            out.push(chunk["text"])
+        out.close()
+        cpu = time.process_time() - start
+        best_cpu = cpu if best_cpu is None else min(best_cpu, cpu)
+    return sink.count, best_cpu
+
+
+def run(chunks: list, intervals, sse_streams: int, ws_clients: int, repeat: int) -> None:
+    duration = chunks[-1]["t"] if chunks else 0.0
+    print(f"{len(chunks)} chunks over {duration:.1f} s of stream, "
+          f"{sse_streams} SSE streams, {ws_clients} WS clients")
+    print(f"{'interval':>9} {'messages':>9} {'msgs/s':>8} {'cpu ms':>8} {'cpu saved':>10}")
+    baseline = None
+    for interval in intervals:
+        count, cpu = _replay(chunks, interval, sse_streams, ws_clients, repeat)
+        if baseline is None:
+            baseline = cpu
+        label = "per-chunk" if interval == 0 else f"{interval * 1000:.0f} ms"
+        rate = count / duration if duration else 0.0
+        saved = (1 - cpu / baseline) * 100 if baseline else 0.0
+        print(f"{label:>9} {count:>9} {rate:>8.0f} {cpu * 1000:>8.1f} {saved:>9.0f}%")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--chunks", type=int, default=2000)
+    parser.add_argument("--recording", help="JSONL recording to replay instead of the synthetic stream")
+    parser.add_argument("--save", help="write the synthetic recording to this JSONL file")
+    parser.add_argument("--intervals", type=float, nargs="+", default=[0, 0.03, 0.05])
+    parser.add_argument("--sse", type=int, default=2)
+    parser.add_argument("--ws", type=int, default=2)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    chunks = _load(args.recording) if args.recording else _synthesize(args.chunks)
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            f.writelines(json.dumps(c) + "\n" for c in chunks)
+    intervals = args.intervals if args.intervals[0] == 0 else [0] + args.intervals
+    run(chunks, intervals, args.sse, args.ws, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -187,6 +187,14 @@ except ImportError as _pb_err:
     SILENT_TOKEN = "[SILENT]"
     CIRCUITS_OK_TOKEN = "CIRCUITS_OK"
     print(f"[WARNING] Prompt builder not available: {_pb_err}")
+try:
+    from src.infra.http_pool import http_post, get_http_stats
+except ImportError as _hp_err:
+    http_post = lambda provider, url, **k: requests.post(url, **k)
+    get_http_stats = lambda: {}
+    print(f"[WARNING] HTTP pool not available: {_hp_err}")
+from src.infra.message_feed import MessageFeed
+from src.infra.stream_coalescer import StreamCoalescer
 
 try:
     from src.memory.memory_manager import MemoryManager
@@ -1725,6 +1733,9 @@ def _resolve_model_metadata(model_name):
 # Providers that natively support vision in describe_image()
 _VISION_PROVIDERS = {'google', 'anthropic', 'xai', 'ollama', 'openai'}
 
+# describe_image() results that report a failure (never stored in the vision cache)
+_VISION_FAILURE_PREFIXES = ("Vision unavailable", "Vision failed", "Image processing failed", "No description available")
+
 # Default note prompts
 DEFAULT_NOTE_PROMPTS = {
     "general_note": """Create a detailed and well-structured note.
@@ -1910,8 +1921,8 @@ class MessageBuffer:
                 
                 # MODIFIED: Only prevent exact duplicate messages, don't filter content
                 if self.last_message:
-                    # Only skip if this is exactly the same message object or identical JSON string
-                    if message is self.last_message or json.dumps(message) == json.dumps(self.last_message):
+                    # Only skip if this is exactly the same message object or an identical payload
+                    if message is self.last_message or message == self.last_message:
                         logger.info("Skipping exact duplicate message")
                         return
                     
@@ -2200,10 +2211,9 @@ def send_message_to_frontend(message, silent=False):
 
 
 # === HTTP polling feed for WebUI mirroring ===
-MESSAGE_FEED = []  # list of {idx:int, ts:float, message:dict}
+# Ring buffer of {idx:int, ts:float, message:dict}; /api/messages reads it
 MESSAGE_FEED_MAX = 500
-MESSAGE_FEED_INDEX = 0
-_feed_lock = threading.Lock()
+MESSAGE_FEED = MessageFeed(capacity=MESSAGE_FEED_MAX)
 
 def _coerce_message_dict(message):
     if isinstance(message, dict):
@@ -2213,20 +2223,11 @@ def _coerce_message_dict(message):
     except Exception:
         return {"type": "text", "content": str(message)}
 
-def _feed_append(message):
-    global MESSAGE_FEED_INDEX
+def _feed_append(message, session=None):
     payload = _coerce_message_dict(message)
-    entry = {
-        "idx": MESSAGE_FEED_INDEX + 1,
-        "ts": time.time(),
-        "message": payload,
-    }
-    with _feed_lock:
-        MESSAGE_FEED_INDEX = entry["idx"]
-        MESSAGE_FEED.append(entry)
-        if len(MESSAGE_FEED) > MESSAGE_FEED_MAX:
-            del MESSAGE_FEED[: len(MESSAGE_FEED) - MESSAGE_FEED_MAX]
-    return entry["idx"]
+    if session is None:
+        session = payload.get('session_key') or payload.get('sessionKey')
+    return MESSAGE_FEED.append(payload, session=session if isinstance(session, str) else None)
 
 
 @app.route('/api/input', methods=['POST'])
@@ -2473,18 +2474,22 @@ def api_input():
 
 @app.route('/api/messages', methods=['GET'])
 def api_messages():
+    """Feed entries newer than ?since=. Optional ?wait=<s> long-polls until one
+    arrives (max 30 s); optional ?session=<key> reads only that session's entries."""
     try:
         since_raw = request.args.get('since', '0')
         try:
             since = int(since_raw)
         except Exception:
             since = 0
-        with _feed_lock:
-            items = [e for e in MESSAGE_FEED if e.get('idx', 0) > since]
-            # Cap initial load (since=0) to last 50 messages for faster WebUI startup
-            if since == 0 and len(items) > 50:
-                items = items[-50:]
-            latest = MESSAGE_FEED_INDEX
+        try:
+            wait = float(request.args.get('wait', '0'))
+        except Exception:
+            wait = 0
+        session = request.args.get('session') or None
+        # Cap initial load (since=0) to last 50 messages for faster WebUI startup
+        items, latest = MESSAGE_FEED.since(since, limit=50 if since == 0 else None,
+                                           session=session, wait=wait)
         return jsonify({
             'status': 'success',
             'index': latest,
@@ -2497,19 +2502,18 @@ def api_messages():
 def api_debug_feed():
     """Debug: show last N feed entries with summary"""
     n = int(request.args.get('n', '20'))
-    with _feed_lock:
-        tail = MESSAGE_FEED[-n:]
-        return jsonify({
-            'total': len(MESSAGE_FEED),
-            'index': MESSAGE_FEED_INDEX,
-            'entries': [{
-                'idx': e['idx'],
-                'type': e['message'].get('type', ''),
-                'status': e['message'].get('status', ''),
-                'result': str(e['message'].get('result', ''))[:120],
-                'has_url': bool(e['message'].get('url')),
-            } for e in tail]
-        })
+    tail = MESSAGE_FEED.tail(n)
+    return jsonify({
+        'total': len(MESSAGE_FEED),
+        'index': MESSAGE_FEED.latest,
+        'entries': [{
+            'idx': e['idx'],
+            'type': e['message'].get('type', ''),
+            'status': e['message'].get('status', ''),
+            'result': str(e['message'].get('result', ''))[:120],
+            'has_url': bool(e['message'].get('url')),
+        } for e in tail]
+    })
 
 @app.route('/api/debug/test-msg', methods=['GET'])
 def api_debug_test_msg():
@@ -2523,81 +2527,55 @@ def api_debug_test_msg():
         'clear_thinking': True,
         'new_message': True
     })
-    return jsonify({'ok': True, 'feed_index': MESSAGE_FEED_INDEX})
+    return jsonify({'ok': True, 'feed_index': MESSAGE_FEED.latest})
 
 # ==== SSE support (WebUI mirror) ====
 try:
-    import queue as _sse_queue_mod
-    _sse_subscribers = []  # list of Queue instances
-
-    def _broadcast_to_sse(message):
-        try:
-            # Normalize to JSON string
-            if isinstance(message, str):
-                try:
-                    data = json.loads(message)
-                except Exception:
-                    data = {"type": "text", "content": message}
-            else:
-                data = message
-            payload = json.dumps(data)
-            # Push to all subscribers (non-blocking)
-            for q in list(_sse_subscribers):
-                try:
-                    q.put_nowait(payload)
-                except Exception:
-                    pass
-        except Exception as e:
-            print(f"SSE broadcast error: {e}", file=sys.stderr)
+    from src.infra.fanout_hub import hub as _fanout_hub
 
     @app.route('/api/events')
     def sse_events():
         from flask import Response, stream_with_context
-        q = _sse_queue_mod.Queue(maxsize=256)
-        _sse_subscribers.append(q)
+        sub = _fanout_hub.subscribe()
 
         def _gen():
             try:
                 # Initial comment to open stream
                 yield ": connected\n\n"
-                while True:
-                    try:
-                        item = q.get(timeout=25)
-                        yield f"data: {item}\n\n"
-                    except _sse_queue_mod.Empty:
+                while not sub.closed:
+                    frame = sub.get(timeout=25)
+                    if frame is not None:
+                        yield frame.sse  # shared bytes, encoded once in publish()
+                    elif not sub.closed:
                         # Keep-alive comment
                         yield ": keepalive\n\n"
             finally:
-                try:
-                    if q in _sse_subscribers:
-                        _sse_subscribers.remove(q)
-                except Exception:
-                    pass
+                _fanout_hub.unsubscribe(sub)
         resp = Response(stream_with_context(_gen()), mimetype='text/event-stream')
         resp.headers['Cache-Control'] = 'no-cache'
         resp.headers['X-Accel-Buffering'] = 'no'
         return resp
 
-    # Wrap existing send_message_to_frontend to also broadcast to SSE + Gateway WS
+    def _gateway_sink(frame):
+        # WS clients only ever got dict payloads; plain-text messages stay SSE-only
+        if frame.plain or not isinstance(frame.data, dict):
+            return
+        from src.infra.gateway_ws import broadcast_frame
+        broadcast_frame(frame)
+
+    _fanout_hub.add_sink(_gateway_sink)
+
+    # Wrap existing send_message_to_frontend to also fan out to SSE + Gateway WS.
+    # The hub encodes each message once; SSE streams and WS clients share that
+    # encoding and are written from their own threads, so a slow client can't
+    # stall the sender.
     _orig_send_message_to_frontend = send_message_to_frontend
     def _wrapped_send_message_to_frontend(message, **kwargs):
         _orig_send_message_to_frontend(message, **kwargs)
         try:
-            _broadcast_to_sse(message)
+            _fanout_hub.publish(message)
         except Exception as _e:
-            print(f"SSE wrap error: {_e}", file=sys.stderr)
-        # Gateway WebSocket broadcast — translate flat messages to structured events
-        # AND broadcast raw payload for direct consumption by dashboard
-        try:
-            from src.infra.gateway_ws import broadcast_raw, get_connected_count
-            _cc = get_connected_count()
-            _gw_msg = message if isinstance(message, dict) else json.loads(message) if isinstance(message, str) else None
-            _status = _gw_msg.get('status', '?') if _gw_msg else '?'
-            print(f"[SMTF-WRAP] status={_status} clients={_cc} type={type(message).__name__}", file=sys.stderr, flush=True)
-            if _cc > 0 and _gw_msg:
-                broadcast_raw(_gw_msg)
-        except Exception as _gw_e:
-            print(f"Gateway WS broadcast error: {_gw_e}", file=sys.stderr, flush=True)
+            print(f"Fanout publish error: {_e}", file=sys.stderr, flush=True)
     # Rebind the module global so all callers in this file use the wrapped version.
     # We use sys.modules patching to avoid the 'assigned before global declaration' SyntaxError.
     import sys as _sys_smtf
@@ -2872,6 +2850,14 @@ class ChatAgent:
             self.unified_memory.bootstrap_foundational_memory()
         except Exception as e:
             logger.warning(f"Failed to bootstrap foundational memory: {e}")
+        
+        # Embed memories that never got an embedding (crash, dropped from queue)
+        if self.unified_memory is not None:
+            threading.Thread(
+                target=self.unified_memory.backfill_embeddings,
+                name="embedding-backfill",
+                daemon=True
+            ).start()
         self.command_parser = CommandParser()
         self.command_executor = CommandExecutor()
         # Pass the config to the CommandExecutor
@@ -3073,7 +3059,7 @@ class ChatAgent:
                         'num_predict': max_tokens_override or self.config.get('max_tokens', 4096)
                     }
                 }
-                response = requests.post(f"{ollama_url}/api/chat", json=payload, timeout=180)
+                response = http_post('ollama', f"{ollama_url}/api/chat", json=payload, timeout=180)
                 if response.status_code == 200:
                     result = response.json()
                     content = result.get('message', {}).get('content', '')
@@ -3096,7 +3082,7 @@ class ChatAgent:
                     'temperature': self.config.get('temperature', 0.7),
                     'max_tokens': max_tokens_override or self.config.get('max_tokens', 4096)
                 }
-                response = requests.post(endpoint, headers=headers, json=payload, timeout=180)
+                response = http_post('xai', endpoint, headers=headers, json=payload, timeout=180)
                 if response.status_code == 200:
                     result = response.json()
                     content = result.get('choices', [{}])[0].get('message', {}).get('content', '')
@@ -3148,7 +3134,7 @@ class ChatAgent:
                 if system_instruction.strip():
                     payload['systemInstruction'] = {'parts': [{'text': system_instruction.strip()}]}
                 
-                response = requests.post(endpoint, headers=headers, json=payload, timeout=180)
+                response = http_post('google', endpoint, headers=headers, json=payload, timeout=180)
                 if response.status_code == 200:
                     result = response.json()
                     content = result.get('candidates', [{}])[0].get('content', {}).get('parts', [{}])[0].get('text', '')
@@ -3170,7 +3156,7 @@ class ChatAgent:
                     'temperature': self.config.get('temperature', 0.7),
                     'max_tokens': max_tokens_override or self.config.get('max_tokens', 4096)
                 }
-                response = requests.post(endpoint, headers=headers, json=payload, timeout=180)
+                response = http_post('openai', endpoint, headers=headers, json=payload, timeout=180)
                 if response.status_code == 200:
                     result = response.json()
                     content = result.get('choices', [{}])[0].get('message', {}).get('content', '')
@@ -3210,7 +3196,7 @@ class ChatAgent:
                 }
                 if system_text:
                     payload['system'] = system_text
-                response = requests.post(endpoint, headers=headers, json=payload, timeout=120)
+                response = http_post('minimax', endpoint, headers=headers, json=payload, timeout=120)
                 if response.status_code == 200:
                     result = response.json()
                     content_blocks = result.get('content', [])
@@ -3699,6 +3685,15 @@ class ChatAgent:
             init_subagent_registry(on_execute=subagent_executor, max_concurrent=3)
             logger.info("Subagent registry initialized")
             
+            # Opt-in: warm the embedding model so the first recall doesn't pay for it
+            if self.config.get('preload_embedding_model', False):
+                try:
+                    from src.memory.unified_memory import preload_embedding_model
+                    preload_embedding_model(background=True)
+                    logger.info("Embedding model preload started")
+                except Exception as pe_err:
+                    logger.warning(f"Embedding model preload failed (non-fatal): {pe_err}")
+            
             # Initialize event logger (persists bus events to JSONL)
             try:
                 from src.infra.event_logger import init_event_logger
@@ -5587,9 +5582,16 @@ class ChatAgent:
         1. Full LLM summarization (chunked for long histories)
         2. Partial summarization (excluding oversized messages)
         3. Basic text extraction fallback
+        
+        Chunks are summarized concurrently (map-reduce) for cloud providers;
+        set compaction_strategy to "sequential" to opt out. Local Ollama
+        always runs sequentially.
         """
         try:
-            from src.infra.compaction import compact_messages as do_compact, estimate_messages_tokens
+            from src.infra.compaction import (
+                compact_messages as do_compact, estimate_messages_tokens,
+                summary_concurrency_for, STRATEGY_MAP_REDUCE,
+            )
             
             total_tokens = estimate_messages_tokens(messages)
             if total_tokens <= max_tokens:
@@ -5608,6 +5610,9 @@ class ChatAgent:
                 return self._llm_summarize_context(full_text, max_summary_tokens=800)
             
             context_window = self.config.get('context_window_tokens', 128000)
+            strategy = self.config.get('compaction_strategy', STRATEGY_MAP_REDUCE)
+            provider = _resolve_model_metadata(self.config.get('model', '')).get('provider', 'ollama')
+            max_workers = summary_concurrency_for(provider, self.config.get('summary_concurrency'))
             
             compacted, stats = do_compact(
                 messages,
@@ -5616,11 +5621,18 @@ class ChatAgent:
                 include_summary=True,
                 summarizer=summarizer_fn,
                 context_window=context_window,
+                strategy=strategy,
+                max_workers=max_workers,
             )
             
             if stats.get('compacted'):
-                new_tokens = estimate_messages_tokens(compacted)
-                method = "LLM staged" if stats.get('llm_summarized') else "basic"
+                new_tokens = stats.get('final_tokens', 0)
+                if not stats.get('llm_summarized'):
+                    method = "basic"
+                elif stats.get('strategy') == STRATEGY_MAP_REDUCE:
+                    method = f"LLM map-reduce x{max_workers}"
+                else:
+                    method = "LLM staged"
                 logger.info(f"[COMPACT] Reduced from {total_tokens} to {new_tokens} tokens ({method} summary, dropped {stats.get('dropped_count', 0)} msgs)")
             
             return compacted
@@ -5646,8 +5658,8 @@ class ChatAgent:
             
             if provider == 'ollama':
                 ollama_url = self.config.get('api_base', self.config.get('api_endpoint', 'http://localhost:11434'))
-                resp = requests.post(
-                    f"{ollama_url}/api/chat",
+                resp = http_post(
+                    'ollama', f"{ollama_url}/api/chat",
                     json={"model": model, "messages": summary_prompt, "stream": False},
                     timeout=15
                 )
@@ -5663,7 +5675,7 @@ class ChatAgent:
                 if api_key:
                     endpoint = model_metadata.get('endpoint', 'https://api.x.ai/v1/chat/completions')
                     remote_model = model_metadata.get('remote_model') or 'grok-4-latest'
-                    resp = requests.post(endpoint, headers={
+                    resp = http_post('xai', endpoint, headers={
                         'Authorization': f'Bearer {api_key}',
                         'Content-Type': 'application/json'
                     }, json={
@@ -5688,7 +5700,7 @@ class ChatAgent:
                     # Extract system content from summary_prompt
                     sys_content = summary_prompt[0]['content']
                     user_content = summary_prompt[1]['content']
-                    resp = requests.post(endpoint, headers={
+                    resp = http_post('anthropic', endpoint, headers={
                         'Content-Type': 'application/json',
                         'x-api-key': api_key,
                         'anthropic-version': version
@@ -5728,7 +5740,7 @@ class ChatAgent:
                     endpoint = f"https://generativelanguage.googleapis.com/v1beta/models/{remote_model}:generateContent?key={api_key}"
                     headers = {'Content-Type': 'application/json'}
                 
-                resp = requests.post(endpoint, headers=headers, json={
+                resp = http_post('google', endpoint, headers=headers, json={
                     'systemInstruction': {'parts': [{'text': sys_content}]},
                     'contents': [{'role': 'user', 'parts': [{'text': user_content}]}],
                     'generationConfig': {'maxOutputTokens': max_summary_tokens, 'temperature': 0.3}
@@ -6169,28 +6181,16 @@ class ChatAgent:
         
         # ── Reliable tool event logging (direct file write only) ──
         def _ensure_tool_event_logged(event_type, data):
-            """Log tool events reliably via direct file write.
+            """Log tool events reliably via the event logger's buffered writer.
             
             Does NOT emit via event bus to avoid duplicate logging
             (the event_logger wildcard subscriber would write a second copy).
             """
             try:
-                import json as _json, time as _time
-                from pathlib import Path as _Path
-                from datetime import datetime as _dt
-                _events_dir = _Path(__file__).parent / "data" / "events"
-                _events_dir.mkdir(parents=True, exist_ok=True)
-                _log_path = _events_dir / f"{_dt.now().strftime('%Y-%m-%d')}.jsonl"
-                _record = {
-                    'ts': _time.time(),
-                    'event': event_type,
-                    'data': {k: v for k, v in data.items() if not str(k).startswith('_')},
-                }
-                with open(_log_path, 'a', encoding='utf-8') as _f:
-                    _f.write(_json.dumps(_record, default=str, ensure_ascii=False) + '\n')
-                print(f"[EVENT] Wrote {event_type} for {data.get('name', '?')} to {_log_path.name}", flush=True)
+                from src.infra.event_logger import log_event as _log_event
+                _log_event(event_type, data)
             except Exception as _we:
-                print(f"[EVENT] Direct write FAILED for {event_type}: {_we}", flush=True)
+                print(f"[EVENT] Event log write FAILED for {event_type}: {_we}", flush=True)
         
         # Vision fallback: if image attached and current model lacks vision, swap to fallback
         if image_data and not model_override:
@@ -6471,6 +6471,10 @@ class ChatAgent:
         else:
             _send_fe = send_message_to_frontend
         
+        # Running token total: each message is tokenized once, not every round
+        from src.infra.compaction import TokenTracker
+        _token_tracker = TokenTracker()
+        
         try:  # try/finally to restore _parent_interrupt for subagents
          while round_count < max_tool_rounds:
             # Check for user interrupt before each round
@@ -6522,7 +6526,7 @@ class ChatAgent:
             # Lazy compaction: only compact when context is actually near the limit.
             # Avoids expensive per-round token estimation and LLM summarization calls.
             if round_count > 3 and round_count % 3 == 0:
-                _est_tokens = sum(len(str(m.get('content', ''))) // 4 for m in messages)
+                _est_tokens = _token_tracker.sync(messages)
                 if _est_tokens > 50000:
                     try:
                         from src.infra.context_pruning import prune_context_messages
@@ -6549,8 +6553,9 @@ class ChatAgent:
                     _u = response.get('_usage', {})
                     _model = model_override or self.config.get('model', 'unknown')
                     if _u:
-                        _cost_trk.record(input_tokens=_u.get('input_tokens', 0), output_tokens=_u.get('output_tokens', 0), model=_model, conversation_id=_conversation_id)
-                        print(f"[COST] Recorded usage tokens: in={_u.get('input_tokens',0)} out={_u.get('output_tokens',0)} model={_model}", flush=True)
+                        _cost_trk.record(input_tokens=_u.get('input_tokens', 0), output_tokens=_u.get('output_tokens', 0), model=_model, conversation_id=_conversation_id,
+                                         cache_read_tokens=_u.get('cache_read_tokens', 0), cache_write_tokens=_u.get('cache_write_tokens', 0))
+                        print(f"[COST] Recorded usage tokens: in={_u.get('input_tokens',0)} out={_u.get('output_tokens',0)} cache_read={_u.get('cache_read_tokens',0)} cache_write={_u.get('cache_write_tokens',0)} model={_model}", flush=True)
                     else:
                         # Estimate tokens when API doesn't return usage data.
                         # Only count the last user message as input (not the full
@@ -6714,7 +6719,7 @@ class ChatAgent:
                 # Force aggressive compaction (halve the threshold)
                 messages = self._compact_messages(messages, max_tokens=32000)
                 # If still too large after compaction, do emergency truncation
-                total_est = sum(self._estimate_tokens(str(m.get('content', ''))) for m in messages)
+                total_est = _token_tracker.sync(messages)
                 if total_est > 50000:
                     system_msgs = [m for m in messages if m.get('role') == 'system']
                     non_system = [m for m in messages if m.get('role') != 'system']
@@ -7491,16 +7496,28 @@ class ChatAgent:
             'Content-Type': 'application/json'
         }
         
+        # Tool schemas are serialized once per schema list, not every round
+        from src.tools.tool_registry import provider_tool_schemas, json_body_with_fragment
+        _, tools_json = provider_tool_schemas(tools, 'openai')
         payload = {
             'model': model_name,
             'messages': messages,
-            'tools': tools,
             'tool_choice': 'auto',
             'temperature': self.config.get('temperature', 0.7),
             'max_tokens': self.config.get('max_tokens', 4096)
         }
         
-        response = requests.post(endpoint, headers=headers, json=payload, timeout=120)
+        # OpenAI caches prompt prefixes automatically; the key keeps requests
+        # sharing our static system head on the same cache shard
+        from src.infra import prompt_cache
+        if actual_provider == 'openai' and self.config.get('prompt_caching', True):
+            _system = next((m.get('content') for m in messages if m.get('role') == 'system'), None)
+            _cache_key = prompt_cache.prompt_cache_key(_system) if isinstance(_system, str) else None
+            if _cache_key:
+                payload['prompt_cache_key'] = _cache_key
+        
+        body = json_body_with_fragment(payload, 'tools', tools_json)
+        response = http_post(actual_provider, endpoint, headers=headers, data=body, timeout=120)
         
         if response.status_code != 200:
             raise RemoteAPIError(f"xAI request failed: {response.status_code} {response.text}")
@@ -7520,10 +7537,7 @@ class ChatAgent:
         # Extract real token usage from API response
         usage = result.get('usage', {})
         if usage:
-            resp['_usage'] = {
-                'input_tokens': usage.get('prompt_tokens', 0),
-                'output_tokens': usage.get('completion_tokens', 0),
-            }
+            resp['_usage'] = prompt_cache.usage_from_openai(usage)
         return resp
     
     def _call_anthropic_with_tools(self, messages, tools, metadata):
@@ -7544,22 +7558,27 @@ class ChatAgent:
             'anthropic-version': version
         }
         
-        # Convert OpenAI-style tools to Anthropic format
-        anthropic_tools = []
-        for tool in tools:
-            func = tool.get('function', {})
-            anthropic_tools.append({
-                'name': func.get('name'),
-                'description': func.get('description', ''),
-                'input_schema': func.get('parameters', {'type': 'object', 'properties': {}})
-            })
+        # Prompt caching: MiniMax et al. share this path but not cache_control
+        from src.infra import prompt_cache
+        _caching = actual_provider == 'anthropic' and self.config.get('prompt_caching', True)
+        
+        # OpenAI-style tools in Anthropic format (translated + serialized once
+        # per schema list; the cached variant carries the tools breakpoint)
+        from src.tools.tool_registry import provider_tool_schemas, json_body_with_fragment
+        _, tools_json = provider_tool_schemas(tools, 'anthropic_cached' if _caching else 'anthropic')
         
         # Convert messages format
         system_content = ""
         anthropic_messages = []
         for msg in messages:
             if msg['role'] == 'system':
-                system_content += msg['content'] + "\n"
+                if _caching and anthropic_messages:
+                    # Mid-loop system notes stay in position; folding them into
+                    # `system` would change the cached head every time one is added
+                    if msg.get('content'):
+                        anthropic_messages.append({'role': 'user', 'content': f"[System] {msg['content']}"})
+                else:
+                    system_content += msg['content'] + "\n"
             elif msg['role'] == 'tool':
                 # Convert tool result to Anthropic format
                 anthropic_messages.append({
@@ -7625,8 +7644,10 @@ class ChatAgent:
             'max_tokens': self.config.get('max_tokens', 4096),
             'system': system_content.strip(),
             'messages': anthropic_messages,
-            'tools': anthropic_tools
         }
+        if _caching:
+            payload['system'] = prompt_cache.anthropic_system_blocks(payload['system'])
+            prompt_cache.mark_anthropic_breakpoints(payload)
         
         # Enable extended thinking for Claude 3.7+ / Claude 4+ models
         _thinking_models = ('claude-3-7', 'claude-3.7', 'claude-4', 'claude-sonnet-4', 'claude-opus-4', 'claude-haiku-4')
@@ -7638,7 +7659,8 @@ class ChatAgent:
             payload.pop('top_k', None)
             logger.info(f"[CLAUDE] Extended thinking enabled for tool-calling: {model_name}")
         
-        response = requests.post(endpoint, headers=headers, json=payload, timeout=120)
+        body = json_body_with_fragment(payload, 'tools', tools_json)
+        response = http_post(actual_provider, endpoint, headers=headers, data=body, timeout=120)
         
         if response.status_code != 200:
             raise RemoteAPIError(f"Anthropic request failed: {response.status_code} {response.text}")
@@ -7675,10 +7697,7 @@ class ChatAgent:
         # Extract real token usage from Anthropic response
         usage = result.get('usage', {})
         if usage:
-            resp['_usage'] = {
-                'input_tokens': usage.get('input_tokens', 0),
-                'output_tokens': usage.get('output_tokens', 0),
-            }
+            resp['_usage'] = prompt_cache.usage_from_anthropic(usage)
         return resp
     
     def _call_google_with_tools(self, messages, tools, metadata):
@@ -7708,29 +7727,9 @@ class ChatAgent:
                 'Content-Type': 'application/json'
             }
         
-        # Convert tools to Gemini format
-        gemini_tools = []
-        if tools:
-            def _sanitize_schema(obj):
-                """Recursively strip fields Gemini rejects (additionalProperties, $schema, default, etc.)."""
-                if isinstance(obj, dict):
-                    _REJECT = {'additionalProperties', '$schema', 'default', 'examples', 'title'}
-                    return {k: _sanitize_schema(v) for k, v in obj.items() if k not in _REJECT}
-                if isinstance(obj, list):
-                    return [_sanitize_schema(i) for i in obj]
-                return obj
-
-            function_declarations = []
-            for tool in tools:
-                func = tool.get('function', {})
-                params = func.get('parameters', {'type': 'object', 'properties': {}})
-                params = _sanitize_schema(params)
-                function_declarations.append({
-                    'name': func.get('name'),
-                    'description': func.get('description', ''),
-                    'parameters': params
-                })
-            gemini_tools = [{'function_declarations': function_declarations}]
+        # Tools in Gemini format (sanitized + serialized once per schema list)
+        from src.tools.tool_registry import provider_tool_schemas, json_body_with_fragment
+        gemini_tools, gemini_tools_json = provider_tool_schemas(tools or [], 'google')
         
         # Convert messages to Gemini format
         gemini_contents = []
@@ -7855,7 +7854,9 @@ class ChatAgent:
             payload['systemInstruction'] = {'parts': [{'text': system_instruction.strip()}]}
         
         if gemini_tools:
-            payload['tools'] = gemini_tools
+            body = json_body_with_fragment(payload, 'tools', gemini_tools_json)
+        else:
+            body = json.dumps(payload).encode('utf-8')
         
         logger.info(f"Gemini tool call payload: {len(gemini_contents)} contents, tools: {len(gemini_tools) if gemini_tools else 0}")
         # Debug: log role sequence to diagnose format errors
@@ -7865,7 +7866,7 @@ class ChatAgent:
         print(f"[GEMINI_DEBUG] Tool count: {sum(len(t.get('function_declarations',[])) for t in gemini_tools) if gemini_tools else 0}", flush=True)
         print(f"[GEMINI_DEBUG] System instruction length: {len(system_instruction)}", flush=True)
         try:
-            response = requests.post(endpoint, headers=headers, json=payload, timeout=120)
+            response = http_post('google', endpoint, headers=headers, data=body, timeout=120)
         except Exception as req_err:
             print(f"[GEMINI_DEBUG] Request exception: {type(req_err).__name__}: {req_err}", flush=True)
             raise
@@ -7909,10 +7910,8 @@ class ChatAgent:
             '_gemini_raw_parts': content_parts
         }
         if usage_meta:
-            resp['_usage'] = {
-                'input_tokens': usage_meta.get('promptTokenCount', 0),
-                'output_tokens': usage_meta.get('candidatesTokenCount', 0),
-            }
+            from src.infra.prompt_cache import usage_from_gemini
+            resp['_usage'] = usage_from_gemini(usage_meta)
         return resp
     
     def _call_ollama_with_tools(self, messages, tools, model_name):
@@ -7920,19 +7919,27 @@ class ChatAgent:
         print(f"[OLLAMA_TOOLS] *** _call_ollama_with_tools called *** model={model_name}", flush=True)
         ollama_url = self.config.get('api_base', 'http://localhost:11434')
         
-        # First try native tool calling
+        # Keep the model resident between rounds so Ollama can reuse the KV
+        # cache for the unchanged prompt prefix instead of re-evaluating it
+        from src.infra.prompt_cache import DEFAULT_OLLAMA_KEEP_ALIVE
+        keep_alive = self.config.get('ollama_keep_alive', DEFAULT_OLLAMA_KEEP_ALIVE)
+        
+        # First try native tool calling (tool schemas serialized once per list)
+        from src.tools.tool_registry import provider_tool_schemas, json_body_with_fragment
+        _, tools_json = provider_tool_schemas(tools, 'openai')
         payload = {
             'model': model_name,
             'messages': messages,
-            'tools': tools,
             'stream': False,
+            'keep_alive': keep_alive,
             'options': {
                 'temperature': self.config.get('temperature', 0.7),
                 'num_predict': self.config.get('max_tokens', 4096)
             }
         }
         
-        response = requests.post(f"{ollama_url}/api/chat", json=payload, timeout=120)
+        body = json_body_with_fragment(payload, 'tools', tools_json)
+        response = http_post('ollama', f"{ollama_url}/api/chat", headers={'Content-Type': 'application/json'}, data=body, timeout=120)
         print(f"[OLLAMA_TOOLS] Response status: {response.status_code}", flush=True)
         
         if response.status_code == 200:
@@ -7994,13 +8001,14 @@ class ChatAgent:
             'model': model_name,
             'messages': messages,
             'stream': False,
+            'keep_alive': keep_alive,
             'options': {
                 'temperature': self.config.get('temperature', 0.7),
                 'num_predict': self.config.get('max_tokens', 4096)
             }
         }
         
-        response = requests.post(f"{ollama_url}/api/chat", json=payload_no_tools, timeout=120)
+        response = http_post('ollama', f"{ollama_url}/api/chat", json=payload_no_tools, timeout=120)
         print(f"[OLLAMA_TOOLS] Fallback response status: {response.status_code}", flush=True)
         
         if response.status_code == 200:
@@ -8418,50 +8426,40 @@ class ChatAgent:
 
             # === Restore streaming and response logic (with overflow recovery) ===
             full_response = ""
-            last_sent = 0
             _overflow_retried = False
             
             def _stream_and_collect(msgs):
-                nonlocal full_response, last_sent
+                nonlocal full_response
                 full_response = ""
-                last_sent = 0
                 _thinking_started = False
                 _chunk_count = 0
-                for chunk in self.stream_response(msgs, model_override=model_override):
-                    _chunk_count += 1
-                    if _chunk_count <= 3 or _chunk_count % 20 == 0:
-                        print(f"[STREAM-DBG] chunk#{_chunk_count} type={type(chunk).__name__} len={len(chunk) if isinstance(chunk, str) else '?'}", file=sys.stderr, flush=True)
-                    # Handle thinking tuples from providers
-                    if isinstance(chunk, tuple) and chunk[0] == 'thinking':
-                        thinking_text = chunk[1]
-                        if not _thinking_started:
-                            _thinking_started = True
-                            send_message_to_frontend({
-                                "type": "thinking_start"
+                # Coalesce token deltas into ~40 ms batches; control messages flush first
+                with StreamCoalescer(send_message_to_frontend) as _out:
+                    for chunk in self.stream_response(msgs, model_override=model_override):
+                        _chunk_count += 1
+                        if _chunk_count <= 3 or _chunk_count % 20 == 0:
+                            print(f"[STREAM-DBG] chunk#{_chunk_count} type={type(chunk).__name__} len={len(chunk) if isinstance(chunk, str) else '?'}", file=sys.stderr, flush=True)
+                        # Handle thinking tuples from providers
+                        if isinstance(chunk, tuple) and chunk[0] == 'thinking':
+                            if not _thinking_started:
+                                _thinking_started = True
+                                _out.send({
+                                    "type": "thinking_start"
+                                })
+                            _out.push(chunk[1], stream="thinking")
+                            continue
+                        # Regular text — if we were thinking, signal transition
+                        if _thinking_started:
+                            _thinking_started = False
+                            _out.send({
+                                "type": "thinking_end"
                             })
-                        send_message_to_frontend({
-                            "type": "thinking_delta",
-                            "content": thinking_text
-                        })
-                        continue
-                    # Regular text — if we were thinking, signal transition
+                        full_response += chunk
+                        _out.push(chunk)
+                    # Safety: close thinking panel if stream ended mid-thinking
                     if _thinking_started:
-                        _thinking_started = False
-                        send_message_to_frontend({
-                            "type": "thinking_end"
-                        })
-                    full_response += chunk
-                    new_text = full_response[last_sent:]
-                    if new_text:
-                        send_message_to_frontend({
-                            "status": "streaming",
-                            "result": new_text
-                        })
-                        last_sent = len(full_response)
-                    time.sleep(0.01)
-                # Safety: close thinking panel if stream ended mid-thinking
-                if _thinking_started:
-                    send_message_to_frontend({"type": "thinking_end"})
+                        _out.send({"type": "thinking_end"})
+                logger.debug(f"[STREAM] {_out.deltas_in} deltas → {_out.messages_out} frontend messages")
             
             try:
                 _stream_and_collect(messages)
@@ -8763,7 +8761,7 @@ class ChatAgent:
         }
 
         logger.info(f"Routing request to Grok endpoint {endpoint} with model {model_name}")
-        response = requests.post(endpoint, headers=headers, json=payload, stream=True, timeout=120)
+        response = http_post(metadata.get('provider', 'xai'), endpoint, headers=headers, json=payload, stream=True, timeout=120)
 
         if response.status_code != 200:
             try:
@@ -8901,7 +8899,7 @@ class ChatAgent:
 
         logger.info(f"Routing request to Claude endpoint {endpoint} with model {model_name}")
         logger.info(f"Claude payload: {json.dumps({k: v for k, v in payload.items() if k != 'messages'})}")
-        response = requests.post(endpoint, headers=headers, json=payload, stream=True, timeout=120)
+        response = http_post(metadata.get('provider', 'anthropic'), endpoint, headers=headers, json=payload, stream=True, timeout=120)
         logger.info(f"Claude response status: {response.status_code}, headers: {dict(response.headers)}")
 
         if response.status_code != 200:
@@ -9050,7 +9048,7 @@ class ChatAgent:
         
         logger.info(f"Routing request to Gemini endpoint with model {model_name}")
         logger.info(f"Gemini payload contents: {len(payload.get('contents', []))} items, parts: {len(parts)}")
-        response = requests.post(endpoint, headers=headers, json=payload, stream=True, timeout=120)
+        response = http_post('google', endpoint, headers=headers, json=payload, stream=True, timeout=120)
         logger.info(f"Gemini response status: {response.status_code}")
         
         if response.status_code != 200:
@@ -9384,6 +9382,7 @@ class ChatAgent:
         configured_model = self.config.get('model', 'llama3.2-vision:11b')
         model_meta = _resolve_model_metadata(configured_model)
         provider = model_meta.get('provider', 'ollama')
+        vision_model = configured_model
         
         # If current provider doesn't support vision, use the fallback vision model
         if provider not in _VISION_PROVIDERS:
@@ -9393,10 +9392,23 @@ class ChatAgent:
                 logger.info(f"[IMAGE] Model '{configured_model}' (provider={provider}) lacks vision — falling back to '{fallback_name}'")
                 model_meta = fallback_meta
                 provider = fallback_meta['provider']
+                vision_model = fallback_name
             else:
                 logger.warning(f"[IMAGE] No valid vision fallback for '{configured_model}' — fallback '{fallback_name}' also lacks vision")
                 return f"Vision unavailable: '{configured_model}' doesn't support images and no valid vision_fallback_model is configured."
         
+        # Same image + prompt + model → cached answer; otherwise upload a normalized copy
+        from src.infra.vision_cache import cached_vision
+        model_key = f"{provider}/{model_meta.get('remote_model') or vision_model}"
+        return cached_vision(
+            image_base64, prompt, model_key,
+            lambda b64, mime: self._describe_image_with(b64, prompt, mime, provider, model_meta),
+            mime_type=mime_type,
+            cacheable=lambda text: not text.startswith(_VISION_FAILURE_PREFIXES),
+        )
+
+    def _describe_image_with(self, image_base64, prompt, mime_type, provider, model_meta):
+        """Send one image to the resolved vision provider (no caching)."""
         # ── Online providers ──
         if provider == 'google':
             try:
@@ -10530,6 +10542,7 @@ def api_agent_stats():
             from src.infra.event_logger import read_events, get_event_summary, list_event_dates
             date_param = request.args.get('date')
             event_limit = int(request.args.get('eventLimit', '200'))
+            event_offset = int(request.args.get('eventOffset', '0'))
             event_type = request.args.get('eventType')
 
             result['eventSummary'] = get_event_summary(date_param)
@@ -10538,6 +10551,7 @@ def api_agent_stats():
                 date=date_param,
                 event_type=event_type,
                 limit=event_limit,
+                offset=event_offset,
             )
         except Exception as e:
             result['eventSummary'] = {}
@@ -11652,7 +11666,12 @@ def api_local_chat_day():
 def api_local_memory():
     """Memory browser — user facts, lessons, config, system docs, visual memory."""
     user_facts_text = _safe_read_text(os.path.join(_PROJECT_ROOT, 'data', 'user_facts.md')) or ''
-    lessons_data = _safe_read_json(os.path.join(_PROJECT_ROOT, 'workspace', 'state', 'lessons.json'))
+    try:
+        # Includes changes still in the append log, not yet folded into lessons.json
+        from src.infra.lessons import get_all_lessons
+        lessons_data = {'lessons': get_all_lessons()}
+    except Exception:
+        lessons_data = _safe_read_json(os.path.join(_PROJECT_ROOT, 'workspace', 'state', 'lessons.json'))
     config_data = _safe_read_json(os.path.join(_PROJECT_ROOT, 'custom_settings.json'))
     memory_json = _safe_read_json(os.path.join(_PROJECT_ROOT, 'memory.json'))
 
@@ -15503,6 +15522,7 @@ def api_cost_reset():
     try:
         from src.infra.cost_tracker import tracker as _cost_tracker
         _cost_tracker._session = __import__('src.infra.cost_tracker', fromlist=['SessionStats']).SessionStats()
+        _cost_tracker._vision = {}
         return jsonify({"status": "success", "message": "Session cost stats reset"})
     except Exception as e:
         logger.error(f"Error resetting cost stats: {e}")
@@ -15534,6 +15554,37 @@ def api_cost_conversations():
         return jsonify({"status": "error", "message": str(e)}), 500
 
 
+@app.route('/api/cost/daily', methods=['GET'])
+def api_cost_daily():
+    """Get per-day token usage and cost rollups (oldest first)."""
+    try:
+        from src.infra.cost_tracker import tracker as _cost_tracker
+        days = max(1, min(request.args.get('days', 30, type=int), 400))
+        daily = _cost_tracker.get_daily_usage(days=days)
+        return jsonify({"status": "success", "days": daily, "count": len(daily)})
+    except Exception as e:
+        logger.error(f"Error getting daily cost rollups: {e}")
+        return jsonify({"status": "error", "message": str(e)}), 500
+
+
+@app.route('/api/cost/ledger', methods=['GET'])
+def api_cost_ledger():
+    """Query the on-disk call ledger by time range, model or conversation."""
+    try:
+        from src.infra.cost_tracker import tracker as _cost_tracker
+        records = _cost_tracker.query_ledger(
+            since=request.args.get('since', None, type=float),
+            until=request.args.get('until', None, type=float),
+            model=request.args.get('model') or None,
+            conversation_id=request.args.get('conversation') or None,
+            limit=max(1, min(request.args.get('limit', 500, type=int), 5000)),
+        )
+        return jsonify({"status": "success", "records": records, "count": len(records)})
+    except Exception as e:
+        logger.error(f"Error querying cost ledger: {e}")
+        return jsonify({"status": "error", "message": str(e)}), 500
+
+
 
 
 @app.route('/api/memory/stats', methods=['GET'])
@@ -15550,6 +15601,22 @@ def api_memory_stats():
         logger.error(f"Error getting memory stats: {e}")
         return jsonify({"status": "error", "message": str(e)}), 500
 
+@app.route('/api/memory/backfill', methods=['POST'])
+def api_memory_backfill():
+    """Queue every memory without an embedding for the background embedder."""
+    try:
+        global agent
+        if 'agent' not in globals() or agent is None:
+            return jsonify({"status": "error", "message": "Agent not initialized"}), 503
+        
+        data = request.get_json(force=True, silent=True) or {}
+        limit = data.get('limit')
+        queued = agent.unified_memory.backfill_embeddings(limit=limit)
+        return jsonify({"status": "success", "queued": queued})
+    except Exception as e:
+        logger.error(f"Error backfilling embeddings: {e}")
+        return jsonify({"status": "error", "message": str(e)}), 500
+
 @app.route('/api/memory/search', methods=['POST'])
 def api_memory_search():
     """Search memories using hybrid search (BM25 + vector)."""
@@ -15602,6 +15669,10 @@ def api_infra_status():
     """Get status of all infrastructure systems."""
     try:
         from src.infra import get_event_stats, get_subagent_registry, get_approval_manager
+        from src.infra.fetch_cache import get_fetch_cache_stats
+        from src.infra.fanout_hub import get_fanout_stats
+        from src.infra.frame_pipeline import get_frame_stats
+        from src.infra.vision_cache import get_vision_cache_stats
         
         return jsonify({
             "status": "success",
@@ -15610,6 +15681,12 @@ def api_infra_status():
             "sessions": get_session_manager().get_stats(),
             "subagents": get_subagent_registry().get_stats(),
             "execApprovals": get_approval_manager().get_stats(),
+            "httpPools": get_http_stats(),
+            "fetchCache": get_fetch_cache_stats(),
+            "fanout": get_fanout_stats(),
+            "messageFeed": MESSAGE_FEED.get_stats(),
+            "frames": get_frame_stats(),
+            "visionCache": get_vision_cache_stats(),
         })
     except Exception as e:
         logger.error(f"Error getting infra status: {e}")
@@ -10,7 +10,8 @@ Requirements:
 
 Features:
 - Tab discovery and switching
-- Page navigation
+- Page navigation that waits on real load events
+- Pipelined commands (per-request futures) and CDP event subscriptions
 - DOM queries and interaction (click, type, get text)
 - JavaScript execution in page context
 - Screenshot capture from live tabs
@@ -26,7 +27,9 @@ import time
 import base64
 import urllib.request
 import urllib.error
-from typing import Dict, Any, Optional, List
+from collections import deque
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+from typing import Dict, Any, Optional, List, Callable, Tuple
 from dataclasses import dataclass, field
 
 logger = logging.getLogger(__name__)
@@ -60,21 +63,70 @@ class CDPTab:
     favicon_url: Optional[str] = None
 
 
+class _EventWaiter:
+    """One-shot waiter for the next matching CDP event.
+
+    Armed before the command that triggers the event is sent, so a fast
+    event can't slip past between sending and waiting.
+    """
+
+    def __init__(self, conn: "CDPConnection", methods: Tuple[str, ...],
+                 predicate: Optional[Callable[[str, Dict], bool]] = None):
+        self._event = threading.Event()
+        self._predicate = predicate
+        self.method: Optional[str] = None
+        self.params: Optional[Dict] = None
+        self._unsubscribe = [conn.on(m, self._on_event) for m in methods]
+
+    def _on_event(self, method: str, params: Dict):
+        if self._event.is_set():
+            return
+        if self._predicate and not self._predicate(method, params):
+            return
+        self.method, self.params = method, params
+        self._event.set()
+
+    def wait(self, timeout: float) -> Optional[Dict]:
+        """Block until the event fires; returns its params, or None on timeout."""
+        try:
+            self._event.wait(timeout)
+        finally:
+            self.cancel()
+        return self.params
+
+    def cancel(self):
+        for unsubscribe in self._unsubscribe:
+            unsubscribe()
+        self._unsubscribe = []
+
+
 class CDPConnection:
     """
     Low-level CDP WebSocket connection to a single tab.
     Uses websocket-client (sync) for simplicity and thread safety.
+
+    Each command gets a Future that the receive thread resolves as soon as
+    its response arrives, so any number of threads can have commands in
+    flight on the same tab. Events are dispatched to subscribers registered
+    with `on()` ("Page.loadEventFired", "Network.*" or "*").
     """
 
+    CONSOLE_BUFFER = 200
+
     def __init__(self, ws_url: str, timeout: float = 15.0):
         self._ws_url = ws_url
         self._timeout = timeout
         self._ws = None
         self._msg_id = 0
         self._lock = threading.Lock()
-        self._responses: Dict[int, Any] = {}
+        self._pending: Dict[int, Future] = {}
+        self._listeners: Dict[str, List[Callable[[str, Dict], None]]] = {}
+        self._enabled_domains: set = set()
         self._recv_thread: Optional[threading.Thread] = None
         self._running = False
+        # Runtime.consoleAPICalled entries, filled once the Runtime domain is enabled
+        self.console_log: deque = deque(maxlen=self.CONSOLE_BUFFER)
+        self.on("Runtime.consoleAPICalled", self._on_console)
 
     def connect(self) -> bool:
         """Open WebSocket connection to the tab."""
@@ -111,24 +163,28 @@ class CDPConnection:
             except Exception:
                 pass
         self._ws = None
+        self._fail_pending("Connection closed")
 
     @property
     def connected(self) -> bool:
         return self._ws is not None and self._running
 
-    def send(self, method: str, params: Optional[Dict] = None, timeout: float = None) -> Dict:
+    # ── Commands ───────────────────────────────────────────────────
+
+    def send_async(self, method: str, params: Optional[Dict] = None) -> Future:
         """
-        Send a CDP command and wait for the response.
-        Returns the 'result' dict on success, or {'error': ...} on failure.
+        Send a CDP command without waiting. The Future resolves to the raw
+        response message ({'id', 'result'} or {'id', 'error'}).
         """
+        future: Future = Future()
         if not self.connected:
-            return {"error": "Not connected"}
-
-        timeout = timeout or self._timeout
+            future.set_result({"error": {"message": "Not connected"}})
+            return future
 
         with self._lock:
             self._msg_id += 1
             msg_id = self._msg_id
+            self._pending[msg_id] = future
 
         message = {"id": msg_id, "method": method}
         if params:
@@ -137,22 +193,113 @@ class CDPConnection:
         try:
             self._ws.send(json.dumps(message))
         except Exception as e:
-            return {"error": f"Send failed: {e}"}
-
-        # Wait for response
-        start = time.time()
-        while (time.time() - start) < timeout:
-            if msg_id in self._responses:
-                resp = self._responses.pop(msg_id)
-                if "error" in resp:
-                    return {"error": resp["error"].get("message", str(resp["error"]))}
-                return resp.get("result", {})
-            time.sleep(0.02)
+            with self._lock:
+                self._pending.pop(msg_id, None)
+            future.set_result({"error": {"message": f"Send failed: {e}"}})
+        return future
+
+    def send(self, method: str, params: Optional[Dict] = None, timeout: float = None) -> Dict:
+        """
+        Send a CDP command and wait for the response.
+        Returns the 'result' dict on success, or {'error': ...} on failure.
+        """
+        return self.wait_result(self.send_async(method, params), method, timeout)
 
-        return {"error": f"Timeout waiting for response to {method}"}
+    def wait_result(self, future: Future, method: str = "command", timeout: float = None) -> Dict:
+        """Wait for a Future from send_async and unwrap it like send()."""
+        try:
+            resp = future.result(timeout or self._timeout)
+        except FutureTimeout:
+            # Drop the slot so a late response doesn't pile up in _pending
+            with self._lock:
+                for msg_id, pending in list(self._pending.items()):
+                    if pending is future:
+                        del self._pending[msg_id]
+            return {"error": f"Timeout waiting for response to {method}"}
+        if "error" in resp:
+            error = resp["error"]
+            return {"error": error.get("message", str(error)) if isinstance(error, dict) else str(error)}
+        return resp.get("result", {})
+
+    def send_many(self, commands: List[Tuple[str, Optional[Dict]]], timeout: float = None) -> List[Dict]:
+        """Pipeline several commands on the tab and wait for all responses (in order)."""
+        futures = [(method, self.send_async(method, params)) for method, params in commands]
+        return [self.wait_result(future, method, timeout) for method, future in futures]
+
+    def enable(self, domain: str) -> Dict:
+        """Enable a CDP domain ("Page", "Runtime", "Network", ...) once per connection."""
+        if domain in self._enabled_domains:
+            return {}
+        result = self.send(f"{domain}.enable")
+        if "error" not in result:
+            self._enabled_domains.add(domain)
+        return result
+
+    # ── Events ─────────────────────────────────────────────────────
+
+    def on(self, method: str, callback: Callable[[str, Dict], None]) -> Callable[[], None]:
+        """
+        Subscribe to CDP events. `method` is an exact event name, a domain
+        wildcard ("Network.*") or "*". The callback gets (method, params) on
+        the receive thread and must not block. Returns an unsubscribe function.
+        """
+        with self._lock:
+            self._listeners.setdefault(method, []).append(callback)
+
+        def unsubscribe():
+            with self._lock:
+                callbacks = self._listeners.get(method)
+                if callbacks and callback in callbacks:
+                    callbacks.remove(callback)
+                    if not callbacks:
+                        del self._listeners[method]
+        return unsubscribe
+
+    def expect_event(self, methods, predicate: Optional[Callable[[str, Dict], bool]] = None) -> _EventWaiter:
+        """Arm a one-shot waiter for one of `methods` (call before triggering it)."""
+        if isinstance(methods, str):
+            methods = (methods,)
+        return _EventWaiter(self, tuple(methods), predicate)
+
+    def wait_for_event(self, method: str, timeout: float = None,
+                       predicate: Optional[Callable[[str, Dict], bool]] = None) -> Optional[Dict]:
+        """Block until the next matching event; returns its params or None on timeout."""
+        return self.expect_event(method, predicate).wait(timeout or self._timeout)
+
+    def _dispatch(self, method: str, params: Dict):
+        domain = method.split(".", 1)[0]
+        with self._lock:
+            callbacks = (self._listeners.get(method, []) + self._listeners.get(f"{domain}.*", [])
+                         + self._listeners.get("*", []))
+        for callback in callbacks:
+            try:
+                callback(method, params)
+            except Exception as e:
+                logger.debug(f"CDP event handler error ({method}): {e}")
+
+    def _on_console(self, method: str, params: Dict):
+        args = params.get("args", [])
+        text = " ".join(
+            str(a["value"]) if "value" in a else a.get("description", a.get("type", ""))
+            for a in args
+        )
+        level = params.get("type", "log")
+        self.console_log.append({
+            "level": "warn" if level == "warning" else level,
+            "text": text,
+            "ts": int(params.get("timestamp", time.time() * 1000)),
+        })
+
+    def _fail_pending(self, reason: str):
+        with self._lock:
+            pending = list(self._pending.values())
+            self._pending.clear()
+        for future in pending:
+            if not future.done():
+                future.set_result({"error": {"message": reason}})
 
     def _recv_loop(self):
-        """Background thread to receive WebSocket messages."""
+        """Background thread: resolve command futures and dispatch events."""
         while self._running and self._ws:
             try:
                 raw = self._ws.recv()
@@ -160,8 +307,12 @@ class CDPConnection:
                     continue
                 data = json.loads(raw)
                 if "id" in data:
-                    self._responses[data["id"]] = data
-                # Events (no id) are ignored for now — could be used for console, network, etc.
+                    with self._lock:
+                        future = self._pending.pop(data["id"], None)
+                    if future and not future.done():
+                        future.set_result(data)
+                elif "method" in data:
+                    self._dispatch(data["method"], data.get("params", {}))
             except _ws_sync.WebSocketTimeoutException:
                 continue
             except Exception as e:
@@ -170,6 +321,7 @@ class CDPConnection:
                 break
 
         self._running = False
+        self._fail_pending("Connection closed")
 
 
 class CDPBrowser:
@@ -404,26 +556,71 @@ class CDPBrowser:
 
     # ── Navigation ─────────────────────────────────────────────────
 
+    # Upper bound for waiting on a page's load event after navigating
+    NAVIGATION_TIMEOUT = 15.0
+
     def navigate(self, url: str, tab_id: Optional[str] = None, wait: bool = True) -> Dict[str, Any]:
-        """Navigate a tab to a URL."""
+        """Navigate a tab to a URL (waits for the load event when `wait`)."""
         conn = self._get_connection(tab_id)
         if not conn:
             return {"status": "error", "error": "No tab connected. Is Edge running with --remote-debugging-port=9222?"}
 
+        waiter = None
+        if wait:
+            conn.enable("Page")
+            waiter = conn.expect_event("Page.loadEventFired")
+
         result = conn.send("Page.navigate", {"url": url})
         if "error" in result:
+            if waiter:
+                waiter.cancel()
             return {"status": "error", "error": result["error"]}
 
-        if wait:
-            # Wait for page load
-            conn.send("Page.enable")
-            time.sleep(1.5)  # Simple wait — could use Page.loadEventFired for precision
-
-        return {
+        response = {
             "status": "success",
             "url": url,
             "frameId": result.get("frameId", ""),
         }
+        if result.get("errorText"):
+            response["errorText"] = result["errorText"]
+
+        if waiter:
+            # No loaderId means a same-document navigation (e.g. #hash): nothing to load
+            if result.get("loaderId") and not result.get("errorText"):
+                started = time.time()
+                response["loaded"] = waiter.wait(self.NAVIGATION_TIMEOUT) is not None
+                response["loadMs"] = int((time.time() - started) * 1000)
+            else:
+                waiter.cancel()
+        return response
+
+    def _history_step(self, delta: int, tab_id: Optional[str] = None) -> Dict[str, Any]:
+        """Move `delta` entries through session history and wait until it lands."""
+        conn = self._get_connection(tab_id)
+        if not conn:
+            return {"status": "error", "error": "No tab connected"}
+
+        history = conn.send("Page.getNavigationHistory")
+        if "error" in history:
+            return {"status": "error", "error": history["error"]}
+        entries = history.get("entries", [])
+        index = history.get("currentIndex", 0) + delta
+        if 0 <= index < len(entries):
+            conn.enable("Page")
+            # Full load, same-document move, or a back/forward-cache restore (no load event)
+            waiter = conn.expect_event(
+                ("Page.loadEventFired", "Page.navigatedWithinDocument", "Page.frameNavigated"),
+                lambda method, params: method != "Page.frameNavigated"
+                or params.get("type") == "BackForwardCacheRestore",
+            )
+            result = conn.send("Page.navigateToHistoryEntry", {"entryId": entries[index]["id"]})
+            if "error" in result:
+                waiter.cancel()
+                return {"status": "error", "error": result["error"]}
+            waiter.wait(self.NAVIGATION_TIMEOUT)
+
+        loc = self.evaluate("({ url: location.href, title: document.title })", tab_id)
+        return {"status": "success", "url": loc.get("value", {}).get("url", ""), "title": loc.get("value", {}).get("title", "")}
 
     # ── JavaScript Execution ───────────────────────────────────────
 
@@ -738,21 +935,11 @@ class CDPBrowser:
 
     def go_back(self, tab_id: Optional[str] = None) -> Dict[str, Any]:
         """Navigate back in browser history."""
-        result = self.evaluate("(() => { history.back(); return { success: true }; })()", tab_id)
-        if result.get("status") == "error":
-            return result
-        time.sleep(1)
-        loc = self.evaluate("({ url: location.href, title: document.title })", tab_id)
-        return {"status": "success", "url": loc.get("value", {}).get("url", ""), "title": loc.get("value", {}).get("title", "")}
+        return self._history_step(-1, tab_id)
 
     def go_forward(self, tab_id: Optional[str] = None) -> Dict[str, Any]:
         """Navigate forward in browser history."""
-        result = self.evaluate("(() => { history.forward(); return { success: true }; })()", tab_id)
-        if result.get("status") == "error":
-            return result
-        time.sleep(1)
-        loc = self.evaluate("({ url: location.href, title: document.title })", tab_id)
-        return {"status": "success", "url": loc.get("value", {}).get("url", ""), "title": loc.get("value", {}).get("title", "")}
+        return self._history_step(1, tab_id)
 
     # ── Hover ──────────────────────────────────────────────────────
 
@@ -848,25 +1035,53 @@ class CDPBrowser:
 
     # ── Wait For ───────────────────────────────────────────────────
 
+    def _wait_in_page(self, check_js: str, timeout: float, tab_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        Wait inside the page until `check_js` (an expression) is truthy.
+
+        A MutationObserver re-checks on every DOM change (plus a 100 ms
+        fallback tick for pure style/layout changes), so the call returns as
+        soon as the condition holds — one round trip instead of a poll loop.
+        Retries if a navigation destroys the execution context mid-wait.
+        Returns {'value': ..., 'waited': seconds} or None on timeout.
+        """
+        started = time.time()
+        while True:
+            remaining = timeout - (time.time() - started)
+            if remaining <= 0:
+                return None
+            js = f"""new Promise(resolve => {{
+                const check = () => {{ try {{ return ({check_js}); }} catch (e) {{ return null; }} }};
+                let obs = null, tick = null, timer = null;
+                const done = v => {{ if (obs) obs.disconnect(); clearInterval(tick); clearTimeout(timer); resolve(v); }};
+                const test = () => {{ const v = check(); if (v) done(v); }};
+                obs = new MutationObserver(test);
+                obs.observe(document.documentElement || document, {{ childList: true, subtree: true, attributes: true, characterData: true }});
+                tick = setInterval(test, 100);
+                timer = setTimeout(() => done(null), {int(remaining * 1000)});
+                test();
+            }})"""
+            result = self.evaluate(js, tab_id, timeout=remaining + 1)
+            if result.get("status") == "success":
+                if not result.get("value"):
+                    return None
+                return {"value": result["value"], "waited": round(time.time() - started, 1)}
+            # Context destroyed by a navigation (or tab busy) — back off briefly and re-arm
+            time.sleep(0.1)
+
     def wait_for_selector(self, selector: str, timeout: float = 10.0, visible: bool = True, tab_id: Optional[str] = None) -> Dict[str, Any]:
         """Wait for an element to appear on the page."""
-        poll_interval = 0.3
-        elapsed = 0.0
-        while elapsed < timeout:
-            js = f"""(() => {{
-                const el = document.querySelector({json.dumps(selector)});
-                if (!el) return null;
-                const rect = el.getBoundingClientRect();
-                const vis = rect.width > 0 && rect.height > 0;
-                return {{ found: true, visible: vis, tag: el.tagName.toLowerCase() }};
-            }})()"""
-            result = self.evaluate(js, tab_id)
-            val = result.get("value")
-            if val and val.get("found"):
-                if not visible or val.get("visible"):
-                    return {"status": "success", "selector": selector, "visible": val.get("visible"), "waited": round(elapsed, 1)}
-            time.sleep(poll_interval)
-            elapsed += poll_interval
+        check = f"""(() => {{
+            const el = document.querySelector({json.dumps(selector)});
+            if (!el) return null;
+            const rect = el.getBoundingClientRect();
+            const vis = rect.width > 0 && rect.height > 0;
+            if ({'true' if visible else 'false'} && !vis) return null;
+            return {{ found: true, visible: vis, tag: el.tagName.toLowerCase() }};
+        }})()"""
+        found = self._wait_in_page(check, timeout, tab_id)
+        if found:
+            return {"status": "success", "selector": selector, "visible": found["value"].get("visible"), "waited": found["waited"]}
         return {"status": "error", "error": f"Timeout waiting for '{selector}' after {timeout}s"}
 
     # ── @ref Snapshot System ───────────────────────────────────────
@@ -1107,44 +1322,20 @@ class CDPBrowser:
         conn = self._get_connection(tab_id)
         if not conn:
             return False
-        conn.send("Runtime.enable")
-        conn.send("Console.enable")
+        conn.enable("Runtime")
+        conn.enable("Console")
         return True
 
     def get_console_messages(self, tab_id: Optional[str] = None, level: Optional[str] = None) -> Dict[str, Any]:
-        """Get console messages from the page. Uses Runtime.evaluate to capture console history."""
+        """Get console messages from the page (captured from Runtime.consoleAPICalled events)."""
         conn = self._get_connection(tab_id)
         if not conn:
             return {"status": "error", "error": "No tab connected"}
-        # Enable console capture
-        conn.send("Runtime.enable")
-        conn.send("Console.enable")
-        # Use JS to capture console output
-        level_filter = f"&& entry.level === {json.dumps(level)}" if level else ""
-        js = f"""(() => {{
-            if (!window.__cdp_console_log) {{
-                window.__cdp_console_log = [];
-                const orig = {{}};
-                ['log','warn','error','info','debug'].forEach(m => {{
-                    orig[m] = console[m];
-                    console[m] = function() {{
-                        window.__cdp_console_log.push({{
-                            level: m,
-                            text: Array.from(arguments).map(a => typeof a === 'object' ? JSON.stringify(a) : String(a)).join(' '),
-                            ts: Date.now()
-                        }});
-                        if (window.__cdp_console_log.length > 200) window.__cdp_console_log.shift();
-                        orig[m].apply(console, arguments);
-                    }};
-                }});
-            }}
-            return window.__cdp_console_log.filter(entry => true {level_filter}).slice(-50);
-        }})()"""
-        result = self.evaluate(js, tab_id)
-        if result.get("status") == "error":
-            return result
-        messages = result.get("value", [])
-        return {"status": "success", "messages": messages or [], "count": len(messages or [])}
+        # Enabling Runtime replays messages already logged in the current context
+        conn.enable("Runtime")
+        conn.enable("Console")
+        messages = [m for m in list(conn.console_log) if not level or m["level"] == level][-50:]
+        return {"status": "success", "messages": messages, "count": len(messages)}
 
     # ── PDF Save ────────────────────────────────────────────────────
 
@@ -1189,7 +1380,7 @@ class CDPBrowser:
         if not selector:
             selector = 'input[type="file"]'
         # Get the DOM node
-        conn.send("DOM.enable")
+        conn.enable("DOM")
         doc = conn.send("DOM.getDocument")
         if "error" in doc:
             return {"status": "error", "error": doc["error"]}
@@ -1217,7 +1408,7 @@ class CDPBrowser:
         conn = self._get_connection(tab_id)
         if not conn:
             return {"status": "error", "error": "No tab connected"}
-        conn.send("Page.enable")
+        conn.enable("Page")
         # Handle any currently open dialog
         params = {"accept": accept}
         if prompt_text is not None:
@@ -1435,15 +1626,10 @@ class CDPBrowser:
 
     def wait_text_gone(self, text: str, timeout: float = 10.0, tab_id: Optional[str] = None) -> Dict[str, Any]:
         """Wait until specific text disappears from the page."""
-        poll_interval = 0.3
-        elapsed = 0.0
-        while elapsed < timeout:
-            js = f"document.body.innerText.includes({json.dumps(text)})"
-            result = self.evaluate(js, tab_id)
-            if result.get("value") == False:
-                return {"status": "success", "text": text, "waited": round(elapsed, 1)}
-            time.sleep(poll_interval)
-            elapsed += poll_interval
+        check = f"document.body && !document.body.innerText.includes({json.dumps(text)})"
+        gone = self._wait_in_page(check, timeout, tab_id)
+        if gone:
+            return {"status": "success", "text": text, "waited": gone["waited"]}
         return {"status": "error", "error": f"Text '{text[:50]}' still present after {timeout}s"}
 
     # ── Enhanced Snapshot ───────────────────────────────────────────
@@ -46,6 +46,12 @@ except ImportError:
         logger.warning(f"Tool system not available: {e}")
         HAS_TOOLS = False
 
+# Pooled keep-alive HTTP sessions (shared with proxy_server when in-process)
+try:
+    from src.infra.http_pool import http_post
+except ImportError:
+    from infra.http_pool import http_post
+
 # Import infra
 try:
     from infra.system_events import drain_system_events, has_system_events
@@ -431,7 +437,8 @@ class AutonomousRunner:
             if tools:
                 payload["tools"] = tools
             
-            response = requests.post(
+            response = http_post(
+                "ollama",
                 f"{self.config.ollama_url}/api/chat",
                 json=payload,
                 stream=True,
@@ -530,7 +537,8 @@ class AutonomousRunner:
             payload["tools"] = [{"function_declarations": func_decls}]
         
         try:
-            response = requests.post(
+            response = http_post(
+                "google",
                 endpoint,
                 json=payload,
                 headers={"Content-Type": "application/json"},
@@ -593,7 +601,8 @@ class AutonomousRunner:
             payload["tools"] = [{"type": "function", "function": t.get("function", t)} for t in tools]
         
         try:
-            response = requests.post(
+            response = http_post(
+                self.config.provider,
                 endpoint,
                 json=payload,
                 headers={
@@ -653,7 +662,8 @@ class AutonomousRunner:
             } for t in tools]
         
         try:
-            response = requests.post(
+            response = http_post(
+                "anthropic",
                 "https://api.anthropic.com/v1/messages",
                 json=payload,
                 headers={
@@ -712,7 +722,8 @@ class AutonomousRunner:
         
         prompt = "\n\n".join(prompt_parts) + "\n\nAssistant:"
         
-        response = requests.post(
+        response = http_post(
+            "ollama",
             f"{self.config.ollama_url}/api/generate",
             json={
                 "model": self.config.default_model,
@@ -0,0 +1,459 @@
+"""
+Cron Engine — In-process cron expression compiler and next-fire search.
+
+Replaces the per-call Node.js croner subprocess for schedule computation.
+Each expression is compiled once into integer bitsets (bit N set = value N
+allowed) and cached; next/previous fire times are found by jumping field by
+field to the next set bit instead of stepping minute by minute.
+
+- 5 fields (minute hour day month weekday) or 6 (leading seconds), as croner
+- Lists, ranges, steps ("*/15", "1-5/2", "10/20"), "?" as "*"
+- Month names (JAN-DEC), weekday names (SUN-SAT), weekday 7 = Sunday
+- Day-of-month "L" (last day), "15W" (nearest weekday), "LW"
+- Weekday "5L" (last Friday of the month), "1#2" (second Monday)
+- Day-of-month and weekday both restricted → either may match (croner default)
+- Nicknames: @yearly @annually @monthly @weekly @daily @midnight @hourly
+- Timezone-aware: searches in wall-clock time of the zone (system local time
+  by default); wall times skipped by a DST jump fire right after the gap,
+  repeated wall times fire once
+
+Usage:
+    from src.gateway.cron_engine import compile_cron, next_fire
+
+    next_fire("0 9 * * 1-5")                      # naive local datetime
+    next_fire("0 9 * * 1-5", tz="Europe/Berlin")  # aware datetime
+    schedule = compile_cron("*/30 * * * *")
+    schedule.next_after(datetime(2025, 1, 1, 8, 10))
+    # datetime(2025, 1, 1, 8, 30)
+"""
+
+import calendar
+import logging
+from datetime import datetime, timedelta, tzinfo
+from functools import lru_cache
+from typing import Optional, Union
+
+try:
+    from zoneinfo import ZoneInfo
+except ImportError:  # pragma: no cover - Python < 3.9
+    ZoneInfo = None
+
+logger = logging.getLogger("gateway.cron")
+
+# Compiled expressions to keep (CIRCUITS.md + periodic events rarely exceed a few dozen)
+COMPILE_CACHE_SIZE = 256
+# Stop searching after this many years (e.g. "0 0 30 2 *" never fires)
+MAX_SEARCH_YEARS = 30
+
+NICKNAMES = {
+    "@yearly": "0 0 1 1 *",
+    "@annually": "0 0 1 1 *",
+    "@monthly": "0 0 1 * *",
+    "@weekly": "0 0 * * 0",
+    "@daily": "0 0 * * *",
+    "@midnight": "0 0 * * *",
+    "@hourly": "0 * * * *",
+}
+
+_MONTH_NAMES = {name: i for i, name in enumerate(
+    ["JAN", "FEB", "MAR", "APR", "MAY", "JUN", "JUL", "AUG", "SEP", "OCT", "NOV", "DEC"], 1)}
+_DAY_NAMES = {name: i for i, name in enumerate(["SUN", "MON", "TUE", "WED", "THU", "FRI", "SAT"])}
+
+TzArg = Union[None, str, tzinfo]
+
+
+class CronError(ValueError):
+    """Raised for cron expressions that cannot be compiled."""
+
+
+def _next_bit(mask: int, start: int) -> int:
+    """Lowest set bit >= start, or -1."""
+    if start < 0:
+        start = 0
+    rest = mask >> start
+    if not rest:
+        return -1
+    return start + (rest & -rest).bit_length() - 1
+
+
+def _prev_bit(mask: int, start: int) -> int:
+    """Highest set bit <= start, or -1."""
+    if start < 0:
+        return -1
+    return (mask & ((1 << (start + 1)) - 1)).bit_length() - 1
+
+
+def _value(token: str, names: dict, field: str) -> int:
+    token = token.upper()
+    if token in names:
+        return names[token]
+    if not token.isdigit():
+        raise CronError(f"invalid {field} value '{token}'")
+    return int(token)
+
+
+def _parse_field(text: str, lo: int, hi: int, field: str, names: dict = None) -> int:
+    """Compile one field ("1-5", "*/10", "MON,WED") into a bitset."""
+    names = names or {}
+    mask = 0
+    for part in text.split(","):
+        if not part:
+            raise CronError(f"empty list item in {field} field '{text}'")
+        step = 1
+        if "/" in part:
+            part, step_text = part.split("/", 1)
+            if not step_text.isdigit() or int(step_text) == 0:
+                raise CronError(f"invalid step in {field} field '{text}'")
+            step = int(step_text)
+        if part in ("*", "?"):
+            start, end = lo, hi
+        elif "-" in part:
+            a, b = part.split("-", 1)
+            start, end = _value(a, names, field), _value(b, names, field)
+        else:
+            start = _value(part, names, field)
+            end = hi if step > 1 else start
+        if start < lo or end > hi or start > end:
+            raise CronError(f"{field} value out of range in '{text}'")
+        for v in range(start, end + 1, step):
+            mask |= 1 << v
+    if field == "weekday" and mask >> 7 & 1:
+        mask = (mask & 0x7F) | 1                # 7 is Sunday too
+    return mask
+
+
+class CronSchedule:
+    """A compiled cron expression.
+
+    Field bitsets: seconds/minutes/hours/months as plain ranges, days 1..31,
+    weekdays 0..6 (0 = Sunday). Special day rules (L, W, #) are resolved per
+    (year, month) into a day-of-month bitset, cached on the instance.
+    """
+
+    __slots__ = ("source", "seconds", "minutes", "hours", "days", "months",
+                 "weekdays", "last_day", "last_weekday_of_month", "nearest_weekday",
+                 "last_weekdays", "nth_weekdays", "dom_any", "dow_any", "_month_masks")
+
+    def __init__(self, source: str):
+        self.source = source
+        expr = NICKNAMES.get(source.strip().lower(), source)
+        fields = expr.split()
+        if len(fields) == 5:
+            fields.insert(0, "0")
+        if len(fields) != 6:
+            raise CronError(f"expected 5 or 6 fields, got {len(fields)}: '{source}'")
+        sec, minute, hour, dom, month, dow = fields
+
+        self.seconds = _parse_field(sec, 0, 59, "second")
+        self.minutes = _parse_field(minute, 0, 59, "minute")
+        self.hours = _parse_field(hour, 0, 23, "hour")
+        self.months = _parse_field(month, 1, 12, "month", _MONTH_NAMES)
+
+        self.dom_any = dom in ("*", "?")
+        self.dow_any = dow in ("*", "?")
+
+        # Day of month: plain values plus L / LW / nW
+        self.last_day = False
+        self.last_weekday_of_month = False
+        self.nearest_weekday = 0
+        plain = []
+        for part in dom.split(","):
+            upper = part.upper()
+            if upper == "L":
+                self.last_day = True
+            elif upper == "LW":
+                self.last_weekday_of_month = True
+            elif upper.endswith("W") and upper[:-1].isdigit():
+                day = int(upper[:-1])
+                if not 1 <= day <= 31:
+                    raise CronError(f"day value out of range in '{dom}'")
+                self.nearest_weekday |= 1 << day
+            else:
+                plain.append(part)
+        self.days = _parse_field(",".join(plain), 1, 31, "day") if plain else 0
+
+        # Weekday: plain values plus nL / n#k
+        self.last_weekdays = 0
+        self.nth_weekdays = ()
+        nth = []
+        plain = []
+        for part in dow.split(","):
+            upper = part.upper()
+            if "#" in upper:
+                day_text, n_text = upper.split("#", 1)
+                wd = _value(day_text, _DAY_NAMES, "weekday") % 7
+                if not n_text.isdigit() or not 1 <= int(n_text) <= 5:
+                    raise CronError(f"invalid nth weekday in '{dow}'")
+                nth.append((wd, int(n_text)))
+            elif len(upper) > 1 and upper.endswith("L"):
+                self.last_weekdays |= 1 << (_value(upper[:-1], _DAY_NAMES, "weekday") % 7)
+            else:
+                plain.append(part)
+        self.nth_weekdays = tuple(nth)
+        self.weekdays = _parse_field(",".join(plain), 0, 7, "weekday", _DAY_NAMES) if plain else 0
+
+        if not self.months or not (self.days or self.last_day or self.last_weekday_of_month
+                                   or self.nearest_weekday or self.weekdays or self.last_weekdays
+                                   or self.nth_weekdays):
+            raise CronError(f"expression can never match: '{source}'")
+        self._month_masks = {}
+
+    def __repr__(self) -> str:
+        return f"CronSchedule({self.source!r})"
+
+    # ── Day resolution ────────────────────────────────────────────
+
+    def day_mask(self, year: int, month: int) -> int:
+        """Bitset of matching days (1..31) in a given month."""
+        key = year * 12 + month
+        mask = self._month_masks.get(key)
+        if mask is not None:
+            return mask
+
+        first_py, ndays = calendar.monthrange(year, month)
+        first = (first_py + 1) % 7           # cron weekday of the 1st (0 = Sunday)
+        month_bits = ((1 << ndays) - 1) << 1
+
+        dom = self.days & month_bits
+        if self.last_day:
+            dom |= 1 << ndays
+        if self.last_weekday_of_month:
+            dom |= 1 << self._nearest_weekday(ndays, ndays, first)
+        if self.nearest_weekday:
+            for day in range(1, ndays + 1):
+                if self.nearest_weekday >> day & 1:
+                    dom |= 1 << self._nearest_weekday(day, ndays, first)
+
+        dow = 0
+        if self.weekdays:
+            for day in range(1, ndays + 1):
+                if self.weekdays >> ((first + day - 1) % 7) & 1:
+                    dow |= 1 << day
+        for wd in range(7):
+            if self.last_weekdays >> wd & 1:
+                last_wd = (first + ndays - 1) % 7
+                dow |= 1 << (ndays - (last_wd - wd) % 7)
+        for wd, n in self.nth_weekdays:
+            day = 1 + (wd - first) % 7 + 7 * (n - 1)
+            if day <= ndays:
+                dow |= 1 << day
+
+        if self.dom_any and self.dow_any:
+            mask = month_bits
+        elif self.dow_any:
+            mask = dom
+        elif self.dom_any:
+            mask = dow
+        else:
+            mask = dom | dow
+
+        if len(self._month_masks) > 512:
+            self._month_masks.clear()
+        self._month_masks[key] = mask
+        return mask
+
+    @staticmethod
+    def _nearest_weekday(day: int, ndays: int, first: int) -> int:
+        """Nearest Mon-Fri to `day` without leaving the month."""
+        day = min(day, ndays)
+        wd = (first + day - 1) % 7
+        if wd == 6:                          # Saturday → Friday, or Monday on the 1st
+            return day - 1 if day > 1 else day + 2
+        if wd == 0:                          # Sunday → Monday, or Friday on the last day
+            return day + 1 if day < ndays else day - 2
+        return day
+
+    def matches(self, when: datetime) -> bool:
+        """True if the wall-clock time `when` (second resolution) matches."""
+        return bool(
+            self.seconds >> when.second & 1
+            and self.minutes >> when.minute & 1
+            and self.hours >> when.hour & 1
+            and self.months >> when.month & 1
+            and self.day_mask(when.year, when.month) >> when.day & 1
+        )
+
+    # ── Wall-clock search ─────────────────────────────────────────
+
+    def _next_wall(self, after: datetime) -> Optional[datetime]:
+        """First matching naive wall time strictly after `after`."""
+        t = after.replace(microsecond=0) + timedelta(seconds=1)
+        year, month, day = t.year, t.month, t.day
+        hour, minute, second = t.hour, t.minute, t.second
+        last_year = year + MAX_SEARCH_YEARS
+        while year <= last_year:
+            m = _next_bit(self.months, month)
+            if m < 0:
+                year, month, day, hour, minute, second = year + 1, 1, 1, 0, 0, 0
+                continue
+            if m != month:
+                month, day, hour, minute, second = m, 1, 0, 0, 0
+
+            d = _next_bit(self.day_mask(year, month), day)
+            if d < 0:
+                month, day, hour, minute, second = month + 1, 1, 0, 0, 0
+                if month > 12:
+                    year, month = year + 1, 1
+                continue
+            if d != day:
+                day, hour, minute, second = d, 0, 0, 0
+
+            h = _next_bit(self.hours, hour)
+            if h < 0:
+                day, hour, minute, second = day + 1, 0, 0, 0
+                continue
+            if h != hour:
+                hour, minute, second = h, 0, 0
+
+            mi = _next_bit(self.minutes, minute)
+            if mi < 0:
+                hour, minute, second = hour + 1, 0, 0
+                continue
+            if mi != minute:
+                minute, second = mi, 0
+
+            s = _next_bit(self.seconds, second)
+            if s < 0:
+                minute, second = minute + 1, 0
+                continue
+            return datetime(year, month, day, hour, minute, s)
+        return None
+
+    def _prev_wall(self, before: datetime) -> Optional[datetime]:
+        """Last matching naive wall time strictly before `before`."""
+        t = before.replace(microsecond=0)
+        if t == before:
+            t -= timedelta(seconds=1)
+        year, month, day = t.year, t.month, t.day
+        hour, minute, second = t.hour, t.minute, t.second
+        first_year = year - MAX_SEARCH_YEARS
+        while year >= first_year:
+            m = _prev_bit(self.months, month)
+            if m < 0:
+                year, month, day, hour, minute, second = year - 1, 12, 31, 23, 59, 59
+                continue
+            if m != month:
+                month, day, hour, minute, second = m, 31, 23, 59, 59
+
+            d = _prev_bit(self.day_mask(year, month), day)
+            if d < 0:
+                month, day, hour, minute, second = month - 1, 31, 23, 59, 59
+                if month < 1:
+                    year, month = year - 1, 12
+                continue
+            if d != day:
+                day, hour, minute, second = d, 23, 59, 59
+
+            h = _prev_bit(self.hours, hour)
+            if h < 0:
+                day, hour, minute, second = day - 1, 23, 59, 59
+                continue
+            if h != hour:
+                hour, minute, second = h, 59, 59
+
+            mi = _prev_bit(self.minutes, minute)
+            if mi < 0:
+                hour, minute, second = hour - 1, 59, 59
+                continue
+            if mi != minute:
+                minute, second = mi, 59
+
+            s = _prev_bit(self.seconds, second)
+            if s < 0:
+                minute, second = minute - 1, 59
+                continue
+            return datetime(year, month, day, hour, minute, s)
+        return None
+
+    # ── Timezone-aware search ─────────────────────────────────────
+
+    def next_after(self, after: datetime, tz: TzArg = None) -> Optional[datetime]:
+        """Next fire time strictly after `after`.
+
+        Naive `after` with no `tz` is system local time and the result is
+        naive local time. Otherwise the search runs in `tz` (default: the
+        tzinfo of `after`) and the result is aware.
+        """
+        return self._search(after, tz, forward=True)
+
+    def prev_before(self, before: datetime, tz: TzArg = None) -> Optional[datetime]:
+        """Most recent fire time strictly before `before` (same tz rules)."""
+        return self._search(before, tz, forward=False)
+
+    def _search(self, ref: datetime, tz: TzArg, forward: bool) -> Optional[datetime]:
+        zone = resolve_tz(tz)
+        if zone is None and ref.tzinfo is not None:
+            zone = ref.tzinfo
+        if zone is None:
+            ref_ts = ref.timestamp()
+            wall = ref
+            to_ts = datetime.timestamp
+            from_ts = datetime.fromtimestamp
+        else:
+            if ref.tzinfo is None:
+                ref = ref.replace(tzinfo=zone)
+            ref_ts = ref.timestamp()
+            wall = ref.astimezone(zone).replace(tzinfo=None)
+            to_ts = lambda w: w.replace(tzinfo=zone).timestamp()   # noqa: E731
+            from_ts = lambda ts: datetime.fromtimestamp(ts, zone)  # noqa: E731
+
+        step = self._next_wall if forward else self._prev_wall
+        # Wall times inside a DST overlap map back before `ref`; walk past them
+        for _ in range(10000):
+            candidate = step(wall)
+            if candidate is None:
+                return None
+            ts = to_ts(candidate)
+            if (ts > ref_ts) if forward else (ts < ref_ts):
+                return from_ts(ts)
+            wall = candidate
+        return None
+
+
+@lru_cache(maxsize=COMPILE_CACHE_SIZE)
+def compile_cron(expr: str) -> CronSchedule:
+    """Compile (or fetch the cached) schedule for a cron expression.
+
+    Raises CronError for malformed expressions.
+    """
+    return CronSchedule(expr.strip())
+
+
+@lru_cache(maxsize=32)
+def _zone(name: str) -> tzinfo:
+    if ZoneInfo is None:
+        raise CronError(f"timezone support unavailable for '{name}'")
+    try:
+        return ZoneInfo(name)
+    except Exception as e:
+        raise CronError(f"unknown timezone '{name}'") from e
+
+
+def resolve_tz(tz: TzArg) -> Optional[tzinfo]:
+    """Accept None, an IANA name ("Europe/Berlin") or a tzinfo."""
+    if tz is None or isinstance(tz, tzinfo):
+        return tz
+    return _zone(tz)
+
+
+def next_fire(expr: str, after: Optional[datetime] = None, tz: TzArg = None) -> Optional[datetime]:
+    """Next fire time for `expr` after `after` (default: now), or None if it never fires."""
+    return compile_cron(expr).next_after(after or datetime.now(), tz)
+
+
+def prev_fire(expr: str, before: Optional[datetime] = None, tz: TzArg = None) -> Optional[datetime]:
+    """Most recent fire time for `expr` before `before` (default: now)."""
+    return compile_cron(expr).prev_before(before or datetime.now(), tz)
+
+
+def is_valid_cron(expr: str) -> bool:
+    """True if `expr` compiles and fires at least once in the search horizon."""
+    try:
+        return next_fire(expr) is not None
+    except CronError:
+        return False
+
+
+def cron_cache_info() -> dict:
+    info = compile_cron.cache_info()
+    return {"hits": info.hits, "misses": info.misses, "size": info.currsize, "maxsize": info.maxsize}
@@ -20,6 +20,7 @@ Supported schedule formats:
   - Random windows: "3 random between 8:00 AM and 10:00 PM: Post to X"
 """
 
+import os
 import re
 import random
 import hashlib
@@ -31,11 +32,16 @@ from typing import List, Optional, Dict
 from dataclasses import dataclass, field
 from pathlib import Path
 
-# Croner (JS) for cron expression parsing — called via Node subprocess.
-# Preferred over croniter (Python, unmaintained) for active maintenance.
+from .cron_engine import CronError, compile_cron
+
+# Croner (JS) helper — no longer on the hot path. Cron expressions are
+# compiled and searched in-process by cron_engine; with
+# SUBSTRATE_CRON_CROSSCHECK=1 each result is also checked against croner
+# via a Node subprocess and mismatches are logged.
 _CRON_HELPER = Path(__file__).parent / "cron_next.js"
 _NODE_BIN = shutil.which("node")
 HAS_CRONER = bool(_NODE_BIN and _CRON_HELPER.exists())
+CRON_CROSSCHECK = os.environ.get("SUBSTRATE_CRON_CROSSCHECK", "").lower() in ("1", "true", "yes")
 
 logger = logging.getLogger("gateway.schedule")
 
@@ -60,9 +66,25 @@ def _croner_next(expr: str) -> Optional[datetime]:
         return None
 
 
-def _croner_validate(expr: str) -> bool:
-    """Check if a cron expression is valid using croner."""
-    return _croner_next(expr) is not None
+def _cron_next(expr: str, now: Optional[datetime] = None) -> Optional[datetime]:
+    """Compute next run time (naive local) for a cron expression."""
+    try:
+        next_dt = compile_cron(expr).next_after(now or datetime.now())
+    except CronError as e:
+        logger.debug(f"Invalid cron '{expr}': {e}")
+        return None
+    # croner only knows "now", so cross-check live computations only
+    if CRON_CROSSCHECK and HAS_CRONER and (now is None or abs((datetime.now() - now).total_seconds()) < 1):
+        expected = _croner_next(expr)
+        if expected != next_dt:
+            logger.warning(f"cron cross-check mismatch for '{expr}': native={next_dt} croner={expected}")
+    return next_dt
+
+
+def _cron_validate(expr: str) -> bool:
+    """Check if a cron expression is valid (compiles and fires at least once)."""
+    return _cron_next(expr) is not None
+
 
 def _generate_random_times(count: int, start_hour: int, end_hour: int,
                            date, task_name: str) -> List[tuple]:
@@ -152,9 +174,9 @@ class CircuitsJob:
                 return self.next_run_at
             return None
 
-        # Cron expression — use croner (Node.js) for precise scheduling
+        # Cron expression — compiled in-process (cron_engine)
         if self.cron_expr:
-            next_dt = _croner_next(self.cron_expr)
+            next_dt = _cron_next(self.cron_expr, now)
             if next_dt:
                 self.next_run_at = next_dt
                 return self.next_run_at
@@ -267,14 +289,15 @@ def parse_schedule_line(line: str) -> Optional[CircuitsJob]:
     # --- Cron expression ---
     # Detect lines starting with a cron pattern: 5 or 6 space-separated fields
     # e.g. "0 8 * * *: Run RSS check" or "*/30 * * * *: Check something"
+    # or "0 18 * * 5L: Last Friday wrap-up" (anything that doesn't compile falls through)
     cron_match = re.match(
-        r'((?:[\d\*\/\-\,]+\s+){4}[\d\*\/\-\,A-Za-z]+)\s*[:\-]\s*(.*)',
+        r'((?:[\w\*\/\-\,\?#]+\s+){4,5}[\w\*\/\-\,\?#]+)\s*[:\-]\s*(.*)',
         line
     )
-    if cron_match and HAS_CRONER:
+    if cron_match:
         expr = cron_match.group(1).strip()
         desc = cron_match.group(2).strip()
-        if _croner_validate(expr):
+        if _cron_validate(expr):
             name = _extract_task_name(desc) if desc else f"Cron {expr}"
             return CircuitsJob(
                 name=name,
@@ -130,6 +130,8 @@ from .cost_tracker import (
 
 from .event_logger import (
     init_event_logger,
+    log_event,
+    flush_events,
     read_events,
     get_event_summary,
     list_event_dates,
@@ -255,6 +257,8 @@ __all__ = [
     'cost_tracker',
     # Event logger
     'init_event_logger',
+    'log_event',
+    'flush_events',
     'read_events',
     'get_event_summary',
     'list_event_dates',
@@ -1,14 +1,19 @@
 """
 Compaction - Smart context window management.
 Handles:
-- Token estimation for messages
+- Token estimation for messages (memoized per content string)
+- Running token totals for a growing tool-loop history (TokenTracker)
 - Splitting messages into chunks
 - LLM-powered summarization of dropped context (with progressive fallback)
 - Staged summarization for very long histories
+- Map-reduce summarization (concurrent chunk summaries + one merge pass)
 - Pruning history while preserving important information
 """
 
 import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Any, Optional, List, Tuple, Callable, Awaitable
 from dataclasses import dataclass, field
 
@@ -30,6 +35,35 @@ def _get_tiktoken_enc():
             logger.debug(f"[COMPACT] tiktoken unavailable, using heuristic: {e}")
     return _tiktoken_enc
 
+
+# ─── Token count cache ───────────────────────────────────────────────
+# Tool loops re-estimate the same history every round. Counts are memoized
+# keyed by (encoder, content string): str hashes are cached on the object,
+# so a lookup for an unchanged message is O(1) and never re-tokenizes.
+# (Counts can't live on the message dicts themselves — those are sent
+# verbatim to OpenAI-compatible APIs, which reject unknown fields.)
+TOKEN_CACHE_SIZE = 8192
+_MIN_CACHED_CHARS = 64  # shorter strings are cheaper to count than to cache
+_token_cache: "OrderedDict[Tuple[str, str], int]" = OrderedDict()
+_token_cache_lock = threading.Lock()
+_token_cache_stats = {"hits": 0, "misses": 0}
+
+
+def _count_tokens(text: str) -> Tuple[str, int]:
+    enc = _get_tiktoken_enc()
+    if enc is not None:
+        try:
+            return enc.name, len(enc.encode(text, disallowed_special=()))
+        except Exception:
+            pass
+    return "chars/4", max(1, len(text) // 4)
+
+
+def get_token_cache_stats() -> Dict[str, Any]:
+    """Hit/miss counters for the token count cache."""
+    with _token_cache_lock:
+        return {**_token_cache_stats, "entries": len(_token_cache)}
+
 # Constants
 BASE_CHUNK_RATIO = 0.4
 MIN_CHUNK_RATIO = 0.15
@@ -44,6 +78,20 @@ MERGE_SUMMARIES_INSTRUCTIONS = (
     "Preserve decisions, TODOs, open questions, and any constraints."
 )
 
+# Summarization strategies for create_summary_message / compact_messages
+STRATEGY_SEQUENTIAL = "sequential"    # each chunk's summary feeds the next
+STRATEGY_MAP_REDUCE = "map_reduce"    # chunks summarized concurrently, then merged
+# Concurrent chunk summaries per provider. Local Ollama serves one
+# generation at a time, so parallel requests only queue — stay sequential.
+SUMMARY_CONCURRENCY = {
+    "ollama": 1,
+    "anthropic": 4,
+    "openai": 4,
+    "xai": 4,
+    "google": 4,
+}
+DEFAULT_SUMMARY_CONCURRENCY = 2
+
 # Type for the summarizer callback
 # Takes (messages_text: str, custom_instructions: str | None, previous_summary: str | None) -> str
 SummarizerFn = Callable[[str, Optional[str], Optional[str]], Optional[str]]
@@ -56,13 +104,23 @@ def estimate_tokens(text: str) -> int:
     """
     if not text:
         return 0
+    if len(text) < _MIN_CACHED_CHARS:
+        return _count_tokens(text)[1]
     enc = _get_tiktoken_enc()
-    if enc is not None:
-        try:
-            return len(enc.encode(text, disallowed_special=()))
-        except Exception:
-            pass
-    return max(1, len(text) // 4)
+    key = (enc.name if enc is not None else "chars/4", text)
+    with _token_cache_lock:
+        count = _token_cache.get(key)
+        if count is not None:
+            _token_cache.move_to_end(key)
+            _token_cache_stats["hits"] += 1
+            return count
+    encoder, count = _count_tokens(text)
+    with _token_cache_lock:
+        _token_cache[(encoder, text)] = count
+        _token_cache_stats["misses"] += 1
+        while len(_token_cache) > TOKEN_CACHE_SIZE:
+            _token_cache.popitem(last=False)
+    return count
 
 
 def estimate_message_tokens(message: Dict[str, Any]) -> int:
@@ -90,6 +148,57 @@ def estimate_messages_tokens(messages: List[Dict[str, Any]]) -> int:
     return sum(estimate_message_tokens(m) for m in messages)
 
 
+class TokenTracker:
+    """
+    Running token total for a message list that mostly grows at the end.
+    
+    sync() walks the list comparing each message (and its content object)
+    by identity against what it counted last time, so appended messages
+    are counted once and an unchanged prefix costs no tokenization.
+    Messages that were pruned, replaced or compacted away are recounted
+    (usually cache hits) from the first point of divergence.
+    
+    Usage:
+        tracker = TokenTracker()
+        total = tracker.sync(messages)   # after append/prune/compact
+    """
+    
+    def __init__(self, messages: Optional[List[Dict[str, Any]]] = None):
+        self._entries: List[Tuple[Dict[str, Any], Any, int]] = []  # (msg, content, tokens)
+        self.total = 0
+        if messages:
+            self.sync(messages)
+    
+    def append(self, message: Dict[str, Any]) -> int:
+        """Count one appended message. Returns the new total."""
+        tokens = estimate_message_tokens(message)
+        self._entries.append((message, message.get("content"), tokens))
+        self.total += tokens
+        return self.total
+    
+    def sync(self, messages: List[Dict[str, Any]]) -> int:
+        """Reconcile with the current message list. Returns the total."""
+        entries = self._entries
+        keep = 0
+        limit = min(len(entries), len(messages))
+        while keep < limit:
+            msg, content, _ = entries[keep]
+            current = messages[keep]
+            if current is not msg or current.get("content") is not content:
+                break
+            keep += 1
+        if keep < len(entries):
+            self.total -= sum(e[2] for e in entries[keep:])
+            del entries[keep:]
+        for message in messages[keep:]:
+            self.append(message)
+        return self.total
+    
+    def counts(self) -> List[int]:
+        """Per-message token counts from the last sync."""
+        return [e[2] for e in self._entries]
+
+
 def compute_adaptive_chunk_ratio(
     messages: List[Dict[str, Any]],
     context_window: int,
@@ -145,7 +254,7 @@ def split_messages_by_token_share(
     for message in messages:
         msg_tokens = estimate_message_tokens(message)
         
-        if (chunks and len(chunks) < parts - 1 and 
+        if (len(chunks) < parts - 1 and 
             current and current_tokens + msg_tokens > target_tokens):
             chunks.append(current)
             current = []
@@ -530,10 +639,21 @@ def summarize_in_stages(
         )
         partial_summaries.append(partial)
     
-    if len(partial_summaries) == 1:
+    return _merge_partial_summaries(
+        partial_summaries, summarizer, custom_instructions, previous_summary,
+    )
+
+
+def _merge_partial_summaries(
+    partial_summaries: List[str],
+    summarizer: SummarizerFn,
+    custom_instructions: Optional[str] = None,
+    previous_summary: Optional[str] = None,
+) -> str:
+    """Merge partial summaries in one summarizer call (concatenate on failure)."""
+    if len(partial_summaries) == 1 and not previous_summary:
         return partial_summaries[0]
     
-    # Merge partial summaries
     merge_instructions = MERGE_SUMMARIES_INSTRUCTIONS
     if custom_instructions:
         merge_instructions += f"\n\nAdditional focus:\n{custom_instructions}"
@@ -553,6 +673,78 @@ def summarize_in_stages(
     return "\n\n".join(partial_summaries)
 
 
+def summary_concurrency_for(provider: Optional[str], overrides: Optional[Dict[str, int]] = None) -> int:
+    """Concurrent chunk summaries allowed for a provider (1 = sequential)."""
+    provider = (provider or "").lower()
+    if overrides and provider in overrides:
+        return max(1, int(overrides[provider]))
+    return SUMMARY_CONCURRENCY.get(provider, DEFAULT_SUMMARY_CONCURRENCY)
+
+
+def summarize_map_reduce(
+    messages: List[Dict[str, Any]],
+    summarizer: SummarizerFn,
+    context_window: int,
+    max_chunk_tokens: int = DEFAULT_MAX_CHUNK_TOKENS,
+    custom_instructions: Optional[str] = None,
+    previous_summary: Optional[str] = None,
+    max_workers: int = 4,
+) -> str:
+    """
+    Map-reduce summarization: summarize independent chunks concurrently,
+    then merge them in a single pass with MERGE_SUMMARIES_INSTRUCTIONS.
+    
+    Wall-clock time is roughly one chunk summary plus one merge, instead of
+    one call per chunk back to back. Chunks don't see each other's summaries;
+    previous_summary is folded in only at the merge. Each chunk keeps the
+    oversized-message fallback of summarize_with_fallback.
+    
+    Falls back to summarize_in_stages when max_workers <= 1 or there is
+    only one chunk.
+    
+    Args:
+        messages: Messages to summarize
+        summarizer: LLM summarizer callback (must be thread-safe)
+        context_window: Context window size
+        max_chunk_tokens: Max tokens per chunk
+        custom_instructions: Extra instructions
+        previous_summary: Previous summary to build on
+        max_workers: Max concurrent summarizer calls
+    
+    Returns:
+        Merged summary string
+    """
+    if not messages:
+        return previous_summary or DEFAULT_SUMMARY_FALLBACK
+    
+    if max_chunk_tokens == DEFAULT_MAX_CHUNK_TOKENS and context_window > 0:
+        ratio = compute_adaptive_chunk_ratio(messages, context_window)
+        max_chunk_tokens = min(max_chunk_tokens, int(context_window * ratio))
+    
+    chunks = chunk_messages_by_max_tokens(messages, max_chunk_tokens)
+    if max_workers <= 1 or len(chunks) <= 1:
+        return summarize_in_stages(
+            messages, summarizer, context_window,
+            max_chunk_tokens, custom_instructions, previous_summary,
+        )
+    
+    workers = min(max_workers, len(chunks))
+    logger.info(f"[COMPACT] Map-reduce summarizing {len(chunks)} chunks ({workers} concurrent)")
+    
+    def _map(chunk: List[Dict[str, Any]]) -> str:
+        return summarize_with_fallback(
+            chunk, summarizer, context_window,
+            max_chunk_tokens, custom_instructions, None,
+        )
+    
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="compact-summary") as pool:
+        partial_summaries = list(pool.map(_map, chunks))
+    
+    return _merge_partial_summaries(
+        partial_summaries, summarizer, custom_instructions, previous_summary,
+    )
+
+
 def create_summary_message(
     dropped_messages: List[Dict[str, Any]],
     summary_text: Optional[str] = None,
@@ -560,11 +752,14 @@ def create_summary_message(
     context_window: int = DEFAULT_CONTEXT_TOKENS,
     custom_instructions: Optional[str] = None,
     previous_summary: Optional[str] = None,
+    strategy: str = STRATEGY_SEQUENTIAL,
+    max_workers: int = 1,
 ) -> Dict[str, Any]:
     """
     Create a summary message for dropped context.
     
-    If a summarizer callback is provided, uses LLM-powered staged summarization.
+    If a summarizer callback is provided, uses LLM-powered staged summarization
+    (or map-reduce when strategy is STRATEGY_MAP_REDUCE and max_workers > 1).
     Otherwise falls back to basic text extraction.
     
     Args:
@@ -574,6 +769,8 @@ def create_summary_message(
         context_window: Context window size for oversized detection
         custom_instructions: Extra instructions for summarizer
         previous_summary: Previous summary to build on
+        strategy: STRATEGY_SEQUENTIAL or STRATEGY_MAP_REDUCE
+        max_workers: Concurrent summarizer calls for map-reduce
         
     Returns:
         System message with summary
@@ -586,13 +783,23 @@ def create_summary_message(
         token_count = estimate_messages_tokens(dropped_messages)
         logger.info(f"[COMPACT] Summarizing {msg_count} dropped messages (~{token_count} tokens) via LLM")
         
-        text = summarize_in_stages(
-            dropped_messages,
-            summarizer=summarizer,
-            context_window=context_window,
-            custom_instructions=custom_instructions,
-            previous_summary=previous_summary,
-        )
+        if strategy == STRATEGY_MAP_REDUCE and max_workers > 1:
+            text = summarize_map_reduce(
+                dropped_messages,
+                summarizer=summarizer,
+                context_window=context_window,
+                custom_instructions=custom_instructions,
+                previous_summary=previous_summary,
+                max_workers=max_workers,
+            )
+        else:
+            text = summarize_in_stages(
+                dropped_messages,
+                summarizer=summarizer,
+                context_window=context_window,
+                custom_instructions=custom_instructions,
+                previous_summary=previous_summary,
+            )
         text = f"[Context compacted: {msg_count} messages (~{token_count} tokens)]\n{text}"
     else:
         text = _basic_summary_fallback(dropped_messages)
@@ -611,6 +818,8 @@ def compact_messages(
     summarizer: Optional[SummarizerFn] = None,
     context_window: int = DEFAULT_CONTEXT_TOKENS,
     previous_summary: Optional[str] = None,
+    strategy: str = STRATEGY_SEQUENTIAL,
+    max_workers: int = 1,
 ) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
     """
     Compact messages to fit within token budget.
@@ -626,6 +835,8 @@ def compact_messages(
         summarizer: Optional LLM summarizer callback for smart summaries
         context_window: Context window size (for oversized detection)
         previous_summary: Previous compaction summary to build on
+        strategy: Summarization strategy (STRATEGY_SEQUENTIAL / STRATEGY_MAP_REDUCE)
+        max_workers: Concurrent summarizer calls for map-reduce
         
     Returns:
         Tuple of (compacted messages, stats dict)
@@ -667,6 +878,8 @@ def compact_messages(
                 summarizer=summarizer,
                 context_window=context_window,
                 previous_summary=previous_summary,
+                strategy=strategy,
+                max_workers=max_workers,
             )
             compacted = [summary] + compacted
         
@@ -679,6 +892,8 @@ def compact_messages(
                 summarizer=summarizer,
                 context_window=context_window,
                 previous_summary=previous_summary,
+                strategy=strategy,
+                max_workers=max_workers,
             )
             final_messages = [summary] + recent_messages
         else:
@@ -693,4 +908,5 @@ def compact_messages(
         "dropped_count": len(messages) - len(final_messages),
         "preserved_recent": len(recent_messages),
         "llm_summarized": summarizer is not None,
+        "strategy": strategy if max_workers > 1 else STRATEGY_SEQUENTIAL,
     }
@@ -2,28 +2,51 @@
 Cost Tracker — Per-conversation and cumulative token/cost tracking.
 
 Tracks input_tokens, output_tokens, and estimated USD cost for every
-LLM API call. Persists cumulative stats to data/usage_stats.json.
+LLM API call.
+
+- Every call is appended to a monthly JSONL ledger (data/usage/YYYY-MM.jsonl)
+- Cumulative totals plus per-model and per-day rollups are maintained
+  incrementally and persisted to data/usage_stats.json
+- One background flusher coalesces writes (every FLUSH_INTERVAL seconds
+  at most); the last batch is flushed at shutdown
+- Per-conversation rollups and the recent call log (a bounded deque) stay
+  in memory for /api/agent/stats
+- Vision requests (result-cache hits, image bytes before/after upload
+  normalization) are counted per session and cumulatively under 'vision'
 
 Usage:
     from src.infra.cost_tracker import tracker
 
     tracker.record(input_tokens=1200, output_tokens=800, model='deepseek-r1:32b')
+    tracker.record(input_tokens=300, output_tokens=90, model='claude-sonnet-4',
+                   cache_read_tokens=18000, cache_write_tokens=0)
     stats = tracker.get_stats()
     # {'session': {...}, 'cumulative': {...}, 'costUsd': ...}
+    tracker.get_daily_usage(days=30)      # per-day rollups, oldest first
+    tracker.record_vision(cache_hit=False, original_bytes=2_400_000, uploaded_bytes=310_000)
+    tracker.query_ledger(since=time.time() - 14 * 86400, model='claude-sonnet-4')
 """
 
 import json
 import time
+import atexit
 import logging
 import threading
+from collections import OrderedDict, deque
 from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from itertools import islice
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional
 
 logger = logging.getLogger(__name__)
 
 SOMA = Path(__file__).parent.parent.parent
 STATS_FILE = SOMA / "data" / "usage_stats.json"
+LEDGER_DIR = SOMA / "data" / "usage"
+
+FLUSH_INTERVAL = 2.0          # seconds between coalesced writes
+DAILY_RETENTION_DAYS = 400    # per-day rollups kept in usage_stats.json
 
 # Cost per 1M tokens (input/output) by provider pattern.
 # Local models (Ollama) are free. Cloud models have real costs.
@@ -64,13 +87,37 @@ MODEL_COSTS = {
 }
 
 
+# Prompt-cache pricing as multiples of the input rate: (read, write).
+# input_tokens passed to record() is always the uncached remainder.
+CACHE_PRICE_MULTIPLIERS = {
+    'claude':  (0.10, 1.25),
+    'gemini':  (0.25, 1.0),
+    '_default': (0.50, 1.0),   # OpenAI / xAI automatic caching
+}
+
+
+def _cache_multipliers(model_lower: str):
+    for pattern, mult in CACHE_PRICE_MULTIPLIERS.items():
+        if pattern != '_default' and pattern in model_lower:
+            return mult
+    return CACHE_PRICE_MULTIPLIERS['_default']
+
+
 # Patterns that indicate a local/Ollama model tag (e.g. 'deepseek-r1:32b', 'dolphin3:latest')
 _OLLAMA_TAG_SUFFIXES = (':latest', ':32b', ':7b', ':8b', ':70b', ':1b', ':3b', ':4b', ':14b', ':22b', ':72b')
 
 
-def _estimate_cost(model: str, input_tokens: int, output_tokens: int) -> float:
+def _estimate_cost(
+    model: str,
+    input_tokens: int,
+    output_tokens: int,
+    cache_read_tokens: int = 0,
+    cache_write_tokens: int = 0,
+) -> float:
     """Estimate USD cost for a call. Returns 0.0 for local models.
     
+    Cache reads/writes are billed at CACHE_PRICE_MULTIPLIERS of the input rate.
+    
     Pricing lookup order:
       1. Dynamic pricing cache (fetched from LiteLLM index, refreshed weekly)
       2. Hardcoded MODEL_COSTS fallback table
@@ -86,6 +133,10 @@ def _estimate_cost(model: str, input_tokens: int, output_tokens: int) -> float:
     if ':' in model_lower and any(model_lower.endswith(s) for s in _OLLAMA_TAG_SUFFIXES):
         return 0.0  # Local model, free
 
+    if cache_read_tokens or cache_write_tokens:
+        read_mult, write_mult = _cache_multipliers(model_lower)
+        input_tokens = input_tokens + cache_read_tokens * read_mult + cache_write_tokens * write_mult
+
     # ── 1. Dynamic pricing (auto-fetched, cached locally with weekly refresh) ──
     try:
         from src.infra.model_pricing import get_pricing
@@ -124,6 +175,8 @@ class CallRecord:
     cost_usd: float
     conversation_id: str = 'main'
     is_estimated: bool = False
+    cache_read_tokens: int = 0
+    cache_write_tokens: int = 0
 
     def to_dict(self) -> Dict[str, Any]:
         return {
@@ -131,7 +184,9 @@ class CallRecord:
             'model': self.model,
             'inputTokens': self.input_tokens,
             'outputTokens': self.output_tokens,
-            'totalTokens': self.input_tokens + self.output_tokens,
+            'cacheReadTokens': self.cache_read_tokens,
+            'cacheWriteTokens': self.cache_write_tokens,
+            'totalTokens': self.input_tokens + self.output_tokens + self.cache_read_tokens + self.cache_write_tokens,
             'costUsd': round(self.cost_usd, 6),
             'conversationId': self.conversation_id,
             'isEstimated': self.is_estimated,
@@ -143,6 +198,8 @@ class SessionStats:
     """Stats for the current agent session (resets on restart)."""
     input_tokens: int = 0
     output_tokens: int = 0
+    cache_read_tokens: int = 0
+    cache_write_tokens: int = 0
     total_tokens: int = 0
     cost_usd: float = 0.0
     call_count: int = 0
@@ -154,6 +211,9 @@ class SessionStats:
         return {
             'inputTokens': self.input_tokens,
             'outputTokens': self.output_tokens,
+            'cacheReadTokens': self.cache_read_tokens,
+            'cacheWriteTokens': self.cache_write_tokens,
+            'cacheHitRatio': _cache_hit_ratio(self.input_tokens, self.cache_read_tokens, self.cache_write_tokens),
             'totalTokens': self.total_tokens,
             'costUsd': round(self.cost_usd, 4),
             'callCount': self.call_count,
@@ -164,8 +224,54 @@ class SessionStats:
         }
 
 
+def _add_vision(bucket: Dict[str, Any], cache_hit: bool, original_bytes: int, uploaded_bytes: int) -> None:
+    bucket['requests'] = bucket.get('requests', 0) + 1
+    bucket['cacheHits'] = bucket.get('cacheHits', 0) + (1 if cache_hit else 0)
+    bucket['bytesOriginal'] = bucket.get('bytesOriginal', 0) + original_bytes
+    bucket['bytesUploaded'] = bucket.get('bytesUploaded', 0) + uploaded_bytes
+
+
+def _vision_summary(bucket: Dict[str, Any]) -> Dict[str, Any]:
+    requests = bucket.get('requests', 0)
+    original = bucket.get('bytesOriginal', 0)
+    uploaded = bucket.get('bytesUploaded', 0)
+    return {
+        'requests': requests,
+        'cacheHits': bucket.get('cacheHits', 0),
+        'hitRate': round(bucket.get('cacheHits', 0) / requests, 3) if requests else 0.0,
+        'bytesOriginal': original,
+        'bytesUploaded': uploaded,
+        'bytesSaved': original - uploaded,
+    }
+
+
+def _cache_hit_ratio(input_tokens: int, cache_read: int, cache_write: int) -> float:
+    """Share of prompt tokens served from the provider's prompt cache."""
+    prompt = input_tokens + cache_read + cache_write
+    return round(cache_read / prompt, 3) if prompt else 0.0
+
+
 # Maximum call records to keep in memory (rolling window)
 _MAX_CALL_LOG = 500
+# Conversations kept in the in-memory breakdown (least recently active dropped)
+_MAX_CONVERSATIONS = 200
+
+
+def _ledger_path(ts: float) -> Path:
+    return LEDGER_DIR / f"{datetime.fromtimestamp(ts).strftime('%Y-%m')}.jsonl"
+
+
+def _add_usage(bucket: Dict[str, Any], r: CallRecord) -> None:
+    """Fold one call into a rollup bucket (camelCase, like to_dict())."""
+    bucket['inputTokens'] = bucket.get('inputTokens', 0) + r.input_tokens
+    bucket['outputTokens'] = bucket.get('outputTokens', 0) + r.output_tokens
+    bucket['cacheReadTokens'] = bucket.get('cacheReadTokens', 0) + r.cache_read_tokens
+    bucket['cacheWriteTokens'] = bucket.get('cacheWriteTokens', 0) + r.cache_write_tokens
+    bucket['totalTokens'] = bucket.get('totalTokens', 0) + (
+        r.input_tokens + r.output_tokens + r.cache_read_tokens + r.cache_write_tokens
+    )
+    bucket['costUsd'] = round(bucket.get('costUsd', 0.0) + r.cost_usd, 6)
+    bucket['callCount'] = bucket.get('callCount', 0) + 1
 
 
 class CostTracker:
@@ -177,7 +283,15 @@ class CostTracker:
         self._lock = threading.Lock()
         self._threshold_usd: Optional[float] = None  # Alert threshold
         self._threshold_callback = None
-        self._call_log: list = []  # Rolling log of CallRecord instances
+        self._call_log: deque = deque(maxlen=_MAX_CALL_LOG)  # Rolling log of CallRecord instances
+        self._conversations: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._vision: Dict[str, int] = {}
+        # Coalescing persistence: records wait here until the flusher runs
+        self._pending: List[CallRecord] = []
+        self._dirty = False
+        self._io_lock = threading.Lock()
+        self._flusher: Optional[threading.Thread] = None
+        atexit.register(self.flush)
 
     def record(
         self,
@@ -187,37 +301,54 @@ class CostTracker:
         session_key: str = 'main',
         conversation_id: str = 'main',
         is_estimated: bool = False,
+        cache_read_tokens: int = 0,
+        cache_write_tokens: int = 0,
     ):
-        """Record token usage from an API call."""
-        cost = _estimate_cost(model, input_tokens, output_tokens)
+        """Record token usage from an API call.
+        
+        input_tokens is the uncached prompt; cache_read_tokens/cache_write_tokens
+        are prompt tokens served from / written to the provider's prompt cache.
+        """
+        cost = _estimate_cost(model, input_tokens, output_tokens, cache_read_tokens, cache_write_tokens)
+        cache_tokens = cache_read_tokens + cache_write_tokens
+        now = time.time()
+        call = CallRecord(
+            timestamp=now,
+            model=model or 'unknown',
+            input_tokens=input_tokens,
+            output_tokens=output_tokens,
+            cost_usd=cost,
+            conversation_id=conversation_id,
+            is_estimated=is_estimated,
+            cache_read_tokens=cache_read_tokens,
+            cache_write_tokens=cache_write_tokens,
+        )
 
         with self._lock:
             # Per-call log for conversation-level tracking
-            self._call_log.append(CallRecord(
-                timestamp=time.time(),
-                model=model or 'unknown',
-                input_tokens=input_tokens,
-                output_tokens=output_tokens,
-                cost_usd=cost,
-                conversation_id=conversation_id,
-                is_estimated=is_estimated,
-            ))
-            if len(self._call_log) > _MAX_CALL_LOG:
-                self._call_log = self._call_log[-_MAX_CALL_LOG:]
+            self._call_log.append(call)
+            self._add_to_conversation(call)
+            self._pending.append(call)
+            self._dirty = True
+
             # Session stats
             self._session.input_tokens += input_tokens
             self._session.output_tokens += output_tokens
-            self._session.total_tokens += input_tokens + output_tokens
+            self._session.cache_read_tokens += cache_read_tokens
+            self._session.cache_write_tokens += cache_write_tokens
+            self._session.total_tokens += input_tokens + output_tokens + cache_tokens
             self._session.cost_usd += cost
             self._session.call_count += 1
-            self._session.last_call_at = time.time()
+            self._session.last_call_at = now
 
             # Per-model breakdown
             model_key = model or 'unknown'
             if model_key not in self._session.by_model:
-                self._session.by_model[model_key] = {'input': 0, 'output': 0, 'calls': 0, 'cost': 0.0}
+                self._session.by_model[model_key] = {'input': 0, 'output': 0, 'cacheRead': 0, 'cacheWrite': 0, 'calls': 0, 'cost': 0.0}
             self._session.by_model[model_key]['input'] += input_tokens
             self._session.by_model[model_key]['output'] += output_tokens
+            self._session.by_model[model_key]['cacheRead'] += cache_read_tokens
+            self._session.by_model[model_key]['cacheWrite'] += cache_write_tokens
             self._session.by_model[model_key]['calls'] += 1
             self._session.by_model[model_key]['cost'] = round(
                 self._session.by_model[model_key]['cost'] + cost, 6
@@ -226,13 +357,22 @@ class CostTracker:
             # Cumulative stats
             self._cumulative['input_tokens'] = self._cumulative.get('input_tokens', 0) + input_tokens
             self._cumulative['output_tokens'] = self._cumulative.get('output_tokens', 0) + output_tokens
-            self._cumulative['total_tokens'] = self._cumulative.get('total_tokens', 0) + input_tokens + output_tokens
+            self._cumulative['cache_read_tokens'] = self._cumulative.get('cache_read_tokens', 0) + cache_read_tokens
+            self._cumulative['cache_write_tokens'] = self._cumulative.get('cache_write_tokens', 0) + cache_write_tokens
+            self._cumulative['total_tokens'] = self._cumulative.get('total_tokens', 0) + input_tokens + output_tokens + cache_tokens
             self._cumulative['cost_usd'] = round(self._cumulative.get('cost_usd', 0.0) + cost, 6)
             self._cumulative['call_count'] = self._cumulative.get('call_count', 0) + 1
-            self._cumulative['last_call_at'] = time.time()
+            self._cumulative['last_call_at'] = now
+
+            # Cumulative rollups: per model and per day (per-day split by model)
+            _add_usage(self._cumulative.setdefault('by_model', {}).setdefault(call.model, {}), call)
+            day = self._cumulative.setdefault('daily', {}).setdefault(
+                datetime.fromtimestamp(now).strftime('%Y-%m-%d'), {})
+            _add_usage(day, call)
+            _add_usage(day.setdefault('byModel', {}).setdefault(call.model, {}), call)
 
-        # Persist (async to avoid blocking)
-        threading.Thread(target=self._save_cumulative, daemon=True).start()
+        # Persist (coalesced by the background flusher)
+        self._ensure_flusher()
 
         # Emit event via bus (lazy import to avoid circular)
         try:
@@ -240,6 +380,8 @@ class CostTracker:
             bus.emit('cost_updated', {
                 'input_tokens': input_tokens,
                 'output_tokens': output_tokens,
+                'cache_read_tokens': cache_read_tokens,
+                'cache_write_tokens': cache_write_tokens,
                 'cost_usd': cost,
                 'model': model,
                 'session_key': session_key,
@@ -256,6 +398,47 @@ class CostTracker:
                 except Exception:
                     pass
 
+    def record_vision(self, cache_hit: bool, original_bytes: int = 0, uploaded_bytes: int = 0):
+        """Record one vision request.
+
+        A cache hit uploads nothing; otherwise original_bytes is the image as
+        received and uploaded_bytes what was sent after normalization.
+        """
+        with self._lock:
+            _add_vision(self._vision, cache_hit, original_bytes, uploaded_bytes)
+            _add_vision(self._cumulative.setdefault('vision', {}), cache_hit, original_bytes, uploaded_bytes)
+            self._dirty = True
+        self._ensure_flusher()
+
+    def _add_to_conversation(self, r: CallRecord):
+        """Incrementally maintain the per-conversation rollup (caller holds _lock)."""
+        c = self._conversations.get(r.conversation_id)
+        if c is None:
+            c = self._conversations[r.conversation_id] = {
+                'conversationId': r.conversation_id,
+                'inputTokens': 0,
+                'outputTokens': 0,
+                'cacheReadTokens': 0,
+                'cacheWriteTokens': 0,
+                'totalTokens': 0,
+                'costUsd': 0.0,
+                'callCount': 0,
+                'firstCall': r.timestamp,
+                'lastCall': r.timestamp,
+                'models': set(),
+                'estimatedCalls': 0,
+            }
+            while len(self._conversations) > _MAX_CONVERSATIONS:
+                self._conversations.popitem(last=False)
+        else:
+            self._conversations.move_to_end(r.conversation_id)
+        _add_usage(c, r)
+        c['lastCall'] = max(c['lastCall'], r.timestamp)
+        c['firstCall'] = min(c['firstCall'], r.timestamp)
+        c['models'].add(r.model)
+        if r.is_estimated:
+            c['estimatedCalls'] += 1
+
     def set_threshold(self, usd: float, callback=None):
         """Set a cost threshold alert."""
         self._threshold_usd = usd
@@ -269,10 +452,17 @@ class CostTracker:
                 'cumulative': {
                     'inputTokens': self._cumulative.get('input_tokens', 0),
                     'outputTokens': self._cumulative.get('output_tokens', 0),
+                    'cacheReadTokens': self._cumulative.get('cache_read_tokens', 0),
+                    'cacheWriteTokens': self._cumulative.get('cache_write_tokens', 0),
                     'totalTokens': self._cumulative.get('total_tokens', 0),
                     'costUsd': round(self._cumulative.get('cost_usd', 0.0), 4),
                     'callCount': self._cumulative.get('call_count', 0),
                     'firstSeen': self._cumulative.get('first_seen', 0),
+                    'byModel': {m: dict(v) for m, v in self._cumulative.get('by_model', {}).items()},
+                },
+                'vision': {
+                    'session': _vision_summary(self._vision),
+                    'cumulative': _vision_summary(self._cumulative.get('vision', {})),
                 },
             }
 
@@ -284,46 +474,143 @@ class CostTracker:
     def get_call_log(self, last_n: int = 50) -> list:
         """Get the most recent N call records."""
         with self._lock:
-            return [r.to_dict() for r in self._call_log[-last_n:]]
+            if last_n <= 0:
+                return []
+            skip = max(0, len(self._call_log) - last_n)
+            return [r.to_dict() for r in islice(self._call_log, skip, None)]
 
     def get_conversation_breakdown(self) -> list:
         """Get token usage grouped by conversation_id (most recent first)."""
         with self._lock:
-            convos: Dict[str, Dict[str, Any]] = {}
-            for r in self._call_log:
-                cid = r.conversation_id
-                if cid not in convos:
-                    convos[cid] = {
-                        'conversationId': cid,
-                        'inputTokens': 0,
-                        'outputTokens': 0,
-                        'totalTokens': 0,
-                        'costUsd': 0.0,
-                        'callCount': 0,
-                        'firstCall': r.timestamp,
-                        'lastCall': r.timestamp,
-                        'models': set(),
-                        'estimatedCalls': 0,
-                    }
-                c = convos[cid]
-                c['inputTokens'] += r.input_tokens
-                c['outputTokens'] += r.output_tokens
-                c['totalTokens'] += r.input_tokens + r.output_tokens
-                c['costUsd'] += r.cost_usd
-                c['callCount'] += 1
-                c['lastCall'] = max(c['lastCall'], r.timestamp)
-                c['firstCall'] = min(c['firstCall'], r.timestamp)
-                c['models'].add(r.model)
-                if r.is_estimated:
-                    c['estimatedCalls'] += 1
-
             result = []
-            for c in convos.values():
-                c['costUsd'] = round(c['costUsd'], 6)
-                c['models'] = sorted(c['models'])
-                result.append(c)
-            result.sort(key=lambda x: x['lastCall'], reverse=True)
-            return result
+            for c in reversed(self._conversations.values()):
+                out = dict(c)
+                out['models'] = sorted(c['models'])
+                result.append(out)
+        result.sort(key=lambda x: x['lastCall'], reverse=True)
+        return result
+
+    def get_daily_usage(self, days: int = 30) -> List[Dict[str, Any]]:
+        """Per-day rollups for the last N days (oldest first, empty days included)."""
+        today = datetime.now().date()
+        with self._lock:
+            daily = self._cumulative.get('daily', {})
+            result = []
+            for offset in range(days - 1, -1, -1):
+                date = (today - timedelta(days=offset)).strftime('%Y-%m-%d')
+                day = daily.get(date, {})
+                result.append({
+                    'date': date,
+                    'inputTokens': day.get('inputTokens', 0),
+                    'outputTokens': day.get('outputTokens', 0),
+                    'cacheReadTokens': day.get('cacheReadTokens', 0),
+                    'cacheWriteTokens': day.get('cacheWriteTokens', 0),
+                    'totalTokens': day.get('totalTokens', 0),
+                    'costUsd': day.get('costUsd', 0.0),
+                    'callCount': day.get('callCount', 0),
+                    'byModel': {m: dict(v) for m, v in day.get('byModel', {}).items()},
+                })
+        return result
+
+    def query_ledger(
+        self,
+        since: Optional[float] = None,
+        until: Optional[float] = None,
+        model: Optional[str] = None,
+        conversation_id: Optional[str] = None,
+        limit: int = 1000,
+    ) -> List[Dict[str, Any]]:
+        """Read call records from the on-disk ledger (most recent `limit` matches).
+
+        Streams only the monthly files overlapping [since, until], so weeks
+        of history never have to sit in memory.
+        """
+        self.flush()
+        until = until if until is not None else time.time()
+        if since is None:
+            months = sorted(LEDGER_DIR.glob('*.jsonl')) if LEDGER_DIR.exists() else []
+        else:
+            months = []
+            cursor = datetime.fromtimestamp(since).replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+            while cursor.timestamp() <= until:
+                months.append(_ledger_path(cursor.timestamp()))
+                cursor = (cursor + timedelta(days=32)).replace(day=1)
+
+        matches: deque = deque(maxlen=max(0, limit))
+        for path in months:
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    for line in f:
+                        try:
+                            rec = json.loads(line)
+                        except ValueError:
+                            continue  # Torn line from a crash
+                        ts = rec.get('ts', 0)
+                        if (since is not None and ts < since) or ts > until:
+                            continue
+                        if model and rec.get('model') != model:
+                            continue
+                        if conversation_id and rec.get('conversationId') != conversation_id:
+                            continue
+                        matches.append(rec)
+            except OSError:
+                continue
+        return list(matches)
+
+    # ── Persistence ──
+
+    def _ensure_flusher(self):
+        if self._flusher is not None and self._flusher.is_alive():
+            return
+        with self._io_lock:
+            if self._flusher is None or not self._flusher.is_alive():
+                self._flusher = threading.Thread(target=self._flush_loop, name="cost-ledger-flusher", daemon=True)
+                self._flusher.start()
+
+    def _flush_loop(self):
+        while True:
+            time.sleep(FLUSH_INTERVAL)
+            try:
+                self.flush()
+            except Exception as e:
+                logger.debug(f"[COST] Flush error: {e}")
+
+    def flush(self) -> int:
+        """Append pending calls to the ledger and rewrite usage_stats.json once.
+
+        Returns the number of ledger records written.
+        """
+        with self._io_lock:
+            with self._lock:
+                if not self._dirty:
+                    return 0
+                pending, self._pending = self._pending, []
+                self._dirty = False
+                self._prune_daily()
+                data = json.loads(json.dumps(self._cumulative))  # deep copy
+
+            by_file: Dict[Path, List[str]] = {}
+            for r in pending:
+                by_file.setdefault(_ledger_path(r.timestamp), []).append(
+                    json.dumps(r.to_dict(), separators=(',', ':')) + '\n')
+            try:
+                LEDGER_DIR.mkdir(parents=True, exist_ok=True)
+                for path, lines in by_file.items():
+                    with open(path, 'a', encoding='utf-8') as f:
+                        f.write(''.join(lines))
+            except Exception as e:
+                logger.warning(f"[COST] Failed to append usage ledger: {e}")
+
+            self._save_cumulative(data)
+            return len(pending)
+
+    def _prune_daily(self):
+        """Drop per-day rollups older than DAILY_RETENTION_DAYS (caller holds _lock)."""
+        daily = self._cumulative.get('daily')
+        if not daily or len(daily) <= DAILY_RETENTION_DAYS:
+            return
+        for date in sorted(daily)[:len(daily) - DAILY_RETENTION_DAYS]:
+            del daily[date]
 
     def _load_cumulative(self) -> Dict[str, Any]:
         """Load cumulative stats from disk."""
@@ -336,13 +623,13 @@ class CostTracker:
             logger.warning(f"[COST] Failed to load cumulative stats: {e}")
         return {'first_seen': time.time()}
 
-    def _save_cumulative(self):
-        """Save cumulative stats to disk."""
+    def _save_cumulative(self, data: Dict[str, Any]):
+        """Save cumulative stats to disk (atomic replace)."""
         try:
             STATS_FILE.parent.mkdir(parents=True, exist_ok=True)
-            with self._lock:
-                data = dict(self._cumulative)
-            STATS_FILE.write_text(json.dumps(data, indent=2), encoding='utf-8')
+            tmp = STATS_FILE.with_suffix('.json.tmp')
+            tmp.write_text(json.dumps(data, indent=2), encoding='utf-8')
+            tmp.replace(STATS_FILE)
         except Exception as e:
             logger.warning(f"[COST] Failed to save cumulative stats: {e}")
 
@@ -3,7 +3,11 @@ Event Bus — Lightweight publish/subscribe for Substrate internals.
 
 Allows modules to react to agent lifecycle events without tight coupling.
 Events are fire-and-forget; handlers run synchronously in the caller's thread
-unless async=True is specified (then they run in a daemon thread).
+unless async_handler=True is specified. Async handlers are dispatched to a
+fixed pool of worker threads with bounded queues — each handler is pinned to
+one worker, so it sees events in emit order. When a queue is full the
+overflow policy decides: drop the new event, drop the oldest queued one, or
+block the emitter (backpressure).
 
 Usage:
     from src.infra.event_bus import bus
@@ -31,13 +35,27 @@ Built-in events:
 """
 
 import time
+import queue
+import bisect
 import logging
 import threading
+from collections import Counter, deque
 from typing import Any, Callable, Dict, List, Optional
 from dataclasses import dataclass, field
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_WORKERS = 4
+DEFAULT_QUEUE_SIZE = 1000
+
+# Overflow policies for a full worker queue
+DROP_NEWEST = 'drop_newest'   # discard the event being emitted
+DROP_OLDEST = 'drop_oldest'   # evict the oldest queued event for it
+BLOCK = 'block'               # wait for space (up to block_timeout), then drop
+
+# Handler latency histogram bucket upper bounds (ms); last bucket is open-ended
+LATENCY_BUCKETS_MS = (1, 5, 10, 50, 100, 500, 1000)
+
 
 @dataclass
 class _Subscription:
@@ -46,17 +64,149 @@ class _Subscription:
     async_handler: bool = False
     once: bool = False
     source: str = ""  # Who registered this handler (for debugging)
+    seq: int = 0      # Registration order; unique per bus
+    worker: int = 0   # Async worker this subscription is pinned to
+
+    @property
+    def label(self) -> str:
+        return self.source or getattr(self.handler, '__qualname__', repr(self.handler))
+
+    @property
+    def stats_key(self) -> str:
+        """Per-subscription key for latency stats (labels alone collide, e.g. '<lambda>')."""
+        return f"{self.event}:{self.label}#{self.seq}"
+
+
+class _LatencyHistogram:
+    """Fixed-bucket latency histogram (not thread-safe; guard externally)."""
+
+    __slots__ = ('counts', 'total_ms', 'max_ms', 'calls', 'errors')
+
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.calls = 0
+        self.errors = 0
+
+    def observe(self, ms: float, ok: bool) -> None:
+        self.counts[bisect.bisect_left(LATENCY_BUCKETS_MS, ms)] += 1
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+        self.calls += 1
+        if not ok:
+            self.errors += 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        labels = [f"<={b}ms" for b in LATENCY_BUCKETS_MS] + [f">{LATENCY_BUCKETS_MS[-1]}ms"]
+        return {
+            'calls': self.calls,
+            'errors': self.errors,
+            'avgMs': round(self.total_ms / self.calls, 2) if self.calls else 0,
+            'maxMs': round(self.max_ms, 2),
+            'buckets': dict(zip(labels, self.counts)),
+        }
+
+
+class _AsyncDispatcher:
+    """Fixed worker pool; each worker drains its own bounded FIFO queue."""
+
+    def __init__(self, bus: 'EventBus', workers: int, queue_size: int,
+                 policy: str, block_timeout: float):
+        self._bus = bus
+        self._queues: List[queue.Queue] = [queue.Queue(maxsize=queue_size) for _ in range(workers)]
+        self._threads: List[threading.Thread] = []
+        self._start_lock = threading.Lock()
+        self.policy = policy
+        self.block_timeout = block_timeout
+        self._count_lock = threading.Lock()
+        self.dispatched = 0
+        self.dropped = 0
+
+    def _count(self, dispatched: int = 0, dropped: int = 0) -> None:
+        with self._count_lock:
+            self.dispatched += dispatched
+            self.dropped += dropped
+
+    def _ensure_started(self) -> None:
+        if self._threads:
+            return
+        with self._start_lock:
+            if self._threads:
+                return
+            for i, q in enumerate(self._queues):
+                t = threading.Thread(target=self._run, args=(q,), name=f"event-bus-{i}", daemon=True)
+                t.start()
+                self._threads.append(t)
+
+    def submit(self, sub: _Subscription, data: Dict[str, Any], event: str) -> bool:
+        """Queue a handler call. Returns False if the event was dropped."""
+        self._ensure_started()
+        # Each subscription is pinned to one worker so its events stay ordered
+        q = self._queues[sub.worker % len(self._queues)]
+        item = (sub, data, event)
+        try:
+            if self.policy == BLOCK:
+                q.put(item, timeout=self.block_timeout)
+            else:
+                q.put_nowait(item)
+        except queue.Full:
+            if self.policy != DROP_OLDEST:
+                self._count(dropped=1)
+                return False
+            try:
+                q.get_nowait()
+                q.task_done()
+                self._count(dropped=1)
+            except queue.Empty:
+                pass
+            try:
+                q.put_nowait(item)
+            except queue.Full:
+                self._count(dropped=1)
+                return False
+        self._count(dispatched=1)
+        return True
+
+    def _run(self, q: queue.Queue) -> None:
+        while True:
+            sub, data, event = q.get()
+            try:
+                self._bus._call(sub, data, event)
+            finally:
+                q.task_done()
+
+    def depths(self) -> List[int]:
+        return [q.qsize() for q in self._queues]
+
+    @property
+    def workers(self) -> int:
+        return len(self._queues)
 
 
 class EventBus:
     """Thread-safe publish/subscribe event bus."""
 
-    def __init__(self):
+    def __init__(
+        self,
+        workers: int = DEFAULT_WORKERS,
+        queue_size: int = DEFAULT_QUEUE_SIZE,
+        overflow_policy: str = DROP_NEWEST,
+        block_timeout: float = 1.0,
+        history_max: int = 200,
+    ):
         self._subs: Dict[str, List[_Subscription]] = {}
         self._lock = threading.Lock()
-        self._history: List[Dict[str, Any]] = []  # Last N events for debugging
-        self._history_max = 200
+        self._history: deque = deque(maxlen=history_max)  # Last N events for debugging
+        self._history_max = history_max
         self._emit_count = 0
+        self._emit_counts: Counter = Counter()
+        self._stats_lock = threading.Lock()
+        self._latency: Dict[str, _LatencyHistogram] = {}
+        self._next_seq = 0
+        self._dispatcher = _AsyncDispatcher(
+            self, max(1, workers), queue_size, overflow_policy, block_timeout
+        )
 
     def on(
         self,
@@ -72,10 +222,7 @@ class EventBus:
             async_handler=async_handler,
             source=source,
         )
-        with self._lock:
-            if event not in self._subs:
-                self._subs[event] = []
-            self._subs[event].append(sub)
+        self._subscribe(sub)
         return handler
 
     def once(
@@ -91,12 +238,17 @@ class EventBus:
             async_handler=async_handler,
             once=True,
         )
-        with self._lock:
-            if event not in self._subs:
-                self._subs[event] = []
-            self._subs[event].append(sub)
+        self._subscribe(sub)
         return handler
 
+    def _subscribe(self, sub: _Subscription) -> None:
+        """Register a subscription, assigning its async worker round-robin."""
+        with self._lock:
+            sub.seq = self._next_seq
+            self._next_seq += 1
+            sub.worker = sub.seq % self._dispatcher.workers
+            self._subs.setdefault(sub.event, []).append(sub)
+
     def off(self, event: str, handler: Callable) -> bool:
         """Unsubscribe a handler. Returns True if found."""
         with self._lock:
@@ -112,27 +264,23 @@ class EventBus:
         Publish an event to all subscribers.
         
         Sync handlers run in the caller's thread.
-        Async handlers run in daemon threads.
+        Async handlers are queued to the worker pool.
         Exceptions in handlers are caught and logged.
         """
         data = data or {}
         data.setdefault('_event', event)
         data.setdefault('_ts', time.time())
 
-        self._emit_count += 1
-
-        # Record in history
+        # Record in history and snapshot subscribers in one pass
+        # (avoid holding lock during execution)
         with self._lock:
+            self._emit_count += 1
+            self._emit_counts[event] += 1
             self._history.append({
                 'event': event,
                 'ts': data['_ts'],
                 'keys': list(k for k in data.keys() if not k.startswith('_')),
             })
-            if len(self._history) > self._history_max:
-                self._history = self._history[-self._history_max:]
-
-        # Snapshot subscribers (avoid holding lock during execution)
-        with self._lock:
             subs = list(self._subs.get(event, []))
             # Also notify wildcard subscribers
             subs.extend(self._subs.get('*', []))
@@ -141,16 +289,11 @@ class EventBus:
         for sub in subs:
             try:
                 if sub.async_handler:
-                    t = threading.Thread(
-                        target=self._safe_call,
-                        args=(sub.handler, data, event),
-                        daemon=True,
-                    )
-                    t.start()
+                    self._dispatcher.submit(sub, data, event)
                 else:
-                    self._safe_call(sub.handler, data, event)
+                    self._call(sub, data, event)
             except Exception:
-                pass  # _safe_call handles logging
+                pass  # _call handles logging
 
             if sub.once:
                 to_remove.append(sub)
@@ -163,27 +306,55 @@ class EventBus:
                     if sub in subs_list:
                         subs_list.remove(sub)
 
+    def _call(self, sub: _Subscription, data: Dict[str, Any], event: str) -> None:
+        """Run a handler, recording its latency."""
+        start = time.perf_counter()
+        ok = self._safe_call(sub.handler, data, event)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        with self._stats_lock:
+            hist = self._latency.get(sub.stats_key)
+            if hist is None:
+                hist = self._latency[sub.stats_key] = _LatencyHistogram()
+            hist.observe(elapsed_ms, ok)
+
     @staticmethod
-    def _safe_call(handler, data, event):
+    def _safe_call(handler, data, event) -> bool:
         try:
             handler(data)
+            return True
         except Exception as e:
             logger.error(f"[EVENT_BUS] Handler error for '{event}': {e}")
+            return False
 
     def get_stats(self) -> Dict[str, Any]:
         """Return bus statistics."""
         with self._lock:
-            return {
+            stats = {
                 'totalSubscriptions': sum(len(v) for v in self._subs.values()),
                 'eventTypes': list(self._subs.keys()),
                 'totalEmits': self._emit_count,
-                'recentEvents': self._history[-20:],
+                'emitsByEvent': dict(self._emit_counts),
+                'recentEvents': list(self._history)[-20:],
+            }
+        depths = self._dispatcher.depths()
+        stats['dispatcher'] = {
+            'workers': len(depths),
+            'policy': self._dispatcher.policy,
+            'queueDepth': sum(depths),
+            'queueDepths': depths,
+            'dispatched': self._dispatcher.dispatched,
+            'dropped': self._dispatcher.dropped,
+        }
+        with self._stats_lock:
+            stats['handlerLatency'] = {
+                key: hist.to_dict() for key, hist in self._latency.items()
             }
+        return stats
 
     def get_recent_events(self, limit: int = 50) -> List[Dict[str, Any]]:
         """Return recent event history."""
         with self._lock:
-            return list(self._history[-limit:])
+            return list(self._history)[-limit:]
 
 
 # Global singleton
@@ -1,10 +1,20 @@
 """
-Event Logger — Append-only JSONL event logging to data/events/.
+Event Logger — Buffered, indexed JSONL event logging to data/events/.
 
 Subscribes to the event bus and persists all events as structured JSONL files,
 one file per day. Enables usage analytics, debugging, and dashboard insights.
 
-Files: data/events/YYYY-MM-DD.jsonl
+Events are buffered in memory and appended in batches (every
+FLUSH_INTERVAL seconds or FLUSH_BATCH events, whichever comes first);
+the last batch is flushed and fsynced at shutdown. Next to each day file
+a sidecar index records the byte offset of every event by type plus a
+checkpoint every CHECKPOINT_EVERY records, so paging and `event_type`
+filtering seek straight to the matching lines instead of re-parsing the
+whole day. Lines appended by anyone else are picked up by indexing the
+file tail on the next read.
+
+Files: data/events/YYYY-MM-DD.jsonl       (events)
+       data/events/YYYY-MM-DD.idx.json    (offset index, rebuildable)
 Format: {"ts": 1234567890.123, "event": "tool_invoked", "data": {...}}
 
 Usage:
@@ -13,13 +23,15 @@ Usage:
     init_event_logger()  # Call once at startup — auto-subscribes to bus
 """
 
+import os
 import json
 import time
+import atexit
 import logging
 import threading
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 logger = logging.getLogger(__name__)
 
@@ -39,38 +51,238 @@ LOGGED_EVENTS = {
     'message_queued', 'message_dequeued',
 }
 
-_write_lock = threading.Lock()
+FLUSH_INTERVAL = 1.0        # seconds between background flushes
+FLUSH_BATCH = 100           # flush early once this many events are pending
+CHECKPOINT_EVERY = 100      # record an offset checkpoint every N records
+INDEX_SAVE_INTERVAL = 30.0  # seconds between sidecar index rewrites
+
+_write_lock = threading.RLock()   # guards file appends and all day indexes
 _initialized = False
 
 
+def _date_for(ts: float) -> str:
+    return datetime.fromtimestamp(ts).strftime('%Y-%m-%d')
+
+
+def _log_path(date: str) -> Path:
+    return EVENTS_DIR / f"{date}.jsonl"
+
+
 def _get_log_path() -> Path:
     """Get today's JSONL log file path."""
     EVENTS_DIR.mkdir(parents=True, exist_ok=True)
-    return EVENTS_DIR / f"{datetime.now().strftime('%Y-%m-%d')}.jsonl"
+    return _log_path(datetime.now().strftime('%Y-%m-%d'))
+
+
+# ── Sidecar index ───────────────────────────────────────────────
+
+class _DayIndex:
+    """Byte offsets of every record in one day file, by type and by position."""
+
+    def __init__(self, date: str):
+        self.date = date
+        self.log_path = _log_path(date)
+        self.idx_path = EVENTS_DIR / f"{date}.idx.json"
+        self.indexed_bytes = 0
+        self.total = 0
+        self.by_type: Dict[str, List[int]] = {}
+        self.checkpoints: List[int] = []
+        self.dirty = False
+        self.saved_at = 0.0
+
+    def add(self, offset: int, event: str, length: int) -> None:
+        if self.total % CHECKPOINT_EVERY == 0:
+            self.checkpoints.append(offset)
+        self.by_type.setdefault(event, []).append(offset)
+        self.total += 1
+        self.indexed_bytes = offset + length
+        self.dirty = True
+
+    def load(self) -> None:
+        """Load the sidecar if it still matches the day file."""
+        try:
+            with open(self.idx_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            size = self.log_path.stat().st_size
+            if meta.get('indexed_bytes', 0) > size:
+                return  # day file was truncated/replaced — rebuild
+            self.indexed_bytes = meta['indexed_bytes']
+            self.total = meta['total']
+            self.by_type = meta['by_type']
+            self.checkpoints = meta['checkpoints']
+            self.saved_at = time.time()
+        except (OSError, ValueError, KeyError):
+            pass
+
+    def catch_up(self) -> None:
+        """Index complete lines appended since the last indexed byte."""
+        try:
+            size = self.log_path.stat().st_size
+        except OSError:
+            return
+        if size <= self.indexed_bytes:
+            return
+        with open(self.log_path, 'rb') as f:
+            f.seek(self.indexed_bytes)
+            offset = self.indexed_bytes
+            for raw in f:
+                if not raw.endswith(b'\n'):
+                    break  # partial line still being written
+                stripped = raw.strip()
+                if stripped:
+                    try:
+                        event = json.loads(stripped).get('event', 'unknown')
+                        self.add(offset, event, len(raw))
+                    except ValueError:
+                        self.indexed_bytes = offset + len(raw)
+                else:
+                    self.indexed_bytes = offset + len(raw)
+                offset += len(raw)
+
+    def save(self) -> None:
+        tmp = self.idx_path.with_suffix('.tmp')
+        try:
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump({
+                    'indexed_bytes': self.indexed_bytes,
+                    'total': self.total,
+                    'checkpoint_every': CHECKPOINT_EVERY,
+                    'checkpoints': self.checkpoints,
+                    'by_type': self.by_type,
+                }, f, separators=(',', ':'))
+            os.replace(tmp, self.idx_path)
+            self.dirty = False
+            self.saved_at = time.time()
+        except OSError as e:
+            logger.debug(f"[EVENT_LOG] Index save error for {self.date}: {e}")
+
+
+_indexes: Dict[str, _DayIndex] = {}
+
+
+def _get_index(date: str) -> Optional[_DayIndex]:
+    """Return an up-to-date index for a day (caller holds _write_lock)."""
+    idx = _indexes.get(date)
+    if idx is None:
+        if not _log_path(date).exists():
+            return None
+        idx = _DayIndex(date)
+        idx.load()
+        _indexes[date] = idx
+    idx.catch_up()
+    return idx
+
+
+# ── Buffered writer ─────────────────────────────────────────────
+
+_buffer: List[Tuple[float, str, bytes]] = []
+_buffer_lock = threading.Lock()
+_flush_wakeup = threading.Event()
+_flusher: Optional[threading.Thread] = None
+
+
+def _ensure_flusher() -> None:
+    global _flusher
+    if _flusher is not None and _flusher.is_alive():
+        return
+    with _buffer_lock:
+        if _flusher is None or not _flusher.is_alive():
+            _flusher = threading.Thread(target=_flush_loop, name="event-log-flusher", daemon=True)
+            _flusher.start()
+
+
+def _flush_loop() -> None:
+    while True:
+        _flush_wakeup.wait(FLUSH_INTERVAL)
+        _flush_wakeup.clear()
+        try:
+            flush_events()
+        except Exception as e:
+            logger.debug(f"[EVENT_LOG] Flush error: {e}")
+
+
+def flush_events(fsync: bool = False) -> int:
+    """Append all buffered events to their day files. Returns events written."""
+    with _buffer_lock:
+        if not _buffer:
+            pending = []
+        else:
+            pending = _buffer[:]
+            _buffer.clear()
+
+    with _write_lock:
+        by_date: Dict[str, List[Tuple[str, bytes]]] = {}
+        for ts, event, line in pending:
+            by_date.setdefault(_date_for(ts), []).append((event, line))
+
+        for date, records in by_date.items():
+            EVENTS_DIR.mkdir(parents=True, exist_ok=True)
+            idx = _get_index(date) or _indexes.setdefault(date, _DayIndex(date))
+            try:
+                with open(_log_path(date), 'ab') as f:
+                    offset = f.tell()
+                    f.write(b''.join(line for _, line in records))
+                    if fsync:
+                        f.flush()
+                        os.fsync(f.fileno())
+                for event, line in records:
+                    idx.add(offset, event, len(line))
+                    offset += len(line)
+            except Exception as e:
+                logger.debug(f"[EVENT_LOG] Write error: {e}")
+
+        now = time.time()
+        for idx in _indexes.values():
+            if idx.dirty and (fsync or now - idx.saved_at >= INDEX_SAVE_INTERVAL):
+                idx.save()
+        # Keep only today's and yesterday's indexes resident
+        if len(_indexes) > 2:
+            for date in sorted(_indexes)[:-2]:
+                if _indexes[date].dirty:
+                    _indexes[date].save()
+                del _indexes[date]
+
+    return len(pending)
+
+
+def shutdown_event_logger() -> None:
+    """Flush, fsync and persist indexes. Registered with atexit."""
+    try:
+        flush_events(fsync=True)
+    except Exception as e:
+        logger.debug(f"[EVENT_LOG] Shutdown flush error: {e}")
+
 
+atexit.register(shutdown_event_logger)
 
-def _write_event(event: str, data: Dict[str, Any]):
-    """Append a single event to today's log file."""
+
+def log_event(event: str, data: Dict[str, Any]) -> None:
+    """Queue a single event for the next batched append."""
     record = {
         'ts': data.get('_ts', time.time()),
         'event': event,
-        'data': {k: v for k, v in data.items() if not k.startswith('_')},
+        'data': {k: v for k, v in data.items() if not str(k).startswith('_')},
     }
 
     try:
-        line = json.dumps(record, default=str, ensure_ascii=False) + '\n'
-        with _write_lock:
-            with open(_get_log_path(), 'a', encoding='utf-8') as f:
-                f.write(line)
+        line = (json.dumps(record, default=str, ensure_ascii=False) + '\n').encode('utf-8')
     except Exception as e:
-        logger.debug(f"[EVENT_LOG] Write error: {e}")
+        logger.debug(f"[EVENT_LOG] Encode error: {e}")
+        return
+
+    with _buffer_lock:
+        _buffer.append((record['ts'], event, line))
+        pending = len(_buffer)
+    _ensure_flusher()
+    if pending >= FLUSH_BATCH:
+        _flush_wakeup.set()
 
 
 def _bus_handler(data: Dict[str, Any]):
     """Event bus subscriber — logs matching events."""
     event = data.get('_event', '')
     if event in LOGGED_EVENTS:
-        _write_event(event, data)
+        log_event(event, data)
 
 
 def init_event_logger():
@@ -106,30 +318,49 @@ def read_events(
     if date is None:
         date = datetime.now().strftime('%Y-%m-%d')
 
-    log_path = EVENTS_DIR / f"{date}.jsonl"
-    if not log_path.exists():
-        return []
+    flush_events()
+    with _write_lock:
+        idx = _get_index(date)
+        if idx is None or limit <= 0:
+            return []
+        if event_type:
+            # Exact offsets for every matching record
+            seeks = idx.by_type.get(event_type, [])[offset:offset + limit]
+            start, skip = None, 0
+        else:
+            if offset >= idx.total:
+                return []
+            seeks = None
+            start = idx.checkpoints[offset // CHECKPOINT_EVERY]
+            skip = offset % CHECKPOINT_EVERY
+        end = idx.indexed_bytes
 
     events = []
-    skipped = 0
     try:
-        with open(log_path, 'r', encoding='utf-8') as f:
-            for line in f:
-                line = line.strip()
-                if not line:
-                    continue
-                try:
-                    record = json.loads(line)
-                    if event_type and record.get('event') != event_type:
+        with open(idx.log_path, 'rb') as f:
+            if seeks is not None:
+                for pos in seeks:
+                    f.seek(pos)
+                    try:
+                        events.append(json.loads(f.readline()))
+                    except ValueError:
+                        continue
+            else:
+                f.seek(start)
+                while len(events) < limit and f.tell() < end:
+                    line = f.readline()
+                    if not line:
+                        break
+                    if not line.strip():
+                        continue
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
                         continue
-                    if skipped < offset:
-                        skipped += 1
+                    if skip:
+                        skip -= 1
                         continue
                     events.append(record)
-                    if len(events) >= limit:
-                        break
-                except json.JSONDecodeError:
-                    continue
     except Exception as e:
         logger.warning(f"[EVENT_LOG] Read error for {date}: {e}")
 
@@ -141,34 +372,16 @@ def get_event_summary(date: Optional[str] = None) -> Dict[str, Any]:
     if date is None:
         date = datetime.now().strftime('%Y-%m-%d')
 
-    log_path = EVENTS_DIR / f"{date}.jsonl"
-    if not log_path.exists():
-        return {'date': date, 'totalEvents': 0, 'byType': {}}
-
-    by_type: Dict[str, int] = {}
-    total = 0
-
-    try:
-        with open(log_path, 'r', encoding='utf-8') as f:
-            for line in f:
-                line = line.strip()
-                if not line:
-                    continue
-                try:
-                    record = json.loads(line)
-                    event = record.get('event', 'unknown')
-                    by_type[event] = by_type.get(event, 0) + 1
-                    total += 1
-                except json.JSONDecodeError:
-                    continue
-    except Exception:
-        pass
-
-    return {
-        'date': date,
-        'totalEvents': total,
-        'byType': by_type,
-    }
+    flush_events()
+    with _write_lock:
+        idx = _get_index(date)
+        if idx is None:
+            return {'date': date, 'totalEvents': 0, 'byType': {}}
+        return {
+            'date': date,
+            'totalEvents': idx.total,
+            'byType': {event: len(offsets) for event, offsets in idx.by_type.items()},
+        }
 
 
 def list_event_dates() -> List[str]:
@@ -47,7 +47,7 @@ except ImportError:
     class FileSystemEventHandler:
         pass
 
-# Try to import croniter for periodic events
+# Try to import croniter for periodic events (falls back to src.gateway.cron_engine)
 try:
     from croniter import croniter
     HAS_CRONITER = True
@@ -357,7 +357,7 @@ class EventWatcher:
                     schedule = event.get("schedule", "")
                     timezone = event.get("timezone")
                     
-                    if not schedule or not HAS_CRONITER:
+                    if not schedule:
                         continue
                     
                     if self._is_periodic_due(event_file.name, schedule, timezone, now):
@@ -400,6 +400,8 @@ class EventWatcher:
     
     def _is_periodic_due(self, filename: str, schedule: str, timezone: Optional[str], now: float) -> bool:
         """Check if a periodic event is due based on its cron schedule."""
+        if not HAS_CRONITER:
+            return self._is_periodic_due_native(filename, schedule, timezone, now)
         try:
             tz = None
             if HAS_PYTZ and timezone:
@@ -426,6 +428,21 @@ class EventWatcher:
             logger.error(f"Error checking periodic schedule for {filename}: {e}")
             return False
     
+    def _is_periodic_due_native(self, filename: str, schedule: str, timezone: Optional[str], now: float) -> bool:
+        """Same check using the in-process cron engine (no croniter installed)."""
+        try:
+            from src.gateway.cron_engine import compile_cron
+
+            base_time = datetime.fromtimestamp(now).astimezone()
+            prev_fire = compile_cron(schedule).prev_before(base_time, timezone or None)
+            if prev_fire is None:
+                return False
+            return prev_fire.timestamp() > self._periodic_last_fired.get(filename, 0)
+
+        except Exception as e:
+            logger.error(f"Error checking periodic schedule for {filename}: {e}")
+            return False
+
     def _parse_iso_timestamp(self, s: str) -> Optional[float]:
         """Parse ISO timestamp string to unix timestamp."""
         if not s:
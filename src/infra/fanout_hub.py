@@ -0,0 +1,260 @@
+"""
+Fanout Hub — Serialize-once broadcast of frontend messages.
+
+Every send_message_to_frontend payload goes to the WebUI SSE stream and to
+every gateway WebSocket client. Encoding it separately for each consumer
+(and per WS client) multiplied the JSON work by the client count, and
+writing to sockets inline meant one slow client stalled the broadcaster.
+
+- publish() encodes a message exactly once into a Frame; the JSON text,
+  the SSE bytes ("data: ...\\n\\n") and each WS event envelope are derived
+  from that single encoding and shared by every consumer
+- Each consumer owns a bounded Outbox. Publishing only appends to outboxes
+  (O(1), never blocks); the consumer drains its own outbox
+- ClientWriter is an Outbox with its own writer thread, used for WS clients
+  so a slow socket only delays itself
+- A consumer whose outbox is full and that has not taken anything for
+  STALL_SECONDS (or that is OVERFLOW_FACTOR times its bound behind) is
+  closed rather than silently losing messages mid-stream; WebUI/dashboard
+  clients reconnect and resync from /api/messages or chat.history
+
+Usage:
+    from src.infra.fanout_hub import hub
+
+    frame = hub.publish({"status": "streaming", "result": "Hel"})
+    sub = hub.subscribe()                  # SSE stream
+    frame = sub.get(timeout=25)            # None on timeout / close
+    yield frame.sse
+    hub.unsubscribe(sub)
+"""
+
+import json
+import logging
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+SSE_OUTBOX_SIZE = 256       # Backlog at which an SSE stream counts as full
+CLIENT_OUTBOX_SIZE = 1024   # Same for a gateway WS client
+STALL_SECONDS = 2.0         # A full outbox is only closed if its consumer made no progress for this long
+OVERFLOW_FACTOR = 8         # ... or once it is this many times its bound behind
+WRITER_IDLE_TIMEOUT = 30.0  # Writer threads wake this often to notice a dead outbox
+
+
+class Frame:
+    """One message, encoded once. Derived encodings are built lazily and cached."""
+
+    __slots__ = ('data', 'text', 'plain', '_sse', '_events')
+
+    def __init__(self, data: Dict[str, Any], text: str, plain: bool = False):
+        self.data = data
+        self.text = text
+        self.plain = plain  # Built from a non-JSON string ({"type": "text", "content": ...})
+        self._sse: Optional[bytes] = None
+        self._events: Dict[str, str] = {}
+
+    @property
+    def sse(self) -> bytes:
+        """Server-Sent Events record for this message."""
+        if self._sse is None:
+            self._sse = b"data: " + self.text.encode("utf-8") + b"\n\n"
+        return self._sse
+
+    def event(self, name: str) -> str:
+        """Gateway envelope {type:'event', event:name, payload:data} as JSON text.
+
+        Byte-identical to json.dumps() of the envelope dict, but splices in
+        the already-encoded payload instead of re-encoding it.
+        """
+        text = self._events.get(name)
+        if text is None:
+            text = '{"type": "event", "event": %s, "payload": %s}' % (json.dumps(name), self.text)
+            self._events[name] = text
+        return text
+
+
+def encode(message) -> Optional[Frame]:
+    """Normalize a frontend message (dict or JSON/plain string) and encode it once."""
+    plain = False
+    if isinstance(message, str):
+        try:
+            data = json.loads(message)
+        except Exception:
+            data = {"type": "text", "content": message}
+            plain = True
+    else:
+        data = message
+    try:
+        return Frame(data, json.dumps(data), plain)
+    except (TypeError, ValueError) as e:
+        logger.warning(f"[FANOUT] Message not JSON-serializable, dropped: {e}")
+        return None
+
+
+class Outbox:
+    """Bounded FIFO between one publisher side and one consumer.
+
+    put() never blocks. A burst may exceed `maxsize` while the consumer is
+    still draining; once the outbox is full and the consumer has stalled
+    (or it is OVERFLOW_FACTOR * maxsize behind) the outbox closes itself
+    (overflowed=True) and further puts return False.
+    """
+
+    def __init__(self, maxsize: int, name: str = ''):
+        self.maxsize = maxsize
+        self.name = name
+        self.closed = False
+        self.overflowed = False
+        self.sent = 0
+        self._progress = time.monotonic()  # last get(), or when the queue last became non-empty
+        self._items: deque = deque()
+        self._cond = threading.Condition(threading.Lock())
+
+    def put(self, item) -> bool:
+        with self._cond:
+            if self.closed:
+                return False
+            backlog = len(self._items)
+            if backlog >= self.maxsize and (
+                    backlog >= self.maxsize * OVERFLOW_FACTOR
+                    or time.monotonic() - self._progress > STALL_SECONDS):
+                self.closed = True
+                self.overflowed = True
+                self._items.clear()
+                self._cond.notify_all()
+                logger.warning(f"[FANOUT] {self.name or 'consumer'} stalled {backlog} messages behind, closing")
+                return False
+            if not backlog:
+                self._progress = time.monotonic()
+            self._items.append(item)
+            self._cond.notify()
+            return True
+
+    def get(self, timeout: Optional[float] = None):
+        """Next item, or None on timeout or once closed."""
+        with self._cond:
+            if not self._items and not self.closed:
+                self._cond.wait(timeout)
+            if self._items:
+                self.sent += 1
+                self._progress = time.monotonic()
+                return self._items.popleft()
+            return None
+
+    def close(self):
+        with self._cond:
+            self.closed = True
+            self._cond.notify_all()
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+
+class ClientWriter(Outbox):
+    """Outbox drained by a dedicated thread that calls `send(item)`.
+
+    A failing send closes the writer; an overflow additionally calls
+    `on_close` (e.g. ws.close) so the connection's reader notices.
+    """
+
+    def __init__(self, send: Callable[[Any], None], maxsize: int = CLIENT_OUTBOX_SIZE,
+                 name: str = '', on_close: Optional[Callable[[], None]] = None):
+        super().__init__(maxsize, name)
+        self._send = send
+        self._on_close = on_close
+        self._thread = threading.Thread(target=self._run, name=f"fanout-{name or 'client'}", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while True:
+            item = self.get(timeout=WRITER_IDLE_TIMEOUT)
+            if item is None:
+                if self.closed:
+                    break
+                continue
+            try:
+                self._send(item)
+            except Exception as e:
+                logger.debug(f"[FANOUT] Send to {self.name or 'client'} failed: {e}")
+                self.close()
+                break
+        if self.overflowed and self._on_close:
+            try:
+                self._on_close()
+            except Exception:
+                pass
+
+
+class FanoutHub:
+    """Encodes each published message once and hands the Frame to all consumers."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers: List[Outbox] = []
+        self._sinks: List[Callable[[Frame], None]] = []
+        self.published = 0
+        self.bytes_encoded = 0
+        self.closed_slow = 0
+
+    def subscribe(self, maxsize: int = SSE_OUTBOX_SIZE, name: str = 'sse') -> Outbox:
+        """Register a pull-style consumer (SSE stream). Frames arrive via get()."""
+        sub = Outbox(maxsize, name)
+        with self._lock:
+            self._subscribers.append(sub)
+        return sub
+
+    def unsubscribe(self, sub: Outbox):
+        sub.close()
+        with self._lock:
+            if sub in self._subscribers:
+                self._subscribers.remove(sub)
+
+    def add_sink(self, sink: Callable[[Frame], None]):
+        """Register a push-style consumer called with every Frame (must not block)."""
+        with self._lock:
+            if sink not in self._sinks:
+                self._sinks.append(sink)
+
+    def publish(self, message) -> Optional[Frame]:
+        frame = encode(message)
+        if frame is None:
+            return None
+        with self._lock:
+            subscribers = list(self._subscribers)
+            sinks = list(self._sinks)
+            self.published += 1
+            self.bytes_encoded += len(frame.text)
+        dead = [sub for sub in subscribers if not sub.put(frame)]
+        if dead:
+            with self._lock:
+                for sub in dead:
+                    if sub in self._subscribers:
+                        self._subscribers.remove(sub)
+                        self.closed_slow += sub.overflowed
+        for sink in sinks:
+            try:
+                sink(frame)
+            except Exception as e:
+                logger.warning(f"[FANOUT] Sink {getattr(sink, '__name__', sink)} failed: {e}")
+        return frame
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "subscribers": len(self._subscribers),
+                "backlog": sum(len(s) for s in self._subscribers),
+                "sinks": len(self._sinks),
+                "published": self.published,
+                "bytesEncoded": self.bytes_encoded,
+                "closedSlow": self.closed_slow,
+            }
+
+
+hub = FanoutHub()
+
+
+def get_fanout_stats() -> Dict[str, Any]:
+    return hub.get_stats()
@@ -0,0 +1,427 @@
+"""
+Fetch Cache — Shared, disk-backed HTTP cache for web_fetch and link understanding.
+
+Research loops fetch the same pages over and over. This module keeps raw
+responses and the text extracted from them in one SQLite file so repeat
+fetches (in the same run or after a restart) skip the download, and
+repeat extractions skip the HTML parse:
+
+- Responses are fresh for the server's max-age (capped at
+  MAX_FRESH_SECONDS), or CACHE_TTL_SECONDS when none is sent; after that they are revalidated with
+  If-None-Match / If-Modified-Since and a 304 reuses the stored body
+- Extracted content (markdown, plain text, link summaries) is cached per
+  (url, extractor) and keyed to the body's hash, so it survives a 304
+  and is dropped automatically when the page actually changes
+- LRU eviction by bytes: once the store exceeds MAX_CACHE_BYTES the least
+  recently used entries are deleted down to EVICT_TO_RATIO of the budget
+- Responses are keyed by (url, verify, caller headers), so a body fetched
+  without certificate checks or with a different Accept is never served
+  to, or coalesced with, a caller that asked for something else
+- Concurrent fetches of the same key are coalesced into one request
+- Cache (SQLite) failures are logged and the fetch goes to the network
+- Requests go through the pooled keep-alive session (http_pool, "web")
+- no-store responses and errors are never cached
+
+Usage:
+    from src.infra.fetch_cache import fetch, cached_extract
+
+    resp = fetch(url, timeout=10)            # raises requests exceptions like requests.get
+    page = cached_extract(resp, "markdown", lambda html: {"content": to_md(html)})
+    get_fetch_cache_stats()
+    # {'entries': 42, 'bytes': 3811022, 'hits': 17, 'revalidated': 3, 'misses': 22, ...}
+"""
+
+import hashlib
+import json
+import logging
+import re
+import sqlite3
+import threading
+import time
+import zlib
+from concurrent.futures import Future
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+import requests
+
+from .http_pool import http_get
+from ..memory.sqlite_pool import SQLitePool
+
+logger = logging.getLogger(__name__)
+
+SOMA = Path(__file__).parent.parent.parent
+CACHE_DB = SOMA / "data" / "fetch_cache.db"
+
+CACHE_TTL_SECONDS = 300          # Serve without revalidating for 5 minutes (no max-age sent)
+MAX_FRESH_SECONDS = 86400        # Cap on a server-provided max-age
+MAX_CACHE_BYTES = 256 * 1024 * 1024
+EVICT_TO_RATIO = 0.9
+MAX_BODY_BYTES = 8 * 1024 * 1024  # Larger responses are returned but not stored
+
+DEFAULT_USER_AGENT = ("Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+                      "(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36")
+DEFAULT_HEADERS = {
+    'User-Agent': DEFAULT_USER_AGENT,
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.5',
+}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    url TEXT,
+    final_url TEXT,
+    status INTEGER,
+    content_type TEXT,
+    etag TEXT,
+    last_modified TEXT,
+    body BLOB,
+    body_sha1 TEXT,
+    size INTEGER,
+    fetched_at REAL,
+    fresh_until REAL,
+    accessed_at REAL
+);
+CREATE TABLE IF NOT EXISTS extracts (
+    url TEXT,
+    extractor TEXT,
+    body_sha1 TEXT,
+    data BLOB,
+    size INTEGER,
+    accessed_at REAL,
+    PRIMARY KEY (url, extractor)
+);
+CREATE INDEX IF NOT EXISTS idx_responses_accessed ON responses(accessed_at);
+CREATE INDEX IF NOT EXISTS idx_extracts_accessed ON extracts(accessed_at);
+"""
+
+_MAX_AGE_RE = re.compile(r'max-age=(\d+)')
+
+
+@dataclass
+class CachedResponse:
+    """A fetched (or cache-served) response body plus its validators."""
+    url: str
+    final_url: str
+    status: int
+    content_type: str
+    body: bytes
+    body_sha1: str
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    source: str = "network"       # "network" | "cache" | "revalidated"
+
+    @property
+    def text(self) -> str:
+        """Body decoded with the declared charset (utf-8 otherwise)."""
+        encoding = 'utf-8'
+        match = re.search(r'charset=([^\s;]+)', self.content_type or '')
+        if match:
+            encoding = match.group(1).strip('"\'')
+        try:
+            return self.body.decode(encoding)
+        except (UnicodeDecodeError, LookupError):
+            return self.body.decode('utf-8', errors='replace')
+
+
+class FetchCache:
+    """SQLite-backed response + extract cache with byte-budget LRU eviction."""
+
+    def __init__(self, db_path: Path = CACHE_DB, max_bytes: int = MAX_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._pool = SQLitePool(db_path)
+        with self._pool.writer() as conn:
+            columns = [r['name'] for r in conn.execute("PRAGMA table_info(responses)").fetchall()]
+            if columns and 'key' not in columns:
+                # Pre-key layout (rows keyed by url alone); it's a cache, start over
+                conn.execute("DROP TABLE responses")
+            conn.executescript(_SCHEMA)
+            self._bytes = conn.execute(
+                "SELECT (SELECT COALESCE(SUM(size), 0) FROM responses)"
+                " + (SELECT COALESCE(SUM(size), 0) FROM extracts)").fetchone()[0]
+        self._inflight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'revalidated': 0, 'misses': 0, 'coalesced': 0,
+                       'extract_hits': 0, 'extract_misses': 0, 'evicted': 0}
+
+    # ── Responses ─────────────────────────────────────────────────
+
+    def fetch(self, url: str, headers: Optional[Dict[str, str]] = None, timeout: float = 30,
+              verify: bool = True, use_cache: bool = True) -> CachedResponse:
+        """GET `url` through the cache. Raises like requests.get + raise_for_status."""
+        key = _cache_key(url, headers, verify)
+        if use_cache:
+            row = self._load(key)
+            if row is not None and row['fresh_until'] > time.time():
+                self._count('hits')
+                self._touch('responses', key)
+                return self._from_row(row, "cache")
+        else:
+            row = None
+
+        # Coalesce: the first caller fetches, the rest wait on its Future
+        with self._lock:
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._inflight[key] = future
+        if not leader:
+            self._count('coalesced')
+            return future.result()
+
+        try:
+            response = self._fetch_network(key, url, row, headers, timeout, verify)
+            future.set_result(response)
+            return response
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def _fetch_network(self, key: str, url: str, row, headers, timeout, verify) -> CachedResponse:
+        request_headers = dict(DEFAULT_HEADERS)
+        request_headers.update(headers or {})
+        if row is not None:
+            if row['etag']:
+                request_headers['If-None-Match'] = row['etag']
+            if row['last_modified']:
+                request_headers['If-Modified-Since'] = row['last_modified']
+
+        resp = http_get("web", url, headers=request_headers, timeout=timeout,
+                        verify=verify, allow_redirects=True)
+        cache_control = resp.headers.get('Cache-Control', '').lower()
+
+        if resp.status_code == 304 and row is not None:
+            self._count('revalidated')
+            fresh_until = time.time() + self._fresh_seconds(cache_control)
+            try:
+                with self._pool.writer() as conn:
+                    conn.execute(
+                        "UPDATE responses SET fresh_until = ?, accessed_at = ?, etag = COALESCE(?, etag),"
+                        " last_modified = COALESCE(?, last_modified) WHERE key = ?",
+                        (fresh_until, time.time(), resp.headers.get('ETag'),
+                         resp.headers.get('Last-Modified'), key))
+            except sqlite3.Error as e:
+                logger.warning(f"[FETCH] Cache update failed for {url}: {e}")
+            return self._from_row(row, "revalidated")
+
+        resp.raise_for_status()
+        self._count('misses')
+        body = resp.content
+        response = CachedResponse(
+            url=url,
+            final_url=resp.url or url,
+            status=resp.status_code,
+            content_type=resp.headers.get('Content-Type', ''),
+            body=body,
+            body_sha1=hashlib.sha1(body).hexdigest(),
+            etag=resp.headers.get('ETag'),
+            last_modified=resp.headers.get('Last-Modified'),
+        )
+        if 'no-store' not in cache_control and len(body) <= MAX_BODY_BYTES:
+            self._store(key, response, self._fresh_seconds(cache_control))
+        return response
+
+    @staticmethod
+    def _fresh_seconds(cache_control: str) -> float:
+        if 'no-cache' in cache_control:
+            return 0
+        match = _MAX_AGE_RE.search(cache_control)
+        if match:
+            return min(int(match.group(1)), MAX_FRESH_SECONDS)
+        return CACHE_TTL_SECONDS
+
+    def _store(self, key: str, response: CachedResponse, fresh_seconds: float) -> None:
+        blob = zlib.compress(response.body, 6)
+        now = time.time()
+        try:
+            with self._pool.writer() as conn:
+                old = conn.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+                conn.execute(
+                    "INSERT OR REPLACE INTO responses (key, url, final_url, status, content_type, etag,"
+                    " last_modified, body, body_sha1, size, fetched_at, fresh_until, accessed_at)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (key, response.url, response.final_url, response.status, response.content_type,
+                     response.etag, response.last_modified, blob, response.body_sha1, len(blob),
+                     now, now + fresh_seconds, now))
+                self._bytes += len(blob) - (old['size'] if old else 0)
+                if self._bytes > self.max_bytes:
+                    self._evict(conn)
+        except sqlite3.Error as e:
+            logger.warning(f"[FETCH] Cache store failed for {response.url}: {e}")
+
+    def _load(self, key: str):
+        """Stored row for `key`, or None (also when the cache is unreadable)."""
+        try:
+            with self._pool.reader() as conn:
+                return conn.execute("SELECT * FROM responses WHERE key = ?", (key,)).fetchone()
+        except sqlite3.Error as e:
+            logger.warning(f"[FETCH] Cache read failed, fetching directly: {e}")
+            return None
+
+    @staticmethod
+    def _from_row(row, source: str) -> CachedResponse:
+        return CachedResponse(
+            url=row['url'],
+            final_url=row['final_url'],
+            status=row['status'],
+            content_type=row['content_type'] or '',
+            body=zlib.decompress(row['body']),
+            body_sha1=row['body_sha1'],
+            etag=row['etag'],
+            last_modified=row['last_modified'],
+            source=source,
+        )
+
+    # ── Extracts ──────────────────────────────────────────────────
+
+    def get_extract(self, url: str, extractor: str, body_sha1: str) -> Optional[Any]:
+        """Cached extractor output for this exact body, or None."""
+        try:
+            with self._pool.reader() as conn:
+                row = conn.execute("SELECT body_sha1, data FROM extracts WHERE url = ? AND extractor = ?",
+                                   (url, extractor)).fetchone()
+        except sqlite3.Error as e:
+            logger.warning(f"[FETCH] Extract cache read failed: {e}")
+            row = None
+        if row is None or row['body_sha1'] != body_sha1:
+            self._count('extract_misses')
+            return None
+        self._count('extract_hits')
+        self._touch('extracts', url, extractor)
+        return _loads(row['data'])
+
+    def put_extract(self, url: str, extractor: str, body_sha1: str, data: Any) -> None:
+        blob = _dumps(data)
+        try:
+            with self._pool.writer() as conn:
+                old = conn.execute("SELECT size FROM extracts WHERE url = ? AND extractor = ?",
+                                   (url, extractor)).fetchone()
+                conn.execute(
+                    "INSERT OR REPLACE INTO extracts (url, extractor, body_sha1, data, size, accessed_at)"
+                    " VALUES (?, ?, ?, ?, ?, ?)",
+                    (url, extractor, body_sha1, blob, len(blob), time.time()))
+                self._bytes += len(blob) - (old['size'] if old else 0)
+                if self._bytes > self.max_bytes:
+                    self._evict(conn)
+        except sqlite3.Error as e:
+            logger.warning(f"[FETCH] Extract cache store failed for {url}: {e}")
+
+    # ── Maintenance ───────────────────────────────────────────────
+
+    def _touch(self, table: str, key: str, extractor: Optional[str] = None) -> None:
+        """Bump LRU recency (`key` is the response key, or the url for extracts)."""
+        try:
+            with self._pool.writer() as conn:
+                if extractor is None:
+                    conn.execute(f"UPDATE {table} SET accessed_at = ? WHERE key = ?", (time.time(), key))
+                else:
+                    conn.execute(f"UPDATE {table} SET accessed_at = ? WHERE url = ? AND extractor = ?",
+                                 (time.time(), key, extractor))
+        except sqlite3.Error as e:
+            logger.debug(f"[FETCH] Cache touch failed: {e}")
+
+    def _evict(self, conn) -> None:
+        """Delete least recently used rows (either table) until under the low-water mark."""
+        target = int(self.max_bytes * EVICT_TO_RATIO)
+        rows = conn.execute(
+            "SELECT 'responses' AS tbl, key AS url, NULL AS extractor, size, accessed_at FROM responses"
+            " UNION ALL SELECT 'extracts', url, extractor, size, accessed_at FROM extracts"
+            " ORDER BY accessed_at").fetchall()
+        evicted = 0
+        for row in rows:
+            if self._bytes <= target:
+                break
+            if row['tbl'] == 'responses':
+                conn.execute("DELETE FROM responses WHERE key = ?", (row['url'],))
+            else:
+                conn.execute("DELETE FROM extracts WHERE url = ? AND extractor = ?",
+                             (row['url'], row['extractor']))
+            self._bytes -= row['size']
+            evicted += 1
+        self._count('evicted', evicted)
+        logger.info(f"[FETCH] Evicted {evicted} cache entries ({self._bytes} bytes left)")
+
+    def _count(self, key: str, n: int = 1) -> None:
+        with self._lock:
+            self._stats[key] += n
+
+    def clear(self) -> None:
+        with self._pool.writer() as conn:
+            conn.execute("DELETE FROM responses")
+            conn.execute("DELETE FROM extracts")
+            self._bytes = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._pool.reader() as conn:
+            responses = conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+            extracts = conn.execute("SELECT COUNT(*) FROM extracts").fetchone()[0]
+        with self._lock:
+            stats = dict(self._stats)
+        return {'entries': responses, 'extracts': extracts, 'bytes': self._bytes,
+                'maxBytes': self.max_bytes, **stats}
+
+
+def _cache_key(url: str, headers: Optional[Dict[str, str]], verify: bool) -> str:
+    """Response key: the url plus everything else that can change what comes back."""
+    if verify and not headers:
+        return url
+    extra = sorted((name.lower(), str(value)) for name, value in (headers or {}).items())
+    digest = hashlib.sha1(json.dumps([bool(verify), extra]).encode('utf-8')).hexdigest()[:16]
+    return f"{url}#{'' if verify else 'insecure:'}{digest}"
+
+
+def _dumps(data: Any) -> bytes:
+    return zlib.compress(json.dumps(data, ensure_ascii=False).encode('utf-8'), 6)
+
+
+def _loads(blob: bytes) -> Any:
+    return json.loads(zlib.decompress(blob).decode('utf-8'))
+
+
+# ── Global Instance ────────────────────────────────────────────────
+
+_cache: Optional[FetchCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_fetch_cache() -> FetchCache:
+    """Get or create the shared fetch cache."""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = FetchCache()
+    return _cache
+
+
+def fetch(url: str, headers: Optional[Dict[str, str]] = None, timeout: float = 30,
+          verify: bool = True, use_cache: bool = True) -> CachedResponse:
+    """GET through the shared cache (see FetchCache.fetch)."""
+    if not verify:
+        requests.packages.urllib3.disable_warnings(requests.packages.urllib3.exceptions.InsecureRequestWarning)
+    return get_fetch_cache().fetch(url, headers=headers, timeout=timeout, verify=verify, use_cache=use_cache)
+
+
+def cached_extract(response: CachedResponse, extractor: str, extract: Callable[[str], Any]) -> Any:
+    """Run `extract(response.text)` once per body; later calls read the stored result."""
+    cache = get_fetch_cache()
+    data = cache.get_extract(response.url, extractor, response.body_sha1)
+    if data is None:
+        data = extract(response.text)
+        cache.put_extract(response.url, extractor, response.body_sha1, data)
+    return data
+
+
+def get_fetch_cache_stats() -> Dict[str, Any]:
+    return get_fetch_cache().get_stats()
+
+
+def clear_fetch_cache() -> None:
+    get_fetch_cache().clear()
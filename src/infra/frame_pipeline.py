@@ -0,0 +1,275 @@
+"""
+Frame Pipeline — Change detection and token-budget encoding for vision frames.
+
+Screen and camera observations used to PNG/JPEG-encode every captured frame
+at full resolution and send it to the vision model, even when nothing on
+screen had changed. FramePipeline sits between capture and upload:
+
+- Change detection: each frame is reduced once to a 256x256 grayscale
+  thumbnail. Its 64-bit difference hash (dHash) and a per-tile
+  difference against the last *observed* frame of the same source decide
+  whether the frame is new: the thumbnail is split into a 32x32 grid and
+  the frame only counts as unchanged if *no* tile's mean |pixel delta|
+  exceeds the threshold. A global mean would average a new notification
+  or a few lines of text away; per tile they stand out, while cursor
+  blinks, clock ticks and sensor noise stay under it. Unchanged frames
+  are skipped before any encoding happens
+- Token budget: frames that are sent are downscaled so width*height/750
+  (the common per-image token estimate) fits the budget and the long edge
+  fits MAX_EDGE, then JPEG-encoded
+- Stats per source (sent, skipped, bytes sent, estimated bytes saved) for
+  /api/infra/status
+
+Change detection state is per source ("autonomy", "screen", "camera:0"),
+so callers don't invalidate each other's reference frames.
+
+Usage:
+    from src.infra.frame_pipeline import frame_pipeline
+
+    frame = frame_pipeline.observe(pil_image, source="autonomy", max_tokens=1200)
+    if frame.skipped:
+        ...                                  # unchanged since the last observation
+    else:
+        send(frame.data_url)                 # downscaled JPEG
+    frame_pipeline.encode(pil_image, max_tokens=800)   # budget only, no change check
+"""
+
+import base64
+import io
+import logging
+import math
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+try:
+    from PIL import Image, ImageChops
+    HAS_PIL = True
+except ImportError:
+    Image = ImageChops = None
+    HAS_PIL = False
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    np = None
+    HAS_NUMPY = False
+
+logger = logging.getLogger(__name__)
+
+THUMB_SIZE = 256             # Side of the grayscale thumbnail used for comparisons
+TILE_GRID = 32               # Thumbnail is compared as TILE_GRID x TILE_GRID tiles
+HASH_DISTANCE = 3            # dHash bits that may differ for a frame to count as unchanged...
+TILE_DIFF_THRESHOLD = 4.0    # ...and max per-tile mean |pixel delta| (0-255) between thumbnails
+DEFAULT_MAX_TOKENS = 1200    # Per-image token budget for sent frames
+PIXELS_PER_TOKEN = 750       # Token estimate: width * height / 750
+MAX_EDGE = 1568              # Long-edge cap even when the budget would allow more
+JPEG_QUALITY = 80
+
+
+@dataclass
+class Frame:
+    """Result of passing one captured image through the pipeline."""
+    skipped: bool
+    distance: int = 0                 # dHash Hamming distance to the reference frame
+    tile_diff: float = 0.0            # Largest per-tile mean |pixel delta| of the thumbnails
+    base64: str = ""
+    mime: str = "image/jpeg"
+    width: int = 0
+    height: int = 0
+    source_width: int = 0
+    source_height: int = 0
+
+    @property
+    def data_url(self) -> str:
+        return f"data:{self.mime};base64,{self.base64}" if self.base64 else ""
+
+    @property
+    def scale(self) -> float:
+        return self.width / self.source_width if self.source_width else 1.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "skipped": self.skipped,
+            "distance": self.distance,
+            "tileDiff": round(self.tile_diff, 2),
+            "width": self.width,
+            "height": self.height,
+            "sourceWidth": self.source_width,
+            "sourceHeight": self.source_height,
+        }
+
+
+class _SourceState:
+    __slots__ = ('hash', 'thumb', 'last_bytes', 'frames', 'sent', 'skipped',
+                 'bytes_sent', 'bytes_saved', 'last_sent_at')
+
+    def __init__(self):
+        self.hash: Optional[int] = None
+        self.thumb = None
+        self.last_bytes = 0
+        self.frames = 0
+        self.sent = 0
+        self.skipped = 0
+        self.bytes_sent = 0
+        self.bytes_saved = 0
+        self.last_sent_at = 0.0
+
+
+def _thumbnail(img):
+    """Square grayscale thumbnail (box filter averages away noise)."""
+    return img.convert("L").resize((THUMB_SIZE, THUMB_SIZE), Image.BOX)
+
+
+def _dhash(thumb) -> int:
+    """64-bit difference hash: is each pixel brighter than its right neighbour (9x8 grid)."""
+    small = thumb.resize((9, 8), Image.BOX)
+    px = list(small.getdata())
+    bits = 0
+    for row in range(8):
+        base = row * 9
+        for col in range(8):
+            bits = (bits << 1) | (px[base + col] > px[base + col + 1])
+    return bits
+
+
+def _tile_diff(a, b) -> float:
+    """Largest mean |pixel delta| over the TILE_GRID x TILE_GRID tiles of two thumbnails."""
+    diff = ImageChops.difference(a, b)
+    if HAS_NUMPY:
+        tile = THUMB_SIZE // TILE_GRID
+        tiles = np.asarray(diff, dtype=np.float32).reshape(TILE_GRID, tile, TILE_GRID, tile)
+        return float(tiles.mean(axis=(1, 3)).max())
+    # A box downscale to the grid averages each tile (rounded to whole levels)
+    return float(diff.resize((TILE_GRID, TILE_GRID), Image.BOX).getextrema()[1])
+
+
+def budget_size(width: int, height: int, max_tokens: Optional[int] = None,
+                max_edge: Optional[int] = MAX_EDGE) -> tuple:
+    """Largest (w, h) with the same aspect ratio that fits the token budget and edge cap.
+
+    max_tokens None means DEFAULT_MAX_TOKENS, 0 means no token limit;
+    max_edge None means no edge cap.
+    """
+    if max_tokens is None:
+        max_tokens = DEFAULT_MAX_TOKENS
+    scale = 1.0
+    if max_tokens > 0:
+        scale = min(scale, math.sqrt(max_tokens * PIXELS_PER_TOKEN / float(width * height)))
+    if max_edge:
+        scale = min(scale, max_edge / float(max(width, height)))
+    return max(1, int(width * scale)), max(1, int(height * scale))
+
+
+def to_pil(frame, bgr: bool = False):
+    """Accept a PIL image or an HxWx3 numpy array (BGR from OpenCV when bgr=True)."""
+    if HAS_PIL and isinstance(frame, Image.Image):
+        return frame
+    if HAS_NUMPY and isinstance(frame, np.ndarray):
+        if bgr and frame.ndim == 3:
+            frame = frame[..., ::-1]
+        return Image.fromarray(np.ascontiguousarray(frame))
+    raise TypeError(f"unsupported frame type: {type(frame).__name__}")
+
+
+class FramePipeline:
+    """Per-source change detection plus budgeted JPEG encoding."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._sources: Dict[str, _SourceState] = {}
+
+    def encode(self, img, max_tokens: Optional[int] = None, quality: int = JPEG_QUALITY,
+               max_edge: Optional[int] = MAX_EDGE) -> Frame:
+        """Downscale to the token budget and JPEG-encode (no change detection)."""
+        if not HAS_PIL:
+            raise RuntimeError("Pillow is required for frame encoding")
+        img = to_pil(img)
+        w, h = budget_size(img.width, img.height, max_tokens, max_edge)
+        out = img if (w, h) == img.size else img.resize((w, h), Image.LANCZOS)
+        if out.mode not in ("RGB", "L"):
+            out = out.convert("RGB")
+        buf = io.BytesIO()
+        out.save(buf, format="JPEG", quality=quality, optimize=True)
+        return Frame(skipped=False, base64=base64.b64encode(buf.getvalue()).decode("ascii"),
+                     width=w, height=h, source_width=img.width, source_height=img.height)
+
+    def observe(self, img, source: str = "default", max_tokens: Optional[int] = None,
+                force: bool = False, quality: int = JPEG_QUALITY,
+                max_edge: Optional[int] = MAX_EDGE,
+                hash_distance: int = HASH_DISTANCE,
+                tile_diff_threshold: float = TILE_DIFF_THRESHOLD) -> Frame:
+        """Compare against the last frame observed for `source`; encode only if it changed.
+
+        `force` always encodes (and still updates the reference frame).
+        """
+        if not HAS_PIL:
+            raise RuntimeError("Pillow is required for frame observation")
+        img = to_pil(img)
+        thumb = _thumbnail(img)
+        digest = _dhash(thumb)
+
+        with self._lock:
+            state = self._sources.setdefault(source, _SourceState())
+            state.frames += 1
+            distance, diff = 64, 255.0
+            if state.hash is not None:
+                distance = bin(digest ^ state.hash).count("1")
+                diff = _tile_diff(thumb, state.thumb)
+            if not force and distance <= hash_distance and diff <= tile_diff_threshold:
+                state.skipped += 1
+                state.bytes_saved += state.last_bytes
+                logger.debug(f"[FRAMES] {source}: unchanged (dHash {distance}, diff {diff:.2f}), skipped")
+                return Frame(skipped=True, distance=distance, tile_diff=diff,
+                             source_width=img.width, source_height=img.height)
+
+        frame = self.encode(img, max_tokens=max_tokens, quality=quality, max_edge=max_edge)
+        frame.distance, frame.tile_diff = distance, diff
+        size = len(frame.base64)
+        # Payload at full resolution scales roughly with pixel count
+        full_estimate = int(size * (img.width * img.height) / float(frame.width * frame.height))
+        with self._lock:
+            state.hash, state.thumb = digest, thumb
+            state.last_bytes = size
+            state.sent += 1
+            state.bytes_sent += size
+            state.bytes_saved += max(0, full_estimate - size)
+            state.last_sent_at = time.time()
+        return frame
+
+    def reset(self, source: Optional[str] = None):
+        """Forget reference frames (all sources, or one) so the next frame is sent."""
+        with self._lock:
+            for name, state in self._sources.items():
+                if source is None or name == source:
+                    state.hash, state.thumb = None, None
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            sources = {
+                name: {
+                    "frames": s.frames,
+                    "sent": s.sent,
+                    "skipped": s.skipped,
+                    "bytesSent": s.bytes_sent,
+                    "bytesSaved": s.bytes_saved,
+                    "lastSentAt": s.last_sent_at,
+                }
+                for name, s in self._sources.items()
+            }
+        return {
+            "sent": sum(s["sent"] for s in sources.values()),
+            "skipped": sum(s["skipped"] for s in sources.values()),
+            "bytesSent": sum(s["bytesSent"] for s in sources.values()),
+            "bytesSaved": sum(s["bytesSaved"] for s in sources.values()),
+            "sources": sources,
+        }
+
+
+frame_pipeline = FramePipeline()
+
+
+def get_frame_stats() -> Dict[str, Any]:
+    return frame_pipeline.get_stats()
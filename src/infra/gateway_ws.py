@@ -23,6 +23,8 @@ import logging
 import threading
 from typing import Dict, Any, Optional, Set, Callable
 
+from .fanout_hub import ClientWriter, Frame, encode
+
 logger = logging.getLogger(__name__)
 
 # Protocol version
@@ -70,9 +72,15 @@ def get_agent_state() -> str:
 # ── Connected client tracking ─────────────────────────────────────────
 
 class GatewayClient:
-    """A connected WebSocket client."""
+    """A connected WebSocket client.
+
+    All outbound traffic (RPC responses and broadcast events) goes through a
+    bounded per-client writer thread, so a slow connection never blocks the
+    broadcaster or other clients, and sends to one socket stay ordered.
+    """
     __slots__ = ('ws', 'client_id', 'client_version', 'platform', 'mode',
-                 'instance_id', 'authenticated', 'connected_at', 'session_key')
+                 'instance_id', 'authenticated', 'connected_at', 'session_key',
+                 'writer')
 
     def __init__(self, ws):
         self.ws = ws
@@ -84,14 +92,23 @@ class GatewayClient:
         self.authenticated: bool = False
         self.connected_at: float = time.time()
         self.session_key: str = 'main'
+        self.writer = ClientWriter(ws.send, name=f"ws-{id(ws):x}", on_close=getattr(ws, 'close', None))
+
+    def send_text(self, text: str) -> bool:
+        """Queue pre-encoded JSON for the client. Returns False if the client is gone."""
+        return self.writer.put(text)
 
     def send_json(self, data: Dict[str, Any]) -> bool:
-        """Send JSON to client. Returns False if send fails."""
+        """Queue JSON for the client. Returns False if the client is gone."""
         try:
-            self.ws.send(json.dumps(data))
+            text = json.dumps(data)
+        except (TypeError, ValueError) as e:
+            logger.warning(f"[GATEWAY] Unserializable message dropped: {e}")
             return True
-        except Exception:
-            return False
+        return self.send_text(text)
+
+    def close(self):
+        self.writer.close()
 
 
 _clients: Set[GatewayClient] = set()
@@ -106,6 +123,7 @@ def _add_client(client: GatewayClient):
 def _remove_client(client: GatewayClient):
     with _clients_lock:
         _clients.discard(client)
+    client.close()
 
 
 def get_connected_count() -> int:
@@ -115,26 +133,35 @@ def get_connected_count() -> int:
 
 # ── Event broadcasting ────────────────────────────────────────────────
 
+def _broadcast_text(text: str):
+    """Queue one pre-encoded event on every authenticated client (never blocks)."""
+    with _clients_lock:
+        dead = [c for c in _clients if c.authenticated and not c.send_text(text)]
+        for c in dead:
+            _clients.discard(c)
+
+
 def broadcast_event(event: str, payload: Dict[str, Any],
                     session_key: Optional[str] = None):
     """
     Broadcast a gateway event to all connected (authenticated) clients.
     If session_key is provided, only send to clients subscribed to that session.
+    The event is encoded once and the same text is queued for every client.
     """
+    # Session filtering comes in Phase 2 — for now every client gets every event
     msg = {"type": "event", "event": event, "payload": payload}
-    dead: list = []
+    try:
+        text = json.dumps(msg)
+    except (TypeError, ValueError) as e:
+        logger.warning(f"[GATEWAY] Unserializable '{event}' event dropped: {e}")
+        return
+    _broadcast_text(text)
 
-    with _clients_lock:
-        for client in _clients:
-            if not client.authenticated:
-                continue
-            if session_key and client.session_key != session_key:
-                # For now, send to all — session filtering comes in Phase 2
-                pass
-            if not client.send_json(msg):
-                dead.append(client)
-        for c in dead:
-            _clients.discard(c)
+
+def broadcast_frame(frame: Frame):
+    """Fanout hub sink: forward an already-encoded frontend message as 'substrate_raw'."""
+    if _clients:
+        _broadcast_text(frame.event('substrate_raw'))
 
 
 def broadcast_raw(substrate_message: Dict[str, Any]):
@@ -143,16 +170,9 @@ def broadcast_raw(substrate_message: Dict[str, Any]):
     as a 'substrate_raw' event. The frontend can process these directly — same
     format the original WebUI uses.
     """
-    msg = {"type": "event", "event": "substrate_raw", "payload": substrate_message}
-    dead: list = []
-    with _clients_lock:
-        for client in _clients:
-            if not client.authenticated:
-                continue
-            if not client.send_json(msg):
-                dead.append(client)
-        for c in dead:
-            _clients.discard(c)
+    frame = encode(substrate_message)
+    if frame is not None:
+        broadcast_frame(frame)
 
 
 def translate_and_broadcast(substrate_message: Dict[str, Any]):
@@ -994,24 +1014,18 @@ def handle_gateway_ws(ws):
 
     # Send challenge
     nonce = uuid.uuid4().hex
-    try:
-        client.send_json({
-            'type': 'event',
-            'event': 'gateway.challenge',
-            'payload': {'nonce': nonce},
-        })
-    except Exception:
-        _remove_client(client)
-        return
+    client.send_json({
+        'type': 'event',
+        'event': 'gateway.challenge',
+        'payload': {'nonce': nonce},
+    })
 
     try:
         while True:
             raw = ws.receive(timeout=60)
             if raw is None:
-                # Send keepalive
-                try:
-                    client.send_json({'type': 'event', 'event': 'ping', 'payload': {}})
-                except Exception:
+                # Send keepalive (fails once the writer has given up on this client)
+                if not client.send_json({'type': 'event', 'event': 'ping', 'payload': {}}):
                     break
                 continue
 
@@ -0,0 +1,181 @@
+"""
+HTTP Pool — Shared keep-alive sessions for LLM provider calls.
+
+Bare `requests.post()` builds a throwaway Session per call, so every tool
+round pays a fresh TCP + TLS handshake to the provider. This module keeps
+one `requests.Session` per provider with a tuned urllib3 pool, so rounds
+in a `chat_with_tools` loop (and concurrent subagents) reuse warm
+connections.
+
+- One Session per provider key ("anthropic", "xai", "ollama", ...)
+- Pool sizes tuned per provider; unknown providers get the default
+- Every new connection's connect() (TCP + TLS) is timed, so reuse ratio
+  and handshake cost show up in `get_http_stats()` / `/api/infra/status`
+- No automatic retries — callers keep their existing error handling
+
+Usage:
+    from src.infra.http_pool import http_post
+
+    resp = http_post("anthropic", endpoint, headers=headers, json=payload, timeout=120)
+    get_http_stats()
+    # {'anthropic': {'requests': 12, 'connections': 1, 'reuseRatio': 0.92, ...}}
+"""
+
+import time
+import logging
+import threading
+from typing import Any, Dict
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+logger = logging.getLogger(__name__)
+
+# (pool_connections, pool_maxsize) — hosts per provider, sockets per host.
+# Cloud providers see bursts from parallel subagents; Ollama is one local host.
+POOL_SIZES = {
+    'anthropic': (2, 16),
+    'xai': (2, 16),
+    'openai': (2, 16),
+    'google': (4, 16),     # AI Studio + regional Vertex endpoints
+    'minimax': (2, 8),
+    'ollama': (1, 8),
+    'web': (32, 4),        # fetch_cache: many sites, few parallel requests each
+}
+DEFAULT_POOL_SIZE = (4, 8)
+
+
+class _PoolStats:
+    """Request/connection counters for one provider."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.errors = 0
+        self.connections = 0
+        self.connect_ms_total = 0.0
+        self.connect_ms_max = 0.0
+        self.last_connect_ms = 0.0
+
+    def record_request(self, ok: bool) -> None:
+        with self._lock:
+            self.requests += 1
+            if not ok:
+                self.errors += 1
+
+    def record_connect(self, elapsed_ms: float) -> None:
+        with self._lock:
+            self.connections += 1
+            self.connect_ms_total += elapsed_ms
+            self.connect_ms_max = max(self.connect_ms_max, elapsed_ms)
+            self.last_connect_ms = elapsed_ms
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            reused = max(0, self.requests - self.connections)
+            return {
+                'requests': self.requests,
+                'errors': self.errors,
+                'connections': self.connections,
+                'reused': reused,
+                'reuseRatio': round(reused / self.requests, 3) if self.requests else 0.0,
+                'handshakeMsAvg': round(self.connect_ms_total / self.connections, 1) if self.connections else 0.0,
+                'handshakeMsMax': round(self.connect_ms_max, 1),
+                'handshakeMsLast': round(self.last_connect_ms, 1),
+                'handshakeMsSaved': round(reused * self.connect_ms_total / self.connections, 1) if self.connections else 0.0,
+            }
+
+
+def _timed_pool(pool_cls, conn_cls, stats: _PoolStats):
+    """Connection pool class whose new connections report their connect time."""
+
+    class _TimedConnection(conn_cls):
+        def connect(self):
+            start = time.perf_counter()
+            super().connect()
+            stats.record_connect((time.perf_counter() - start) * 1000)
+
+    class _TimedPool(pool_cls):
+        ConnectionCls = _TimedConnection
+
+    return _TimedPool
+
+
+class _PooledAdapter(HTTPAdapter):
+    """HTTPAdapter that swaps in timed connection pools."""
+
+    def __init__(self, stats: _PoolStats, **kwargs):
+        self._stats = stats
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            'http': _timed_pool(HTTPConnectionPool, HTTPConnection, self._stats),
+            'https': _timed_pool(HTTPSConnectionPool, HTTPSConnection, self._stats),
+        }
+
+
+_sessions: Dict[str, requests.Session] = {}
+_stats: Dict[str, _PoolStats] = {}
+_lock = threading.Lock()
+
+
+def get_http_session(provider: str) -> requests.Session:
+    """Get the shared keep-alive Session for a provider."""
+    provider = (provider or 'default').lower()
+    session = _sessions.get(provider)
+    if session is not None:
+        return session
+    with _lock:
+        session = _sessions.get(provider)
+        if session is None:
+            stats = _stats.setdefault(provider, _PoolStats())
+            connections, maxsize = POOL_SIZES.get(provider, DEFAULT_POOL_SIZE)
+            adapter = _PooledAdapter(stats, pool_connections=connections, pool_maxsize=maxsize)
+            session = requests.Session()
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+            _sessions[provider] = session
+            logger.debug(f"[HTTP] Created pooled session for {provider} ({connections}x{maxsize})")
+        return session
+
+
+def http_request(provider: str, method: str, url: str, **kwargs) -> requests.Response:
+    """Send a request through the provider's pooled Session."""
+    session = get_http_session(provider)
+    stats = _stats[(provider or 'default').lower()]
+    try:
+        response = session.request(method, url, **kwargs)
+    except Exception:
+        stats.record_request(ok=False)
+        raise
+    stats.record_request(ok=response.status_code < 500)
+    return response
+
+
+def http_post(provider: str, url: str, **kwargs) -> requests.Response:
+    """POST through the provider's pooled Session (drop-in for requests.post)."""
+    return http_request(provider, 'POST', url, **kwargs)
+
+
+def http_get(provider: str, url: str, **kwargs) -> requests.Response:
+    """GET through the provider's pooled Session (drop-in for requests.get)."""
+    return http_request(provider, 'GET', url, **kwargs)
+
+
+def get_http_stats() -> Dict[str, Dict[str, Any]]:
+    """Per-provider request, connection-reuse and handshake-time metrics."""
+    with _lock:
+        providers = list(_stats.items())
+    return {name: stats.to_dict() for name, stats in providers}
+
+
+def close_http_sessions() -> None:
+    """Close every pooled Session (idle sockets are released)."""
+    with _lock:
+        for session in _sessions.values():
+            session.close()
+        _sessions.clear()
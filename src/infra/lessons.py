@@ -12,16 +12,26 @@ Lesson types:
 - preference: User behavioral signals (e.g., "use web_search not browser for research")
 
 Storage: workspace/state/lessons.json (not in src/ — it's runtime data)
+  - Lessons live in memory behind an mtime check, with precomputed token sets
+    and an inverted index (token → lesson ids); load_lessons only computes
+    overlap for lessons that share a token with the task.
+  - Changes are appended to lessons.log.jsonl and folded into lessons.json
+    every COMPACT_EVERY records (and at exit).
+  - consolidate_lessons groups near-duplicates via MinHash/LSH buckets
+    instead of comparing every pair.
 Token cost: ~300 tokens extraction + ~300 tokens injection = ~600 tokens/task total.
 """
 
 import os
 import json
 import time
+import atexit
+import random
 import hashlib
 import logging
 import threading
 import re
+import zlib
 import requests
 from datetime import datetime, timezone
 from typing import Dict, List, Optional, Any, Tuple
@@ -32,6 +42,7 @@ logger = logging.getLogger(__name__)
 SOMA = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 _STATE_DIR = os.path.join(SOMA, "workspace", "state")
 _LESSONS_FILE = os.path.join(_STATE_DIR, "lessons.json")
+_LESSONS_LOG = os.path.join(_STATE_DIR, "lessons.log.jsonl")
 
 # ── Limits ────────────────────────────────────────────────────────────
 MAX_LESSONS = 150
@@ -42,6 +53,20 @@ DECAY_AFTER_DAYS = 90               # Up from 60 — workflows shouldn't decay f
 DECAY_AMOUNT = 0.05                 # Down from 0.1 — gentler decay
 MIN_CONFIDENCE = 0.15               # Down from 0.2 — keep more lessons alive
 DEDUP_TOKEN_OVERLAP_THRESHOLD = 0.35
+COMPACT_EVERY = 100                 # Log records before folding into lessons.json
+
+# MinHash/LSH for consolidation: 16 bands × 2 rows ≈ 0.25 Jaccard threshold,
+# so pairs above DEDUP_TOKEN_OVERLAP_THRESHOLD collide with ~88% probability
+# (candidates are then verified exactly).
+_MINHASH_BANDS = 16
+_MINHASH_ROWS = 2
+_MERSENNE_PRIME = (1 << 61) - 1
+_rng = random.Random(0x1E55)
+_MINHASH_PERMS = [
+    (_rng.randrange(1, _MERSENNE_PRIME), _rng.randrange(0, _MERSENNE_PRIME))
+    for _ in range(_MINHASH_BANDS * _MINHASH_ROWS)
+]
+del _rng
 
 # Thread safety
 _lock = threading.Lock()
@@ -149,29 +174,289 @@ def _extract_core_signature(pattern: str, tags: List[str]) -> str:
 
 # ── Storage ───────────────────────────────────────────────────────────
 
-def _load_lessons_file() -> Dict:
-    """Load lessons.json from disk. Returns empty structure if missing/corrupt."""
-    try:
-        if os.path.isfile(_LESSONS_FILE):
-            with open(_LESSONS_FILE, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            if isinstance(data, dict) and "lessons" in data:
-                return data
-    except (json.JSONDecodeError, OSError) as e:
-        logger.warning(f"[LESSONS] Failed to load lessons file, starting fresh: {e}")
-    return {"version": 1, "lessons": []}
-
-
-def _save_lessons_file(data: Dict) -> bool:
-    """Write lessons.json to disk."""
+def _parse_iso_ts(iso_str: str) -> Optional[float]:
     try:
-        _ensure_state_dir()
-        with open(_LESSONS_FILE, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, default=str)
+        dt = datetime.fromisoformat(iso_str.replace("Z", "+00:00"))
+        if dt.tzinfo is None:
+            dt = dt.replace(tzinfo=timezone.utc)
+        return dt.timestamp()
+    except Exception:
+        return None
+
+
+def _is_usable_signature(sig: str) -> bool:
+    """'::' (no tool, action or error category) says nothing about the lesson."""
+    return bool(sig) and len(sig) > 3
+
+
+def _minhash(tokens) -> Tuple[int, ...]:
+    """MinHash signature of a token set (one min per permutation)."""
+    hashed = [zlib.crc32(t.encode("utf-8")) for t in tokens]
+    if not hashed:
+        return ()
+    return tuple(
+        min((a * h + b) % _MERSENNE_PRIME for h in hashed)
+        for a, b in _MINHASH_PERMS
+    )
+
+
+class _LessonIndex:
+    """
+    In-memory lessons with everything load/store/consolidate need precomputed:
+    relevance tokens (tags + pattern + lesson), dedup tokens (pattern + lesson),
+    core signature, reinforcement timestamp, and inverted indexes by token,
+    pattern and signature. Insertion order is kept (first match wins on dedup).
+    """
+
+    def __init__(self, data: Dict):
+        self.version = data.get("version", 1)
+        self.lessons: Dict[str, Dict] = {}
+        self.generation = 0
+        self.consolidated_generation = -1
+        self._tokens: Dict[str, frozenset] = {}
+        self._dedup_tokens: Dict[str, frozenset] = {}
+        self._sig: Dict[str, str] = {}
+        self._pattern: Dict[str, str] = {}
+        self._ts: Dict[str, Optional[float]] = {}
+        self._minhash: Dict[str, Tuple[int, ...]] = {}
+        self._postings: Dict[str, set] = {}
+        self._by_pattern: Dict[str, set] = {}
+        self._by_sig: Dict[str, set] = {}
+        self._seq: Dict[str, int] = {}
+        self._next_seq = 0
+        for les in data.get("lessons", []):
+            if isinstance(les, dict):
+                self.put(les)
+
+    # ── mutation ──
+
+    def put(self, les: Dict) -> None:
+        """Insert or re-index a lesson (call after mutating it in place)."""
+        lid = les.get("id") or _lesson_id()
+        les["id"] = lid
+        if lid in self.lessons:
+            self._unindex(lid)
+        else:
+            self._seq[lid] = self._next_seq
+            self._next_seq += 1
+        self.lessons[lid] = les
+
+        dedup = _tokenize(les.get("pattern", "")) | _tokenize(les.get("lesson", ""))
+        tokens = set(dedup)
+        for tag in les.get("tags", []):
+            tokens.update(_tokenize(str(tag)))
+        self._tokens[lid] = frozenset(tokens)
+        self._dedup_tokens[lid] = frozenset(dedup)
+        self._sig[lid] = _extract_core_signature(les.get("pattern", ""), les.get("tags", []))
+        self._ts[lid] = _parse_iso_ts(les.get("last_reinforced", les.get("last_seen", "")))
+        for tok in tokens:
+            self._postings.setdefault(tok, set()).add(lid)
+        self._pattern[lid] = les.get("pattern")
+        self._by_pattern.setdefault(self._pattern[lid], set()).add(lid)
+        self._by_sig.setdefault(self._sig[lid], set()).add(lid)
+        self.generation += 1
+
+    def remove(self, lid: str) -> None:
+        if lid in self.lessons:
+            self._unindex(lid)
+            del self.lessons[lid]
+            del self._seq[lid]
+            self.generation += 1
+
+    def _unindex(self, lid: str) -> None:
+        for tok in self._tokens.pop(lid, ()):
+            ids = self._postings.get(tok)
+            if ids:
+                ids.discard(lid)
+                if not ids:
+                    del self._postings[tok]
+        for table, key in ((self._by_pattern, self._pattern.pop(lid, None)), (self._by_sig, self._sig.pop(lid, None))):
+            ids = table.get(key)
+            if ids:
+                ids.discard(lid)
+                if not ids:
+                    del table[key]
+        self._dedup_tokens.pop(lid, None)
+        self._ts.pop(lid, None)
+        self._minhash.pop(lid, None)
+
+    # ── queries ──
+
+    def ordered(self) -> List[Dict]:
+        return list(self.lessons.values())
+
+    def candidates(self, tokens) -> set:
+        """Ids of lessons sharing at least one token."""
+        found = set()
+        for tok in tokens:
+            ids = self._postings.get(tok)
+            if ids:
+                found |= ids
+        return found
+
+    def find_duplicate(self, pattern: str, lesson: str, tags: List[str]) -> Optional[str]:
+        """
+        First lesson (insertion order) that is an exact pattern match,
+        shares the core signature, or overlaps above the dedup threshold.
+        """
+        matches = set(self._by_pattern.get(pattern, ()))
+        sig = _extract_core_signature(pattern, tags)
+        if _is_usable_signature(sig):
+            matches |= self._by_sig.get(sig, set())
+        new_tokens = _tokenize(f"{pattern} {lesson}")
+        if new_tokens:
+            for lid in self.candidates(new_tokens):
+                if lid in matches:
+                    continue
+                ex_tokens = self._dedup_tokens[lid]
+                if ex_tokens and len(new_tokens & ex_tokens) / len(new_tokens | ex_tokens) > DEDUP_TOKEN_OVERLAP_THRESHOLD:
+                    matches.add(lid)
+        if not matches:
+            return None
+        return min(matches, key=self._seq.__getitem__)
+
+    def days_since_reinforced(self, lid: str, now: float) -> float:
+        ts = self._ts.get(lid)
+        if ts is None:
+            return 30.0  # Default to 30 days if parsing fails (as _days_since)
+        return max(0.0, (now - ts) / 86400)
+
+    def relevance_tokens(self, lid: str) -> frozenset:
+        return self._tokens[lid]
+
+    def signature(self, lid: str) -> str:
+        return self._sig[lid]
+
+    def minhash(self, lid: str) -> Tuple[int, ...]:
+        mh = self._minhash.get(lid)
+        if mh is None:
+            mh = self._minhash[lid] = _minhash(self._dedup_tokens[lid])
+        return mh
+
+    def jaccard(self, a: str, b: str) -> float:
+        ta, tb = self._dedup_tokens[a], self._dedup_tokens[b]
+        if not ta or not tb:
+            return 0.0
+        return len(ta & tb) / len(ta | tb)
+
+    def to_data(self) -> Dict:
+        return {"version": self.version, "lessons": self.ordered()}
+
+
+class _LessonStore:
+    """
+    lessons.json snapshot + lessons.log.jsonl append log, cached in memory.
+
+    The cache is keyed on both files' (mtime, size), so hand edits or other
+    processes touching them trigger a reload. All methods expect _lock held.
+    """
+
+    def __init__(self):
+        self._index: Optional[_LessonIndex] = None
+        self._fingerprint = None
+        self._log_records = 0
+        atexit.register(self.flush)
+
+    @staticmethod
+    def _stat(path: str):
+        try:
+            st = os.stat(path)
+            return (st.st_mtime_ns, st.st_size)
+        except OSError:
+            return None
+
+    def _current_fingerprint(self):
+        return (self._stat(_LESSONS_FILE), self._stat(_LESSONS_LOG))
+
+    def index(self) -> _LessonIndex:
+        fingerprint = self._current_fingerprint()
+        if self._index is None or fingerprint != self._fingerprint:
+            self._index, self._log_records = self._load()
+            self._fingerprint = fingerprint
+        return self._index
+
+    def _load(self) -> Tuple[_LessonIndex, int]:
+        data = {"version": 1, "lessons": []}
+        try:
+            if os.path.isfile(_LESSONS_FILE):
+                with open(_LESSONS_FILE, 'r', encoding='utf-8') as f:
+                    loaded = json.load(f)
+                if isinstance(loaded, dict) and "lessons" in loaded:
+                    data = loaded
+        except (json.JSONDecodeError, OSError) as e:
+            logger.warning(f"[LESSONS] Failed to load lessons file, starting fresh: {e}")
+        index = _LessonIndex(data)
+
+        records = 0
+        try:
+            if os.path.isfile(_LESSONS_LOG):
+                with open(_LESSONS_LOG, 'r', encoding='utf-8') as f:
+                    for line in f:
+                        try:
+                            rec = json.loads(line)
+                        except json.JSONDecodeError:
+                            continue  # Torn write from a crash — skip it
+                        if rec.get("op") == "put" and isinstance(rec.get("lesson"), dict):
+                            index.put(rec["lesson"])
+                        elif rec.get("op") == "del":
+                            index.remove(rec.get("id"))
+                        records += 1
+        except OSError as e:
+            logger.warning(f"[LESSONS] Failed to replay lessons log: {e}")
+        return index, records
+
+    def commit(self, put: List[Dict] = (), delete: List[str] = ()) -> bool:
+        """Append changed/removed lessons to the log; compact when it grows."""
+        if not put and not delete:
+            return True
+        try:
+            _ensure_state_dir()
+            with open(_LESSONS_LOG, 'a', encoding='utf-8') as f:
+                for les in put:
+                    f.write(json.dumps({"op": "put", "lesson": les}, default=str) + "\n")
+                for lid in delete:
+                    f.write(json.dumps({"op": "del", "id": lid}) + "\n")
+            self._log_records += len(put) + len(delete)
+            self._fingerprint = self._current_fingerprint()
+        except Exception as e:
+            logger.error(f"[LESSONS] Failed to append lessons log: {e}")
+            return False
+        if self._log_records >= COMPACT_EVERY:
+            return self.compact()
         return True
-    except Exception as e:
-        logger.error(f"[LESSONS] Failed to save lessons file: {e}")
-        return False
+
+    def compact(self) -> bool:
+        """Write the full snapshot to lessons.json and drop the log."""
+        if self._index is None:
+            return True
+        try:
+            _ensure_state_dir()
+            tmp = _LESSONS_FILE + ".tmp"
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump(self._index.to_data(), f, indent=2, default=str)
+            os.replace(tmp, _LESSONS_FILE)
+            if os.path.isfile(_LESSONS_LOG):
+                os.remove(_LESSONS_LOG)
+            self._log_records = 0
+            self._fingerprint = self._current_fingerprint()
+            return True
+        except Exception as e:
+            logger.error(f"[LESSONS] Failed to save lessons file: {e}")
+            return False
+
+    def flush(self) -> None:
+        """Fold any pending log records into lessons.json (registered atexit)."""
+        with _lock:
+            if self._log_records:
+                self.compact()
+
+    def reset(self) -> None:
+        self._index = None
+        self._fingerprint = None
+        self._log_records = 0
+
+
+_store = _LessonStore()
 
 
 # ── Compact tool history (reuse format from task_persistence) ─────────
@@ -614,9 +899,12 @@ def store_lessons(new_lessons: List[Dict]) -> int:
 
     Dedup logic:
     - Exact match on pattern → increment occurrences, boost confidence
-    - High token overlap (>60%) → same as exact match
+    - High token overlap (>35%) or same core signature → same as exact match
     - No match → create new entry
 
+    Candidates come from the index (pattern, signature, shared tokens), so
+    each insert only compares against lessons it could actually match.
+
     Args:
         new_lessons: List of lesson dicts from extract_lessons()
 
@@ -627,44 +915,31 @@ def store_lessons(new_lessons: List[Dict]) -> int:
         return 0
 
     with _lock:
-        data = _load_lessons_file()
-        existing = data.get("lessons", [])
+        index = _store.index()
         now = _now_iso()
         added = 0
+        changed: Dict[str, Dict] = {}
 
         for new in new_lessons:
             pattern = new.get("pattern", "")
             lesson = new.get("lesson", "")
-            combined = f"{pattern} {lesson}"
-
-            # Check for duplicates
-            matched = False
-            for ex in existing:
-                ex_combined = f"{ex.get('pattern', '')} {ex.get('lesson', '')}"
-
-                # Check: exact match, token overlap, or same core signature
-                new_sig = _extract_core_signature(pattern, new.get("tags", []))
-                ex_sig = _extract_core_signature(ex.get("pattern", ""), ex.get("tags", []))
-                is_dup = (
-                    ex.get("pattern") == pattern
-                    or _token_overlap(combined, ex_combined) > DEDUP_TOKEN_OVERLAP_THRESHOLD
-                    or (new_sig and ex_sig and new_sig == ex_sig)
-                )
-                if is_dup:
-                    # Reinforce existing lesson
-                    ex["occurrences"] = ex.get("occurrences", 1) + 1
-                    ex["last_seen"] = now
-                    ex["last_reinforced"] = now
-                    ex["confidence"] = min(1.0, ex.get("confidence", 0.5) + 0.1)
-                    # Merge tags
-                    existing_tags = set(ex.get("tags", []))
-                    existing_tags.update(new.get("tags", []))
-                    ex["tags"] = list(existing_tags)
-                    matched = True
-                    logger.debug(f"[LESSONS] Reinforced existing lesson: {pattern[:60]}... (now {ex['occurrences']}x)")
-                    break
 
-            if not matched:
+            dup_id = index.find_duplicate(pattern, lesson, new.get("tags", []))
+            if dup_id:
+                # Reinforce existing lesson
+                ex = index.lessons[dup_id]
+                ex["occurrences"] = ex.get("occurrences", 1) + 1
+                ex["last_seen"] = now
+                ex["last_reinforced"] = now
+                ex["confidence"] = min(1.0, ex.get("confidence", 0.5) + 0.1)
+                # Merge tags
+                existing_tags = set(ex.get("tags", []))
+                existing_tags.update(new.get("tags", []))
+                ex["tags"] = list(existing_tags)
+                index.put(ex)
+                changed[dup_id] = ex
+                logger.debug(f"[LESSONS] Reinforced existing lesson: {pattern[:60]}... (now {ex['occurrences']}x)")
+            else:
                 # Create new lesson — workflows start higher confidence
                 ltype = new.get("type", "tactical")
                 init_confidence = 0.7 if ltype == "workflow" else 0.5
@@ -682,19 +957,22 @@ def store_lessons(new_lessons: List[Dict]) -> int:
                     "source": new.get("source", "auto_extracted"),
                     "tags": new.get("tags", [])[:10],
                 }
-                existing.append(entry)
+                index.put(entry)
+                changed[entry["id"]] = entry
                 added += 1
                 logger.info(f"[LESSONS] New lesson stored: {pattern[:60]}...")
 
         # Enforce max lessons (keep highest confidence)
-        if len(existing) > MAX_LESSONS:
-            existing.sort(key=lambda x: x.get("confidence", 0), reverse=True)
-            removed = len(existing) - MAX_LESSONS
-            existing = existing[:MAX_LESSONS]
-            logger.info(f"[LESSONS] Pruned {removed} low-confidence lessons (max {MAX_LESSONS})")
+        removed = []
+        if len(index.lessons) > MAX_LESSONS:
+            by_conf = sorted(index.ordered(), key=lambda x: x.get("confidence", 0), reverse=True)
+            for les in by_conf[MAX_LESSONS:]:
+                index.remove(les["id"])
+                changed.pop(les["id"], None)
+                removed.append(les["id"])
+            logger.info(f"[LESSONS] Pruned {len(removed)} low-confidence lessons (max {MAX_LESSONS})")
 
-        data["lessons"] = existing
-        _save_lessons_file(data)
+        _store.commit(put=list(changed.values()), delete=removed)
 
         return added
 
@@ -712,81 +990,81 @@ def load_lessons(
         - User-explicit lessons get a 1.3× boost
         - Relevance matches against tags + pattern + lesson text (not just tags)
 
+    Only lessons sharing a token with the task (via the inverted index) get
+    an overlap computed; the rest sit at the 0.3 relevance floor.
+
     Returns:
         Top lessons sorted by score, with dedicated workflow slots
     """
-    with _lock:
-        data = _load_lessons_file()
-
-    lessons = data.get("lessons", [])
-    if not lessons:
-        return []
-
     # Tokenize task for relevance matching — include full message
     task_tokens = _tokenize(task_description) if task_description else set()
 
-    scored_workflows = []
-    scored_other = []
-    for les in lessons:
-        confidence = les.get("confidence", 0.5)
-        if confidence < MIN_CONFIDENCE:
-            continue
+    with _lock:
+        index = _store.index()
+        if not index.lessons:
+            return []
+        candidates = index.candidates(task_tokens) if task_tokens else set()
+        now = time.time()
+
+        scored_workflows = []
+        scored_other = []
+        for lid, les in index.lessons.items():
+            confidence = les.get("confidence", 0.5)
+            if confidence < MIN_CONFIDENCE:
+                continue
+
+            ltype = les.get("type", "tactical")
+
+            # Recency factor: recently reinforced lessons score higher
+            days = index.days_since_reinforced(lid, now)
+            # Workflows decay slower in scoring (divide by 60 instead of 30)
+            recency_divisor = 60.0 if ltype == "workflow" else 30.0
+            recency = 1.0 / (1.0 + days / recency_divisor)
 
-        ltype = les.get("type", "tactical")
-
-        # Recency factor: recently reinforced lessons score higher
-        days = _days_since(les.get("last_reinforced", les.get("last_seen", "")))
-        # Workflows decay slower in scoring (divide by 60 instead of 30)
-        recency_divisor = 60.0 if ltype == "workflow" else 30.0
-        recency = 1.0 / (1.0 + days / recency_divisor)
-
-        # Relevance factor: match against tags + pattern + lesson text
-        if task_tokens:
-            les_tokens = set()
-            for tag in les.get("tags", []):
-                les_tokens.update(_tokenize(tag))
-            les_tokens.update(_tokenize(les.get("pattern", "")))
-            les_tokens.update(_tokenize(les.get("lesson", "")))
-            if les_tokens:
+            # Relevance factor: match against tags + pattern + lesson text
+            les_tokens = index.relevance_tokens(lid)
+            if not task_tokens or not les_tokens:
+                relevance = 0.5
+            elif lid in candidates:
                 # Bidirectional: check both directions of overlap
-                overlap_forward = len(task_tokens & les_tokens) / max(1, len(task_tokens))
-                overlap_backward = len(task_tokens & les_tokens) / max(1, len(les_tokens))
+                shared = len(task_tokens & les_tokens)
+                overlap_forward = shared / max(1, len(task_tokens))
+                overlap_backward = shared / max(1, len(les_tokens))
                 overlap = max(overlap_forward, overlap_backward)
                 relevance = 0.3 + 0.7 * min(1.0, overlap)
             else:
-                relevance = 0.5
-        else:
-            relevance = 0.5
+                relevance = 0.3
 
-        # Occurrence boost (more observations = more reliable)
-        occ_boost = min(1.0, 0.7 + 0.06 * les.get("occurrences", 1))
+            # Occurrence boost (more observations = more reliable)
+            occ_boost = min(1.0, 0.7 + 0.06 * les.get("occurrences", 1))
 
-        # Type boost: workflows are more valuable
-        type_boost = 1.5 if ltype == "workflow" else 1.0
+            # Type boost: workflows are more valuable
+            type_boost = 1.5 if ltype == "workflow" else 1.0
 
-        # User-explicit lessons always rank high
-        source_boost = 1.3 if les.get("source") in ("user_correction", "explicit") else 1.0
+            # User-explicit lessons always rank high
+            source_boost = 1.3 if les.get("source") in ("user_correction", "explicit") else 1.0
 
-        score = confidence * recency * relevance * occ_boost * type_boost * source_boost
+            score = confidence * recency * relevance * occ_boost * type_boost * source_boost
 
-        if ltype == "workflow":
-            scored_workflows.append((score, les))
-        else:
-            scored_other.append((score, les))
+            if ltype == "workflow":
+                scored_workflows.append((score, les))
+            else:
+                scored_other.append((score, les))
 
-    # Sort each pool by score
-    scored_workflows.sort(key=lambda x: x[0], reverse=True)
-    scored_other.sort(key=lambda x: x[0], reverse=True)
+        # Sort each pool by score
+        scored_workflows.sort(key=lambda x: x[0], reverse=True)
+        scored_other.sort(key=lambda x: x[0], reverse=True)
 
-    # Reserve dedicated slots for workflows, fill rest with tactical/preference
-    result = []
-    workflow_count = min(MAX_INJECTION_WORKFLOWS, len(scored_workflows))
-    for _, les in scored_workflows[:workflow_count]:
-        result.append(les)
+        # Reserve dedicated slots for workflows, fill rest with tactical/preference
+        # (copies, so callers can't mutate the cached index)
+        result = []
+        workflow_count = min(MAX_INJECTION_WORKFLOWS, len(scored_workflows))
+        for _, les in scored_workflows[:workflow_count]:
+            result.append(dict(les))
 
-    remaining_slots = limit - len(result)
-    for _, les in scored_other[:remaining_slots]:
-        result.append(les)
+        remaining_slots = limit - len(result)
+        for _, les in scored_other[:remaining_slots]:
+            result.append(dict(les))
 
     return result
 
@@ -868,18 +1146,18 @@ def add_explicit_lesson(
     # store_lessons handles dedup and persistence
     store_lessons([entry])
 
-    # Re-load to get the actual stored entry (may have been merged)
+    # Look up the actual stored entry (may have been merged)
     with _lock:
-        data = _load_lessons_file()
-    for les in data.get("lessons", []):
-        if les.get("pattern") == pattern[:200]:
-            # Ensure user corrections have high confidence
-            if les.get("source") != "user_correction":
-                les["source"] = "user_correction"
-                les["confidence"] = max(les.get("confidence", 0.5), 1.0)
-                with _lock:
-                    _save_lessons_file(data)
-            return les
+        index = _store.index()
+        for les in index.ordered():
+            if les.get("pattern") == pattern[:200]:
+                # Ensure user corrections have high confidence
+                if les.get("source") != "user_correction":
+                    les["source"] = "user_correction"
+                    les["confidence"] = max(les.get("confidence", 0.5), 1.0)
+                    index.put(les)
+                    _store.commit(put=[les])
+                return dict(les)
 
     return entry
 
@@ -889,65 +1167,104 @@ def decay_lessons() -> int:
     Decay old lessons that haven't been reinforced recently.
 
     Called periodically (e.g., on lessons load or daily).
-    - Lessons not reinforced in 60+ days: confidence -= 0.1
-    - Lessons with confidence < 0.2: deleted
+    - Lessons not reinforced in 90+ days: confidence -= 0.05
+    - Lessons with confidence < 0.15: deleted
 
     Returns:
         Number of lessons decayed or removed
     """
     with _lock:
-        data = _load_lessons_file()
-        lessons = data.get("lessons", [])
-
-        if not lessons:
+        index = _store.index()
+        if not index.lessons:
             return 0
 
-        decayed = 0
-        to_keep = []
+        now = time.time()
+        decayed = []
+        removed = []
 
-        for les in lessons:
+        for lid, les in list(index.lessons.items()):
             # User-sourced lessons never decay
             if les.get("source") in ("user_correction", "explicit"):
-                to_keep.append(les)
                 continue
 
-            days = _days_since(les.get("last_reinforced", les.get("last_seen", "")))
-
-            if days > DECAY_AFTER_DAYS:
+            if index.days_since_reinforced(lid, now) > DECAY_AFTER_DAYS:
                 # Workflow lessons decay at half the rate
                 decay = DECAY_AMOUNT * 0.5 if les.get("type") == "workflow" else DECAY_AMOUNT
                 les["confidence"] = max(0.0, les.get("confidence", 0.5) - decay)
-                decayed += 1
 
                 if les["confidence"] < MIN_CONFIDENCE:
                     logger.info(f"[LESSONS] Removing decayed lesson: {les.get('pattern', '?')[:60]}...")
-                    continue  # Don't keep it
+                    index.remove(lid)
+                    removed.append(lid)
+                else:
+                    decayed.append(les)
 
-            to_keep.append(les)
+        if decayed or removed:
+            _store.commit(put=decayed, delete=removed)
+            logger.info(f"[LESSONS] Decay pass: {len(decayed) + len(removed)} decayed, {len(removed)} removed")
 
-        removed = len(lessons) - len(to_keep)
-        if decayed > 0 or removed > 0:
-            data["lessons"] = to_keep
-            _save_lessons_file(data)
-            logger.info(f"[LESSONS] Decay pass: {decayed} decayed, {removed} removed")
+        return len(decayed) + 2 * len(removed)
 
-        return decayed + removed
+
+def _lsh_groups(index: _LessonIndex, ids: List[str]) -> List[List[str]]:
+    """
+    Near-duplicate groups (Jaccard > DEDUP_TOKEN_OVERLAP_THRESHOLD, same type)
+    among `ids`. MinHash band buckets propose candidate pairs; each pair is
+    verified against the exact token sets, then joined with union-find.
+    """
+    buckets: Dict[Tuple, List[str]] = {}
+    for lid in ids:
+        mh = index.minhash(lid)
+        if not mh:
+            continue
+        ltype = index.lessons[lid].get("type", "tactical")
+        for band in range(_MINHASH_BANDS):
+            key = (ltype, band, mh[band * _MINHASH_ROWS:(band + 1) * _MINHASH_ROWS])
+            buckets.setdefault(key, []).append(lid)
+
+    parent = {lid: lid for lid in ids}
+
+    def find(x: str) -> str:
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    checked = set()
+    for members in buckets.values():
+        for i in range(len(members)):
+            for j in range(i + 1, len(members)):
+                a, b = members[i], members[j]
+                pair = (a, b) if a < b else (b, a)
+                if pair in checked:
+                    continue
+                checked.add(pair)
+                if find(a) != find(b) and index.jaccard(a, b) > DEDUP_TOKEN_OVERLAP_THRESHOLD:
+                    parent[find(a)] = find(b)
+
+    groups: Dict[str, List[str]] = {}
+    for lid in ids:
+        groups.setdefault(find(lid), []).append(lid)
+    return list(groups.values())
 
 
 def consolidate_lessons() -> int:
     """
     Merge near-duplicate lessons that slipped past the per-insert dedup.
-    Groups by core signature, keeps the one with highest confidence,
-    and sums occurrences.
+    Groups by core signature, then by MinHash/LSH buckets for lessons with
+    no usable signature, keeps the one with highest confidence, and sums
+    occurrences.
+
+    Skipped when nothing changed since the last pass.
 
     Returns:
         Number of lessons removed by merging
     """
     with _lock:
-        data = _load_lessons_file()
-        lessons = data.get("lessons", [])
-        if len(lessons) < 2:
+        index = _store.index()
+        if len(index.lessons) < 2 or index.consolidated_generation == index.generation:
             return 0
+        before = len(index.lessons)
 
         def _merge_group(group: List[Dict]) -> Tuple[Dict, int]:
             """Merge a group of lessons, keeping the best one."""
@@ -960,69 +1277,77 @@ def consolidate_lessons() -> int:
             best["occurrences"] = total_occ
             best["confidence"] = min(1.0, best.get("confidence", 0.5) + 0.05 * (len(group) - 1))
             best["tags"] = list(all_tags)
+            for g in group[1:]:
+                index.remove(g["id"])
+                removed.append(g["id"])
+            index.put(best)
+            changed[best["id"]] = best
             return best, len(group) - 1
 
+        changed: Dict[str, Dict] = {}
+        removed: List[str] = []
+
         # Pass 1: Group by exact core signature (tool:action:error_category)
         groups: Dict[str, List[Dict]] = {}
-        ungrouped = []
-        for les in lessons:
-            sig = _extract_core_signature(les.get("pattern", ""), les.get("tags", []))
-            if sig and len(sig) > 3:
+        ungrouped: Dict[str, None] = {}   # ordered set of ids no signature pass can group
+        for lid, les in index.lessons.items():
+            sig = index.signature(lid)
+            if _is_usable_signature(sig):
                 groups.setdefault(sig, []).append(les)
             else:
-                ungrouped.append(les)
+                ungrouped[lid] = None
 
-        pass1 = []
         merges = 0
         for sig, group in groups.items():
-            if len(group) == 1:
-                pass1.append(group[0])
-            else:
-                best, m = _merge_group(group)
-                pass1.append(best)
+            if len(group) > 1:
+                _, m = _merge_group(group)
                 merges += m
                 logger.info(f"[LESSONS] Pass 1 merged {len(group)} → 1: {sig}")
 
         # Pass 2: Group by tool:error_category (ignoring action)
         # e.g., desktop:send_keys:missing_arg + desktop:wait:missing_arg → same root lesson
         broad_groups: Dict[str, List[Dict]] = {}
-        ungrouped2 = []
-        for les in pass1:
-            sig = _extract_core_signature(les.get("pattern", ""), les.get("tags", []))
-            parts = sig.split(":")
+        for lid, les in index.lessons.items():
+            parts = index.signature(lid).split(":")
             if len(parts) == 3 and parts[0] and parts[2]:
                 broad_key = f"{parts[0]}:*:{parts[2]}"
                 broad_groups.setdefault(broad_key, []).append(les)
             else:
-                ungrouped2.append(les)
+                ungrouped[lid] = None
 
-        merged = []
         for bkey, group in broad_groups.items():
-            if len(group) == 1:
-                merged.append(group[0])
-            else:
-                best, m = _merge_group(group)
-                merged.append(best)
+            if len(group) > 1:
+                _, m = _merge_group(group)
                 merges += m
                 logger.info(f"[LESSONS] Pass 2 merged {len(group)} → 1: {bkey}")
 
-        merged.extend(ungrouped)
-        merged.extend(ungrouped2)
+        # Pass 3: Lessons no signature could group — MinHash/LSH on pattern + lesson text
+        for group_ids in _lsh_groups(index, [lid for lid in ungrouped if lid in index.lessons]):
+            if len(group_ids) > 1:
+                group = [index.lessons[lid] for lid in group_ids]
+                best, m = _merge_group(group)
+                merges += m
+                logger.info(f"[LESSONS] Pass 3 merged {len(group)} → 1: {best.get('pattern', '?')[:60]}")
 
         if merges > 0:
-            data["lessons"] = merged
-            _save_lessons_file(data)
-            logger.info(f"[LESSONS] Consolidation removed {merges} duplicate lessons ({len(lessons)} → {len(merged)})")
+            for lid in removed:
+                changed.pop(lid, None)
+            _store.commit(put=list(changed.values()), delete=removed)
+            logger.info(f"[LESSONS] Consolidation removed {merges} duplicate lessons ({before} → {len(index.lessons)})")
 
+        index.consolidated_generation = index.generation
         return merges
 
 
-def get_lessons_stats() -> Dict:
-    """Get statistics about the lessons store."""
+def get_all_lessons() -> List[Dict]:
+    """All stored lessons (snapshot + pending log), as lessons.json would hold them."""
     with _lock:
-        data = _load_lessons_file()
+        return [dict(les) for les in _store.index().ordered()]
+
 
-    lessons = data.get("lessons", [])
+def get_lessons_stats() -> Dict:
+    """Get statistics about the lessons store."""
+    lessons = get_all_lessons()
     if not lessons:
         return {"total": 0}
 
@@ -1048,9 +1373,11 @@ def clear_all_lessons() -> bool:
     """Clear all lessons (use with caution)."""
     with _lock:
         try:
-            if os.path.isfile(_LESSONS_FILE):
-                os.remove(_LESSONS_FILE)
-                logger.info("[LESSONS] All lessons cleared")
+            for path in (_LESSONS_FILE, _LESSONS_LOG):
+                if os.path.isfile(path):
+                    os.remove(path)
+            _store.reset()
+            logger.info("[LESSONS] All lessons cleared")
             return True
         except Exception as e:
             logger.error(f"[LESSONS] Failed to clear lessons: {e}")
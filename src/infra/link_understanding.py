@@ -51,6 +51,7 @@ class LinkResult:
     text: Optional[str] = None
     error: Optional[str] = None
     fetch_ms: int = 0
+    cached: bool = False
 
 
 def extract_urls(text: str) -> List[str]:
@@ -90,32 +91,29 @@ def _fetch_url_content(url: str) -> LinkResult:
     result = LinkResult(url=url)
     
     try:
-        import requests
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
-            'Accept-Language': 'en-US,en;q=0.5',
-        }
-        
-        resp = requests.get(url, headers=headers, timeout=FETCH_TIMEOUT_SECONDS, allow_redirects=True)
-        resp.raise_for_status()
+        from .fetch_cache import fetch, cached_extract
+
+        resp = fetch(url, timeout=FETCH_TIMEOUT_SECONDS)
+        result.cached = resp.source != "network"
         
-        content_type = resp.headers.get('content-type', '')
+        content_type = resp.content_type.lower()
         
         # Only process HTML/text content
         if 'text/html' in content_type or 'text/plain' in content_type or 'application/json' in content_type:
-            raw_text = resp.text
-            
             if 'application/json' in content_type:
                 # JSON — just truncate
                 result.title = f"JSON from {url}"
-                result.text = raw_text[:MAX_CONTENT_CHARS]
+                result.text = resp.text[:MAX_CONTENT_CHARS]
             elif 'text/plain' in content_type:
                 result.title = url
-                result.text = raw_text[:MAX_CONTENT_CHARS]
+                result.text = resp.text[:MAX_CONTENT_CHARS]
             else:
-                # HTML — extract readable text
-                result.title, result.text = _extract_html_content(raw_text, url)
+                # HTML — extract readable text (parsed once per page version)
+                page = cached_extract(
+                    resp, "link_understanding",
+                    lambda html: dict(zip(("title", "text"), _extract_html_content(html, url))),
+                )
+                result.title, result.text = page["title"], page["text"]
         else:
             result.error = f"Non-text content type: {content_type}"
             
@@ -226,7 +224,7 @@ def process_message_links(message: str) -> Optional[str]:
         
         title_str = f" — {r.title}" if r.title else ""
         parts.append(f"[Content from {r.url}{title_str} ({r.fetch_ms}ms)]\n{r.text}")
-        logger.info(f"[LINK] Extracted {len(r.text)} chars from {r.url} ({r.fetch_ms}ms)")
+        logger.info(f"[LINK] Extracted {len(r.text)} chars from {r.url} ({r.fetch_ms}ms{', cached' if r.cached else ''})")
     
     if not parts:
         return None
@@ -0,0 +1,166 @@
+"""
+Message Feed — Indexed ring buffer behind /api/messages polling.
+
+Every frontend message is appended with a monotonically increasing idx.
+WebUI and mobile clients poll with ?since=<last idx seen>. The feed is a
+fixed-capacity ring, so appends are O(1) (no list shifting when trimming)
+and a `since` query is a binary search over the retained idx range plus a
+slice of exactly the entries returned — no scan over the whole feed.
+
+- Long-poll: since(..., wait=s) blocks until an entry newer than `since`
+  arrives or the wait expires, so idle clients stop hammering the endpoint
+- Optional per-session partitions: an entry appended with a session key is
+  also indexed in that session's own ring, and since(session=...) queries
+  only that ring, so one session's clients don't pay for another's traffic.
+  The global feed (session=None) still sees everything
+- A client whose `since` is ahead of the feed (server restarted) gets the
+  current index back immediately instead of waiting
+
+Usage:
+    from src.infra.message_feed import MessageFeed
+
+    feed = MessageFeed(capacity=500)
+    idx = feed.append({"status": "done", "result": "hi"}, session="main")
+    items, latest = feed.since(idx - 1)                 # [{idx, ts, message}], idx
+    items, latest = feed.since(latest, wait=25)         # long-poll
+    items, latest = feed.since(0, session="main")
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+DEFAULT_CAPACITY = 500
+SESSION_CAPACITY = 200      # Entries kept per session partition
+MAX_SESSIONS = 64           # Least recently written partitions beyond this are dropped
+MAX_WAIT_SECONDS = 30.0
+
+
+class _Ring:
+    """Fixed-capacity ring of feed entries with strictly increasing idx."""
+
+    __slots__ = ('capacity', '_slots', '_start', '_count')
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self._slots: List[Optional[Dict[str, Any]]] = [None] * capacity
+        self._start = 0          # slot of the oldest entry
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _at(self, pos: int) -> Dict[str, Any]:
+        return self._slots[(self._start + pos) % self.capacity]
+
+    def append(self, entry: Dict[str, Any]):
+        if self._count < self.capacity:
+            self._slots[(self._start + self._count) % self.capacity] = entry
+            self._count += 1
+        else:
+            self._slots[self._start] = entry       # overwrite the oldest
+            self._start = (self._start + 1) % self.capacity
+
+    def last_idx(self) -> int:
+        return self._at(self._count - 1)['idx']
+
+    def first_after(self, idx: int) -> int:
+        """Position of the first entry with entry['idx'] > idx (binary search)."""
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._at(mid)['idx'] <= idx:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def slice(self, pos: int, end: Optional[int] = None) -> List[Dict[str, Any]]:
+        end = self._count if end is None else min(end, self._count)
+        if pos >= end:
+            return []
+        a = (self._start + pos) % self.capacity
+        b = (self._start + end) % self.capacity
+        if a < b:
+            return self._slots[a:b]
+        return self._slots[a:] + self._slots[:b]
+
+
+class MessageFeed:
+    """Thread-safe ring-buffered message feed with long-poll support."""
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY, session_capacity: int = SESSION_CAPACITY):
+        self.capacity = capacity
+        self.session_capacity = session_capacity
+        self._ring = _Ring(capacity)
+        self._sessions: "OrderedDict[str, _Ring]" = OrderedDict()
+        self._latest = 0
+        self._cond = threading.Condition(threading.Lock())
+
+    @property
+    def latest(self) -> int:
+        return self._latest
+
+    def __len__(self) -> int:
+        return len(self._ring)
+
+    def append(self, message: Dict[str, Any], session: Optional[str] = None) -> int:
+        """Add a message; returns its idx. Wakes any waiting pollers."""
+        with self._cond:
+            self._latest += 1
+            entry = {"idx": self._latest, "ts": time.time(), "message": message}
+            self._ring.append(entry)
+            if session:
+                ring = self._sessions.get(session)
+                if ring is None:
+                    ring = self._sessions[session] = _Ring(self.session_capacity)
+                    if len(self._sessions) > MAX_SESSIONS:
+                        self._sessions.popitem(last=False)
+                else:
+                    self._sessions.move_to_end(session)
+                ring.append(entry)
+            self._cond.notify_all()
+            return self._latest
+
+    def since(self, since: int, limit: Optional[int] = None, session: Optional[str] = None,
+              wait: float = 0) -> Tuple[List[Dict[str, Any]], int]:
+        """Entries with idx > since (oldest first) and the current latest idx.
+
+        `limit` keeps only the newest `limit` entries. With `wait` > 0 the
+        call blocks (up to MAX_WAIT_SECONDS) until something newer arrives.
+        """
+        with self._cond:
+            ring = self._ring if session is None else self._sessions.get(session)
+            if wait > 0 and since <= self._latest and not self._has_after(ring, since):
+                deadline = time.monotonic() + min(wait, MAX_WAIT_SECONDS)
+                while True:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0 or not self._cond.wait(remaining):
+                        break
+                    ring = self._ring if session is None else self._sessions.get(session)
+                    if self._has_after(ring, since):
+                        break
+            if ring is None:
+                return [], self._latest
+            pos = ring.first_after(since)
+            if limit is not None and len(ring) - pos > limit:
+                pos = len(ring) - limit
+            return ring.slice(pos), self._latest
+
+    @staticmethod
+    def _has_after(ring: Optional[_Ring], since: int) -> bool:
+        return ring is not None and len(ring) > 0 and ring.last_idx() > since
+
+    def tail(self, n: int) -> List[Dict[str, Any]]:
+        with self._cond:
+            return self._ring.slice(max(0, len(self._ring) - n))
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._cond:
+            return {
+                "index": self._latest,
+                "entries": len(self._ring),
+                "capacity": self.capacity,
+                "sessions": {k: len(r) for k, r in self._sessions.items()},
+            }
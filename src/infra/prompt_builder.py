@@ -14,13 +14,19 @@ Sections:
 - Circuits / Silent replies
 - Project Context (auto-loaded .md files)
 - Runtime info
+
+File-backed sections (identity, skills, macros, project context) are
+memoized under a fingerprint of the files they read (path, mtime, size),
+so an unchanged workspace rebuilds only the runtime section per call.
+SkillWatcher changes call invalidate_prompt_cache("skills").
 """
 
 import os
 import re
 import platform
 import logging
-from typing import Dict, Any, List, Optional
+import threading
+from typing import Dict, Any, List, Optional, Tuple
 
 logger = logging.getLogger(__name__)
 
@@ -206,6 +212,105 @@ def _parse_frontmatter(text: str) -> Dict[str, str]:
     return fm
 
 
+# ─── Section cache ────────────────────────────────────────────────────
+
+_section_cache: Dict[str, Tuple[Any, Any]] = {}   # section -> (fingerprint, value)
+_cache_lock = threading.Lock()
+_cache_stats = {"hits": 0, "misses": 0, "invalidations": 0}
+_skills_generation = 0  # bumped by SkillWatcher via invalidate_prompt_cache()
+
+
+def _stat_key(path: Optional[str]) -> Optional[Tuple[int, int]]:
+    if not path:
+        return None
+    try:
+        st = os.stat(path)
+        return (st.st_mtime_ns, st.st_size)
+    except OSError:
+        return None
+
+
+def _dir_fingerprint(path: Optional[str], suffixes: Tuple[str, ...], per_file: bool = True):
+    """Fingerprint a directory: its own stat, plus every matching file's unless trusted.
+
+    Creating or deleting a file changes the directory mtime, but editing one
+    in place doesn't — so per-file stats are needed unless a watcher covers it.
+    """
+    dir_key = _stat_key(path)
+    if dir_key is None or not per_file:
+        return (path, dir_key)
+    entries = []
+    try:
+        with os.scandir(path) as it:
+            for entry in it:
+                if entry.name.endswith(suffixes):
+                    st = entry.stat()
+                    entries.append((entry.name, st.st_mtime_ns, st.st_size))
+    except OSError:
+        pass
+    entries.sort()
+    return (path, dir_key, tuple(entries))
+
+
+def _user_file_fingerprint(filename: str):
+    """Fingerprint every location _load_file() may read a file from."""
+    user_data = _get_user_data_dir()
+    return tuple(_stat_key(p) for p in (
+        os.path.join(user_data, filename) if user_data else None,
+        os.path.join(SOMA, filename),
+        os.path.join(SOMA, "installer", "templates", filename),
+    ))
+
+
+def _skills_fingerprint():
+    user_data = _get_user_data_dir()
+    dirs = [os.path.join(user_data, "skills") if user_data else None,
+            os.path.join(SOMA, "skills")]
+    try:
+        from src.infra.skill_watcher import get_skill_watcher
+        watcher = get_skill_watcher()
+    except Exception:
+        watcher = None
+    parts = []
+    for d in dirs:
+        trusted = bool(d and watcher and watcher.watches(d))
+        parts.append(_dir_fingerprint(d, (".md",), per_file=not trusted))
+    return (_skills_generation, tuple(parts))
+
+
+def _memoized(section: str, fingerprint, build):
+    """Return the cached value for a section, rebuilding it if its fingerprint changed."""
+    with _cache_lock:
+        cached = _section_cache.get(section)
+        if cached is not None and cached[0] == fingerprint:
+            _cache_stats["hits"] += 1
+            return cached[1]
+    value = build()
+    with _cache_lock:
+        _section_cache[section] = (fingerprint, value)
+        _cache_stats["misses"] += 1
+    return value
+
+
+def invalidate_prompt_cache(section: Optional[str] = None) -> None:
+    """Drop memoized prompt sections ("identity", "skills", "macros", "context:<mode>"), or all."""
+    global _skills_generation
+    with _cache_lock:
+        if section is None:
+            _section_cache.clear()
+        else:
+            _section_cache.pop(section, None)
+        if section in (None, "skills"):
+            _skills_generation += 1
+        _cache_stats["invalidations"] += 1
+
+
+def get_prompt_cache_stats() -> Dict[str, Any]:
+    """Hit/miss counters and currently cached sections."""
+    with _cache_lock:
+        return {**_cache_stats, "sections": sorted(_section_cache)}
+
+
 # ─── Section builders ─────────────────────────────────────────────────
 
 def _build_identity_section(substrate_content: Optional[str]) -> List[str]:
@@ -238,14 +343,14 @@ def _build_tooling_section(tool_registry=None) -> List[str]:
             schemas = tool_registry.get_schemas_for_llm()
             if schemas:
                 # Group tools by category based on name prefix
+                descriptions: Dict[str, str] = {}
+                for s in schemas:
+                    func = s.get('function', {})
+                    descriptions.setdefault(func.get('name', ''), func.get('description', '')[:80])
                 tool_names = sorted(s.get('function', {}).get('name', '') for s in schemas)
                 lines.append(f"Available tools ({len(tool_names)}):")
                 for name in tool_names:
-                    desc = ""
-                    for s in schemas:
-                        if s.get('function', {}).get('name') == name:
-                            desc = s.get('function', {}).get('description', '')[:80]
-                            break
+                    desc = descriptions.get(name, "")
                     if desc:
                         lines.append(f"- {name}: {desc}")
                     else:
@@ -594,6 +699,11 @@ def _build_runtime_section(config: Optional[Dict[str, Any]] = None) -> List[str]
 
 # ─── Main builder ─────────────────────────────────────────────────────
 
+def _counted(build_section, items) -> Tuple[List[str], int]:
+    """Build a section and keep the item count (for the summary log line)."""
+    return build_section(items), len(items or "")
+
+
 def build_system_prompt(
     config: Optional[Dict[str, Any]] = None,
     tool_registry=None,
@@ -629,17 +739,26 @@ def build_system_prompt(
         workspace_dir = os.path.join(SOMA, "workspace")
 
     # Load SUBSTRATE.md
-    substrate_content = _load_substrate()
+    identity = _memoized(
+        "identity", _user_file_fingerprint("SUBSTRATE.md"),
+        lambda: _counted(_build_identity_section, _load_substrate()),
+    )
 
     # Scan skills and macros
-    skills = _scan_skills() if include_skills else []
-    macros = _scan_macros() if include_skills else []
+    skills_section, skill_count = _memoized(
+        "skills", _skills_fingerprint(),
+        lambda: _counted(_build_skills_section, _scan_skills()),
+    ) if include_skills else ([], 0)
+    macros_section, macro_count = _memoized(
+        "macros", _dir_fingerprint(os.path.join(SOMA, "macros"), (".py", ".ps1")),
+        lambda: _counted(_build_macros_section, _scan_macros()),
+    ) if include_skills else ([], 0)
 
     # Assemble sections
     sections: List[str] = []
 
     # 1. Identity (SUBSTRATE.md or fallback)
-    sections.extend(_build_identity_section(substrate_content))
+    sections.extend(identity[0])
 
     # 2. Tooling (dynamic)
     if include_tools:
@@ -647,12 +766,10 @@ def build_system_prompt(
         sections.extend(_build_tool_style_section(chat_mode=chat_mode))
 
     # 3. Macros (deterministic scripts — checked before skills)
-    if macros:
-        sections.extend(_build_macros_section(macros))
+    sections.extend(macros_section)
 
     # 4. Skills (open-ended workflows)
-    if skills:
-        sections.extend(_build_skills_section(skills))
+    sections.extend(skills_section)
 
     # 5. Memory recall
     if include_memory:
@@ -666,12 +783,24 @@ def build_system_prompt(
         sections.extend(_build_circuits_section())
 
     # 8. Project Context (auto-loaded files)
-    context_lines = _build_context_files_section(chat_mode=chat_mode)
+    context_lines = _memoized(
+        f"context:{chat_mode}",
+        tuple(_user_file_fingerprint(f) for f in CONTEXT_FILES if f != "SUBSTRATE.md"),
+        lambda: _build_context_files_section(chat_mode=chat_mode),
+    )
     if context_lines:
         sections.append("# Project Context")
         sections.append("")
         sections.extend(context_lines)
 
+    # Everything above is stable across rounds and runs; everything below
+    # (CURRENT_TIME, custom instructions) is not. Providers cache this head.
+    try:
+        from src.infra.prompt_cache import register_static_prefix
+        register_static_prefix("\n".join(sections))
+    except Exception as e:
+        logger.debug(f"[PROMPT] Static prefix not registered: {e}")
+
     # 9. Runtime
     sections.extend(_build_runtime_section(config))
 
@@ -682,9 +811,9 @@ def build_system_prompt(
 
     prompt = "\n".join(sections)
     logger.info(f"[PROMPT] Built system prompt: {len(prompt)} chars, "
-                f"substrate={'yes' if substrate_content else 'no'}, "
+                f"substrate={'yes' if identity[1] else 'no'}, "
                 f"tools={include_tools}, "
-                f"macros={len(macros)}, "
-                f"skills={len(skills)}, "
+                f"macros={macro_count}, "
+                f"skills={skill_count}, "
                 f"memory={include_memory}")
     return prompt
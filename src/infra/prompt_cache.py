@@ -0,0 +1,161 @@
+"""
+Prompt Cache — Keep the stable prompt prefix cacheable across tool rounds.
+
+Every round of a tool loop re-sends the system prompt, the tool schemas
+and the whole history. Providers can serve that prefix from cache, but
+only if it is byte-identical and (for Anthropic) explicitly marked:
+
+- `build_system_prompt` registers its static head (identity, tooling,
+  skills, workspace, project context). The runtime section (CURRENT_TIME)
+  and per-run context come after it, so they never invalidate the head.
+- Anthropic: the system prompt is split into a static block and a per-run
+  block, each with `cache_control`, plus a breakpoint on the last tool and
+  the last message so each round reads the previous round's prefix.
+  System notes injected mid-loop stay in position as user text instead of
+  being folded into `system` (which would change the cached head).
+- OpenAI: caching is automatic; `prompt_cache_key` pins it to the prefix.
+- Ollama: `keep_alive` keeps the model (and its KV prefix) loaded.
+- Usage parsers normalize cache-read / cache-write token counts so
+  `CostTracker.record` can price them.
+
+Usage:
+    from src.infra import prompt_cache
+
+    system = prompt_cache.anthropic_system_blocks(system_text)
+    prompt_cache.mark_anthropic_breakpoints(payload)
+    usage = prompt_cache.usage_from_anthropic(result['usage'])
+    # {'input_tokens': 310, 'output_tokens': 95, 'cache_read_tokens': 18211, ...}
+"""
+
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+CACHE_CONTROL = {'type': 'ephemeral'}
+DEFAULT_OLLAMA_KEEP_ALIVE = '30m'
+
+# Distinct static heads to remember (one per chat_mode / tool set in practice)
+_MAX_PREFIXES = 8
+# Shorter heads aren't worth a breakpoint (Anthropic's minimum is ~1024 tokens)
+_MIN_PREFIX_CHARS = 2048
+
+_prefixes: "OrderedDict[str, str]" = OrderedDict()   # prefix -> sha1
+_lock = threading.Lock()
+
+
+def register_static_prefix(text: str) -> None:
+    """Remember a system-prompt head that is identical across rounds and runs."""
+    if len(text) < _MIN_PREFIX_CHARS:
+        return
+    with _lock:
+        if text in _prefixes:
+            _prefixes.move_to_end(text)
+            return
+        _prefixes[text] = hashlib.sha1(text.encode('utf-8')).hexdigest()[:16]
+        while len(_prefixes) > _MAX_PREFIXES:
+            _prefixes.popitem(last=False)
+
+
+def split_static_prefix(system_text: str) -> Tuple[str, str, Optional[str]]:
+    """Split system text into (static head, per-run tail, head hash).
+
+    The head runs through the end of the longest registered prefix found
+    in the text (anything constant in front of it, like the plan-mode
+    preamble, is included). Returns ("", text, None) when nothing matches.
+    """
+    with _lock:
+        candidates = list(_prefixes.items())
+    best = None
+    for prefix, digest in candidates:
+        pos = system_text.find(prefix)
+        if pos >= 0 and (best is None or len(prefix) > best[1]):
+            best = (pos + len(prefix), len(prefix), digest)
+    if best is None:
+        return "", system_text, None
+    end = best[0]
+    return system_text[:end], system_text[end:], best[2]
+
+
+def prompt_cache_key(system_text: str) -> Optional[str]:
+    """Stable key for the static head, for providers that route by key."""
+    return split_static_prefix(system_text)[2]
+
+
+# ── Anthropic ─────────────────────────────────────────────────────
+
+def anthropic_system_blocks(system_text: str) -> List[Dict[str, Any]]:
+    """System prompt as text blocks with cache breakpoints after head and tail."""
+    head, tail, _ = split_static_prefix(system_text)
+    blocks = []
+    if head.strip():
+        blocks.append({'type': 'text', 'text': head, 'cache_control': dict(CACHE_CONTROL)})
+    if tail.strip():
+        blocks.append({'type': 'text', 'text': tail, 'cache_control': dict(CACHE_CONTROL)})
+    return blocks
+
+
+def mark_anthropic_breakpoints(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Add cache_control to the last tool and the last message block.
+
+    With the two system breakpoints that is Anthropic's maximum of four.
+    Round N+1 then reads everything round N wrote.
+    """
+    tools = payload.get('tools')
+    if tools:
+        tools[-1] = {**tools[-1], 'cache_control': dict(CACHE_CONTROL)}
+
+    messages = payload.get('messages')
+    if messages:
+        last = messages[-1]
+        content = last.get('content')
+        if isinstance(content, str):
+            content = [{'type': 'text', 'text': content}]
+        if isinstance(content, list) and content:
+            content = list(content)
+            # Thinking blocks can't carry cache_control; mark the last other block
+            for i in range(len(content) - 1, -1, -1):
+                if content[i].get('type') not in ('thinking', 'redacted_thinking'):
+                    content[i] = {**content[i], 'cache_control': dict(CACHE_CONTROL)}
+                    break
+            messages[-1] = {**last, 'content': content}
+    return payload
+
+
+# ── Usage normalization ───────────────────────────────────────────
+#
+# input_tokens is always the *uncached* input; cache reads/writes are
+# reported separately so CostTracker can price each at its own rate.
+
+def usage_from_anthropic(usage: Dict[str, Any]) -> Dict[str, int]:
+    return {
+        'input_tokens': usage.get('input_tokens', 0) or 0,
+        'output_tokens': usage.get('output_tokens', 0) or 0,
+        'cache_read_tokens': usage.get('cache_read_input_tokens', 0) or 0,
+        'cache_write_tokens': usage.get('cache_creation_input_tokens', 0) or 0,
+    }
+
+
+def usage_from_openai(usage: Dict[str, Any]) -> Dict[str, int]:
+    prompt = usage.get('prompt_tokens', 0) or 0
+    cached = (usage.get('prompt_tokens_details') or {}).get('cached_tokens', 0) or 0
+    return {
+        'input_tokens': max(0, prompt - cached),
+        'output_tokens': usage.get('completion_tokens', 0) or 0,
+        'cache_read_tokens': cached,
+        'cache_write_tokens': 0,
+    }
+
+
+def usage_from_gemini(usage_meta: Dict[str, Any]) -> Dict[str, int]:
+    prompt = usage_meta.get('promptTokenCount', 0) or 0
+    cached = usage_meta.get('cachedContentTokenCount', 0) or 0
+    return {
+        'input_tokens': max(0, prompt - cached),
+        'output_tokens': usage_meta.get('candidatesTokenCount', 0) or 0,
+        'cache_read_tokens': cached,
+        'cache_write_tokens': 0,
+    }
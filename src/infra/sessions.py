@@ -3,15 +3,17 @@ Session Management - Isolated session contexts.
 Provides:
 - Session isolation for different tasks
 - Main session vs isolated sessions (cron, subagents)
-- Session state persistence
+- Session state persistence (append-only logs + compaction snapshots)
 - Cross-session communication
 """
 
+import os
 import json
 import time
+import atexit
 import logging
 import threading
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Tuple
 from dataclasses import dataclass, field, asdict
 from pathlib import Path
 import uuid
@@ -22,6 +24,7 @@ logger = logging.getLogger(__name__)
 SOMA = Path(__file__).parent.parent.parent
 DATA_DIR = SOMA / "data"
 SESSIONS_DIR = DATA_DIR / "sessions"
+INDEX_FILE = SESSIONS_DIR / "_index.json"
 
 
 @dataclass
@@ -104,6 +107,61 @@ class Session:
         self.updated_at = time.time()
 
 
+@dataclass
+class SessionInfo:
+    """Metadata for a session, kept in memory without its message bodies."""
+    key: str
+    session_type: str = "main"
+    created_at: float = field(default_factory=time.time)
+    updated_at: float = field(default_factory=time.time)
+    parent_session: Optional[str] = None
+    message_count: int = 0
+    seq: int = 0              # last log record written
+    snapshot_seq: int = 0     # last record folded into the snapshot
+    snapshot_bytes: int = 0
+    log_bytes: int = 0
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "key": self.key,
+            "sessionType": self.session_type,
+            "createdAt": self.created_at,
+            "updatedAt": self.updated_at,
+            "parentSession": self.parent_session,
+            "messageCount": self.message_count,
+            "seq": self.seq,
+            "snapshotSeq": self.snapshot_seq,
+            "snapshotBytes": self.snapshot_bytes,
+            "logBytes": self.log_bytes,
+        }
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'SessionInfo':
+        return cls(
+            key=data["key"],
+            session_type=data.get("sessionType", "main"),
+            created_at=data.get("createdAt", time.time()),
+            updated_at=data.get("updatedAt", time.time()),
+            parent_session=data.get("parentSession"),
+            message_count=data.get("messageCount", 0),
+            seq=data.get("seq", 0),
+            snapshot_seq=data.get("snapshotSeq", 0),
+            snapshot_bytes=data.get("snapshotBytes", 0),
+            log_bytes=data.get("logBytes", 0),
+        )
+
+
+def _session_header(session: Session) -> Dict[str, Any]:
+    """Session fields other than messages, as written to log header records."""
+    return {
+        "key": session.key,
+        "sessionType": session.session_type,
+        "createdAt": session.created_at,
+        "metadata": session.metadata,
+        "parentSession": session.parent_session,
+    }
+
+
 class SessionManager:
     """
     Manages multiple isolated sessions.
@@ -113,70 +171,338 @@ class SessionManager:
     - cron:<jobId>: Isolated session for cron job execution
     - subagent:<id>: Isolated session for subagent tasks
     - isolated:<id>: Generic isolated session
+    
+    Storage, per session:
+    - <key>.jsonl: append-only log, one record per new message or header change
+    - <key>.json: compaction snapshot (the legacy whole-session format plus
+      the log sequence number it covers), rewritten every COMPACT_EVERY records
+    - _index.json: metadata for every session, so startup, list_sessions and
+      get_stats never parse message bodies. Bodies load on first get().
     """
     
+    # Fold the log into a fresh snapshot after this many appended records
+    COMPACT_EVERY = 200
+    # Minimum seconds between index rewrites (always written on shutdown)
+    INDEX_SAVE_INTERVAL = 5.0
+    
     def __init__(self, persist: bool = True):
-        self._sessions: Dict[str, Session] = {}
+        self._sessions: Dict[str, Session] = {}      # loaded bodies
+        self._info: Dict[str, SessionInfo] = {}      # every known session
+        # key -> (persisted message count, last persisted message, header json)
+        self._synced: Dict[str, Tuple[int, Optional[SessionMessage], str]] = {}
         self._lock = threading.Lock()
         self._persist = persist
+        self._index_dirty = False
+        self._index_saved_at = 0.0
+        self._stats = {"appends": 0, "compactions": 0, "lazyLoads": 0}
         
         if persist:
             self._ensure_dirs()
             self._load_sessions()
+            atexit.register(self.flush)
     
     def _ensure_dirs(self):
         """Ensure storage directories exist."""
         SESSIONS_DIR.mkdir(parents=True, exist_ok=True)
     
-    def _session_file(self, key: str) -> Path:
-        """Get file path for a session."""
+    def _file_stem(self, key: str) -> str:
         # Sanitize key for filename
-        safe_key = key.replace(":", "_").replace("/", "_")
-        return SESSIONS_DIR / f"{safe_key}.json"
+        return key.replace(":", "_").replace("/", "_")
+    
+    def _session_file(self, key: str) -> Path:
+        """Get snapshot path for a session."""
+        return SESSIONS_DIR / f"{self._file_stem(key)}.json"
+    
+    def _log_file(self, key: str) -> Path:
+        """Get append-log path for a session."""
+        return SESSIONS_DIR / f"{self._file_stem(key)}.jsonl"
+    
+    # ── Loading ──────────────────────────────────────────────────
     
     def _load_sessions(self):
-        """Load sessions from disk."""
+        """Load session metadata from the index, re-reading only stale files."""
         try:
-            for file in SESSIONS_DIR.glob("*.json"):
+            index: Dict[str, Dict[str, Any]] = {}
+            if INDEX_FILE.exists():
                 try:
-                    data = json.loads(file.read_text())
-                    session = Session.from_dict(data)
-                    self._sessions[session.key] = session
+                    index = json.loads(INDEX_FILE.read_text()).get("sessions", {})
                 except Exception as e:
-                    logger.warning(f"Error loading session {file}: {e}")
+                    logger.warning(f"Session index unreadable, rebuilding: {e}")
+            
+            sizes: Dict[str, Dict[str, int]] = {}
+            for file in SESSIONS_DIR.iterdir():
+                if file.name.startswith("_") or file.suffix not in (".json", ".jsonl"):
+                    continue
+                sizes.setdefault(file.stem, {})[file.suffix] = file.stat().st_size
             
-            logger.info(f"Loaded {len(self._sessions)} sessions")
+            rescanned = 0
+            seen_stems = set()
+            for key, data in index.items():
+                stem = self._file_stem(key)
+                on_disk = sizes.get(stem)
+                if not on_disk:
+                    continue
+                seen_stems.add(stem)
+                info = SessionInfo.from_dict(data)
+                if (on_disk.get(".json", 0) == info.snapshot_bytes
+                        and on_disk.get(".jsonl", 0) == info.log_bytes):
+                    self._info[key] = info
+                    continue
+                if self._rescan(key):
+                    rescanned += 1
+            
+            # Files the index doesn't know about: legacy sessions or a lost index
+            for stem, on_disk in sizes.items():
+                if stem in seen_stems:
+                    continue
+                key = self._key_from_files(stem, on_disk)
+                if key and key not in self._info and self._rescan(key):
+                    rescanned += 1
+            
+            if rescanned:
+                self._index_dirty = True
+                self._save_index(force=True)
+            logger.info(f"Loaded {len(self._info)} sessions ({rescanned} re-read from disk)")
         except Exception as e:
             logger.error(f"Error loading sessions: {e}")
     
+    def _key_from_files(self, stem: str, on_disk: Dict[str, int]) -> Optional[str]:
+        """Recover the real session key (file names are sanitized)."""
+        try:
+            if ".json" in on_disk:
+                return json.loads((SESSIONS_DIR / f"{stem}.json").read_text())["key"]
+            with open(SESSIONS_DIR / f"{stem}.jsonl", "r", encoding="utf-8") as f:
+                for line in f:
+                    record = json.loads(line)
+                    if record.get("op") == "h":
+                        return record["key"]
+        except Exception as e:
+            logger.warning(f"Error reading session files for {stem}: {e}")
+        return None
+    
+    def _rescan(self, key: str) -> bool:
+        """Rebuild a session's metadata from its files (body is not kept)."""
+        session, info = self._read_session(key)
+        if session is None:
+            return False
+        self._info[key] = info
+        return True
+    
+    def _read_session(self, key: str) -> Tuple[Optional[Session], Optional[SessionInfo]]:
+        """Load snapshot + replay the log. Truncates a torn trailing record."""
+        snapshot = self._session_file(key)
+        log = self._log_file(key)
+        session: Optional[Session] = None
+        snapshot_seq = 0
+        seq = 0
+        
+        try:
+            if snapshot.exists():
+                data = json.loads(snapshot.read_text())
+                session = Session.from_dict(data)
+                snapshot_seq = seq = data.get("seq", 0)
+        except Exception as e:
+            logger.warning(f"Error loading session snapshot {snapshot}: {e}")
+        
+        if log.exists():
+            good_bytes = 0
+            try:
+                with open(log, "rb") as f:
+                    for raw in f:
+                        try:
+                            if not raw.endswith(b"\n"):
+                                raise ValueError("torn record")
+                            record = json.loads(raw)
+                        except ValueError:
+                            logger.warning(f"Truncating torn record in {log.name} at byte {good_bytes}")
+                            break
+                        good_bytes += len(raw)
+                        rec_seq = record.get("seq", 0)
+                        if rec_seq <= snapshot_seq:
+                            continue  # already folded into the snapshot
+                        seq = rec_seq
+                        session = self._apply_record(session, record)
+                if good_bytes < log.stat().st_size:
+                    with open(log, "r+b") as f:
+                        f.truncate(good_bytes)
+            except Exception as e:
+                logger.warning(f"Error replaying session log {log}: {e}")
+        
+        if session is None:
+            return None, None
+        
+        info = SessionInfo(
+            key=session.key,
+            session_type=session.session_type,
+            created_at=session.created_at,
+            updated_at=session.updated_at,
+            parent_session=session.parent_session,
+            message_count=len(session.messages),
+            seq=seq,
+            snapshot_seq=snapshot_seq,
+            snapshot_bytes=snapshot.stat().st_size if snapshot.exists() else 0,
+            log_bytes=log.stat().st_size if log.exists() else 0,
+        )
+        return session, info
+    
+    @staticmethod
+    def _apply_record(session: Optional[Session], record: Dict[str, Any]) -> Optional[Session]:
+        op = record.get("op")
+        if op == "h":
+            if session is None:
+                session = Session.from_dict(record)
+            else:
+                session.session_type = record.get("sessionType", session.session_type)
+                session.metadata = record.get("metadata", session.metadata)
+                session.parent_session = record.get("parentSession", session.parent_session)
+            session.updated_at = max(session.updated_at, record.get("updatedAt", 0))
+        elif op == "m" and session is not None:
+            msg = SessionMessage.from_dict(record)
+            session.messages.append(msg)
+            session.updated_at = max(session.updated_at, msg.timestamp)
+        return session
+    
+    def _ensure_loaded(self, key: str) -> Optional[Session]:
+        """Return the session body, reading it from disk on first access."""
+        session = self._sessions.get(key)
+        if session is not None or key not in self._info:
+            return session
+        if not self._persist:
+            return None
+        session, info = self._read_session(key)
+        if session is None:
+            return None
+        self._sessions[key] = session
+        self._info[key] = info
+        self._mark_synced(session)
+        self._stats["lazyLoads"] += 1
+        return session
+    
+    # ── Writing ──────────────────────────────────────────────────
+    
+    def _mark_synced(self, session: Session):
+        last = session.messages[-1] if session.messages else None
+        self._synced[session.key] = (
+            len(session.messages), last, json.dumps(_session_header(session), sort_keys=True)
+        )
+    
+    def _refresh_info(self, session: Session) -> SessionInfo:
+        info = self._info.get(session.key)
+        if info is None:
+            info = SessionInfo(key=session.key)
+            self._info[session.key] = info
+        info.session_type = session.session_type
+        info.created_at = session.created_at
+        info.updated_at = session.updated_at
+        info.parent_session = session.parent_session
+        info.message_count = len(session.messages)
+        self._index_dirty = True
+        return info
+    
     def _save_session(self, session: Session):
-        """Save a session to disk."""
+        """Persist a session: append what changed, or snapshot if history was rewritten."""
+        info = self._refresh_info(session)
         if not self._persist:
+            self._mark_synced(session)
             return
         
         try:
-            self._ensure_dirs()
-            file = self._session_file(session.key)
-            file.write_text(json.dumps(session.to_dict(), indent=2))
+            count, last, header = self._synced.get(session.key, (0, None, ""))
+            messages = session.messages
+            if len(messages) < count or (count and messages[count - 1] is not last):
+                # Cleared, truncated or replaced — appending can't express it
+                self._write_snapshot(session, info)
+            else:
+                records = []
+                new_header = json.dumps(_session_header(session), sort_keys=True)
+                if new_header != header:
+                    records.append({"op": "h", **_session_header(session), "updatedAt": session.updated_at})
+                for msg in messages[count:]:
+                    records.append({"op": "m", **msg.to_dict()})
+                if records:
+                    self._append(session, info, records)
+            self._mark_synced(session)
+            self._save_index()
         except Exception as e:
             logger.error(f"Error saving session {session.key}: {e}")
     
+    def _append(self, session: Session, info: SessionInfo, records: List[Dict[str, Any]]):
+        self._ensure_dirs()
+        lines = []
+        for record in records:
+            info.seq += 1
+            record["seq"] = info.seq
+            lines.append(json.dumps(record, ensure_ascii=False) + "\n")
+        data = "".join(lines).encode("utf-8")
+        with open(self._log_file(session.key), "ab") as f:
+            f.write(data)
+        info.log_bytes += len(data)
+        self._stats["appends"] += len(records)
+        
+        if info.seq - info.snapshot_seq >= self.COMPACT_EVERY:
+            self._write_snapshot(session, info)
+    
+    def _write_snapshot(self, session: Session, info: SessionInfo):
+        """Write the full session atomically and truncate its log."""
+        self._ensure_dirs()
+        file = self._session_file(session.key)
+        tmp = file.with_suffix(".json.tmp")
+        data = session.to_dict()
+        data["seq"] = info.seq
+        tmp.write_text(json.dumps(data, indent=2))
+        os.replace(tmp, file)
+        # A crash before this truncate is harmless: replay skips seq <= snapshot seq
+        log = self._log_file(session.key)
+        if log.exists():
+            log.unlink()
+        info.snapshot_seq = info.seq
+        info.snapshot_bytes = file.stat().st_size
+        info.log_bytes = 0
+        self._stats["compactions"] += 1
+        self._index_dirty = True
+    
+    def _save_index(self, force: bool = False):
+        """Rewrite the metadata index, at most every INDEX_SAVE_INTERVAL seconds."""
+        if not self._persist or not self._index_dirty:
+            return
+        now = time.time()
+        if not force and now - self._index_saved_at < self.INDEX_SAVE_INTERVAL:
+            return
+        try:
+            self._ensure_dirs()
+            tmp = INDEX_FILE.with_suffix(".json.tmp")
+            tmp.write_text(json.dumps({
+                "sessions": {key: info.to_dict() for key, info in self._info.items()},
+            }))
+            os.replace(tmp, INDEX_FILE)
+            self._index_dirty = False
+            self._index_saved_at = now
+        except Exception as e:
+            logger.error(f"Error saving session index: {e}")
+    
     def _delete_session_file(self, key: str):
-        """Delete session file from disk."""
+        """Delete session files from disk."""
         if not self._persist:
             return
         
         try:
-            file = self._session_file(key)
-            if file.exists():
-                file.unlink()
+            for file in (self._session_file(key), self._log_file(key)):
+                if file.exists():
+                    file.unlink()
         except Exception as e:
             logger.error(f"Error deleting session file {key}: {e}")
     
+    def flush(self):
+        """Write the metadata index now (log records are never buffered)."""
+        with self._lock:
+            self._save_index(force=True)
+    
+    # ── Public API ───────────────────────────────────────────────
+    
     def get(self, key: str) -> Optional[Session]:
         """Get a session by key."""
         with self._lock:
-            return self._sessions.get(key)
+            return self._ensure_loaded(key)
     
     def get_or_create(
         self,
@@ -187,8 +513,9 @@ class SessionManager:
     ) -> Session:
         """Get existing session or create new one."""
         with self._lock:
-            if key in self._sessions:
-                return self._sessions[key]
+            existing = self._ensure_loaded(key)
+            if existing is not None:
+                return existing
             
             session = Session(
                 key=key,
@@ -228,13 +555,22 @@ class SessionManager:
     def delete(self, key: str) -> bool:
         """Delete a session."""
         with self._lock:
-            if key in self._sessions:
-                del self._sessions[key]
+            if key in self._info:
+                del self._info[key]
+                self._sessions.pop(key, None)
+                self._synced.pop(key, None)
                 self._delete_session_file(key)
+                self._index_dirty = True
+                self._save_index(force=True)
                 logger.info(f"Deleted session: {key}")
                 return True
             return False
     
+    def _message_count(self, info: SessionInfo) -> int:
+        # Loaded bodies may have been mutated directly; trust them over the index
+        session = self._sessions.get(info.key)
+        return len(session.messages) if session is not None else info.message_count
+    
     def list_sessions(
         self,
         session_type: Optional[str] = None,
@@ -243,19 +579,21 @@ class SessionManager:
         """List all sessions."""
         with self._lock:
             sessions = []
-            for session in self._sessions.values():
-                if session_type and session.session_type != session_type:
+            for info in self._info.values():
+                if session_type and info.session_type != session_type:
                     continue
-                if not include_empty and not session.messages:
+                count = self._message_count(info)
+                if not include_empty and not count:
                     continue
                 
+                session = self._sessions.get(info.key)
                 sessions.append({
-                    "key": session.key,
-                    "type": session.session_type,
-                    "messageCount": len(session.messages),
-                    "createdAt": session.created_at,
-                    "updatedAt": session.updated_at,
-                    "parentSession": session.parent_session,
+                    "key": info.key,
+                    "type": info.session_type,
+                    "messageCount": count,
+                    "createdAt": info.created_at,
+                    "updatedAt": session.updated_at if session is not None else info.updated_at,
+                    "parentSession": info.parent_session,
                 })
             
             return sorted(sessions, key=lambda s: s["updatedAt"], reverse=True)
@@ -267,9 +605,10 @@ class SessionManager:
     def clear_session(self, key: str):
         """Clear messages from a session but keep it."""
         with self._lock:
-            if key in self._sessions:
-                self._sessions[key].clear_messages()
-                self._save_session(self._sessions[key])
+            session = self._ensure_loaded(key)
+            if session is not None:
+                session.clear_messages()
+                self._save_session(session)
     
     def add_message(
         self,
@@ -280,7 +619,7 @@ class SessionManager:
     ):
         """Add a message to a session."""
         with self._lock:
-            session = self._sessions.get(key)
+            session = self._ensure_loaded(key)
             if session:
                 session.add_message(role, content, metadata)
                 self._save_session(session)
@@ -291,14 +630,16 @@ class SessionManager:
             by_type: Dict[str, int] = {}
             total_messages = 0
             
-            for session in self._sessions.values():
-                by_type[session.session_type] = by_type.get(session.session_type, 0) + 1
-                total_messages += len(session.messages)
+            for info in self._info.values():
+                by_type[info.session_type] = by_type.get(info.session_type, 0) + 1
+                total_messages += self._message_count(info)
             
             return {
-                "totalSessions": len(self._sessions),
+                "totalSessions": len(self._info),
                 "totalMessages": total_messages,
                 "byType": by_type,
+                "loadedSessions": len(self._sessions),
+                "storage": dict(self._stats),
             }
 
 
@@ -81,6 +81,11 @@ SETTINGS_SCHEMA = {
     "max_tokens": {"type": int, "required": False, "range": (1, 1000000), "description": "Max output tokens"},
     "context_retrieval_limit": {"type": int, "required": False, "range": (0, 100), "description": "Max context messages to retrieve"},
     "use_advanced_memory": {"type": bool, "required": False, "description": "Enable advanced memory system"},
+    "preload_embedding_model": {"type": bool, "required": False, "description": "Load the memory embedding model in the background at startup"},
+    "prompt_caching": {"type": bool, "required": False, "description": "Mark stable prompt prefixes cacheable (Anthropic cache_control, OpenAI prompt_cache_key)"},
+    "ollama_keep_alive": {"type": (str, int), "required": False, "description": "How long Ollama keeps the model loaded between tool rounds (e.g. '30m', -1)"},
+    "compaction_strategy": {"type": str, "required": False, "description": "Context compaction summarization: 'map_reduce' (concurrent chunks) or 'sequential'"},
+    "summary_concurrency": {"type": dict, "required": False, "description": "Per-provider concurrent chunk summaries during compaction (e.g. {'anthropic': 4})"},
     "system_prompt": {"type": str, "required": False, "description": "System prompt"},
     "screenshot_prompt": {"type": str, "required": False, "description": "Screenshot analysis prompt"},
     "note_prompts": {"type": dict, "required": False, "description": "Note prompt templates"},
@@ -112,7 +112,7 @@ class SkillWatcher:
     Watches skills/ directory for .md file changes.
 
     On change:
-    1. Invalidates the skills_tool cache
+    1. Invalidates the skills_tool cache and the prompt builder's skills section
     2. Emits skill_loaded/skill_reloaded events on the event bus
     3. Logs the change
     """
@@ -168,6 +168,15 @@ class SkillWatcher:
 
         logger.info("[SKILL_WATCHER] Stopped")
 
+    def watches(self, path) -> bool:
+        """True if this watcher is running and covers the given directory."""
+        if not self._running:
+            return False
+        try:
+            return os.path.realpath(path) == os.path.realpath(self._skills_dir)
+        except Exception:
+            return False
+
     def get_status(self) -> Dict[str, Any]:
         """Get watcher status."""
         with self._lock:
@@ -251,6 +260,11 @@ class SkillWatcher:
             _st._cache_time = 0
         except Exception:
             pass
+        try:
+            from src.infra.prompt_builder import invalidate_prompt_cache
+            invalidate_prompt_cache("skills")
+        except Exception:
+            pass
 
         # Update known files snapshot
         if change_type == 'deleted':
@@ -0,0 +1,118 @@
+"""
+Stream Coalescer — Batch streamed token deltas into fewer frontend messages.
+
+Providers yield tiny chunks (often a few characters). Sending each one as
+its own send_message_to_frontend call runs the whole frontend pipeline
+(startup/SILENT/SMS/TTS checks, feed append, SSE + WS fan-out) per chunk.
+A StreamCoalescer sits between the provider loop and the sender:
+
+- Text deltas are buffered and flushed as ONE combined delta when the
+  buffer is FLUSH_INTERVAL old or holds MAX_BUFFER_CHARS
+- Adaptive: the first delta of a run and any delta arriving after a quiet
+  gap (>= FLUSH_INTERVAL since the last flush) go out immediately, so
+  time-to-first-token and slow streams are not delayed
+- Separate streams ("text" → {status:'streaming', result}, "thinking" →
+  {type:'thinking_delta', content}); switching stream flushes first, so
+  the frontend sees deltas in their original order
+- Control messages (thinking_start/end, clear_thinking, tool events, done)
+  go through send(), which flushes pending text first, then sends
+  immediately
+
+Flushes run on the producer's thread (inside push/send/close), never on a
+timer thread: send_message_to_frontend relies on thread-locals (circuits
+[SILENT] suppression, SMS capture), so it must be called from the thread
+that owns the run. The trade-off is that a buffered tail waits for the next
+chunk or close() when a provider stalls mid-stream.
+
+Usage:
+    from src.infra.stream_coalescer import StreamCoalescer
+
+    with StreamCoalescer(send_message_to_frontend) as out:
+        for chunk in provider_stream:
+            out.push(chunk)                      # text delta
+        out.push(reasoning, stream="thinking")   # thinking delta
+        out.send({"type": "thinking_end"})       # control: flush + send now
+    # leaving the block flushes the tail
+"""
+
+import logging
+import time
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+FLUSH_INTERVAL = 0.04      # Max age (s) of buffered text before it is sent
+MAX_BUFFER_CHARS = 2048    # Flush early once this much text is buffered
+
+# stream name → (payload key, message template)
+STREAMS: Dict[str, tuple] = {
+    "text": ("result", {"status": "streaming"}),
+    "thinking": ("content", {"type": "thinking_delta"}),
+}
+
+
+class StreamCoalescer:
+    """Per-run buffer that turns many small deltas into few frontend messages."""
+
+    def __init__(self, send: Callable[[Dict[str, Any]], Any],
+                 flush_interval: float = FLUSH_INTERVAL,
+                 max_chars: int = MAX_BUFFER_CHARS,
+                 clock: Callable[[], float] = time.monotonic):
+        self._send = send
+        self.flush_interval = flush_interval
+        self.max_chars = max_chars
+        self._clock = clock
+        self._parts = []
+        self._chars = 0
+        self._stream: Optional[str] = None
+        self._last_flush = float("-inf")
+        self.deltas_in = 0
+        self.messages_out = 0
+
+    def push(self, text: str, stream: str = "text"):
+        """Buffer one delta; flush if the time or size budget is spent."""
+        if not text:
+            return
+        if stream not in STREAMS:
+            raise ValueError(f"unknown stream '{stream}'")
+        self.deltas_in += 1
+        if self._stream is not None and stream != self._stream:
+            self.flush()
+        self._stream = stream
+        self._parts.append(text)
+        self._chars += len(text)
+        if (self._chars >= self.max_chars
+                or self._clock() - self._last_flush >= self.flush_interval):
+            self.flush()
+
+    def flush(self):
+        """Send buffered deltas (if any) as one message."""
+        if not self._parts:
+            return
+        key, template = STREAMS[self._stream]
+        text = self._parts[0] if len(self._parts) == 1 else "".join(self._parts)
+        self._parts = []
+        self._chars = 0
+        self._last_flush = self._clock()
+        message = dict(template)
+        message[key] = text
+        self.messages_out += 1
+        self._send(message)
+
+    def send(self, message: Dict[str, Any]):
+        """Flush pending deltas, then send a control message immediately."""
+        self.flush()
+        self.messages_out += 1
+        self._send(message)
+
+    def close(self):
+        self.flush()
+        if self.deltas_in > self.messages_out:
+            logger.debug(f"[STREAM] Coalesced {self.deltas_in} deltas into {self.messages_out} messages")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
@@ -0,0 +1,262 @@
+"""
+Vision Cache — Content-addressed result cache and upload normalization for image analysis.
+
+describe_image and the vision client endpoint sent the full base64 image to
+the provider on every call, even when the agent looked at the same
+screenshot or file again a few turns later. This module sits in front of
+those calls:
+
+- Results are keyed by (sha256 of the image bytes, sha256 of the prompt,
+  model) and kept in one SQLite file, so a repeat question about the same
+  image skips the upload entirely, across restarts too
+- Entries expire after CACHE_TTL_SECONDS; LRU eviction by bytes once the
+  store exceeds MAX_CACHE_BYTES (down to EVICT_TO_RATIO of the budget)
+- On a miss the image is normalized before upload: downscaled so the long
+  edge fits NORMALIZE_MAX_EDGE and re-encoded as JPEG. The original is
+  kept when it already fits and is JPEG, when it is animated, or when
+  re-encoding would not make it smaller
+- Every lookup is reported to CostTracker.record_vision (cache hits,
+  original vs uploaded bytes)
+
+The key is computed from the image as received, so normalization work is
+skipped on a hit as well.
+
+Usage:
+    from src.infra.vision_cache import cached_vision
+
+    text = cached_vision(image_b64, prompt, "anthropic/claude-sonnet-4-5",
+                         lambda b64, mime: call_provider(b64, mime, prompt),
+                         mime_type="image/png")
+    get_vision_cache_stats()
+    # {'entries': 12, 'bytes': 40211, 'hits': 5, 'misses': 12, 'expired': 1, ...}
+"""
+
+import base64
+import binascii
+import hashlib
+import io
+import json
+import logging
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from .frame_pipeline import HAS_PIL, Image, frame_pipeline
+from ..memory.sqlite_pool import SQLitePool
+
+logger = logging.getLogger(__name__)
+
+SOMA = Path(__file__).parent.parent.parent
+CACHE_DB = SOMA / "data" / "vision_cache.db"
+
+CACHE_TTL_SECONDS = 6 * 3600      # Results older than this are re-requested
+MAX_CACHE_BYTES = 32 * 1024 * 1024
+EVICT_TO_RATIO = 0.9
+NORMALIZE_MAX_EDGE = 1568         # Long edge of uploaded images (larger ones are downscaled)
+NORMALIZE_QUALITY = 85
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    key TEXT PRIMARY KEY,
+    model TEXT,
+    data BLOB,
+    size INTEGER,
+    created_at REAL,
+    accessed_at REAL
+);
+CREATE INDEX IF NOT EXISTS idx_results_accessed ON results(accessed_at);
+"""
+
+
+def _decode(image_b64: str) -> Optional[bytes]:
+    try:
+        return base64.b64decode(image_b64, validate=False)
+    except (binascii.Error, ValueError, TypeError):
+        return None
+
+
+def cache_key(image_bytes: bytes, prompt: str, model: str) -> str:
+    """Content address for one (image, prompt, model) request."""
+    image_sha = hashlib.sha256(image_bytes).hexdigest()
+    prompt_sha = hashlib.sha256((prompt or "").encode("utf-8")).hexdigest()
+    return hashlib.sha256(f"{image_sha}\0{prompt_sha}\0{model}".encode("utf-8")).hexdigest()
+
+
+def normalize_image(image_b64: str, mime_type: str = "image/jpeg",
+                    image_bytes: Optional[bytes] = None,
+                    max_edge: int = NORMALIZE_MAX_EDGE,
+                    quality: int = NORMALIZE_QUALITY) -> Tuple[str, str]:
+    """Downscale/re-encode an image for upload. Returns (base64, mime); the input if unchanged."""
+    if not HAS_PIL:
+        return image_b64, mime_type
+    raw = image_bytes if image_bytes is not None else _decode(image_b64)
+    if not raw:
+        return image_b64, mime_type
+    try:
+        img = Image.open(io.BytesIO(raw))
+        if getattr(img, "is_animated", False):
+            return image_b64, mime_type
+        fits = max(img.size) <= max_edge
+        if fits and img.format == "JPEG":
+            return image_b64, mime_type
+        img.load()
+        frame = frame_pipeline.encode(img, max_tokens=0, quality=quality, max_edge=max_edge)
+    except Exception as e:
+        logger.debug(f"[VISION] Normalization skipped: {e}")
+        return image_b64, mime_type
+    if fits and len(frame.base64) >= len(image_b64):
+        return image_b64, mime_type
+    return frame.base64, frame.mime
+
+
+class VisionCache:
+    """SQLite-backed result store with TTL and byte-budget LRU eviction."""
+
+    def __init__(self, db_path: Path = CACHE_DB, max_bytes: int = MAX_CACHE_BYTES,
+                 ttl: float = CACHE_TTL_SECONDS):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._pool = SQLitePool(db_path)
+        with self._pool.writer() as conn:
+            conn.executescript(_SCHEMA)
+            self._bytes = conn.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0, 'expired': 0, 'stored': 0, 'evicted': 0}
+
+    def get(self, key: str, ttl: Optional[float] = None) -> Optional[Any]:
+        """Cached result for `key` if younger than `ttl` (default self.ttl), else None."""
+        with self._pool.reader() as conn:
+            row = conn.execute("SELECT data, size, created_at FROM results WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            self._count('misses')
+            return None
+        now = time.time()
+        if now - row['created_at'] > (self.ttl if ttl is None else ttl):
+            self._count('expired')
+            self._count('misses')
+            with self._pool.writer() as conn:
+                if conn.execute("DELETE FROM results WHERE key = ?", (key,)).rowcount:
+                    self._bytes -= row['size']
+            return None
+        self._count('hits')
+        with self._pool.writer() as conn:
+            conn.execute("UPDATE results SET accessed_at = ? WHERE key = ?", (now, key))
+        return json.loads(zlib.decompress(row['data']).decode('utf-8'))
+
+    def put(self, key: str, model: str, result: Any) -> None:
+        blob = zlib.compress(json.dumps(result, ensure_ascii=False).encode('utf-8'), 6)
+        now = time.time()
+        with self._pool.writer() as conn:
+            old = conn.execute("SELECT size FROM results WHERE key = ?", (key,)).fetchone()
+            conn.execute(
+                "INSERT OR REPLACE INTO results (key, model, data, size, created_at, accessed_at)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (key, model, blob, len(blob), now, now))
+            self._bytes += len(blob) - (old['size'] if old else 0)
+            if self._bytes > self.max_bytes:
+                self._evict(conn)
+        self._count('stored')
+
+    def _evict(self, conn) -> None:
+        """Delete expired rows, then least recently used ones, until under the low-water mark."""
+        target = int(self.max_bytes * EVICT_TO_RATIO)
+        cutoff = time.time() - self.ttl
+        rows = conn.execute("SELECT key, size, created_at FROM results ORDER BY accessed_at").fetchall()
+        rows.sort(key=lambda r: r['created_at'] >= cutoff)   # stable: expired first, then LRU
+        evicted = 0
+        for row in rows:
+            if self._bytes <= target:
+                break
+            conn.execute("DELETE FROM results WHERE key = ?", (row['key'],))
+            self._bytes -= row['size']
+            evicted += 1
+        self._count('evicted', evicted)
+        logger.info(f"[VISION] Evicted {evicted} cached results ({self._bytes} bytes left)")
+
+    def _count(self, key: str, n: int = 1) -> None:
+        with self._lock:
+            self._stats[key] += n
+
+    def clear(self) -> None:
+        with self._pool.writer() as conn:
+            conn.execute("DELETE FROM results")
+            self._bytes = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._pool.reader() as conn:
+            entries = conn.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+        with self._lock:
+            stats = dict(self._stats)
+        lookups = stats['hits'] + stats['misses']
+        return {'entries': entries, 'bytes': self._bytes, 'maxBytes': self.max_bytes,
+                'ttlSeconds': self.ttl, **stats,
+                'hitRate': round(stats['hits'] / lookups, 3) if lookups else 0.0}
+
+
+# ── Global Instance ────────────────────────────────────────────────
+
+_cache: Optional[VisionCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_vision_cache() -> VisionCache:
+    """Get or create the shared vision cache."""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = VisionCache()
+    return _cache
+
+
+def cached_vision(image_b64: str, prompt: str, model: str,
+                  analyze: Callable[[str, str], Any],
+                  mime_type: str = "image/jpeg",
+                  cacheable: Optional[Callable[[Any], bool]] = None,
+                  ttl: Optional[float] = None) -> Any:
+    """Result of `analyze(normalized_b64, mime)` for this image/prompt/model, cached.
+
+    `cacheable(result)` decides whether a fresh result is stored (default:
+    any truthy result), so provider errors are not replayed from the cache.
+    """
+    from .cost_tracker import tracker
+
+    raw = _decode(image_b64)
+    if raw is None:
+        return analyze(image_b64, mime_type)
+    key = cache_key(raw, prompt, model)
+    try:
+        cache = get_vision_cache()
+        result = cache.get(key, ttl)
+    except Exception as e:
+        logger.warning(f"[VISION] Cache lookup failed: {e}")
+        cache, result = None, None
+    if result is not None:
+        logger.info(f"[VISION] Cache hit for {model} ({len(raw)} bytes not uploaded)")
+        tracker.record_vision(cache_hit=True, original_bytes=len(raw))
+        return result
+
+    upload_b64, upload_mime = normalize_image(image_b64, mime_type, image_bytes=raw)
+    uploaded = len(raw) if upload_b64 is image_b64 else len(upload_b64) * 3 // 4
+    if uploaded < len(raw):
+        logger.info(f"[VISION] Normalized image {len(raw)} -> {uploaded} bytes before upload")
+    tracker.record_vision(cache_hit=False, original_bytes=len(raw), uploaded_bytes=uploaded)
+
+    result = analyze(upload_b64, upload_mime)
+    if cache is not None and result and (cacheable is None or cacheable(result)):
+        try:
+            cache.put(key, model, result)
+        except Exception as e:
+            logger.warning(f"[VISION] Cache store failed: {e}")
+    return result
+
+
+def get_vision_cache_stats() -> Dict[str, Any]:
+    return get_vision_cache().get_stats()
+
+
+def clear_vision_cache() -> None:
+    get_vision_cache().clear()
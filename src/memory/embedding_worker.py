@@ -0,0 +1,162 @@
+"""
+Embedding Worker — Background, micro-batched embedding pipeline.
+
+`add_memory` used to run a SentenceTransformer forward pass per memory on
+its own thread. This worker owns a bounded queue instead: it drains up to
+`batch_size` pending texts (or whatever arrives within `max_wait` seconds),
+encodes them in one `model.encode()` call, and hands the batch to a writer
+callback that commits all rows in a single transaction.
+
+Memories that haven't been embedded yet are simply absent from the vector
+index, so hybrid search falls back to FTS for them instead of blocking.
+If the queue is full, the item is dropped and counted — `backfill()` on
+the memory manager re-discovers anything without an embeddings row.
+
+Usage:
+    worker = EmbeddingWorker(encode_fn, write_fn)
+    worker.submit("mem_123", "user|assistant", "chat")
+    worker.get_stats()
+    # {'backlog': 0, 'processed': 1, 'lag_ms': 0.0, ...}
+"""
+
+import queue
+import time
+import logging
+import threading
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 64
+DEFAULT_MAX_WAIT = 0.2       # seconds to wait for a batch to fill
+DEFAULT_QUEUE_SIZE = 4096
+
+# (memory_id, content, memory_type, enqueued_at)
+EmbeddingJob = Tuple[str, str, str, float]
+
+
+class EmbeddingWorker:
+    """Single daemon thread draining a bounded queue in micro-batches."""
+
+    def __init__(
+        self,
+        encode_fn: Callable[[List[str]], np.ndarray],
+        write_fn: Callable[[Sequence[EmbeddingJob], np.ndarray], None],
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        max_wait: float = DEFAULT_MAX_WAIT,
+        queue_size: int = DEFAULT_QUEUE_SIZE,
+    ):
+        self._encode = encode_fn
+        self._write = write_fn
+        self.batch_size = batch_size
+        self.max_wait = max_wait
+        self._queue: "queue.Queue[EmbeddingJob]" = queue.Queue(maxsize=queue_size)
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self._idle = threading.Event()
+        self._idle.set()
+
+        self._stats_lock = threading.Lock()
+        self._submitted = 0
+        self._processed = 0
+        self._dropped = 0
+        self._errors = 0
+        self._batches = 0
+        self._last_batch_size = 0
+        self._last_batch_ms = 0.0
+        self._last_lag_ms = 0.0
+        self._max_lag_ms = 0.0
+
+    def _ensure_started(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._start_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name="embedding-worker", daemon=True
+                )
+                self._thread.start()
+
+    def submit(self, memory_id: str, content: str, memory_type: str, block: bool = False) -> bool:
+        """Queue a memory for embedding. Returns False if it was dropped."""
+        self._ensure_started()
+        job = (memory_id, content, memory_type, time.time())
+        self._idle.clear()
+        try:
+            self._queue.put(job, block=block)
+        except queue.Full:
+            if self._queue.unfinished_tasks == 0:
+                self._idle.set()
+            with self._stats_lock:
+                self._dropped += 1
+            logger.debug(f"[EMBED] Queue full, dropped {memory_id} (backfill will catch it)")
+            return False
+        with self._stats_lock:
+            self._submitted += 1
+        return True
+
+    def wait_idle(self, timeout: Optional[float] = None) -> bool:
+        """Block until the queue is drained and no batch is in flight."""
+        return self._idle.wait(timeout)
+
+    def _next_batch(self) -> List[EmbeddingJob]:
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self) -> None:
+        while True:
+            batch = self._next_batch()
+            started = time.time()
+            try:
+                embeddings = self._encode([job[1] for job in batch])
+                self._write(batch, np.asarray(embeddings, dtype=np.float32))
+                ok = True
+            except Exception as e:
+                ok = False
+                logger.error(f"[EMBED] Batch of {len(batch)} failed: {e}")
+            finished = time.time()
+
+            with self._stats_lock:
+                self._batches += 1
+                self._last_batch_size = len(batch)
+                self._last_batch_ms = (finished - started) * 1000
+                if ok:
+                    self._processed += len(batch)
+                    lag_ms = (finished - batch[0][3]) * 1000
+                    self._last_lag_ms = lag_ms
+                    self._max_lag_ms = max(self._max_lag_ms, lag_ms)
+                else:
+                    self._errors += len(batch)
+
+            for _ in batch:
+                self._queue.task_done()
+            if self._queue.unfinished_tasks == 0:
+                self._idle.set()
+
+    def get_stats(self) -> Dict:
+        with self._stats_lock:
+            return {
+                'running': self._thread is not None and self._thread.is_alive(),
+                'backlog': self._queue.qsize(),
+                'submitted': self._submitted,
+                'processed': self._processed,
+                'dropped': self._dropped,
+                'errors': self._errors,
+                'batches': self._batches,
+                'avg_batch_size': round((self._processed + self._errors) / self._batches, 1) if self._batches else 0,
+                'last_batch_size': self._last_batch_size,
+                'last_batch_ms': round(self._last_batch_ms, 1),
+                'lag_ms': round(self._last_lag_ms, 1),
+                'max_lag_ms': round(self._max_lag_ms, 1),
+            }
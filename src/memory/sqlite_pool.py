@@ -0,0 +1,136 @@
+"""
+SQLite Pool — One long-lived writer plus a bounded set of reader connections.
+
+WAL mode lets readers run concurrently with a single writer, but only if
+they aren't all funneled through the same lock. This pool:
+
+- Keeps one writer connection, serialized by `write_lock`
+- Hands out up to `max_readers` reader connections, one per concurrent
+  reading thread; readers never touch `write_lock`
+- Opens every connection once (PRAGMAs applied once, not per call) with a
+  larger `cached_statements` so repeated queries reuse prepared statements
+
+Usage:
+    pool = SQLitePool(DB_PATH)
+    with pool.writer() as conn:
+        conn.execute("INSERT ...")       # committed on exit, rolled back on error
+    with pool.reader() as conn:
+        rows = conn.execute("SELECT ...").fetchall()
+"""
+
+import queue
+import sqlite3
+import logging
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_READERS = 4
+STATEMENT_CACHE_SIZE = 256
+
+
+class SQLitePool:
+    """Writer connection + bounded reader pool for a WAL-mode SQLite file."""
+
+    def __init__(self, db_path: Path, max_readers: int = DEFAULT_MAX_READERS):
+        self.db_path = db_path
+        self.max_readers = max(1, max_readers)
+        self.write_lock = threading.RLock()
+        self._writer = None
+        self._idle: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue()
+        self._readers: List[sqlite3.Connection] = []
+        self._readers_lock = threading.Lock()
+        self._closed = False
+        self._stats = {'reads': 0, 'writes': 0, 'reader_waits': 0}
+
+    def _connect(self, readonly: bool) -> sqlite3.Connection:
+        conn = sqlite3.connect(
+            self.db_path,
+            check_same_thread=False,
+            cached_statements=STATEMENT_CACHE_SIZE,
+        )
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA busy_timeout=5000")
+        if readonly:
+            conn.execute("PRAGMA query_only=ON")
+        else:
+            # journal_mode is persistent in the file; only the writer sets it
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    @contextmanager
+    def writer(self) -> Iterator[sqlite3.Connection]:
+        """Exclusive access to the writer connection. Commits on clean exit."""
+        with self.write_lock:
+            if self._closed:
+                raise sqlite3.ProgrammingError("SQLitePool is closed")
+            if self._writer is None:
+                self._writer = self._connect(readonly=False)
+            conn = self._writer
+            self._stats['writes'] += 1
+            try:
+                yield conn
+                if conn.in_transaction:
+                    conn.commit()
+            except BaseException:
+                if conn.in_transaction:
+                    conn.rollback()
+                raise
+
+    @contextmanager
+    def reader(self) -> Iterator[sqlite3.Connection]:
+        """Borrow a reader connection for the duration of the block."""
+        conn = self._acquire_reader()
+        try:
+            yield conn
+        finally:
+            if conn.in_transaction:
+                conn.rollback()
+            if self._closed:
+                conn.close()
+            else:
+                self._idle.put(conn)
+
+    def _acquire_reader(self) -> sqlite3.Connection:
+        if self._closed:
+            raise sqlite3.ProgrammingError("SQLitePool is closed")
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            conn = None
+            with self._readers_lock:
+                if len(self._readers) < self.max_readers:
+                    conn = self._connect(readonly=True)
+                    self._readers.append(conn)
+            if conn is None:
+                self._stats['reader_waits'] += 1
+                conn = self._idle.get()
+        self._stats['reads'] += 1
+        return conn
+
+    def close(self) -> None:
+        """Close all connections. Borrowed readers close when returned."""
+        self._closed = True
+        with self.write_lock:
+            if self._writer is not None:
+                self._writer.close()
+                self._writer = None
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+
+    def get_stats(self) -> Dict:
+        with self._readers_lock:
+            open_readers = len(self._readers)
+        return {
+            **self._stats,
+            'open_readers': open_readers,
+            'idle_readers': self._idle.qsize(),
+            'max_readers': self.max_readers,
+        }
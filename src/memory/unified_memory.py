@@ -3,10 +3,11 @@ Unified Memory System for Substrate
 ================================
 Single source of truth with:
 - SQLite database for all storage
-- Hybrid search (BM25 full-text + vector embeddings)
+- Hybrid search (BM25 full-text + vector embeddings, weighted or RRF fusion)
 - Deduplication via content hashing
 - Action-type metadata for multimedia/commands
-- Embedding cache to avoid re-computing
+- Embedding cache to avoid re-computing (filled by a batched background worker)
+- In-memory vector index for vectorized top-k (see vector_index.py)
 """
 
 import sqlite3
@@ -14,8 +15,11 @@ import json
 import time
 import os
 import hashlib
+import atexit
 import logging
 import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from typing import Dict, List, Optional, Tuple, Any
 from pathlib import Path
@@ -23,6 +27,10 @@ from enum import Enum
 
 import numpy as np
 
+from .embedding_worker import EmbeddingWorker
+from .sqlite_pool import SQLitePool
+from .vector_index import VectorIndex
+
 logger = logging.getLogger(__name__)
 
 # Lazy load heavy dependencies
@@ -41,6 +49,87 @@ def get_embedding_model():
     return _sentence_transformer
 
 
+def preload_embedding_model(background: bool = True) -> Optional[threading.Thread]:
+    """Load the sentence transformer ahead of the first search.
+    
+    With background=True the import and load happen on a daemon thread
+    so startup isn't delayed; the thread is returned for joining.
+    """
+    def _load():
+        try:
+            get_embedding_model().encode(["warmup"])
+        except Exception as e:
+            logger.warning(f"Embedding model preload failed: {e}")
+    
+    if not background:
+        _load()
+        return None
+    thread = threading.Thread(target=_load, name="embedding-preload", daemon=True)
+    thread.start()
+    return thread
+
+
+def _encode_texts(texts: List[str]) -> np.ndarray:
+    """Encode a batch of texts with the shared model."""
+    return get_embedding_model().encode(texts, batch_size=len(texts))
+
+
+QUERY_CACHE_SIZE = 512
+
+
+class QueryEmbeddingCache:
+    """Bounded LRU of query embeddings keyed by normalized query text."""
+    
+    def __init__(self, max_size: int = QUERY_CACHE_SIZE):
+        self.max_size = max_size
+        self._entries: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+    
+    @staticmethod
+    def normalize(query: str) -> str:
+        return ' '.join(query.lower().split())
+    
+    def get(self, query: str) -> np.ndarray:
+        """Return the embedding for query, encoding it on a miss."""
+        key = self.normalize(query)
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return cached
+            self.misses += 1
+        
+        embedding = get_embedding_model().encode([key])[0].astype(np.float32)
+        embedding.flags.writeable = False
+        with self._lock:
+            self._entries[key] = embedding
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+        return embedding
+    
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+    
+    def get_stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0,
+            }
+
+
+_query_cache = QueryEmbeddingCache()
+
+
 class MemoryType(str, Enum):
     """Types of memory entries for filtering and search."""
     CHAT = "chat"
@@ -58,12 +147,35 @@ EMBEDDING_DIMENSION = 384
 DEFAULT_CONTEXT_LIMIT = 10
 MAX_MEMORY_ENTRIES = 1000
 SNIPPET_MAX_CHARS = 500
+DEFAULT_FUSION = "weighted"   # or "rrf"
+RRF_K = 60
 
 # Data directory
 DATA_DIR = Path(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'data'))
 DATA_DIR.mkdir(parents=True, exist_ok=True)
 DB_PATH = DATA_DIR / "unified_memory.db"
 
+# FTS and vector retrieval for search_hybrid run side by side
+_search_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="memory-search")
+
+
+def _reciprocal_rank_fusion(
+    ranked_lists: List[Tuple[List[Tuple[str, float]], float]],
+    k: int = RRF_K
+) -> Dict[str, float]:
+    """Weighted RRF over best-first (id, score) lists, rescaled to 0-1.
+    
+    An id ranked first by every retriever scores 1.0.
+    """
+    fused: Dict[str, float] = {}
+    for hits, weight in ranked_lists:
+        for rank, (mem_id, _) in enumerate(hits):
+            fused[mem_id] = fused.get(mem_id, 0.0) + weight / (k + rank + 1)
+    best = sum(weight for _, weight in ranked_lists) / (k + 1)
+    if best <= 0:
+        return fused
+    return {mem_id: score / best for mem_id, score in fused.items()}
+
 
 def compute_content_hash(content: str) -> str:
     """Compute a hash for deduplication."""
@@ -78,118 +190,142 @@ class UnifiedMemoryManager:
     - Old MemoryManager with separate SQLite + FAISS
     
     Features:
-    - Single SQLite database
+    - Single SQLite database (pooled: one writer, concurrent WAL readers)
     - FTS5 full-text search (BM25)
     - Vector embeddings stored in DB
     - Embedding cache
+    - In-memory vector index (loaded lazily on first vector search)
     - Deduplication
     - Action-type metadata
     """
     
     def __init__(self, db_path: Path = DB_PATH):
         self.db_path = db_path
-        self._db_lock = threading.Lock()
+        self._pool = SQLitePool(db_path)
         self._init_db()
+        self._vector_index = VectorIndex(db_path, EMBEDDING_DIMENSION)
+        atexit.register(self._flush_vector_index)
+        self._embedder = EmbeddingWorker(_encode_texts, self._write_embeddings)
         logger.info(f"UnifiedMemoryManager initialized with DB at {db_path}")
     
     def _get_connection(self) -> sqlite3.Connection:
-        """Get a database connection with proper settings."""
+        """Open a standalone connection; the caller must close it.
+        
+        Kept for callers outside this class (dashboard/gateway history
+        readers). Methods here use the pooled connections in self._pool.
+        """
         conn = sqlite3.connect(self.db_path, check_same_thread=False)
         conn.row_factory = sqlite3.Row
-        conn.execute("PRAGMA journal_mode=WAL")
-        conn.execute("PRAGMA synchronous=NORMAL")
         return conn
     
     def _init_db(self) -> None:
         """Initialize the database schema."""
-        with self._db_lock:
-            conn = self._get_connection()
-            try:
-                # Main memories table
-                conn.execute("""
-                    CREATE TABLE IF NOT EXISTS memories (
-                        id TEXT PRIMARY KEY,
-                        timestamp REAL NOT NULL,
-                        type TEXT NOT NULL,
-                        model TEXT,
-                        user_message TEXT,
-                        assistant_response TEXT,
-                        content_hash TEXT UNIQUE,
-                        importance_score REAL DEFAULT 0.5,
-                        metadata JSON,
-                        created_at DATETIME DEFAULT CURRENT_TIMESTAMP
-                    )
-                """)
-                
-                # Create index on timestamp for fast recent queries
-                conn.execute("""
-                    CREATE INDEX IF NOT EXISTS idx_memories_timestamp 
-                    ON memories(timestamp DESC)
-                """)
-                
-                # Create index on type for filtering
-                conn.execute("""
-                    CREATE INDEX IF NOT EXISTS idx_memories_type 
-                    ON memories(type)
-                """)
-                
-                # Create index on content_hash for deduplication
-                conn.execute("""
-                    CREATE INDEX IF NOT EXISTS idx_memories_hash 
-                    ON memories(content_hash)
-                """)
-                
-                # FTS5 virtual table for full-text search
-                conn.execute("""
-                    CREATE VIRTUAL TABLE IF NOT EXISTS memories_fts USING fts5(
-                        id,
-                        user_message,
-                        assistant_response,
-                        content='memories',
-                        content_rowid='rowid',
-                        tokenize='porter unicode61'
-                    )
-                """)
-                
-                # Triggers to keep FTS in sync
-                conn.execute("""
-                    CREATE TRIGGER IF NOT EXISTS memories_ai AFTER INSERT ON memories BEGIN
-                        INSERT INTO memories_fts(rowid, id, user_message, assistant_response)
-                        VALUES (new.rowid, new.id, new.user_message, new.assistant_response);
-                    END
-                """)
-                
-                conn.execute("""
-                    CREATE TRIGGER IF NOT EXISTS memories_ad AFTER DELETE ON memories BEGIN
-                        INSERT INTO memories_fts(memories_fts, rowid, id, user_message, assistant_response)
-                        VALUES ('delete', old.rowid, old.id, old.user_message, old.assistant_response);
-                    END
-                """)
-                
-                conn.execute("""
-                    CREATE TRIGGER IF NOT EXISTS memories_au AFTER UPDATE ON memories BEGIN
-                        INSERT INTO memories_fts(memories_fts, rowid, id, user_message, assistant_response)
-                        VALUES ('delete', old.rowid, old.id, old.user_message, old.assistant_response);
-                        INSERT INTO memories_fts(rowid, id, user_message, assistant_response)
-                        VALUES (new.rowid, new.id, new.user_message, new.assistant_response);
+        with self._pool.writer() as conn:
+            # Main memories table
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS memories (
+                    id TEXT PRIMARY KEY,
+                    timestamp REAL NOT NULL,
+                    type TEXT NOT NULL,
+                    model TEXT,
+                    user_message TEXT,
+                    assistant_response TEXT,
+                    content_hash TEXT UNIQUE,
+                    importance_score REAL DEFAULT 0.5,
+                    metadata JSON,
+                    created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
+            
+            # Create index on timestamp for fast recent queries
+            conn.execute("""
+                CREATE INDEX IF NOT EXISTS idx_memories_timestamp 
+                ON memories(timestamp DESC)
+            """)
+            
+            # Create index on type for filtering
+            conn.execute("""
+                CREATE INDEX IF NOT EXISTS idx_memories_type 
+                ON memories(type)
+            """)
+            
+            # Create index on content_hash for deduplication
+            conn.execute("""
+                CREATE INDEX IF NOT EXISTS idx_memories_hash 
+                ON memories(content_hash)
+            """)
+            
+            # FTS5 virtual table for full-text search
+            conn.execute("""
+                CREATE VIRTUAL TABLE IF NOT EXISTS memories_fts USING fts5(
+                    id,
+                    user_message,
+                    assistant_response,
+                    content='memories',
+                    content_rowid='rowid',
+                    tokenize='porter unicode61'
+                )
+            """)
+            
+            # Triggers to keep FTS in sync
+            conn.execute("""
+                CREATE TRIGGER IF NOT EXISTS memories_ai AFTER INSERT ON memories BEGIN
+                    INSERT INTO memories_fts(rowid, id, user_message, assistant_response)
+                    VALUES (new.rowid, new.id, new.user_message, new.assistant_response);
+                END
+            """)
+            
+            conn.execute("""
+                CREATE TRIGGER IF NOT EXISTS memories_ad AFTER DELETE ON memories BEGIN
+                    INSERT INTO memories_fts(memories_fts, rowid, id, user_message, assistant_response)
+                    VALUES ('delete', old.rowid, old.id, old.user_message, old.assistant_response);
+                END
+            """)
+            
+            conn.execute("""
+                CREATE TRIGGER IF NOT EXISTS memories_au AFTER UPDATE ON memories BEGIN
+                    INSERT INTO memories_fts(memories_fts, rowid, id, user_message, assistant_response)
+                    VALUES ('delete', old.rowid, old.id, old.user_message, old.assistant_response);
+                    INSERT INTO memories_fts(rowid, id, user_message, assistant_response)
+                    VALUES (new.rowid, new.id, new.user_message, new.assistant_response);
+                END
+            """)
+            
+            # Embeddings table (cached vectors)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS embeddings (
+                    memory_id TEXT PRIMARY KEY,
+                    embedding BLOB,
+                    model_name TEXT,
+                    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+                    FOREIGN KEY (memory_id) REFERENCES memories(id) ON DELETE CASCADE
+                )
+            """)
+            
+            # Generation counter for the vector index watermark; bumped by
+            # triggers in the same transaction as any change it depends on
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS embeddings_generation (
+                    id INTEGER PRIMARY KEY CHECK (id = 1),
+                    generation INTEGER NOT NULL
+                )
+            """)
+            conn.execute("INSERT OR IGNORE INTO embeddings_generation (id, generation) VALUES (1, 0)")
+            for name, event in (
+                ('embeddings_gen_ai', 'AFTER INSERT ON embeddings'),
+                ('embeddings_gen_ad', 'AFTER DELETE ON embeddings'),
+                ('embeddings_gen_au', 'AFTER UPDATE ON embeddings'),
+                ('memories_gen_ad', 'AFTER DELETE ON memories'),
+                ('memories_gen_au', 'AFTER UPDATE OF id, type ON memories'),
+            ):
+                conn.execute(f"""
+                    CREATE TRIGGER IF NOT EXISTS {name} {event} BEGIN
+                        UPDATE embeddings_generation SET generation = generation + 1 WHERE id = 1;
                     END
                 """)
-                
-                # Embeddings table (cached vectors)
-                conn.execute("""
-                    CREATE TABLE IF NOT EXISTS embeddings (
-                        memory_id TEXT PRIMARY KEY,
-                        embedding BLOB,
-                        model_name TEXT,
-                        created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
-                        FOREIGN KEY (memory_id) REFERENCES memories(id) ON DELETE CASCADE
-                    )
-                """)
-                
-                conn.commit()
-                logger.info("Database schema initialized")
-            finally:
-                conn.close()
+            
+            conn.commit()
+            logger.info("Database schema initialized")
     
     def _clean_message(self, message: str) -> str:
         """Remove nested conversation history from messages."""
@@ -252,8 +388,7 @@ class UnifiedMemoryManager:
                 user_message, assistant_response, memory_type, metadata
             )
         
-        with self._db_lock:
-            conn = self._get_connection()
+        with self._pool.writer() as conn:
             try:
                 # Check for duplicate
                 cursor = conn.execute(
@@ -286,12 +421,12 @@ class UnifiedMemoryManager:
                 )
                 conn.commit()
                 
-                # Compute and cache embedding asynchronously
-                threading.Thread(
-                    target=self._cache_embedding,
-                    args=(memory_id, content),
-                    daemon=True
-                ).start()
+                # Embed in the background; FTS covers it until the batch lands
+                self._embedder.submit(
+                    memory_id,
+                    content,
+                    memory_type.value if isinstance(memory_type, MemoryType) else memory_type
+                )
                 
                 logger.debug(f"Added memory {memory_id} (type={memory_type}, importance={importance_score:.2f})")
                 return memory_id
@@ -299,8 +434,6 @@ class UnifiedMemoryManager:
             except sqlite3.IntegrityError as e:
                 logger.debug(f"Duplicate memory (integrity error): {e}")
                 return None
-            finally:
-                conn.close()
     
     def _calculate_importance(
         self,
@@ -356,28 +489,72 @@ class UnifiedMemoryManager:
         
         return min(1.0, max(0.0, score))
     
-    def _cache_embedding(self, memory_id: str, content: str) -> None:
-        """Compute and cache embedding for a memory."""
-        try:
-            model = get_embedding_model()
-            embedding = model.encode([content])[0]
-            embedding_blob = embedding.astype(np.float32).tobytes()
+    def _write_embeddings(self, jobs, embeddings: np.ndarray) -> None:
+        """Persist a batch of embeddings in one transaction and index them."""
+        rows = [
+            (job[0], embedding.tobytes(), 'all-MiniLM-L6-v2')
+            for job, embedding in zip(jobs, embeddings)
+        ]
+        with self._pool.writer() as conn:
+            # Skip memories deleted while they waited in the queue
+            placeholders = ','.join('?' * len(jobs))
+            cursor = conn.execute(
+                f"SELECT id FROM memories WHERE id IN ({placeholders})",
+                [job[0] for job in jobs]
+            )
+            live = {row['id'] for row in cursor.fetchall()}
+            conn.executemany(
+                """
+                INSERT OR REPLACE INTO embeddings (memory_id, embedding, model_name)
+                VALUES (?, ?, ?)
+                """,
+                [row for row in rows if row[0] in live]
+            )
+            conn.commit()
+            self._vector_index.add_many(
+                ((job[0], embedding, job[2])
+                 for job, embedding in zip(jobs, embeddings)
+                 if job[0] in live),
+                generation=VectorIndex.read_generation(conn)
+            )
+    
+    def backfill_embeddings(self, limit: Optional[int] = None, wait: bool = False) -> int:
+        """
+        Queue every memory that has no embeddings row.
+        
+        Covers rows dropped from a full queue, written before a crash, or
+        imported from elsewhere. Blocks on a full queue rather than dropping.
+        
+        Args:
+            limit: Maximum memories to queue (None = all)
+            wait: Block until the worker has embedded everything queued
             
-            with self._db_lock:
-                conn = self._get_connection()
-                try:
-                    conn.execute(
-                        """
-                        INSERT OR REPLACE INTO embeddings (memory_id, embedding, model_name)
-                        VALUES (?, ?, ?)
-                        """,
-                        (memory_id, embedding_blob, 'all-MiniLM-L6-v2')
-                    )
-                    conn.commit()
-                finally:
-                    conn.close()
-        except Exception as e:
-            logger.error(f"Error caching embedding for {memory_id}: {e}")
+        Returns:
+            Number of memories queued
+        """
+        with self._pool.reader() as conn:
+            cursor = conn.execute(
+                """
+                SELECT m.id, m.type, m.user_message, m.assistant_response
+                FROM memories m
+                LEFT JOIN embeddings e ON e.memory_id = m.id
+                WHERE e.memory_id IS NULL
+                ORDER BY m.timestamp DESC
+                LIMIT ?
+                """,
+                (-1 if limit is None else limit,)
+            )
+            missing = cursor.fetchall()
+        
+        for row in missing:
+            content = f"{row['user_message'] or ''}|{row['assistant_response'] or ''}"
+            self._embedder.submit(row['id'], content, row['type'], block=True)
+        
+        if missing:
+            logger.info(f"Queued {len(missing)} memories for embedding backfill")
+            if wait:
+                self._embedder.wait_idle()
+        return len(missing)
     
     def get_recent_context(
         self,
@@ -396,109 +573,100 @@ class UnifiedMemoryManager:
         Returns:
             Formatted context string for LLM consumption
         """
-        with self._db_lock:
-            conn = self._get_connection()
-            try:
-                if memory_types:
-                    type_placeholders = ','.join('?' * len(memory_types))
-                    type_values = [t.value if isinstance(t, MemoryType) else t for t in memory_types]
-                    cursor = conn.execute(
-                        f"""
-                        SELECT * FROM memories 
-                        WHERE type IN ({type_placeholders})
-                        ORDER BY timestamp DESC 
-                        LIMIT ?
-                        """,
-                        (*type_values, limit)
-                    )
-                else:
-                    # Exclude FOUNDATIONAL memories from recent context by default
-                    cursor = conn.execute(
-                        """
-                        SELECT * FROM memories 
-                        WHERE type != ?
-                        ORDER BY timestamp DESC 
-                        LIMIT ?
-                        """,
-                        (MemoryType.FOUNDATIONAL.value, limit)
-                    )
+        with self._pool.reader() as conn:
+            if memory_types:
+                type_placeholders = ','.join('?' * len(memory_types))
+                type_values = [t.value if isinstance(t, MemoryType) else t for t in memory_types]
+                cursor = conn.execute(
+                    f"""
+                    SELECT * FROM memories 
+                    WHERE type IN ({type_placeholders})
+                    ORDER BY timestamp DESC 
+                    LIMIT ?
+                    """,
+                    (*type_values, limit)
+                )
+            else:
+                # Exclude FOUNDATIONAL memories from recent context by default
+                cursor = conn.execute(
+                    """
+                    SELECT * FROM memories 
+                    WHERE type != ?
+                    ORDER BY timestamp DESC 
+                    LIMIT ?
+                    """,
+                    (MemoryType.FOUNDATIONAL.value, limit)
+                )
                 
-                rows = cursor.fetchall()
+            rows = cursor.fetchall()
+            
+            if not rows:
+                return ""
                 
-                if not rows:
-                    return ""
+            # Build context string (reverse to chronological order)
+            context_parts = []
+            for row in reversed(rows):
+                user_msg = row['user_message'] or ""
+                assistant_msg = row['assistant_response'] or ""
+                mem_type = row['type']
                 
-                # Build context string (reverse to chronological order)
-                context_parts = []
-                for row in reversed(rows):
-                    user_msg = row['user_message'] or ""
-                    assistant_msg = row['assistant_response'] or ""
-                    mem_type = row['type']
-                    
-                    # Add type prefix for non-chat memories
-                    if mem_type != MemoryType.CHAT.value and mem_type != "chat":
-                        type_label = f"[{mem_type.upper()}] "
-                    else:
-                        type_label = ""
+                # Add type prefix for non-chat memories
+                if mem_type != MemoryType.CHAT.value and mem_type != "chat":
+                    type_label = f"[{mem_type.upper()}] "
+                else:
+                    type_label = ""
                     
-                    # Format timestamp from epoch
-                    ts = row['timestamp']
-                    try:
-                        from datetime import datetime as _dt
-                        ts_str = _dt.fromtimestamp(ts).strftime("[%b %d, %Y %I:%M %p]")
-                    except Exception:
-                        ts_str = ""
+                # Format timestamp from epoch
+                ts = row['timestamp']
+                try:
+                    from datetime import datetime as _dt
+                    ts_str = _dt.fromtimestamp(ts).strftime("[%b %d, %Y %I:%M %p]")
+                except Exception:
+                    ts_str = ""
                     
-                    if user_msg:
-                        context_parts.append(f"{ts_str} User: {type_label}{user_msg}")
-                    if assistant_msg:
-                        context_parts.append(f"{ts_str} Assistant: {assistant_msg}")
+                if user_msg:
+                    context_parts.append(f"{ts_str} User: {type_label}{user_msg}")
+                if assistant_msg:
+                    context_parts.append(f"{ts_str} Assistant: {assistant_msg}")
                     
-                    # Add metadata context if requested
-                    if include_metadata and row['metadata']:
-                        try:
-                            meta = json.loads(row['metadata'])
-                            if meta.get('image_description'):
-                                context_parts.append(f"  [Saw: {meta['image_description']}]")
-                            if meta.get('search_query'):
-                                context_parts.append(f"  [Searched: {meta['search_query']}]")
-                            if meta.get('note_title'):
-                                context_parts.append(f"  [Created note: {meta['note_title']}]")
-                        except json.JSONDecodeError:
-                            pass
-                
-                if context_parts:
-                    return "\n--- Conversation History ---\n" + "\n".join(context_parts) + "\n"
-                return ""
+                # Add metadata context if requested
+                if include_metadata and row['metadata']:
+                    try:
+                        meta = json.loads(row['metadata'])
+                        if meta.get('image_description'):
+                            context_parts.append(f"  [Saw: {meta['image_description']}]")
+                        if meta.get('search_query'):
+                            context_parts.append(f"  [Searched: {meta['search_query']}]")
+                        if meta.get('note_title'):
+                            context_parts.append(f"  [Created note: {meta['note_title']}]")
+                    except json.JSONDecodeError:
+                        pass
                 
-            finally:
-                conn.close()
+            if context_parts:
+                return "\n--- Conversation History ---\n" + "\n".join(context_parts) + "\n"
+            return ""
     
     def get_recent_messages(self, count: int = 5) -> List[Dict]:
         """Get recent messages in a format suitable for note creation."""
-        with self._db_lock:
-            conn = self._get_connection()
-            try:
-                cursor = conn.execute(
-                    """
-                    SELECT user_message, assistant_response 
-                    FROM memories 
-                    ORDER BY timestamp DESC 
-                    LIMIT ?
-                    """,
-                    (count,)
-                )
-                
-                messages = []
-                for row in cursor.fetchall():
-                    if row['user_message']:
-                        messages.append({"role": "user", "content": row['user_message']})
-                    if row['assistant_response']:
-                        messages.append({"role": "assistant", "content": row['assistant_response']})
+        with self._pool.reader() as conn:
+            cursor = conn.execute(
+                """
+                SELECT user_message, assistant_response 
+                FROM memories 
+                ORDER BY timestamp DESC 
+                LIMIT ?
+                """,
+                (count,)
+            )
+            
+            messages = []
+            for row in cursor.fetchall():
+                if row['user_message']:
+                    messages.append({"role": "user", "content": row['user_message']})
+                if row['assistant_response']:
+                    messages.append({"role": "assistant", "content": row['assistant_response']})
                 
-                return messages
-            finally:
-                conn.close()
+            return messages
     
     def search_hybrid(
         self,
@@ -506,17 +674,23 @@ class UnifiedMemoryManager:
         limit: int = 10,
         memory_types: Optional[List[MemoryType]] = None,
         vector_weight: float = 0.7,
-        text_weight: float = 0.3
+        text_weight: float = 0.3,
+        fusion: str = DEFAULT_FUSION
     ) -> List[Dict]:
         """
         Hybrid search combining BM25 full-text and vector similarity.
         
+        Both retrievers run concurrently and return only (id, score) pairs;
+        the fused top-k rows are then hydrated in a single query.
+        
         Args:
             query: Search query
             limit: Maximum results
             memory_types: Filter by types
             vector_weight: Weight for vector similarity (0-1)
             text_weight: Weight for BM25 text match (0-1)
+            fusion: "weighted" (weighted sum of normalized scores) or
+                "rrf" (reciprocal rank fusion, rescaled to 0-1)
             
         Returns:
             List of matching memories with scores
@@ -526,45 +700,53 @@ class UnifiedMemoryManager:
         vector_weight = vector_weight / total
         text_weight = text_weight / total
         
-        # Get BM25 results
-        text_results = self._search_fts(query, limit * 2, memory_types)
-        
-        # Get vector results
-        vector_results = self._search_vector(query, limit * 2, memory_types)
+        # Run both retrievers at once; the vector side may be encoding
+        fts_future = _search_executor.submit(self._search_fts_ids, query, limit * 2, memory_types)
+        vector_future = _search_executor.submit(self._search_vector_ids, query, limit * 2, memory_types)
+        text_hits = fts_future.result()
+        vector_hits = vector_future.result()
         
-        # Merge results
-        merged = {}
+        scores: Dict[str, Dict[str, float]] = {}
+        for hits, key in ((text_hits, 'text_score'), (vector_hits, 'vector_score')):
+            for mem_id, score in hits:
+                entry = scores.setdefault(mem_id, {'text_score': 0, 'vector_score': 0})
+                entry[key] = score
         
-        for result in text_results:
-            mem_id = result['id']
-            merged[mem_id] = {
-                **result,
-                'text_score': result.get('score', 0),
-                'vector_score': 0,
-                'final_score': result.get('score', 0) * text_weight
+        if fusion == 'rrf':
+            fused = _reciprocal_rank_fusion(
+                [(text_hits, text_weight), (vector_hits, vector_weight)]
+            )
+        else:
+            fused = {
+                mem_id: entry['text_score'] * text_weight + entry['vector_score'] * vector_weight
+                for mem_id, entry in scores.items()
             }
         
-        for result in vector_results:
-            mem_id = result['id']
-            if mem_id in merged:
-                merged[mem_id]['vector_score'] = result.get('score', 0)
-                merged[mem_id]['final_score'] += result.get('score', 0) * vector_weight
-            else:
-                merged[mem_id] = {
-                    **result,
-                    'text_score': 0,
-                    'vector_score': result.get('score', 0),
-                    'final_score': result.get('score', 0) * vector_weight
-                }
-        
-        # Sort by final score and return top results
-        sorted_results = sorted(
-            merged.values(),
-            key=lambda x: x['final_score'],
-            reverse=True
-        )
-        
-        return sorted_results[:limit]
+        top = sorted(fused.items(), key=lambda item: item[1], reverse=True)[:limit]
+        rows = self._hydrate([mem_id for mem_id, _ in top])
+        
+        results = []
+        for mem_id, final_score in top:
+            row = rows.get(mem_id)
+            if row is None:
+                continue
+            row.update(scores[mem_id])
+            row['score'] = final_score
+            row['final_score'] = final_score
+            results.append(row)
+        return results
+    
+    def _hydrate(self, memory_ids: List[str]) -> Dict[str, Dict]:
+        """Fetch full rows for the given ids in one query."""
+        if not memory_ids:
+            return {}
+        placeholders = ','.join('?' * len(memory_ids))
+        with self._pool.reader() as conn:
+            cursor = conn.execute(
+                f"SELECT * FROM memories WHERE id IN ({placeholders})",
+                memory_ids
+            )
+            return {row['id']: dict(row) for row in cursor.fetchall()}
     
     def _search_fts(
         self,
@@ -573,21 +755,32 @@ class UnifiedMemoryManager:
         memory_types: Optional[List[MemoryType]] = None
     ) -> List[Dict]:
         """Full-text search using FTS5 BM25."""
-        with self._db_lock:
-            conn = self._get_connection()
+        hits = self._search_fts_ids(query, limit, memory_types)
+        return self._hydrate_hits(hits)
+    
+    def _search_fts_ids(
+        self,
+        query: str,
+        limit: int,
+        memory_types: Optional[List[MemoryType]] = None
+    ) -> List[Tuple[str, float]]:
+        """BM25 retrieval returning (memory_id, 0-1 score) pairs, best first."""
+        # Build FTS query
+        fts_query = ' OR '.join(query.split())
+        if not fts_query:
+            return []
+        
+        with self._pool.reader() as conn:
             try:
-                # Build FTS query
-                fts_query = ' OR '.join(query.split())
-                
                 if memory_types:
                     type_placeholders = ','.join('?' * len(memory_types))
                     type_values = [t.value if isinstance(t, MemoryType) else t for t in memory_types]
                     
                     cursor = conn.execute(
                         f"""
-                        SELECT m.*, bm25(memories_fts) as score
+                        SELECT fts.id, bm25(memories_fts) as score
                         FROM memories_fts fts
-                        JOIN memories m ON fts.id = m.id
+                        JOIN memories m ON m.rowid = fts.rowid
                         WHERE memories_fts MATCH ?
                         AND m.type IN ({type_placeholders})
                         ORDER BY score
@@ -598,9 +791,8 @@ class UnifiedMemoryManager:
                 else:
                     cursor = conn.execute(
                         """
-                        SELECT m.*, bm25(memories_fts) as score
+                        SELECT fts.id, bm25(memories_fts) as score
                         FROM memories_fts fts
-                        JOIN memories m ON fts.id = m.id
                         WHERE memories_fts MATCH ?
                         ORDER BY score
                         LIMIT ?
@@ -608,20 +800,15 @@ class UnifiedMemoryManager:
                         (fts_query, limit)
                     )
                 
-                results = []
-                for row in cursor.fetchall():
-                    result = dict(row)
-                    # BM25 returns negative scores (lower = better), normalize to 0-1
-                    result['score'] = 1.0 / (1.0 + abs(result.get('score', 0)))
-                    results.append(result)
-                
-                return results
+                # BM25 returns negative scores (lower = better), normalize to 0-1
+                return [
+                    (row['id'], 1.0 / (1.0 + abs(row['score'] or 0)))
+                    for row in cursor.fetchall()
+                ]
                 
             except sqlite3.OperationalError as e:
                 logger.warning(f"FTS search error: {e}")
                 return []
-            finally:
-                conn.close()
     
     def _search_vector(
         self,
@@ -629,62 +816,61 @@ class UnifiedMemoryManager:
         limit: int,
         memory_types: Optional[List[MemoryType]] = None
     ) -> List[Dict]:
-        """Vector similarity search using cached embeddings."""
+        """Vector similarity search using the in-memory vector index."""
+        hits = self._search_vector_ids(query, limit, memory_types)
+        return self._hydrate_hits(hits)
+    
+    def _search_vector_ids(
+        self,
+        query: str,
+        limit: int,
+        memory_types: Optional[List[MemoryType]] = None
+    ) -> List[Tuple[str, float]]:
+        """Vector retrieval returning (memory_id, cosine) pairs, best first."""
+        if _sentence_transformer is None and _embedding_lock.locked():
+            # Model is still loading on the embedding worker; answer from FTS only
+            return []
+        
         try:
-            model = get_embedding_model()
-            query_embedding = model.encode([query])[0].astype(np.float32)
+            query_embedding = _query_cache.get(query)
         except Exception as e:
             logger.error(f"Error computing query embedding: {e}")
             return []
         
-        with self._db_lock:
-            conn = self._get_connection()
-            try:
-                # Get all embeddings
-                if memory_types:
-                    type_placeholders = ','.join('?' * len(memory_types))
-                    type_values = [t.value if isinstance(t, MemoryType) else t for t in memory_types]
-                    
-                    cursor = conn.execute(
-                        f"""
-                        SELECT e.memory_id, e.embedding, m.*
-                        FROM embeddings e
-                        JOIN memories m ON e.memory_id = m.id
-                        WHERE m.type IN ({type_placeholders})
-                        """,
-                        type_values
-                    )
-                else:
-                    cursor = conn.execute(
-                        """
-                        SELECT e.memory_id, e.embedding, m.*
-                        FROM embeddings e
-                        JOIN memories m ON e.memory_id = m.id
-                        """
-                    )
-                
-                results = []
-                for row in cursor.fetchall():
-                    try:
-                        embedding = np.frombuffer(row['embedding'], dtype=np.float32)
-                        # Cosine similarity
-                        similarity = np.dot(query_embedding, embedding) / (
-                            np.linalg.norm(query_embedding) * np.linalg.norm(embedding) + 1e-8
-                        )
-                        
-                        result = dict(row)
-                        result['score'] = float(similarity)
-                        results.append(result)
-                    except Exception as e:
-                        logger.debug(f"Error processing embedding: {e}")
-                        continue
-                
-                # Sort by similarity (descending)
-                results.sort(key=lambda x: x['score'], reverse=True)
-                return results[:limit]
-                
-            finally:
-                conn.close()
+        self._ensure_vector_index()
+        type_values = None
+        if memory_types:
+            type_values = [t.value if isinstance(t, MemoryType) else t for t in memory_types]
+        return self._vector_index.search(query_embedding, limit, type_values)
+    
+    def _hydrate_hits(self, hits: List[Tuple[str, float]]) -> List[Dict]:
+        """Turn (id, score) pairs into full rows with a 'score' key, in order."""
+        rows = self._hydrate([mem_id for mem_id, _ in hits])
+        results = []
+        for mem_id, score in hits:
+            row = rows.get(mem_id)
+            if row is None:
+                continue
+            row['score'] = score
+            results.append(row)
+        return results
+    
+    def _ensure_vector_index(self) -> None:
+        """Load (or rebuild) the vector index on first use."""
+        if self._vector_index.loaded:
+            return
+        # Build under the writer so no embedding commits between the
+        # snapshot and the index going live
+        with self._pool.writer() as conn:
+            self._vector_index.load_or_build(conn)
+    
+    def _flush_vector_index(self) -> None:
+        """Persist pending index mutations (under the writer, like every index save)."""
+        try:
+            with self._pool.writer():
+                self._vector_index.flush()
+        except sqlite3.Error as e:
+            logger.warning(f"Vector index flush skipped: {e}")
     
     def search_by_type(
         self,
@@ -693,61 +879,56 @@ class UnifiedMemoryManager:
         since_timestamp: Optional[float] = None
     ) -> List[Dict]:
         """Get memories of a specific type."""
-        with self._db_lock:
-            conn = self._get_connection()
-            try:
-                if since_timestamp:
-                    cursor = conn.execute(
-                        """
-                        SELECT * FROM memories 
-                        WHERE type = ? AND timestamp > ?
-                        ORDER BY timestamp DESC 
-                        LIMIT ?
-                        """,
-                        (memory_type.value, since_timestamp, limit)
-                    )
-                else:
-                    cursor = conn.execute(
-                        """
-                        SELECT * FROM memories 
-                        WHERE type = ?
-                        ORDER BY timestamp DESC 
-                        LIMIT ?
-                        """,
-                        (memory_type.value, limit)
-                    )
+        with self._pool.reader() as conn:
+            if since_timestamp:
+                cursor = conn.execute(
+                    """
+                    SELECT * FROM memories 
+                    WHERE type = ? AND timestamp > ?
+                    ORDER BY timestamp DESC 
+                    LIMIT ?
+                    """,
+                    (memory_type.value, since_timestamp, limit)
+                )
+            else:
+                cursor = conn.execute(
+                    """
+                    SELECT * FROM memories 
+                    WHERE type = ?
+                    ORDER BY timestamp DESC 
+                    LIMIT ?
+                    """,
+                    (memory_type.value, limit)
+                )
                 
-                return [dict(row) for row in cursor.fetchall()]
-            finally:
-                conn.close()
+            return [dict(row) for row in cursor.fetchall()]
     
     def get_memory_stats(self) -> Dict:
         """Get statistics about the memory database."""
-        with self._db_lock:
-            conn = self._get_connection()
-            try:
-                stats = {}
-                
-                # Total count
-                cursor = conn.execute("SELECT COUNT(*) as count FROM memories")
-                stats['total_memories'] = cursor.fetchone()['count']
-                
-                # Count by type
-                cursor = conn.execute(
-                    "SELECT type, COUNT(*) as count FROM memories GROUP BY type"
-                )
-                stats['by_type'] = {row['type']: row['count'] for row in cursor.fetchall()}
-                
-                # Embeddings count
-                cursor = conn.execute("SELECT COUNT(*) as count FROM embeddings")
-                stats['cached_embeddings'] = cursor.fetchone()['count']
-                
-                # Database size
-                stats['db_size_mb'] = os.path.getsize(self.db_path) / (1024 * 1024)
-                
-                return stats
-            finally:
-                conn.close()
+        with self._pool.reader() as conn:
+            stats = {}
+            
+            # Total count
+            cursor = conn.execute("SELECT COUNT(*) as count FROM memories")
+            stats['total_memories'] = cursor.fetchone()['count']
+            
+            # Count by type
+            cursor = conn.execute(
+                "SELECT type, COUNT(*) as count FROM memories GROUP BY type"
+            )
+            stats['by_type'] = {row['type']: row['count'] for row in cursor.fetchall()}
+            
+            # Embeddings count
+            cursor = conn.execute("SELECT COUNT(*) as count FROM embeddings")
+            stats['cached_embeddings'] = cursor.fetchone()['count']
+            stats['vector_index'] = self._vector_index.get_stats()
+            stats['embedding_queue'] = self._embedder.get_stats()
+            stats['query_cache'] = _query_cache.get_stats()
+            
+            # Database size
+            stats['db_size_mb'] = os.path.getsize(self.db_path) / (1024 * 1024)
+            
+            return stats
     
     def get_memories_since(
         self,
@@ -765,34 +946,30 @@ class UnifiedMemoryManager:
         Returns:
             List of memory dicts ordered chronologically (oldest first)
         """
-        with self._db_lock:
-            conn = self._get_connection()
-            try:
-                if memory_types:
-                    type_placeholders = ','.join('?' * len(memory_types))
-                    type_values = [t.value if isinstance(t, MemoryType) else t for t in memory_types]
-                    cursor = conn.execute(
-                        f"""
-                        SELECT * FROM memories 
-                        WHERE timestamp > ? AND type IN ({type_placeholders})
-                        ORDER BY timestamp ASC 
-                        LIMIT ?
-                        """,
-                        (since_timestamp, *type_values, limit)
-                    )
-                else:
-                    cursor = conn.execute(
-                        """
-                        SELECT * FROM memories 
-                        WHERE timestamp > ?
-                        ORDER BY timestamp ASC 
-                        LIMIT ?
-                        """,
-                        (since_timestamp, limit)
-                    )
-                return [dict(row) for row in cursor.fetchall()]
-            finally:
-                conn.close()
+        with self._pool.reader() as conn:
+            if memory_types:
+                type_placeholders = ','.join('?' * len(memory_types))
+                type_values = [t.value if isinstance(t, MemoryType) else t for t in memory_types]
+                cursor = conn.execute(
+                    f"""
+                    SELECT * FROM memories 
+                    WHERE timestamp > ? AND type IN ({type_placeholders})
+                    ORDER BY timestamp ASC 
+                    LIMIT ?
+                    """,
+                    (since_timestamp, *type_values, limit)
+                )
+            else:
+                cursor = conn.execute(
+                    """
+                    SELECT * FROM memories 
+                    WHERE timestamp > ?
+                    ORDER BY timestamp ASC 
+                    LIMIT ?
+                    """,
+                    (since_timestamp, limit)
+                )
+            return [dict(row) for row in cursor.fetchall()]
 
     def cleanup_old_memories(
         self,
@@ -800,74 +977,73 @@ class UnifiedMemoryManager:
         importance_threshold: float = 0.3
     ) -> int:
         """Remove old, low-importance memories to keep database size manageable."""
-        with self._db_lock:
-            conn = self._get_connection()
-            try:
-                # Count current entries
-                cursor = conn.execute("SELECT COUNT(*) as count FROM memories")
-                current_count = cursor.fetchone()['count']
-                
-                if current_count <= max_entries:
-                    return 0
-                
-                # Delete oldest low-importance entries
-                to_delete = current_count - max_entries
-                cursor = conn.execute(
-                    """
-                    DELETE FROM memories 
-                    WHERE id IN (
-                        SELECT id FROM memories 
-                        WHERE importance_score < ?
-                        ORDER BY timestamp ASC 
-                        LIMIT ?
-                    )
-                    """,
-                    (importance_threshold, to_delete)
-                )
-                
-                deleted = cursor.rowcount
-                conn.commit()
-                
-                # Vacuum to reclaim space
-                conn.execute("VACUUM")
+        with self._pool.writer() as conn:
+            # Count current entries
+            cursor = conn.execute("SELECT COUNT(*) as count FROM memories")
+            current_count = cursor.fetchone()['count']
+            
+            if current_count <= max_entries:
+                return 0
                 
-                logger.info(f"Cleaned up {deleted} old memories")
-                return deleted
+            # Delete oldest low-importance entries
+            to_delete = current_count - max_entries
+            cursor = conn.execute(
+                """
+                SELECT id FROM memories 
+                WHERE importance_score < ?
+                ORDER BY timestamp ASC 
+                LIMIT ?
+                """,
+                (importance_threshold, to_delete)
+            )
+            doomed = [row['id'] for row in cursor.fetchall()]
+            if not doomed:
+                return 0
                 
-            finally:
-                conn.close()
+            placeholders = ','.join('?' * len(doomed))
+            cursor = conn.execute(
+                f"DELETE FROM memories WHERE id IN ({placeholders})", doomed
+            )
+            deleted = cursor.rowcount
+            # foreign_keys is off, so ON DELETE CASCADE doesn't fire
+            conn.execute(
+                f"DELETE FROM embeddings WHERE memory_id IN ({placeholders})", doomed
+            )
+            conn.commit()
+            
+            self._vector_index.remove(doomed, generation=VectorIndex.read_generation(conn))
+            self._vector_index.flush()
+            
+            # Vacuum to reclaim space
+            conn.execute("VACUUM")
+            
+            logger.info(f"Cleaned up {deleted} old memories")
+            return deleted
     
     def clear_all(self) -> None:
         """Clear all memories (use with caution!)."""
-        with self._db_lock:
-            conn = self._get_connection()
-            try:
-                conn.execute("DELETE FROM embeddings")
-                conn.execute("DELETE FROM memories")
-                conn.commit()
-                conn.execute("VACUUM")
-                logger.info("All memories cleared")
-            finally:
-                conn.close()
+        with self._pool.writer() as conn:
+            conn.execute("DELETE FROM embeddings")
+            conn.execute("DELETE FROM memories")
+            conn.commit()
+            self._vector_index.clear(generation=VectorIndex.read_generation(conn))
+            conn.execute("VACUUM")
+            logger.info("All memories cleared")
     
     def export_to_json(self, filepath: Optional[Path] = None) -> str:
         """Export all memories to JSON for backup."""
         if filepath is None:
             filepath = DATA_DIR / f"memory_backup_{int(time.time())}.json"
         
-        with self._db_lock:
-            conn = self._get_connection()
-            try:
-                cursor = conn.execute("SELECT * FROM memories ORDER BY timestamp")
-                memories = [dict(row) for row in cursor.fetchall()]
-                
-                with open(filepath, 'w', encoding='utf-8') as f:
-                    json.dump({'memories': memories, 'exported_at': time.time()}, f, indent=2)
+        with self._pool.reader() as conn:
+            cursor = conn.execute("SELECT * FROM memories ORDER BY timestamp")
+            memories = [dict(row) for row in cursor.fetchall()]
+            
+            with open(filepath, 'w', encoding='utf-8') as f:
+                json.dump({'memories': memories, 'exported_at': time.time()}, f, indent=2)
                 
-                logger.info(f"Exported {len(memories)} memories to {filepath}")
-                return str(filepath)
-            finally:
-                conn.close()
+            logger.info(f"Exported {len(memories)} memories to {filepath}")
+            return str(filepath)
     
     def import_from_legacy(self, legacy_json_path: Path) -> int:
         """Import memories from legacy conversation_history.json format."""
@@ -922,19 +1098,15 @@ class UnifiedMemoryManager:
             True if foundational memory was added, False if already exists or failed
         """
         # Check if foundational memory already exists
-        with self._db_lock:
-            conn = self._get_connection()
-            try:
-                cursor = conn.execute(
-                    "SELECT COUNT(*) FROM memories WHERE type = ?",
-                    (MemoryType.FOUNDATIONAL.value,)
-                )
-                count = cursor.fetchone()[0]
-                if count > 0:
-                    logger.debug("Foundational memory already exists, skipping bootstrap")
-                    return False
-            finally:
-                conn.close()
+        with self._pool.reader() as conn:
+            cursor = conn.execute(
+                "SELECT COUNT(*) FROM memories WHERE type = ?",
+                (MemoryType.FOUNDATIONAL.value,)
+            )
+            count = cursor.fetchone()[0]
+            if count > 0:
+                logger.debug("Foundational memory already exists, skipping bootstrap")
+                return False
         
         # Load "Note to self (now you).md" from project root
         soma = Path(__file__).parent.parent.parent
@@ -0,0 +1,372 @@
+"""
+Vector Index — In-memory cosine top-k index for unified memory embeddings.
+
+Keeps every cached embedding as a row of a pre-normalized float32 matrix so
+a query is a single matrix-vector product plus an argpartition, instead of
+decoding every blob from SQLite and scoring rows one at a time.
+
+- Rows are L2-normalized on insert, so dot product == cosine similarity
+- Per-type boolean bitmaps make `memory_types` filtering a vector mask
+- Deletions tombstone a row; tombstones are compacted on save
+- Persisted next to the DB (`<db>.vecidx.npy` + `<db>.vecidx.json`) and
+  memory-mapped on load, so startup doesn't re-read the embeddings table
+- The meta file records the DB's embeddings generation (a counter bumped
+  by triggers in the same transaction as every embeddings change); a
+  persisted index is only used if it matches, otherwise it is rebuilt
+
+Usage:
+    index = VectorIndex(DB_PATH, dim=384)
+    index.load_or_build(conn)
+    index.add("mem_123", embedding, "chat", generation=VectorIndex.read_generation(conn))
+    hits = index.search(query_embedding, k=10, types=["chat", "note"])
+    # [("mem_123", 0.83), ...]
+"""
+
+import json
+import os
+import sqlite3
+import logging
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Initial row capacity; grows by doubling
+_INITIAL_CAPACITY = 1024
+# Persist after this many unsaved mutations
+SAVE_EVERY = 256
+
+
+class VectorIndex:
+    """Pre-normalized float32 matrix with per-type bitmaps and tombstones."""
+
+    def __init__(self, db_path: Path, dim: int, model_name: str = 'all-MiniLM-L6-v2'):
+        self.dim = dim
+        self.model_name = model_name
+        base = str(db_path)
+        self._matrix_path = Path(base + ".vecidx.npy")
+        self._meta_path = Path(base + ".vecidx.json")
+
+        self._lock = threading.RLock()
+        self._loaded = False
+        self._matrix = np.zeros((0, dim), dtype=np.float32)
+        self._writable = True            # False while backed by a read-only mmap
+        self._size = 0                   # rows in use (live + tombstoned)
+        self._ids: List[Optional[str]] = []
+        self._row_of: Dict[str, int] = {}
+        self._alive = np.zeros(0, dtype=bool)
+        self._type_bitmaps: Dict[str, np.ndarray] = {}
+        self._dirty = 0
+        self._generation: Optional[int] = None  # DB generation the rows reflect
+
+    # ── Loading ──────────────────────────────────────────────────
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded
+
+    def __len__(self) -> int:
+        return len(self._row_of)
+
+    @staticmethod
+    def read_generation(conn: sqlite3.Connection) -> Optional[int]:
+        """Current embeddings generation of the DB, or None if it isn't tracked."""
+        try:
+            row = conn.execute("SELECT generation FROM embeddings_generation WHERE id = 1").fetchone()
+        except sqlite3.Error:
+            return None
+        return row[0] if row else None
+
+    def load_or_build(self, conn: sqlite3.Connection) -> None:
+        """Load the persisted index, rebuilding from SQLite if it is stale.
+
+        The caller is responsible for holding any DB lock it needs.
+        """
+        with self._lock:
+            if self._loaded:
+                return
+            generation = self.read_generation(conn)
+            if generation is not None and self._load_from_disk(generation):
+                logger.info(f"[VECIDX] Loaded {len(self._row_of)} vectors from {self._matrix_path.name}")
+            else:
+                self._build_from_db(conn)
+                self._generation = generation
+                self.save()
+            self._loaded = True
+
+    def _load_from_disk(self, generation: int) -> bool:
+        if not (self._matrix_path.exists() and self._meta_path.exists()):
+            return False
+        try:
+            with open(self._meta_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            if meta.get('dim') != self.dim or meta.get('model') != self.model_name:
+                return False
+            if meta.get('generation') != generation:
+                logger.info(f"[VECIDX] Persisted index is at generation {meta.get('generation')}, "
+                            f"DB is at {generation}; rebuilding")
+                return False
+            matrix = np.load(self._matrix_path, mmap_mode='r')
+            ids = meta.get('ids', [])
+            types = meta.get('types', [])
+            if matrix.shape != (len(ids), self.dim) or len(types) != len(ids):
+                return False
+        except Exception as e:
+            logger.warning(f"[VECIDX] Failed to load persisted index, rebuilding: {e}")
+            return False
+
+        self._reset()
+        self._set_rows(matrix, ids, types, writable=False)
+        self._generation = generation
+        return True
+
+    def _set_rows(self, matrix: np.ndarray, ids: List[str], types: List[str], writable: bool) -> None:
+        """Replace the rows with a compact (tombstone-free) matrix and its metadata."""
+        self._matrix = matrix
+        self._writable = writable
+        self._size = len(ids)
+        self._ids = list(ids)
+        self._row_of = {mid: i for i, mid in enumerate(ids)}
+        self._alive = np.ones(self._size, dtype=bool)
+        self._type_bitmaps = {}
+        for type_name in set(types):
+            self._type_bitmaps[type_name] = np.zeros(self._size, dtype=bool)
+        for i, type_name in enumerate(types):
+            self._type_bitmaps[type_name][i] = True
+
+    def _build_from_db(self, conn) -> None:
+        self._reset()
+        cursor = conn.execute(
+            """
+            SELECT e.memory_id, e.embedding, m.type
+            FROM embeddings e
+            JOIN memories m ON e.memory_id = m.id
+            """
+        )
+        count = 0
+        for row in cursor:
+            try:
+                vec = np.frombuffer(row[1], dtype=np.float32)
+            except Exception:
+                continue
+            if vec.shape[0] != self.dim:
+                continue
+            self._add_locked(row[0], vec, row[2])
+            count += 1
+        logger.info(f"[VECIDX] Built index from DB ({count} vectors)")
+
+    def _reset(self) -> None:
+        self._matrix = np.zeros((0, self.dim), dtype=np.float32)
+        self._writable = True
+        self._size = 0
+        self._ids = []
+        self._row_of = {}
+        self._alive = np.zeros(0, dtype=bool)
+        self._type_bitmaps = {}
+        self._dirty = 0
+        self._generation = None
+
+    # ── Mutation ─────────────────────────────────────────────────
+
+    # Mutators take the DB generation read after the change was committed
+    # (read_generation); it is what save() records as the index watermark.
+
+    def add(self, memory_id: str, embedding: np.ndarray, memory_type: str,
+            generation: Optional[int] = None) -> None:
+        """Insert or replace the vector for a memory."""
+        with self._lock:
+            if not self._loaded:
+                # Not loaded yet — the next load_or_build() picks it up from the DB
+                return
+            self._add_locked(memory_id, embedding, memory_type)
+            self._generation = generation
+            self._mark_dirty()
+
+    def add_many(self, items: Iterable[Tuple[str, np.ndarray, str]],
+                 generation: Optional[int] = None) -> None:
+        """Insert or replace several vectors at once."""
+        with self._lock:
+            if not self._loaded:
+                return
+            for memory_id, embedding, memory_type in items:
+                self._add_locked(memory_id, embedding, memory_type)
+                self._dirty += 1
+            self._generation = generation
+            self._mark_dirty(0)
+
+    def remove(self, memory_ids: Iterable[str], generation: Optional[int] = None) -> int:
+        """Tombstone the rows for the given memory ids. Returns rows removed."""
+        removed = 0
+        with self._lock:
+            for memory_id in memory_ids:
+                row = self._row_of.pop(memory_id, None)
+                if row is None:
+                    continue
+                self._alive[row] = False
+                self._ids[row] = None
+                removed += 1
+            if self._loaded:
+                # Even with nothing to remove the watermark moved; persist it
+                self._generation = generation
+                self._mark_dirty(max(removed, 1))
+        return removed
+
+    def clear(self, generation: Optional[int] = None) -> None:
+        """Drop every vector and persist the empty index."""
+        with self._lock:
+            self._reset()
+            self._generation = generation
+            if self._loaded:
+                self.save()
+
+    def _add_locked(self, memory_id: str, embedding: np.ndarray, memory_type: str) -> None:
+        vec = np.asarray(embedding, dtype=np.float32).reshape(-1)
+        norm = float(np.linalg.norm(vec))
+        if norm > 0:
+            vec = vec / norm
+
+        existing = self._row_of.get(memory_id)
+        if existing is not None:
+            self._alive[existing] = False
+            self._ids[existing] = None
+
+        self._ensure_capacity(self._size + 1)
+        row = self._size
+        self._matrix[row] = vec
+        self._alive[row] = True
+        self._ids.append(memory_id)
+        self._row_of[memory_id] = row
+        bitmap = self._type_bitmaps.get(memory_type)
+        if bitmap is None:
+            bitmap = np.zeros(self._matrix.shape[0], dtype=bool)
+            self._type_bitmaps[memory_type] = bitmap
+        bitmap[row] = True
+        self._size += 1
+
+    def _ensure_capacity(self, needed: int) -> None:
+        capacity = self._matrix.shape[0]
+        if self._writable and needed <= capacity:
+            return
+        new_capacity = max(_INITIAL_CAPACITY, capacity)
+        while new_capacity < needed:
+            new_capacity *= 2
+        # Copying also detaches us from a read-only mmap
+        matrix = np.zeros((new_capacity, self.dim), dtype=np.float32)
+        matrix[:self._size] = self._matrix[:self._size]
+        self._matrix = matrix
+        self._writable = True
+        self._alive = _grow(self._alive, new_capacity)
+        for type_name, bitmap in self._type_bitmaps.items():
+            self._type_bitmaps[type_name] = _grow(bitmap, new_capacity)
+
+    def _mark_dirty(self, count: int = 1) -> None:
+        self._dirty += count
+        if self._dirty >= SAVE_EVERY:
+            self.save()
+
+    # ── Query ────────────────────────────────────────────────────
+
+    def search(
+        self,
+        query_embedding: np.ndarray,
+        k: int,
+        types: Optional[List[str]] = None
+    ) -> List[Tuple[str, float]]:
+        """Return up to k (memory_id, cosine) pairs, best first."""
+        q = np.asarray(query_embedding, dtype=np.float32).reshape(-1)
+        norm = float(np.linalg.norm(q))
+        if norm == 0 or k <= 0:
+            return []
+        q = q / norm
+
+        with self._lock:
+            n = self._size
+            if n == 0:
+                return []
+            mask = self._alive[:n]
+            if types:
+                type_mask = np.zeros(n, dtype=bool)
+                for type_name in types:
+                    bitmap = self._type_bitmaps.get(type_name)
+                    if bitmap is not None:
+                        type_mask |= bitmap[:n]
+                mask = mask & type_mask
+            candidates = np.flatnonzero(mask)
+            if candidates.size == 0:
+                return []
+            # Contiguous fast path when nothing is filtered out
+            if candidates.size == n:
+                scores = self._matrix[:n] @ q
+            else:
+                scores = self._matrix[candidates] @ q
+
+            k = min(k, scores.shape[0])
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top])]
+            rows = top if candidates.size == n else candidates[top]
+            return [(self._ids[r], float(scores[t])) for r, t in zip(rows, top)]
+
+    # ── Persistence ──────────────────────────────────────────────
+
+    def save(self) -> None:
+        """Compact tombstones and write the index atomically."""
+        with self._lock:
+            live_rows = np.flatnonzero(self._alive[:self._size])
+            matrix = np.ascontiguousarray(self._matrix[live_rows])
+            ids = [self._ids[r] for r in live_rows]
+            row_types = [''] * len(ids)
+            for type_name, bitmap in self._type_bitmaps.items():
+                for out_i in np.flatnonzero(bitmap[live_rows]):
+                    row_types[out_i] = type_name
+
+            if not self._writable:
+                # Still memory-mapped from the file we're about to replace, which
+                # Windows refuses; switch to the compacted in-memory copy first
+                self._set_rows(matrix, ids, row_types, writable=True)
+
+            try:
+                self._matrix_path.parent.mkdir(parents=True, exist_ok=True)
+                tmp_matrix = self._matrix_path.with_suffix('.tmp.npy')
+                tmp_meta = self._meta_path.with_suffix('.tmp')
+                np.save(tmp_matrix, matrix)
+                with open(tmp_meta, 'w', encoding='utf-8') as f:
+                    json.dump({
+                        'dim': self.dim,
+                        'model': self.model_name,
+                        'generation': self._generation,
+                        'ids': ids,
+                        'types': row_types,
+                    }, f)
+                os.replace(tmp_matrix, self._matrix_path)
+                os.replace(tmp_meta, self._meta_path)
+                self._dirty = 0
+            except Exception as e:
+                logger.warning(f"[VECIDX] Failed to persist index: {e}")
+
+    def flush(self) -> None:
+        """Persist pending mutations, if any."""
+        with self._lock:
+            if self._loaded and self._dirty:
+                self.save()
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            return {
+                'loaded': self._loaded,
+                'vectors': len(self._row_of),
+                'tombstones': self._size - len(self._row_of),
+                'capacity': int(self._matrix.shape[0]),
+                'mmap': not self._writable,
+                'types': {t: int(b[:self._size][self._alive[:self._size]].sum())
+                          for t, b in self._type_bitmaps.items()},
+                'unsaved': self._dirty,
+            }
+
+
+def _grow(arr: np.ndarray, capacity: int) -> np.ndarray:
+    out = np.zeros(capacity, dtype=arr.dtype)
+    out[:min(arr.shape[0], capacity)] = arr[:capacity]
+    return out
@@ -2,10 +2,9 @@ import pyautogui
 import random
 import time
 import threading
-import base64
 import logging
-from io import BytesIO
-from PIL import Image
+
+from src.infra.frame_pipeline import frame_pipeline
 
 # Try to import screeninfo for multi-monitor support
 try:
@@ -81,6 +80,11 @@ class ScreenshotHandler(threading.Thread):
                         self.enabled = self.enabled.lower() == "true"
                         logger.info(f"Screenshot autonomy enabled state (converted from string): {self.enabled}")
                         
+                    skip_unchanged = screenshot_config.get('skip_unchanged', True)
+                    # Same string handling as `enabled` ("false" must not count as true)
+                    if isinstance(skip_unchanged, str):
+                        skip_unchanged = skip_unchanged.lower() == "true"
+                    
                     self.min_interval = screenshot_config.get('min_interval', 30)
                     self.max_interval = screenshot_config.get('max_interval', 300)
                     # Resolve both system-level and user-level prompts
@@ -116,10 +120,24 @@ class ScreenshotHandler(threading.Thread):
                                 screenshot = pyautogui.screenshot()
                                 logger.info("Captured full screen screenshot (no multi-monitor support)")
                             
-                            # Convert to base64
-                            buffered = BytesIO()
-                            screenshot.save(buffered, format="PNG")
-                            img_str = base64.b64encode(buffered.getvalue()).decode()
+                            # Skip frames that haven't changed since the last observation;
+                            # downscale/JPEG-encode the rest to the token budget
+                            frame = frame_pipeline.observe(
+                                screenshot,
+                                source="autonomy",
+                                max_tokens=screenshot_config.get('token_budget'),
+                                force=not skip_unchanged,
+                            )
+                            if frame.skipped:
+                                logger.info(f"Screen unchanged since last observation "
+                                            f"(dHash distance {frame.distance}, tile diff "
+                                            f"{frame.tile_diff:.1f}), not sending")
+                                self.last_screenshot_time = current_time
+                                time.sleep(min(self.min_interval, 60))
+                                continue
+                            image_url = frame.data_url
+                            logger.info(f"Screenshot encoded at {frame.width}x{frame.height} "
+                                        f"(from {frame.source_width}x{frame.source_height}), {len(frame.base64)} b64 chars")
                             
                             # Create messages for the screenshot
                             messages = [
@@ -134,7 +152,7 @@ class ScreenshotHandler(threading.Thread):
                                     "role": "user",
                                     "content": [
                                         {"type": "text", "text": self.screenshot_prompt},
-                                        {"type": "image_url", "image_url": {"url": f"data:image/png;base64,{img_str}"}}
+                                        {"type": "image_url", "image_url": {"url": image_url}}
                                     ]
                                 }
                             ]
@@ -143,7 +161,7 @@ class ScreenshotHandler(threading.Thread):
                             logger.info("Sending screenshot to chat...")
                             self.chat_agent.chat_response(
                                 self.screenshot_prompt or "What do you see?",
-                                image_data=f"data:image/png;base64,{img_str}",
+                                image_data=image_url,
                                 override_messages=messages
                             )
                             
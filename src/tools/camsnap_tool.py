@@ -23,12 +23,16 @@ except ImportError:
     HAS_OPENCV = False
     logger.warning("OpenCV not installed. Run: pip install opencv-python")
 
+from src.infra.frame_pipeline import HAS_PIL as HAS_FRAME_PIPELINE, frame_pipeline, to_pil
+
 IS_WINDOWS = sys.platform == 'win32'
 CAMSNAP_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "visual_memory", "images")
 JPEG_QUALITY = 80  # Good enough for vision models, ~40% smaller than default 95
 IDLE_TIMEOUT = 30  # Seconds before releasing an idle camera
 COLD_WARMUP = 2    # Frames to skip on cold open (auto-exposure settle)
 CAMERA_CONTEXT = "This is your live view through the camera."  # Prepended to vision prompts
+LOOK_TOKEN_BUDGET = 800   # Vision token budget for look() frames (downscaled before upload)
+LOOK_REUSE_SECONDS = 30   # Unchanged scene + same prompt within this window reuses the last description
 
 
 def _ensure_camsnap_dir():
@@ -283,6 +287,9 @@ def capture_and_describe(
 
 # ── Fast "look" tool — instant capture + describe, like screenshot ──────────
 
+_last_look: Dict[str, Dict[str, Any]] = {}  # frame source -> {prompt, description, at}
+
+
 def look(
     prompt: str = "",
     camera_index: int = 0,
@@ -304,28 +311,46 @@ def look(
     except RuntimeError as e:
         return {"status": "error", "error": str(e)}
     
-    # Encode to JPEG base64 (skip disk save for speed)
-    _, buffer = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, JPEG_QUALITY])
-    image_b64 = base64.b64encode(buffer).decode('utf-8')
+    vision_prompt = f"{CAMERA_CONTEXT} {prompt}".strip() if prompt else CAMERA_CONTEXT
+    description = None
+    unchanged = False
+    if HAS_FRAME_PIPELINE:
+        # Same scene + same question shortly after → reuse the last answer;
+        # otherwise send a frame downscaled to the token budget
+        source = f"camera:{_pool._key(camera_index, camera_url)}"
+        last = _last_look.get(source)
+        reusable = bool(last and last["prompt"] == vision_prompt
+                        and time.time() - last["at"] < LOOK_REUSE_SECONDS)
+        observed = frame_pipeline.observe(to_pil(frame, bgr=True), source=source,
+                                          max_tokens=LOOK_TOKEN_BUDGET, force=not reusable)
+        if observed.skipped:
+            description, unchanged = last["description"], True
+        image_b64 = observed.base64
+    else:
+        # Encode to JPEG base64 (skip disk save for speed)
+        _, buffer = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, JPEG_QUALITY])
+        image_b64 = base64.b64encode(buffer).decode('utf-8')
     
     capture_ms = (time.perf_counter() - t0) * 1000
     
     # Get description from best available vision model
-    vision_prompt = f"{CAMERA_CONTEXT} {prompt}".strip() if prompt else CAMERA_CONTEXT
-    description = None
-    try:
-        _ps = sys.modules.get('proxy_server')
-        _agent = getattr(_ps, 'agent', None) if _ps else None
-        if _agent:
-            description = _agent.describe_image(image_base64=image_b64, prompt=vision_prompt)
-    except Exception as e:
-        logger.warning(f"[LOOK] agent.describe_image failed: {e}")
+    if not unchanged:
+        try:
+            _ps = sys.modules.get('proxy_server')
+            _agent = getattr(_ps, 'agent', None) if _ps else None
+            if _agent:
+                description = _agent.describe_image(image_base64=image_b64, prompt=vision_prompt)
+        except Exception as e:
+            logger.warning(f"[LOOK] agent.describe_image failed: {e}")
+        if description and HAS_FRAME_PIPELINE:
+            _last_look[source] = {"prompt": vision_prompt, "description": description, "at": time.time()}
     
     if not description:
         description = "Camera captured but vision model returned no description. Check online provider config."
     
     total_ms = (time.perf_counter() - t0) * 1000
-    logger.info(f"[LOOK] Done in {total_ms:.0f}ms (capture={capture_ms:.0f}ms, {'warm' if is_warm else 'cold'})")
+    logger.info(f"[LOOK] Done in {total_ms:.0f}ms (capture={capture_ms:.0f}ms, {'warm' if is_warm else 'cold'}"
+                f"{', scene unchanged' if unchanged else ''})")
     
     return {
         "status": "success",
@@ -334,6 +359,7 @@ def look(
         "capture_ms": round(capture_ms, 1),
         "total_ms": round(total_ms, 1),
         "warm": is_warm,
+        "unchanged": unchanged,
     }
 
 
@@ -7,13 +7,28 @@ and context lines around matches.
 
 This tool saves significant tokens by letting the agent find
 exactly which files and lines are relevant before reading them.
+
+Search engine:
+- The walked file list is cached per root and revalidated by statting
+  directories only (a file add/remove/rename bumps its directory mtime)
+- Files are scanned on a thread pool (open/read/mmap release the GIL),
+  in ordered chunks so a capped search stops early
+- Each file is searched as one buffer (mmap for large files); line
+  numbers and context are only computed around matches; patterns that
+  can match or look past a newline are matched line by line instead
 """
 
 import os
 import re
+import mmap
+import time
 import fnmatch
 import logging
-from typing import Dict, Any, Optional, List
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, Any, Optional, List, Tuple
 
 logger = logging.getLogger(__name__)
 
@@ -48,7 +63,103 @@ MAX_FILE_SIZE = 2 * 1024 * 1024
 MAX_MATCHES = 100
 
 # Max files to scan
-MAX_FILES = 5000
+MAX_FILES = 50000
+
+# Files at least this big are mmapped instead of read
+MMAP_THRESHOLD = 256 * 1024
+
+# Scan pool size and files per scheduled chunk
+SEARCH_WORKERS = min(16, (os.cpu_count() or 4) * 2)
+SEARCH_CHUNK = 64
+
+# Cached tree snapshots (one per root + depth)
+MAX_TREE_SNAPSHOTS = 8
+
+
+@dataclass
+class _TreeSnapshot:
+    """Everything one os.walk of a root found, plus the dir mtimes that vouch for it."""
+    root: str
+    max_depth: int
+    dir_mtimes: Dict[str, int] = field(default_factory=dict)
+    files: List[Tuple[str, str, int, int]] = field(default_factory=list)  # (path, name, size, depth)
+    dirs: List[Tuple[str, str, int]] = field(default_factory=list)        # (path, name, parent depth)
+    taken_at: float = 0.0
+
+    def is_current(self) -> bool:
+        """True if no walked directory changed since the snapshot was taken."""
+        # Directories touched within a second of the walk may have changed mid-walk
+        racy_ns = int((self.taken_at - 1.0) * 1e9)
+        for path, mtime in self.dir_mtimes.items():
+            try:
+                current = os.stat(path).st_mtime_ns
+            except OSError:
+                return False
+            if current != mtime or current >= racy_ns:
+                return False
+        return True
+
+
+def _walk_tree(root: str, max_depth: int) -> _TreeSnapshot:
+    snap = _TreeSnapshot(root=root, max_depth=max_depth, taken_at=time.time())
+    for dirpath, dirs, filenames in os.walk(root):
+        # Skip hidden and known dirs
+        dirs[:] = [d for d in dirs if d not in SKIP_DIRS and not d.startswith('.')]
+        try:
+            snap.dir_mtimes[dirpath] = os.stat(dirpath).st_mtime_ns
+        except OSError:
+            continue
+
+        depth = dirpath.replace(root, '').count(os.sep)
+        if depth >= max_depth:
+            dirs.clear()
+            continue
+
+        for d in dirs:
+            snap.dirs.append((os.path.join(dirpath, d), d, depth))
+        for fname in filenames:
+            filepath = os.path.join(dirpath, fname)
+            try:
+                size = os.path.getsize(filepath)
+            except OSError:
+                continue
+            snap.files.append((filepath, fname, size, depth))
+    return snap
+
+
+_snapshots: "OrderedDict[Tuple[str, int], _TreeSnapshot]" = OrderedDict()
+_snapshots_lock = threading.Lock()
+
+
+def _get_tree(root: str, max_depth: int) -> _TreeSnapshot:
+    """Cached walk of `root` covering at least `max_depth` levels."""
+    with _snapshots_lock:
+        candidates = [snap for (r, d), snap in _snapshots.items() if r == root and d >= max_depth]
+    for snap in candidates:
+        if snap.is_current():
+            with _snapshots_lock:
+                _snapshots.move_to_end((snap.root, snap.max_depth), last=True)
+            return snap
+
+    snap = _walk_tree(root, max_depth)
+    with _snapshots_lock:
+        for key in [k for k in _snapshots if k[0] == root and k[1] <= max_depth]:
+            del _snapshots[key]
+        _snapshots[(root, max_depth)] = snap
+        while len(_snapshots) > MAX_TREE_SNAPSHOTS:
+            _snapshots.popitem(last=False)
+    return snap
+
+
+def invalidate_file_cache(root: Optional[str] = None) -> None:
+    """Drop cached tree snapshots (all, or those under `root`)."""
+    with _snapshots_lock:
+        if root is None:
+            _snapshots.clear()
+            return
+        root = os.path.abspath(root)
+        for key in [k for k in _snapshots if k[0].startswith(root) or root.startswith(k[0])]:
+            del _snapshots[key]
 
 
 def _resolve_search_path(path: str) -> str:
@@ -90,57 +201,390 @@ def _collect_files(
     max_depth: int = 10,
 ) -> List[str]:
     """Collect files to search, respecting filters."""
-    files = []
-    
     if os.path.isfile(search_path):
         return [search_path]
     
     if not os.path.isdir(search_path):
         return []
     
-    file_count = 0
-    for root, dirs, filenames in os.walk(search_path):
-        # Skip hidden and known dirs
-        dirs[:] = [d for d in dirs if d not in SKIP_DIRS and not d.startswith('.')]
-        
-        # Check depth
-        depth = root.replace(search_path, '').count(os.sep)
+    include_re = re.compile('|'.join(fnmatch.translate(os.path.normcase(p)) for p in includes)) if includes else None
+    files = []
+    for filepath, fname, size, depth in _get_tree(search_path, max_depth).files:
         if depth >= max_depth:
-            dirs.clear()
             continue
-        
-        for fname in filenames:
-            if file_count >= MAX_FILES:
-                break
-            
-            filepath = os.path.join(root, fname)
-            _, ext = os.path.splitext(fname)
-            
-            # Skip binary files
-            if ext.lower() in BINARY_EXTENSIONS:
-                continue
-            
-            # Skip large files
-            try:
-                if os.path.getsize(filepath) > MAX_FILE_SIZE:
-                    continue
-            except OSError:
-                continue
-            
-            # Apply include glob filters
-            if includes:
-                if not any(fnmatch.fnmatch(fname, pat) for pat in includes):
-                    continue
-            
-            files.append(filepath)
-            file_count += 1
-        
-        if file_count >= MAX_FILES:
+        # Skip binary and large files
+        if os.path.splitext(fname)[1].lower() in BINARY_EXTENSIONS or size > MAX_FILE_SIZE:
+            continue
+        # Apply include glob filters (fnmatch semantics, compiled once)
+        if include_re and not include_re.match(os.path.normcase(fname)):
+            continue
+        files.append(filepath)
+        if len(files) >= MAX_FILES:
             break
     
     return files
 
 
+try:
+    from re import _parser as _sre_parse   # Python 3.11+
+except ImportError:  # pragma: no cover
+    import sre_parse as _sre_parse
+
+# ASCII letters that IGNORECASE also matches to non-ASCII characters
+# (K: KELVIN SIGN, S: LONG S, I: DOTTED/DOTLESS I)
+_UNICODE_FOLD_CHARS = frozenset('iksIKS')
+
+_REPEAT_OPS = tuple(op for op in (getattr(_sre_parse, name, None) for name in
+                                  ('MAX_REPEAT', 'MIN_REPEAT', 'POSSESSIVE_REPEAT')) if op is not None)
+_ATOMIC_GROUP = getattr(_sre_parse, 'ATOMIC_GROUP', None)
+_STRUCTURAL_OPS = _REPEAT_OPS + (_sre_parse.SUBPATTERN, _sre_parse.BRANCH, _sre_parse.ASSERT,
+                                 _sre_parse.ASSERT_NOT, _sre_parse.GROUPREF_EXISTS, _ATOMIC_GROUP)
+
+# Zero-width assertions that look neither at word characters nor past a line
+_LINE_ANCHORS = frozenset((_sre_parse.AT_BEGINNING, _sre_parse.AT_END))
+
+_CATEGORY_ESCAPES = {getattr(_sre_parse, f'CATEGORY_{name}'): escape for name, escape in (
+    ('DIGIT', r'\d'), ('NOT_DIGIT', r'\D'), ('SPACE', r'\s'),
+    ('NOT_SPACE', r'\S'), ('WORD', r'\w'), ('NOT_WORD', r'\W'))}
+
+
+def _walk_pattern(items, flags: int):
+    """Yield (op, arg, active flags) for every node of a parsed pattern, nested ones included."""
+    for op, arg in items:
+        yield op, arg, flags
+        if op in _REPEAT_OPS:
+            yield from _walk_pattern(arg[2], flags)
+        elif op is _sre_parse.SUBPATTERN:
+            _, add_flags, del_flags, sub = arg
+            yield from _walk_pattern(sub, (flags | add_flags) & ~del_flags)
+        elif op is _sre_parse.BRANCH:
+            for branch in arg[1]:
+                yield from _walk_pattern(branch, flags)
+        elif op in (_sre_parse.ASSERT, _sre_parse.ASSERT_NOT):
+            yield from _walk_pattern(arg[1], flags)
+        elif op is _ATOMIC_GROUP:
+            yield from _walk_pattern(arg, flags)
+        elif op is _sre_parse.GROUPREF_EXISTS:
+            yield from _walk_pattern(arg[1], flags)
+            if arg[2] is not None:
+                yield from _walk_pattern(arg[2], flags)
+
+
+def _class_matches_newline(items) -> bool:
+    negate, hit = False, False
+    for op, arg in items:
+        if op is _sre_parse.NEGATE:
+            negate = True
+        elif op is _sre_parse.LITERAL:
+            hit = hit or arg == 10
+        elif op is _sre_parse.RANGE:
+            hit = hit or arg[0] <= 10 <= arg[1]
+        elif op is _sre_parse.CATEGORY:
+            escape = _CATEGORY_ESCAPES.get(arg)
+            hit = hit or escape is None or re.match(escape, '\n') is not None
+        else:
+            hit = True
+    return hit != negate
+
+
+def _stays_within_line(parsed) -> bool:
+    """True if no match can consume or look past a newline (or use \\A / \\Z).
+
+    Only then is a whole-buffer MULTILINE search equivalent to searching
+    each readlines() line (which keeps its trailing newline) on its own.
+    """
+    for op, arg, flags in _walk_pattern(parsed, parsed.state.flags):
+        if op is _sre_parse.LITERAL:
+            if arg == 10:
+                return False
+        elif op is _sre_parse.NOT_LITERAL:
+            if arg != 10:
+                return False
+        elif op is _sre_parse.ANY:
+            if flags & re.DOTALL:
+                return False
+        elif op is _sre_parse.IN:
+            if _class_matches_newline(arg):
+                return False
+        elif op is _sre_parse.AT:
+            if arg not in _LINE_ANCHORS and arg not in (_sre_parse.AT_BOUNDARY, _sre_parse.AT_NON_BOUNDARY):
+                return False
+        elif op not in _STRUCTURAL_OPS and op is not _sre_parse.GROUPREF:
+            return False
+    return True
+
+
+def _bytes_equivalent(parsed) -> bool:
+    """True if a bytes regex over UTF-8 matches exactly what the str regex would.
+
+    Only plain ASCII literals and positive ASCII classes qualify: `.`,
+    negated classes, \\w \\s \\d \\b and friends are Unicode-aware in str
+    patterns and byte-wise in bytes patterns.
+    """
+    for op, arg, flags in _walk_pattern(parsed, parsed.state.flags):
+        ignorecase = bool(flags & re.IGNORECASE)
+        if op is _sre_parse.LITERAL:
+            if arg > 127 or (ignorecase and chr(arg) in _UNICODE_FOLD_CHARS):
+                return False
+        elif op is _sre_parse.IN:
+            for item_op, item_arg in arg:
+                if item_op is _sre_parse.LITERAL:
+                    lo = hi = item_arg
+                elif item_op is _sre_parse.RANGE:
+                    lo, hi = item_arg
+                else:                      # NEGATE, CATEGORY
+                    return False
+                if hi > 127 or (ignorecase and any(lo <= ord(c) <= hi for c in _UNICODE_FOLD_CHARS)):
+                    return False
+        elif op is _sre_parse.AT:
+            if arg not in _LINE_ANCHORS:
+                return False
+        elif op not in _STRUCTURAL_OPS and op is not _sre_parse.GROUPREF:
+            return False
+    return True
+
+
+def _compile_pattern(query: str, fixed_strings: bool, case_sensitive: bool):
+    """Compile the query for searching file buffers.
+
+    Patterns that stay within a line are compiled MULTILINE and run over
+    the whole buffer; the rest are compiled without MULTILINE and matched
+    line by line, exactly as a per-line readlines() search would. A bytes
+    regex (no decode, mmap-able) is used only when it is provably
+    equivalent to the str regex; anything Unicode-aware stays str.
+    """
+    flags = 0 if case_sensitive else re.IGNORECASE
+    source = re.escape(query) if fixed_strings else query
+    re.compile(source, flags)  # raises re.error for bad input
+    try:
+        parsed = _sre_parse.parse(source, flags)
+    except Exception:
+        return re.compile(source, flags)
+    if _stays_within_line(parsed):
+        flags |= re.MULTILINE
+    if query.isascii() and _bytes_equivalent(parsed):
+        return re.compile(source.encode('ascii'), flags)
+    return re.compile(source, flags)
+
+
+class _Prefilter:
+    """Literal every match must contain; a cheap `in` check skips the regex for most files.
+
+    Case-insensitive bytes regexes are several times slower than lowering
+    the buffer and testing membership, so non-matching files never reach
+    the regex engine. The check runs on the raw UTF-8 bytes for str
+    patterns too, so case-insensitive literals leave out the letters that
+    fold to non-ASCII characters (see _UNICODE_FOLD_CHARS).
+    """
+
+    MIN_LITERAL = 3
+
+    def __init__(self, literal: bytes, case_sensitive: bool):
+        self.literal = literal if case_sensitive else literal.lower()
+        self.case_sensitive = case_sensitive
+
+    def may_match(self, buf) -> bool:
+        if self.case_sensitive:
+            return buf.find(self.literal) >= 0
+        return self.literal in buf.lower() if not isinstance(buf, mmap.mmap) else self.literal in buf[:].lower()
+
+    @classmethod
+    def for_query(cls, query: str, fixed_strings: bool, case_sensitive: bool) -> Optional["_Prefilter"]:
+        if not query.isascii():
+            return None
+        if fixed_strings:
+            chars = list(query)
+        else:
+            try:
+                parsed = _sre_parse.parse(query)
+            except Exception:
+                return None
+            if parsed.state.flags & re.IGNORECASE:   # inline (?i)
+                case_sensitive = False
+            chars = [chr(arg) if op is _sre_parse.LITERAL else None for op, arg in parsed]
+        # Longest run of plain characters at the top level of the pattern
+        best, run = "", ""
+        for ch in chars:
+            if ch is None or (not case_sensitive and ch in _UNICODE_FOLD_CHARS):
+                run = ""
+                continue
+            run += ch
+            if len(run) > len(best):
+                best = run
+        literal = best
+        if len(literal) < cls.MIN_LITERAL:
+            return None
+        return cls(literal.encode('ascii'), case_sensitive)
+
+
+def _read_buffer(filepath: str, as_bytes: bool):
+    """File contents as bytes (mmapped when large and `as_bytes`), or None."""
+    try:
+        with open(filepath, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            if size == 0 or size > MAX_FILE_SIZE:
+                return None
+            if size >= MMAP_THRESHOLD and as_bytes:
+                buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            else:
+                buf = f.read()
+    except (OSError, ValueError):
+        return None
+    # Same line breaks as text-mode readlines(): \r\n and lone \r end a line
+    if b'\r' in buf:
+        if isinstance(buf, mmap.mmap):
+            raw = buf[:]
+            buf.close()
+            buf = raw
+        buf = buf.replace(b'\r\n', b'\n').replace(b'\r', b'\n')
+    return buf
+
+
+def _line_text(line) -> str:
+    if isinstance(line, bytes):
+        return line.decode('utf-8', errors='replace')
+    return line
+
+
+def _matching_lines(buf, pattern, nl):
+    """Yield (start, end) spans of the lines of `buf` that `pattern` matches, in order."""
+    size = len(buf)
+    # A trailing newline ends the last line; it doesn't start an empty one
+    last = size - 1 if buf.endswith(nl) else size
+    pos = 0
+    if not pattern.flags & re.MULTILINE:
+        # Per-line mode: each line is searched with its newline, like readlines()
+        while pos <= last:
+            end = buf.find(nl, pos)
+            if end < 0:
+                end = size
+            if pattern.search(buf[pos:end + 1]):
+                yield pos, end
+            pos = end + 1
+        return
+    while pos <= last:
+        m = pattern.search(buf, pos)
+        if m is None or m.start() > last:
+            return
+        start = buf.rfind(nl, 0, m.start()) + 1
+        end = buf.find(nl, m.start())
+        if end < 0:
+            end = size
+        yield start, end
+        pos = end + 1
+
+
+def _search_file(filepath: str, pattern, context_lines: int, limit: int,
+                 prefilter: Optional[_Prefilter] = None) -> List[Dict[str, Any]]:
+    """Search one file; returns up to `limit` line matches.
+
+    MULTILINE patterns are run over the whole buffer; patterns compiled
+    without it need per-line matching (see _compile_pattern).
+    """
+    as_bytes = isinstance(pattern.pattern, bytes)
+    buf = _read_buffer(filepath, as_bytes)
+    if buf is None:
+        return []
+    nl = b'\n' if as_bytes else '\n'
+    try:
+        if prefilter is not None and not prefilter.may_match(buf):
+            return []
+        if not as_bytes:
+            buf = buf.decode('utf-8', errors='replace')
+        if pattern.flags & re.MULTILINE and pattern.search(buf) is None:
+            return []
+        if isinstance(buf, mmap.mmap):
+            view = buf[:]          # Matches are rare; copy only files that have one
+            buf.close()
+            buf = view
+        results = []
+        line_no = 1
+        counted_to = 0
+        size = len(buf)
+        for start, end in _matching_lines(buf, pattern, nl):
+            if len(results) >= limit:
+                break
+            line_no += buf.count(nl, counted_to, start)
+            counted_to = start
+            entry = {"line": line_no, "text": _line_text(buf[start:end])[:500]}
+            if context_lines > 0:
+                before, after = [], []
+                b_end = start
+                for i in range(1, context_lines + 1):
+                    if b_end == 0:
+                        break
+                    b_start = buf.rfind(nl, 0, b_end - 1) + 1
+                    before.insert(0, f"{line_no - i}: {_line_text(buf[b_start:b_end - 1]).rstrip()[:300]}")
+                    b_end = b_start
+                a_start = end + 1
+                for i in range(1, context_lines + 1):
+                    if a_start > size or (a_start == size and size > 0):
+                        break
+                    a_end = buf.find(nl, a_start)
+                    if a_end < 0:
+                        a_end = size
+                    after.append(f"{line_no + i}: {_line_text(buf[a_start:a_end]).rstrip()[:300]}")
+                    a_start = a_end + 1
+                if before:
+                    entry["before"] = before
+                if after:
+                    entry["after"] = after
+            results.append(entry)
+        return results
+    finally:
+        if isinstance(buf, mmap.mmap):
+            buf.close()
+
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=SEARCH_WORKERS, thread_name_prefix="grep")
+    return _executor
+
+
+def _search_chunk(paths: List[str], pattern, context_lines: int, limit: int, prefilter=None):
+    found = []
+    remaining = limit
+    for filepath in paths:
+        matches = _search_file(filepath, pattern, context_lines, remaining, prefilter)
+        if matches:
+            found.append((filepath, matches))
+            remaining -= len(matches)
+            if remaining <= 0:
+                break
+    return found
+
+
+def _search_files(files: List[str], pattern, context_lines: int, limit: int, prefilter=None):
+    """Yield (filepath, matches) in file order, scanning chunks in parallel."""
+    chunks = [files[i:i + SEARCH_CHUNK] for i in range(0, len(files), SEARCH_CHUNK)]
+    if len(chunks) <= 1:
+        yield from (_search_chunk(chunks[0], pattern, context_lines, limit, prefilter) if chunks else [])
+        return
+    executor = _get_executor()
+    window = SEARCH_WORKERS * 2
+    pending = []
+    next_chunk = 0
+    try:
+        while next_chunk < len(chunks) or pending:
+            while next_chunk < len(chunks) and len(pending) < window:
+                pending.append(executor.submit(_search_chunk, chunks[next_chunk], pattern,
+                                               context_lines, limit, prefilter))
+                next_chunk += 1
+            yield from pending.pop(0).result()
+    finally:
+        # Consumer stopped early (result cap): don't scan the rest
+        for future in pending:
+            future.cancel()
+
+
 def grep(
     query: str,
     path: str = ".",
@@ -175,12 +619,8 @@ def grep(
             }
         
         # Compile regex
-        flags = 0 if case_sensitive else re.IGNORECASE
         try:
-            if fixed_strings:
-                pattern = re.compile(re.escape(query), flags)
-            else:
-                pattern = re.compile(query, flags)
+            pattern = _compile_pattern(query, fixed_strings, case_sensitive)
         except re.error as e:
             return {
                 "status": "error",
@@ -208,24 +648,11 @@ def grep(
         files_with_matches = set()
         total_match_count = 0
         
-        for filepath in files:
+        prefilter = _Prefilter.for_query(query, fixed_strings, case_sensitive)
+        for filepath, file_matches in _search_files(files, pattern, context_lines, max_results, prefilter):
             if total_match_count >= max_results:
                 break
             
-            try:
-                with open(filepath, 'r', encoding='utf-8', errors='replace') as f:
-                    lines = f.readlines()
-            except (OSError, UnicodeDecodeError):
-                continue
-            
-            file_matches = []
-            for line_num, line in enumerate(lines, 1):
-                if pattern.search(line):
-                    file_matches.append((line_num, line.rstrip('\n\r')))
-            
-            if not file_matches:
-                continue
-            
             files_with_matches.add(filepath)
             
             # Make path relative to search_path for cleaner output
@@ -234,30 +661,10 @@ def grep(
             except ValueError:
                 rel_path = filepath
             
-            for line_num, line_text in file_matches:
+            for entry in file_matches:
                 if total_match_count >= max_results:
                     break
-                
-                match_entry = {
-                    "file": rel_path,
-                    "line": line_num,
-                    "text": line_text[:500],  # Truncate very long lines
-                }
-                
-                # Add context lines if requested
-                if context_lines > 0:
-                    ctx_before = []
-                    ctx_after = []
-                    for i in range(max(0, line_num - 1 - context_lines), line_num - 1):
-                        ctx_before.append(f"{i+1}: {lines[i].rstrip()[:300]}")
-                    for i in range(line_num, min(len(lines), line_num + context_lines)):
-                        ctx_after.append(f"{i+1}: {lines[i].rstrip()[:300]}")
-                    if ctx_before:
-                        match_entry["before"] = ctx_before
-                    if ctx_after:
-                        match_entry["after"] = ctx_after
-                
-                all_matches.append(match_entry)
+                all_matches.append({"file": rel_path, **entry})
                 total_match_count += 1
         
         # Build compact output
@@ -320,45 +727,35 @@ def find_files(
                 "error": f"Not a directory: {path}",
             }
         
-        results = []
-        count = 0
+        found = []
+        tree = _get_tree(search_path, max_depth)
         
-        for root, dirs, files in os.walk(search_path):
-            # Skip hidden and known dirs
-            dirs[:] = [d for d in dirs if d not in SKIP_DIRS and not d.startswith('.')]
-            
-            depth = root.replace(search_path, '').count(os.sep)
-            if depth >= max_depth:
-                dirs.clear()
-                continue
-            
-            # Check directories
-            if file_type in ("directory", "any"):
-                for d in dirs:
-                    if count >= max_results:
-                        break
-                    if fnmatch.fnmatch(d, pattern):
-                        rel = os.path.relpath(os.path.join(root, d), search_path)
-                        results.append({"path": rel, "type": "directory"})
-                        count += 1
-            
-            # Check files
-            if file_type in ("file", "any"):
-                for f in files:
-                    if count >= max_results:
-                        break
-                    if fnmatch.fnmatch(f, pattern):
-                        filepath = os.path.join(root, f)
-                        rel = os.path.relpath(filepath, search_path)
-                        try:
-                            size = os.path.getsize(filepath)
-                        except OSError:
-                            size = 0
-                        results.append({"path": rel, "type": "file", "size": size})
-                        count += 1
-            
-            if count >= max_results:
-                break
+        # Check directories
+        if file_type in ("directory", "any"):
+            for dirpath, d, depth in tree.dirs:
+                if depth < max_depth and fnmatch.fnmatch(d, pattern):
+                    found.append((dirpath, "directory"))
+        
+        # Check files
+        if file_type in ("file", "any"):
+            for filepath, f, _, depth in tree.files:
+                if depth < max_depth and fnmatch.fnmatch(f, pattern):
+                    found.append((filepath, "file"))
+        
+        # Walk order: each directory's subdirectories, then its files
+        if file_type == "any":
+            walk_order = {dirpath: i for i, dirpath in enumerate(tree.dir_mtimes)}
+            found.sort(key=lambda item: (walk_order.get(os.path.dirname(item[0]), 0), item[1] == "file"))
+        
+        results = []
+        for entry_path, kind in found[:max_results]:
+            entry = {"path": os.path.relpath(entry_path, search_path), "type": kind}
+            if kind == "file":
+                try:
+                    entry["size"] = os.path.getsize(entry_path)
+                except OSError:
+                    entry["size"] = 0
+            results.append(entry)
         
         return {
             "status": "success",
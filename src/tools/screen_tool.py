@@ -180,6 +180,8 @@ try:
 except ImportError:
     logger.debug("PIL not installed - image processing limited")
 
+from src.infra.frame_pipeline import MAX_EDGE, frame_pipeline
+
 try:
     import cv2
     import numpy as np
@@ -287,6 +289,8 @@ def take_screenshot(
     region: Optional[Tuple[int, int, int, int]] = None,
     save_path: Optional[str] = None,
     quality: int = 85,
+    max_tokens: Optional[int] = None,
+    skip_unchanged: bool = False,
 ) -> Dict[str, Any]:
     """
     Take a screenshot of the screen or a region.
@@ -296,6 +300,10 @@ def take_screenshot(
         region: Optional region as (x, y, width, height)
         save_path: Path to save screenshot (returns base64 if not provided)
         quality: JPEG quality (1-100)
+        max_tokens: Downscale base64 output to this vision token budget
+            (coordinates in the image then need dividing by "scale")
+        skip_unchanged: Return {"unchanged": True} without image data if the
+            screen looks the same as the last screenshot taken this way
         
     Returns:
         Dict with screenshot data or path
@@ -352,6 +360,21 @@ def take_screenshot(
             }
         else:
             # Return base64
+            if HAS_PIL and (max_tokens or skip_unchanged):
+                # Without a budget, keep full resolution so coordinates stay valid
+                frame = frame_pipeline.observe(
+                    img, source="screen", max_tokens=max_tokens or 0,
+                    max_edge=MAX_EDGE if max_tokens else None,
+                    force=not skip_unchanged, quality=quality,
+                )
+                result = {"status": "success", **frame.to_dict(), "scale": round(frame.scale, 4)}
+                if frame.skipped:
+                    result["unchanged"] = True
+                    result["message"] = "Screen unchanged since the last screenshot"
+                else:
+                    result.update(base64=frame.base64, format="jpeg",
+                                  size={"width": frame.width, "height": frame.height})
+                return result
             if HAS_PIL:
                 buffer = io.BytesIO()
                 img.save(buffer, format="JPEG", quality=quality)
@@ -8,12 +8,17 @@ Features:
 - Execute tools by name
 - Tool policy (allow/deny lists)
 - Tool execution logging
+- Cached schema bundles (Python list + pre-serialized JSON) keyed by
+  (categories, policy version, registry version), with per-provider
+  translations (Anthropic/Gemini) cached alongside
 """
 
+import json
 import logging
 import time
 import threading
-from typing import Dict, Any, Optional, List, Callable
+from collections import OrderedDict
+from typing import Dict, Any, Optional, List, Callable, Tuple
 from dataclasses import dataclass, field
 from enum import Enum
 
@@ -181,6 +186,8 @@ def _screen_dispatch(action: str, **kwargs) -> Dict[str, Any]:
             region=kwargs.get("region"),
             save_path=kwargs.get("save_path"),
             quality=kwargs.get("quality", 85),
+            max_tokens=kwargs.get("max_tokens"),
+            skip_unchanged=kwargs.get("skip_unchanged", False),
         ),
         "info": lambda: get_screen_info(),
         "record_start": lambda: start_recording(
@@ -875,6 +882,95 @@ class RegisteredTool:
     category: str = "core"
 
 
+@dataclass
+class SchemaBundle:
+    """LLM tool schemas for one (categories, policy version, registry version) key.
+
+    `schemas` is shared between callers — treat it and its dicts as read-only.
+    """
+    key: Tuple
+    schemas: List[Dict[str, Any]]
+    json: str
+
+
+# ── Provider translations ────────────────────────────────────────────
+# chat_with_tools passes the same schema list every round; translations are
+# cached by the identity of that list's dicts (the cache holds references,
+# so ids can't be recycled while an entry lives).
+
+_GEMINI_REJECTED_KEYS = {'additionalProperties', '$schema', 'default', 'examples', 'title'}
+_TRANSLATION_CACHE_SIZE = 32
+_translations: "OrderedDict[Tuple, Tuple[List[Dict[str, Any]], List[Dict[str, Any]], str]]" = OrderedDict()
+_translations_lock = threading.Lock()
+
+
+def _sanitize_gemini_schema(obj):
+    """Recursively strip fields Gemini rejects (additionalProperties, $schema, default, etc.)."""
+    if isinstance(obj, dict):
+        return {k: _sanitize_gemini_schema(v) for k, v in obj.items() if k not in _GEMINI_REJECTED_KEYS}
+    if isinstance(obj, list):
+        return [_sanitize_gemini_schema(i) for i in obj]
+    return obj
+
+
+def _translate_tools(tools: List[Dict[str, Any]], provider: str) -> List[Dict[str, Any]]:
+    if provider in ('anthropic', 'anthropic_cached'):
+        translated = []
+        for tool in tools:
+            func = tool.get('function', {})
+            translated.append({
+                'name': func.get('name'),
+                'description': func.get('description', ''),
+                'input_schema': func.get('parameters', {'type': 'object', 'properties': {}}),
+            })
+        if provider == 'anthropic_cached' and translated:
+            # Prompt-cache breakpoint after the tool block (see prompt_cache)
+            translated[-1] = {**translated[-1], 'cache_control': {'type': 'ephemeral'}}
+        return translated
+    if provider == 'google':
+        declarations = []
+        for tool in tools:
+            func = tool.get('function', {})
+            declarations.append({
+                'name': func.get('name'),
+                'description': func.get('description', ''),
+                'parameters': _sanitize_gemini_schema(func.get('parameters', {'type': 'object', 'properties': {}})),
+            })
+        return [{'function_declarations': declarations}] if declarations else []
+    return list(tools)   # OpenAI-compatible / Ollama: already in the right shape
+
+
+def provider_tool_schemas(tools: List[Dict[str, Any]], provider: str = 'openai') -> Tuple[List[Dict[str, Any]], str]:
+    """
+    OpenAI-style tool schemas translated for a provider, plus their JSON.
+
+    provider: 'openai' (also xAI/Ollama), 'anthropic', 'anthropic_cached'
+    (last tool carries a cache_control breakpoint) or 'google'.
+    Returns (tools, json_fragment); a fresh list each call, shared dicts.
+    """
+    key = (provider, tuple(id(t) for t in tools))
+    with _translations_lock:
+        hit = _translations.get(key)
+        if hit is not None:
+            _translations.move_to_end(key)
+            return list(hit[1]), hit[2]
+    translated = _translate_tools(tools, provider)
+    fragment = json.dumps(translated)
+    with _translations_lock:
+        _translations[key] = (list(tools), translated, fragment)
+        while len(_translations) > _TRANSLATION_CACHE_SIZE:
+            _translations.popitem(last=False)
+    return list(translated), fragment
+
+
+def json_body_with_fragment(payload: Dict[str, Any], key: str, fragment: str) -> bytes:
+    """Serialize payload with payload[key] replaced by an already-encoded JSON fragment."""
+    rest = json.dumps({k: v for k, v in payload.items() if k != key})
+    if rest == '{}':
+        return f'{{{json.dumps(key)}: {fragment}}}'.encode('utf-8')
+    return f'{rest[:-1]}, {json.dumps(key)}: {fragment}}}'.encode('utf-8')
+
+
 class ToolRegistry:
     """
     Central registry for all tools.
@@ -884,6 +980,7 @@ class ToolRegistry:
     - Tool execution with logging
     - Policy enforcement
     - Execution history
+    - Schema bundle cache (invalidated by registry/policy version bumps)
     """
     
     def __init__(self):
@@ -892,6 +989,11 @@ class ToolRegistry:
         self._lock = threading.Lock()
         self._max_history = 100
         
+        # Schema bundle cache — any change to tools or policy bumps a version
+        self._version = 0
+        self._policy_version = 0
+        self._bundles: Dict[Tuple, SchemaBundle] = {}
+        
         # Default policy settings
         self._global_policy = ToolPolicy.ALLOW
         self._tool_policies: Dict[str, ToolPolicy] = {}
@@ -919,6 +1021,7 @@ class ToolRegistry:
                 requires_confirmation=requires_confirmation,
                 category=category,
             )
+            self._version += 1
             logger.info(f"Registered tool: {name} (category={category})")
     
     def register_tool_class(self, tool_class) -> None:
@@ -943,6 +1046,7 @@ class ToolRegistry:
         with self._lock:
             if name in self._tools:
                 del self._tools[name]
+                self._version += 1
                 logger.info(f"Unregistered tool: {name}")
                 return True
             return False
@@ -974,17 +1078,20 @@ class ToolRegistry:
                 self._tool_policies[tool_name] = policy
             else:
                 self._global_policy = policy
+            self._policy_version += 1
     
     def deny_tool(self, name: str) -> None:
         """Add a tool to the deny list."""
         with self._lock:
             self._denied_tools.add(name)
+            self._policy_version += 1
     
     def allow_tool(self, name: str) -> None:
         """Add a tool to the allow list."""
         with self._lock:
             self._allowed_tools.add(name)
             self._denied_tools.discard(name)
+            self._policy_version += 1
     
     def _check_policy(self, name: str) -> ToolPolicy:
         """Check the effective policy for a tool."""
@@ -1159,16 +1266,24 @@ class ToolRegistry:
             cats.setdefault(tool.category, []).append(tool.name)
         return cats
     
-    def get_schemas_for_llm(self, categories: Optional[List[str]] = None) -> List[Dict[str, Any]]:
-        """Get tool schemas for LLM. If categories given, only include those categories."""
+    def get_schema_bundle(self, categories: Optional[List[str]] = None) -> SchemaBundle:
+        """Cached tool schemas (+ JSON) for the current tools and policy."""
+        cat_key = frozenset(categories) if categories is not None else None
+        key = (cat_key, self._policy_version, self._version)
+        bundle = self._bundles.get(key)
+        if bundle is not None:
+            return bundle
+        
+        with self._lock:
+            tools = list(self._tools.values())
         schemas = []
-        for tool in self._tools.values():
+        for tool in tools:
             if self._check_policy(tool.name) == ToolPolicy.DENY:
                 continue
-            if categories is not None and tool.category not in categories:
+            if cat_key is not None and tool.category not in cat_key:
                 continue
             
-            schema = {
+            schemas.append({
                 "type": "function",
                 "function": {
                     "name": tool.name,
@@ -1178,34 +1293,27 @@ class ToolRegistry:
                         "properties": {},
                     },
                 },
-            }
-            schemas.append(schema)
+            })
         
-        return schemas
+        bundle = SchemaBundle(key=key, schemas=schemas, json=json.dumps(schemas))
+        with _translations_lock:
+            # Seed the OpenAI-shape entry so request bodies reuse bundle.json
+            _translations[('openai', tuple(id(t) for t in schemas))] = (schemas, schemas, bundle.json)
+            while len(_translations) > _TRANSLATION_CACHE_SIZE:
+                _translations.popitem(last=False)
+        with self._lock:
+            # Drop bundles from older versions; keep one per category set
+            self._bundles = {k: v for k, v in self._bundles.items() if k[1:] == key[1:]}
+            self._bundles[key] = bundle
+        return bundle
+    
+    def get_schemas_for_llm(self, categories: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """Get tool schemas for LLM. If categories given, only include those categories."""
+        return list(self.get_schema_bundle(categories).schemas)
     
     def get_ollama_tools(self, categories: Optional[List[str]] = None) -> List[Dict[str, Any]]:
-        """Get tool schemas in Ollama's tool format."""
-        tools = []
-        for tool in self._tools.values():
-            if self._check_policy(tool.name) == ToolPolicy.DENY:
-                continue
-            if categories is not None and tool.category not in categories:
-                continue
-            
-            tool_def = {
-                "type": "function",
-                "function": {
-                    "name": tool.name,
-                    "description": tool.description,
-                    "parameters": tool.schema or {
-                        "type": "object",
-                        "properties": {},
-                    },
-                },
-            }
-            tools.append(tool_def)
-        
-        return tools
+        """Get tool schemas in Ollama's tool format (same shape as get_schemas_for_llm)."""
+        return list(self.get_schema_bundle(categories).schemas)
 
 
 # Global registry instance
@@ -1297,7 +1405,7 @@ def _register_default_tools(registry: ToolRegistry) -> None:
             "Mouse: mouse_click, mouse_move, mouse_drag, mouse_scroll, mouse_position, screen_size, hotkey. "
             "Screen: screenshot, screen_info, record_start, record_stop. "
             "Process: exec_status, exec_kill, exec_list, list_processes, kill_process, focus_window, active_window. "
-            "Extra params (automation_id, click_type, from_x/from_y/to_x/to_y, region, quality, etc.) are accepted as needed."
+            "Extra params (automation_id, click_type, from_x/from_y/to_x/to_y, region, quality, max_tokens, skip_unchanged, etc.) are accepted as needed."
         ),
         schema={
             "type": "object",
@@ -5,54 +5,23 @@ Features:
 - Fetch URL content
 - Extract readable text (removes ads, navigation, etc.)
 - Convert HTML to markdown or plain text
-- Caching to avoid re-fetching
+- Caching to avoid re-fetching (shared disk cache, see src/infra/fetch_cache.py)
 """
 
 import logging
 import os
 import re
-import time
-from typing import Dict, Any, Optional
+from typing import Dict, Any
 from urllib.parse import urlparse
-import hashlib
 
-logger = logging.getLogger(__name__)
+import requests
+
+from ..infra.fetch_cache import fetch as cached_fetch, cached_extract
 
-# Simple in-memory cache
-_url_cache: Dict[str, Dict[str, Any]] = {}
-CACHE_TTL_SECONDS = 300  # 5 minutes
+logger = logging.getLogger(__name__)
 
 DEFAULT_MAX_CHARS = 50000
 DEFAULT_TIMEOUT = 30
-DEFAULT_USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
-
-
-def _get_cache_key(url: str) -> str:
-    """Generate cache key for URL."""
-    return hashlib.md5(url.encode()).hexdigest()
-
-
-def _get_cached(url: str) -> Optional[Dict[str, Any]]:
-    """Get cached result if still valid."""
-    key = _get_cache_key(url)
-    if key in _url_cache:
-        entry = _url_cache[key]
-        if time.time() - entry.get('timestamp', 0) < CACHE_TTL_SECONDS:
-            return entry.get('result')
-    return None
-
-
-def _set_cache(url: str, result: Dict[str, Any]):
-    """Cache a result."""
-    key = _get_cache_key(url)
-    _url_cache[key] = {
-        'timestamp': time.time(),
-        'result': result
-    }
-    # Limit cache size
-    if len(_url_cache) > 100:
-        oldest = min(_url_cache.keys(), key=lambda k: _url_cache[k].get('timestamp', 0))
-        del _url_cache[oldest]
 
 
 def _html_to_text(html: str) -> str:
@@ -195,64 +164,22 @@ def web_fetch(
                 "error": f"Invalid URL scheme: {parsed.scheme}. Use http or https.",
             }
         
-        # Check cache
-        if use_cache:
-            cached = _get_cached(url)
-            if cached:
-                logger.info(f"Cache hit for {url}")
-                return cached
-        
-        # Fetch URL
-        import urllib.request
-        import ssl
-        
-        # Create SSL context that doesn't verify (for simplicity)
-        ctx = ssl.create_default_context()
-        ctx.check_hostname = False
-        ctx.verify_mode = ssl.CERT_NONE
-        
-        req = urllib.request.Request(
-            url,
-            headers={
-                'User-Agent': DEFAULT_USER_AGENT,
-                'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
-                'Accept-Language': 'en-US,en;q=0.5',
-            }
-        )
-        
-        with urllib.request.urlopen(req, timeout=timeout, context=ctx) as response:
-            # Check content type
-            content_type = response.headers.get('Content-Type', '')
-            if 'text/html' not in content_type and 'text/plain' not in content_type:
-                # Try to read anyway for JSON, etc.
-                pass
-            
-            # Read content
-            raw_content = response.read()
-            
-            # Try to decode
-            encoding = 'utf-8'
-            if 'charset=' in content_type:
-                match = re.search(r'charset=([^\s;]+)', content_type)
-                if match:
-                    encoding = match.group(1)
-            
-            try:
-                html = raw_content.decode(encoding)
-            except UnicodeDecodeError:
-                html = raw_content.decode('utf-8', errors='replace')
-        
-        # Extract title
-        title = _extract_title(html)
-        
-        # Extract main content
-        main_html = _extract_main_content(html)
-        
-        # Convert to requested format
-        if extract_mode == "text":
-            content = _html_to_text(main_html)
-        else:
-            content = _html_to_markdown(main_html)
+        # Fetch through the shared cache (fresh hit, 304 revalidation, or download)
+        response = cached_fetch(url, timeout=timeout, verify=False, use_cache=use_cache)
+        if response.source != "network":
+            logger.info(f"Cache {response.source} for {url}")
+
+        def extract(html: str) -> Dict[str, str]:
+            main_html = _extract_main_content(html)
+            if extract_mode == "text":
+                content = _html_to_text(main_html)
+            else:
+                content = _html_to_markdown(main_html)
+            return {"title": _extract_title(html), "content": content}
+
+        # Extraction is cached per body, so a re-fetch of an unchanged page skips the parse
+        page = cached_extract(response, f"web_fetch:{extract_mode}", extract)
+        title, content = page["title"], page["content"]
         
         # Truncate if needed
         truncated = False
@@ -260,7 +187,7 @@ def web_fetch(
             content = content[:max_chars] + f"\n\n[...truncated, {len(content)} total chars]"
             truncated = True
         
-        result = {
+        return {
             "status": "success",
             "url": url,
             "title": title,
@@ -269,22 +196,16 @@ def web_fetch(
             "truncated": truncated,
         }
         
-        # Cache result
-        if use_cache:
-            _set_cache(url, result)
-        
-        return result
-        
-    except urllib.error.HTTPError as e:
+    except requests.HTTPError as e:
         return {
             "status": "error",
-            "error": f"HTTP {e.code}: {e.reason}",
+            "error": f"HTTP {e.response.status_code}: {e.response.reason}",
             "url": url,
         }
-    except urllib.error.URLError as e:
+    except requests.RequestException as e:
         return {
             "status": "error",
-            "error": f"URL error: {e.reason}",
+            "error": f"URL error: {e}",
             "url": url,
         }
     except Exception as e:
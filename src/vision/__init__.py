@@ -8,8 +8,15 @@ from io import BytesIO
 from PIL import Image
 from flask import request, jsonify
 
+from src.infra.vision_cache import cached_vision, normalize_image
+
 logger = logging.getLogger(__name__)
 
+# Replaying a cached reply skips the whole chat turn (frontend messages,
+# history/memory writes, TTS), so it is opt-in:
+#   "vision_client": {"reply_cache_seconds": 300}
+DEFAULT_REPLY_CACHE_SECONDS = 0
+
 class VisionClientHandler:
     def __init__(self, chat_agent):
         """Initialize the VisionClientHandler with a chat agent."""
@@ -46,6 +53,15 @@ class VisionClientHandler:
                 "result": f"Error processing request: {e}"
             }), 500
         
+    def _reply_cache_seconds(self):
+        """Configured reply replay window in seconds (0 = always run the chat turn)."""
+        config = getattr(self.chat_agent, 'config', None) or {}
+        try:
+            return max(0.0, float(config.get('vision_client', {}).get(
+                'reply_cache_seconds', DEFAULT_REPLY_CACHE_SECONDS) or 0))
+        except (TypeError, ValueError, AttributeError):
+            return DEFAULT_REPLY_CACHE_SECONDS
+
     def process_image(self, image_data, prompt=None, model=None):
         """Process an image from the vision client.
         
@@ -67,27 +83,42 @@ class VisionClientHandler:
             else:
                 img_str = image_data
             
-            # Create messages for the vision client
-            messages = [
-                {
-                    "role": "system",
-                    "content": prompt_text
-                },
-                {
-                    "role": "user",
-                    "content": [
-                        {"type": "image_url", "image_url": {"url": f"data:image/jpeg;base64,{img_str}"}}
-                    ]
-                }
-            ]
+            def analyze(b64, mime):
+                # Create messages for the vision client
+                image_url = f"data:{mime};base64,{b64}"
+                messages = [
+                    {
+                        "role": "system",
+                        "content": prompt_text
+                    },
+                    {
+                        "role": "user",
+                        "content": [
+                            {"type": "image_url", "image_url": {"url": image_url}}
+                        ]
+                    }
+                ]
+                
+                # Process the image
+                logger.info("Sending vision client image to chat...")
+                return self.chat_agent.chat_response(
+                    prompt_text,
+                    image_data=image_url,
+                    override_messages=messages,
+                    model_override=model
+                )
             
-            # Process the image
-            logger.info("Sending vision client image to chat...")
-            response = self.chat_agent.chat_response(
-                prompt_text,
-                image_data=f"data:image/jpeg;base64,{img_str}",
-                override_messages=messages,
-                model_override=model
+            reply_ttl = self._reply_cache_seconds()
+            if not reply_ttl:
+                # Every frame is a real chat turn; only shrink the upload
+                return analyze(*normalize_image(img_str))
+            
+            # Opted in: identical frame + prompt + model → replay the cached
+            # reply without running the chat turn again
+            response = cached_vision(
+                img_str, prompt_text, f"chat/{model}", analyze,
+                cacheable=lambda r: isinstance(r, dict) and r.get("status") == "done",
+                ttl=reply_ttl,
             )
             
             return response
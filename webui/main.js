@@ -1860,13 +1860,14 @@
     currentAssistantRaw = '';
   }
   let lastIndex = 0;
+  // Long-poll: the server holds the request until a newer message arrives (or ~25s pass)
   async function poll(){
     try {
-      const res = await authFetch(`${proxyBase}/api/messages?since=${lastIndex}`);
+      const res = await authFetch(`${proxyBase}/api/messages?since=${lastIndex}&wait=25`);
       if (!res.ok) throw new Error('poll failed');
       statusEl.textContent = 'Connected';
       const data = await res.json();
-      if (!data || !Array.isArray(data.messages)) return;
+      if (!data || !Array.isArray(data.messages)) return true;
       // Update index
       if (typeof data.index === 'number') lastIndex = data.index;
       if (data.messages.length > 0) console.log(`[POLL] ${data.messages.length} new msgs, index now ${lastIndex}`);
@@ -2062,12 +2063,18 @@
     } catch (e) {
       statusEl.textContent = 'Connecting...';
       console.warn('[POLL] error:', e.message, 'proxyBase:', proxyBase);
+      return false;
     }
+    return true;
   }
-  // Start polling
+  // Start polling — back-to-back long-polls, with a short pause after errors
   console.log('[POLL] Starting poll loop, proxyBase:', proxyBase);
-  poll();
-  setInterval(poll, 500);
+  (async function pollLoop(){
+    for (;;) {
+      const ok = await poll();
+      await new Promise(r => setTimeout(r, ok ? 50 : 1000));
+    }
+  })();
 
   // Hold a pending image selection until user clicks Send
   let pendingImage = null; // { filename, dataUrl, base64, mime, bubble }